@@ -0,0 +1,81 @@
+# Job tracing for MetaMCP workers: the spans of one job, continuing the orchestrator's trace
+# from the envelope's W3C traceparent, written to a JSON lines file and/or posted to an OTLP/HTTP
+# collector when the job ends. Standard library only.
+#
+# Shared by the workers, each of which is built from its own directory and carries a
+# byte-identical copy of this file:
+#   hfspace-worker-template/worker/job_trace.py (this copy, and its vibe-coding-tool mirror)
+#   metamcp_artifacts/fallback_oracle_worker/job_trace.py
+# Edit this file and copy it over them with metamcp_artifacts/sync_shared_modules.sh.
+import os, json, time, uuid
+import urllib.request
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List
+
+class JobTrace:
+    """Spans of one job. Spans nest in the order they are opened and are
+    exported together by export(), which blocks on file and network I/O:
+    async handlers run it with asyncio.to_thread."""
+
+    def __init__(self, traceparent: Optional[str] = None, service_name: str = 'metamcp-worker',
+                 trace_file: Optional[str] = None, otlp_endpoint: Optional[str] = None):
+        parts = (traceparent or '').split('-')
+        valid = len(parts) >= 4 and len(parts[1]) == 32 and len(parts[2]) == 16
+        self.trace_id = parts[1] if valid else uuid.uuid4().hex
+        self.parent_id = parts[2] if valid else None
+        self.service_name = service_name
+        self.trace_file = trace_file
+        self.otlp_endpoint = otlp_endpoint
+        self.spans: List[Dict[str, Any]] = []
+        self._open: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        span = {
+            'name': name, 'trace_id': self.trace_id, 'span_id': os.urandom(8).hex(),
+            'parent_id': self._open[-1]['span_id'] if self._open else self.parent_id,
+            'start_ns': time.time_ns(), 'attributes': attributes,
+            'status': 'ok', 'status_message': None, 'service': self.service_name
+        }
+        self._open.append(span)
+        try:
+            yield span
+        except Exception as e:
+            span['status'], span['status_message'] = 'error', str(e)
+            raise
+        finally:
+            self._open.remove(span)
+            span['end_ns'] = time.time_ns()
+            self.spans.append(span)
+
+    def traceparent(self) -> str:
+        span_id = self._open[-1]['span_id'] if self._open else (self.parent_id or '0' * 16)
+        return f"00-{self.trace_id}-{span_id}-01"
+
+    def export(self):
+        """Best effort: tracing must never fail a job"""
+        try:
+            if self.trace_file:
+                with open(self.trace_file, 'a', encoding='utf-8') as f:
+                    for span in self.spans:
+                        f.write(json.dumps(span, default=str) + '\n')
+            if self.otlp_endpoint:
+                otlp_spans = [{
+                    'traceId': s['trace_id'], 'spanId': s['span_id'],
+                    **({'parentSpanId': s['parent_id']} if s['parent_id'] else {}),
+                    'name': s['name'], 'kind': 1,
+                    'startTimeUnixNano': str(s['start_ns']), 'endTimeUnixNano': str(s['end_ns']),
+                    'attributes': [{'key': k, 'value': {'stringValue': str(v)}} for k, v in s['attributes'].items()],
+                    'status': {'code': 2 if s['status'] == 'error' else 1}
+                } for s in self.spans]
+                body = json.dumps({'resourceSpans': [{
+                    'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': self.service_name}}]},
+                    'scopeSpans': [{'scope': {'name': 'metamcp-worker'}, 'spans': otlp_spans}]
+                }]}).encode()
+                request = urllib.request.Request(
+                    f"{self.otlp_endpoint.rstrip('/')}/v1/traces", data=body,
+                    headers={'Content-Type': 'application/json'}, method='POST'
+                )
+                urllib.request.urlopen(request, timeout=5).close()
+        except Exception:
+            pass
@@ -1,10 +1,11 @@
-import os, io, json, time, tempfile, subprocess, shutil, uuid
-from typing import Optional, Dict, Any
-from fastapi import FastAPI, HTTPException, Request, Header
+import os, io, json, time, tempfile, subprocess, shutil, uuid, hmac, hashlib, asyncio
+from typing import Optional, Dict, Any, List
+from fastapi import FastAPI, HTTPException, Request, Header, BackgroundTasks
 from fastapi.responses import JSONResponse
 import httpx
 import jwt
-from jwt import InvalidTokenError
+from worker.job_envelope import EnvelopeReplayed, EnvelopeVerifier
+from worker.job_trace import JobTrace
 from huggingface_hub import HfApi
 from pathlib import Path
 
@@ -27,6 +28,14 @@ META_PUBLIC_KEY = os.environ.get('META_PUBLIC_KEY')  # PEM public key used to ve
 WORKER_ID = os.environ.get('WORKER_ID', f'worker-{uuid.uuid4().hex[:8]}')
 DEFAULT_HF_REPO = os.environ.get('DEFAULT_HF_REPO')  # e.g., 'username/repo-datasets' or dataset id
 API_TIMEOUT = int(os.environ.get('API_TIMEOUT', '20'))
+CALLBACK_ATTEMPTS = int(os.environ.get('CALLBACK_ATTEMPTS', '5'))
+TRACE_FILE = os.environ.get('TRACE_FILE')  # append spans as JSON lines
+OTLP_ENDPOINT = os.environ.get('OTEL_EXPORTER_OTLP_ENDPOINT')  # e.g. http://collector:4318
+SERVICE_NAME = os.environ.get('OTEL_SERVICE_NAME', 'metamcp-hf-worker')
+ENVELOPE_ALGORITHMS = os.environ.get('ENVELOPE_ALGORITHMS', 'RS256,EdDSA').split(',')
+REPLAY_CACHE_SIZE = int(os.environ.get('REPLAY_CACHE_SIZE', '10000'))  # envelope IDs remembered
+
+envelope_verifier = EnvelopeVerifier(META_PUBLIC_KEY, ENVELOPE_ALGORITHMS, REPLAY_CACHE_SIZE) if META_PUBLIC_KEY else None
 
 @app.get('/mcp/health')
 async def health():
@@ -45,13 +54,14 @@ async def capabilities():
     return JSONResponse(caps)
 
 def verify_envelope(envelope_jwt: str) -> Dict[str, Any]:
-    """Verify RS256 JWT envelope using META_PUBLIC_KEY (PEM). Returns payload dict if valid."""
-    if not META_PUBLIC_KEY:
+    """Verify an RS256/EdDSA JWT envelope using META_PUBLIC_KEY (PEM). Returns payload dict if valid."""
+    if envelope_verifier is None:
         raise HTTPException(status_code=500, detail='META_PUBLIC_KEY not configured in worker')
     try:
-        payload = jwt.decode(envelope_jwt, META_PUBLIC_KEY, algorithms=['RS256'], options={"verify_aud": False})
-        return payload
-    except InvalidTokenError as e:
+        return envelope_verifier.verify(envelope_jwt)
+    except EnvelopeReplayed:
+        raise HTTPException(status_code=409, detail='Envelope already used')
+    except jwt.PyJWTError as e:
         raise HTTPException(status_code=401, detail=f'Invalid envelope JWT: {str(e)}')
 
 def run_subprocess(cmd, cwd=None, timeout=600):
@@ -151,79 +161,151 @@ def upload_artifacts_to_hf(files: list, hf_repo: Optional[str], token: Optional[
             results[p.name] = {'error': str(e)}
     return results
 
-async def call_callback(callback_url: str, payload: dict, timeout: int = 20):
+def sign_callback(secret: str, timestamp: str, body: bytes) -> str:
+    """X-Callback-Signature value: HMAC-SHA256 of '{timestamp}.{body}' with the per-job secret"""
+    digest = hmac.new(secret.encode(), timestamp.encode() + b'.' + body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+async def call_callback(callback_url: str, payload: dict, secret: Optional[str] = None, timeout: int = 20, attempts: int = 1, traceparent: Optional[str] = None):
+    """POST a callback, signed when the orchestrator sent a callback_secret.
+    Final results are retried with backoff; the orchestrator ignores duplicates."""
+    body = json.dumps(payload, separators=(',', ':')).encode()
+    result = {}
     async with httpx.AsyncClient(timeout=timeout) as client:
-        try:
-            r = await client.post(callback_url, json=payload)
-            return {'status_code': r.status_code, 'text': r.text}
-        except Exception as e:
-            return {'error': str(e)}
+        for attempt in range(attempts):
+            headers = {'Content-Type': 'application/json'}
+            if traceparent:
+                headers['traceparent'] = traceparent
+            if secret:
+                timestamp = str(int(time.time()))
+                headers['X-Callback-Timestamp'] = timestamp
+                headers['X-Callback-Signature'] = sign_callback(secret, timestamp, body)
+            try:
+                r = await client.post(callback_url, content=body, headers=headers)
+                result = {'status_code': r.status_code, 'text': r.text}
+                # 4xx (bad signature, unknown or superseded job) will not get better
+                if r.status_code < 500:
+                    return result
+            except Exception as e:
+                result = {'error': str(e)}
+            if attempt + 1 < attempts:
+                await asyncio.sleep(min(2 ** attempt, 30))
+    return result
 
-@app.post('/mcp/exec')
-async def exec_job(request: Request):
-    body = await request.json()
-    envelope_jwt = body.get('envelope_jwt') or body.get('jwt')
-    if not envelope_jwt:
-        raise HTTPException(status_code=400, detail='envelope_jwt is required')
-    payload = verify_envelope(envelope_jwt)
-    # Basic schema: payload contains task_id, tool, repo_url, ref, callback_url, hf_repo (optional), params
+async def run_pipeline(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the requested tools and report back to callback_url, if any"""
+    # Basic schema: payload contains task_id, tool, repo_url, ref, callback_url, hf_repo (optional), params.
+    # The orchestrator sends tool, repo_url, ref, hf_repo and params inside the task's 'input'.
+    job_input = payload.get('input') or {}
+    def field(name, default=None):
+        return payload.get(name, job_input.get(name, default))
     task_id = payload.get('task_id') or str(uuid.uuid4())
-    tool = payload.get('tool')
-    repo_url = payload.get('repo_url')
-    ref = payload.get('ref', 'main')
+    tool = field('tool')
+    repo_url = field('repo_url')
+    ref = field('ref', 'main')
     callback_url = payload.get('callback_url')
-    hf_repo = payload.get('hf_repo') or DEFAULT_HF_REPO
-    params = payload.get('params') or {}
+    callback_secret = payload.get('callback_secret')
+    meta_request_id = payload.get('meta_request_id')
+    hf_repo = field('hf_repo') or DEFAULT_HF_REPO
+    params = field('params') or {}
+    trace = JobTrace(payload.get('traceparent'), SERVICE_NAME, TRACE_FILE, OTLP_ENDPOINT)
+
+    async def report(stage: str):
+        # Progress is best effort: a single attempt, failures ignored
+        if callback_url:
+            await call_callback(callback_url, {
+                'task_id': task_id, 'status': 'running', 'meta_request_id': meta_request_id,
+                'progress': {'stage': stage, 'worker_id': WORKER_ID}
+            }, callback_secret, timeout=API_TIMEOUT, traceparent=trace.traceparent())
+
+    async def finish(callback_payload: dict):
+        with trace.span('worker.callback', status=callback_payload['status']):
+            return await call_callback(
+                callback_url, callback_payload, callback_secret, timeout=API_TIMEOUT,
+                attempts=CALLBACK_ATTEMPTS, traceparent=trace.traceparent()
+            )
+
     # Create workspace
     workdir = Path(tempfile.mkdtemp(prefix='mcp-work-'))
     outdir = workdir / 'out'
     outdir.mkdir(parents=True, exist_ok=True)
-    result = {'task_id': task_id, 'worker_id': WORKER_ID, 'status': 'started'}
+    result = {'task_id': task_id, 'worker_id': WORKER_ID, 'status': 'started', 'trace_id': trace.trace_id}
     try:
-        # clone repo shallow
-        if repo_url:
-            clone_cmd = f"git clone --depth 1 --branch {ref} {repo_url} {workdir / 'repo'}"
-            r_clone = run_subprocess(clone_cmd, cwd=str(workdir), timeout=600)
-            result['clone'] = r_clone
-            repo_dir = str(workdir / 'repo')
-        else:
-            repo_dir = str(workdir)
-        # Depending on tool, run pipeline
-        artifacts = []
-        notes = {}
-        if tool and 'kglab' in tool:
-            kres = simple_kglab_run(repo_dir, str(outdir), source_name=params.get('source_name'))
-            if 'files' in kres:
-                artifacts.extend(kres['files'])
-            notes['kglab'] = kres
-        if tool and 'semgrep' in tool:
-            sres = run_semgrep(repo_dir, str(outdir))
-            artifacts.extend(sres.get('files', []))
-            notes['semgrep'] = sres
-        if tool and 'tree_sitter' in tool:
-            tres = run_tree_sitter_stats(repo_dir, str(outdir))
-            artifacts.extend(tres.get('files', []))
-            notes['tree_sitter'] = tres
-        # Always produce a zip of outdir for convenience
-        zip_path = workdir / f"artifacts_{task_id}.zip"
-        shutil.make_archive(str(zip_path).replace('.zip',''), 'zip', str(outdir))
-        artifacts.append(str(zip_path))
-        # Upload artifacts to HF
-        upload_results = upload_artifacts_to_hf(artifacts, hf_repo, HF_TOKEN)
-        result.update({'status': 'completed', 'artifacts': upload_results, 'notes': notes})
-        # Callback
-        if callback_url:
-            callback_payload = {'task_id': task_id, 'status': 'completed', 'results': {'artifacts': upload_results}, 'meta_request_id': payload.get('meta_request_id')}
-            cbres = await call_callback(callback_url, callback_payload, timeout=API_TIMEOUT)
-            result['callback'] = cbres
-    except Exception as e:
-        result.update({'status': 'failed', 'error': str(e)})
-        if callback_url:
-            await call_callback(callback_url, {'task_id': task_id, 'status': 'failed', 'error': str(e), 'meta_request_id': payload.get('meta_request_id')}, timeout=API_TIMEOUT)
+        with trace.span('worker.job', task_id=task_id, tool=tool or '', worker_id=WORKER_ID) as job_span:
+            try:
+                # clone repo shallow
+                if repo_url:
+                    await report('clone')
+                    with trace.span('worker.clone', repo_url=repo_url, ref=ref) as span:
+                        clone_cmd = f"git clone --depth 1 --branch {ref} {repo_url} {workdir / 'repo'}"
+                        r_clone = await asyncio.to_thread(run_subprocess, clone_cmd, str(workdir), 600)
+                        span['attributes']['returncode'] = r_clone['returncode']
+                    result['clone'] = r_clone
+                    repo_dir = str(workdir / 'repo')
+                else:
+                    repo_dir = str(workdir)
+                # Depending on tool, run pipeline; blocking stages run off the event loop
+                artifacts = []
+                notes = {}
+                if tool and 'kglab' in tool:
+                    await report('kglab')
+                    with trace.span('worker.tool', tool='kglab'):
+                        kres = await asyncio.to_thread(simple_kglab_run, repo_dir, str(outdir), params.get('source_name'))
+                    if 'files' in kres:
+                        artifacts.extend(kres['files'])
+                    notes['kglab'] = kres
+                if tool and 'semgrep' in tool:
+                    await report('semgrep')
+                    with trace.span('worker.tool', tool='semgrep'):
+                        sres = await asyncio.to_thread(run_semgrep, repo_dir, str(outdir))
+                    artifacts.extend(sres.get('files', []))
+                    notes['semgrep'] = sres
+                if tool and 'tree_sitter' in tool:
+                    await report('tree_sitter')
+                    with trace.span('worker.tool', tool='tree_sitter'):
+                        tres = await asyncio.to_thread(run_tree_sitter_stats, repo_dir, str(outdir))
+                    artifacts.extend(tres.get('files', []))
+                    notes['tree_sitter'] = tres
+                # Always produce a zip of outdir for convenience
+                zip_path = workdir / f"artifacts_{task_id}.zip"
+                shutil.make_archive(str(zip_path).replace('.zip',''), 'zip', str(outdir))
+                artifacts.append(str(zip_path))
+                # Upload artifacts to HF
+                await report('upload')
+                with trace.span('worker.upload', files=len(artifacts)):
+                    upload_results = await asyncio.to_thread(upload_artifacts_to_hf, artifacts, hf_repo, HF_TOKEN)
+                result.update({'status': 'completed', 'artifacts': upload_results, 'notes': notes})
+            except Exception as e:
+                error = e.detail if isinstance(e, HTTPException) else str(e)
+                result.update({'status': 'failed', 'error': error})
+                job_span['status'], job_span['status_message'] = 'error', error
+            # Callback
+            if callback_url:
+                if result['status'] == 'completed':
+                    result['callback'] = await finish({'task_id': task_id, 'status': 'completed', 'results': {'artifacts': result['artifacts']}, 'meta_request_id': meta_request_id})
+                else:
+                    result['callback'] = await finish({'task_id': task_id, 'status': 'failed', 'error': result['error'], 'meta_request_id': meta_request_id})
     finally:
         # optional: cleanup workspace
         try:
             shutil.rmtree(workdir)
         except Exception:
             pass
-    return JSONResponse(result)
+        await asyncio.to_thread(trace.export)
+    return result
+
+@app.post('/mcp/exec')
+async def exec_job(request: Request, background_tasks: BackgroundTasks):
+    body = await request.json()
+    envelope_jwt = body.get('envelope_jwt') or body.get('jwt')
+    if not envelope_jwt:
+        raise HTTPException(status_code=400, detail='envelope_jwt is required')
+    payload = verify_envelope(envelope_jwt)
+    if payload.get('callback_url'):
+        # Submit and return: the orchestrator frees its slot and waits for the callback
+        background_tasks.add_task(run_pipeline, payload)
+        return JSONResponse(
+            {'task_id': payload.get('task_id'), 'worker_id': WORKER_ID, 'status': 'accepted', 'meta_request_id': payload.get('meta_request_id')},
+            status_code=202
+        )
+    return JSONResponse(await run_pipeline(payload))
@@ -0,0 +1,23 @@
+"""
+Pytest configuration for the ingestion adapter tests
+
+Run from the adapter directory: python -m pytest tests
+"""
+
+import os
+import tempfile
+
+import pytest
+
+# main creates DATA_DIR on import; keep it out of the working tree
+os.environ.setdefault('DATA_DIR', tempfile.mkdtemp(prefix='gkg-test-'))
+
+import main  # noqa: E402
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """A fresh DATA_DIR and graph manager per test"""
+    monkeypatch.setattr(main, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(main, 'graphs', main.GraphManager())
+    return tmp_path
@@ -0,0 +1,76 @@
+"""
+Test suite for batch ingestion
+"""
+
+import httpx
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+
+import main
+
+PAGES = {
+    '/article': (200, 'text/html', '<html><body><p>First paragraph</p><p>Second paragraph</p></body></html>'),
+    '/notes.txt': (200, 'text/plain', 'one\ntwo\nthree'),
+    '/missing': (404, 'text/plain', 'not found'),
+}
+
+
+def serve(request):
+    status, content_type, body = PAGES[request.url.path]
+    return httpx.Response(status, headers={'content-type': content_type}, text=body)
+
+
+@pytest_asyncio.fixture
+async def client(data_dir, monkeypatch):
+    monkeypatch.setattr(main, '_http', httpx.AsyncClient(transport=httpx.MockTransport(serve)))
+    async with AsyncClient(app=main.app, base_url='http://test') as client:
+        yield client
+    await main._http.aclose()
+    if main._parse_pool is not None:
+        main._parse_pool.shutdown()
+        main._parse_pool = None
+
+
+class TestIngestBatch:
+    """Test per-item results and the batch size limit"""
+
+    @pytest.mark.asyncio
+    async def test_failed_items_do_not_fail_the_batch(self, client):
+        response = await client.post('/mcp/ingest_batch', json={'graph': 'docs', 'items': [
+            {'url': 'http://site/article', 'source_name': 'article'},
+            {'url': 'http://site/missing'},
+            {'text': 'alpha\nbeta', 'source_name': 'notes', 'graph': 'other'},
+            {'source_name': 'empty'},
+            'not an item',
+            {'url': 'http://site/notes.txt', 'source_name': 'notes'},
+        ]})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [item['status'] for item in body['items']] == ['ok', 'error', 'ok', 'error', 'error', 'ok']
+        assert [item.get('triples') for item in body['items']] == [4, None, 4, None, None, 6]
+        assert 'url or text is required' in body['items'][3]['error']
+        assert body['stats']['succeeded'] == 3 and body['stats']['failed'] == 3
+        assert {g['graph']: g['triples_added'] for g in body['graphs']} == {'docs': 10, 'other': 4}
+        assert len(await main.graphs.get('docs')) == 10
+
+    @pytest.mark.asyncio
+    async def test_html_is_parsed_in_spawned_processes(self, client):
+        response = await client.post('/mcp/ingest_batch', json={'items': [{'url': 'http://site/article'}]})
+
+        assert response.json()['items'][0]['status'] == 'ok'
+        assert main._parse_pool._mp_context.get_start_method() == 'spawn'
+
+    @pytest.mark.asyncio
+    async def test_batch_size_is_limited(self, client, monkeypatch):
+        monkeypatch.setattr(main, 'INGEST_BATCH_MAX', 2)
+
+        too_many = await client.post('/mcp/ingest_batch', json={'items': [{'text': 'x'}] * 3})
+        at_limit = await client.post('/mcp/ingest_batch', json={'items': [{'text': 'x'}] * 2})
+        empty = await client.post('/mcp/ingest_batch', json={'items': []})
+
+        assert too_many.status_code == 400
+        assert 'at most 2 items' in too_many.json()['detail']
+        assert at_limit.status_code == 200
+        assert empty.status_code == 400
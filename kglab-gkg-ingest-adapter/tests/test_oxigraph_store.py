@@ -0,0 +1,76 @@
+"""
+Test suite for the embedded on-disk Oxigraph store
+"""
+
+import gc
+
+import pytest
+from rdflib import Literal, URIRef
+from rdflib.namespace import XSD
+
+import main
+
+pytest.importorskip('pyoxigraph')
+
+EX = 'http://example.org/'
+
+
+def triples(n):
+    return [(URIRef(f'{EX}s/{i}'), URIRef(f'{EX}n'), Literal(i, datatype=XSD.integer)) for i in range(n)]
+
+
+class TestOxigraphStore:
+    """Test that a graph created in the oxigraph store stays on disk in it"""
+
+    @pytest.mark.asyncio
+    async def test_graph_is_reopened_from_disk(self, data_dir):
+        manager = main.GraphManager()
+        added = (await manager.add('code', triples(5), kind='oxigraph'))[1]
+        added_again = (await manager.add('code', triples(6), kind='oxigraph'))[1]
+        await manager.close()
+        # RocksDB allows one open handle per directory, released with the store
+        del manager
+        gc.collect()
+
+        assert (added, added_again) == (5, 1)
+        assert (data_dir / 'code.oxigraph').is_dir()
+        assert main.OxigraphStore.exists('code')
+
+        # Reopened in the store it was saved with, whatever GRAPH_STORE says
+        manager = main.GraphManager()
+        store = await manager.get('code')
+        assert (store.kind, len(store)) == ('oxigraph', 6)
+        with pytest.raises(ValueError):
+            await manager.get('code', kind='memory')
+
+        result = store.query(f'SELECT ?s ?n WHERE {{ ?s <{EX}n> ?n FILTER(?n > 4) }}')
+        assert list(result.rows) == [{
+            's': {'type': 'uri', 'value': f'{EX}s/5'},
+            'n': {'type': 'literal', 'value': '5', 'datatype': str(XSD.integer)},
+        }]
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_store_is_not_evicted(self, data_dir):
+        manager = main.GraphManager(budget=0)
+        await manager.add('disk', triples(3), kind='oxigraph')
+        await manager.add('other', triples(3), kind='memory')
+
+        assert 'disk' in manager
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_invalid_names_and_iris_are_rejected(self, data_dir):
+        for name in ('../x', 'a/b', 'a.b'):
+            with pytest.raises(ValueError):
+                main.OxigraphStore(name)
+            with pytest.raises(ValueError):
+                main.OxigraphStore.exists(name)
+        assert not (data_dir.parent / 'x.oxigraph').exists()
+
+        manager = main.GraphManager()
+        store, _ = await manager.add('disk', triples(1), kind='oxigraph')
+        with pytest.raises(ValueError):
+            store.add([(URIRef(f'{EX}a>b'), URIRef(f'{EX}n'), Literal('x'))])
+        assert len(store) == 1
+        await manager.close()
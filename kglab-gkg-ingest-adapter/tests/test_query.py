@@ -0,0 +1,166 @@
+"""
+Test suite for streamed SPARQL queries
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from rdflib import BNode, Literal, URIRef
+from rdflib.namespace import XSD
+
+import main
+
+EX = 'http://example.org/'
+ROWS = f'SELECT ?s ?v WHERE {{ ?s <{EX}v> ?v }} ORDER BY ?s'
+
+
+@pytest_asyncio.fixture
+async def client(data_dir):
+    await main.graphs.add('g', [(URIRef(f'{EX}s/{i}'), URIRef(f'{EX}v'), Literal(f'value {i}')) for i in range(5)])
+    async with AsyncClient(app=main.app, base_url='http://test') as client:
+        yield client
+
+
+def blocking_query(store, monkeypatch):
+    """Make store queries block until the returned event is set"""
+    release = threading.Event()
+    query = store.query
+
+    def blocked(sparql):
+        release.wait(5)
+        return query(sparql)
+    monkeypatch.setattr(store, 'query', blocked)
+    return release
+
+
+async def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    assert condition()
+
+
+class TestFormats:
+    """Test SPARQL JSON and NDJSON responses"""
+
+    @pytest.mark.asyncio
+    async def test_json_results_document(self, client):
+        response = await client.post('/mcp/query', json={'graph': 'g', 'sparql': ROWS})
+
+        assert response.headers['content-type'] == 'application/sparql-results+json'
+        body = response.json()
+        assert body['head'] == {'vars': ['s', 'v']}
+        assert [b['v']['value'] for b in body['results']['bindings']] == [f'value {i}' for i in range(5)]
+        assert (body['rows'], body['next_cursor']) == (5, None)
+
+    @pytest.mark.asyncio
+    async def test_ndjson_lines(self, client):
+        response = await client.post('/mcp/query', json={'graph': 'g', 'sparql': ROWS, 'format': 'ndjson'})
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert response.headers['content-type'] == 'application/x-ndjson'
+        assert lines[0] == {'head': {'vars': ['s', 'v']}}
+        assert lines[1] == {'s': {'type': 'uri', 'value': f'{EX}s/0'}, 'v': {'type': 'literal', 'value': 'value 0'}}
+        assert len(lines) == 7
+        assert lines[-1] == {'rows': 5, 'next_cursor': None}
+
+    @pytest.mark.asyncio
+    async def test_ask_and_errors(self, client):
+        ask = await client.post('/mcp/query', json={'graph': 'g', 'sparql': f'ASK {{ ?s <{EX}v> "value 1" }}'})
+        invalid = await client.post('/mcp/query', json={'graph': 'g', 'sparql': 'SELECT WHERE'})
+        missing = await client.post('/mcp/query', json={'graph': 'nope', 'sparql': ROWS})
+        bad_format = await client.post('/mcp/query', json={'graph': 'g', 'sparql': ROWS, 'format': 'xml'})
+
+        assert ask.json() == {'head': {}, 'boolean': True}
+        assert [r.status_code for r in (invalid, missing, bad_format)] == [400, 404, 400]
+
+    @pytest.mark.asyncio
+    async def test_typed_terms(self, client):
+        await main.graphs.add('typed', [
+            (URIRef(f'{EX}t'), URIRef(f'{EX}n'), Literal(42)),
+            (URIRef(f'{EX}t'), URIRef(f'{EX}label'), Literal('chat', lang='fr')),
+            (URIRef(f'{EX}t'), URIRef(f'{EX}note'), Literal('plain')),
+            (URIRef(f'{EX}t'), URIRef(f'{EX}link'), BNode()),
+        ])
+        response = await client.post('/mcp/query', json={
+            'graph': 'typed', 'sparql': f'SELECT ?p ?o WHERE {{ <{EX}t> ?p ?o }}'
+        })
+
+        terms = {b['p']['value'][len(EX):]: b['o'] for b in response.json()['results']['bindings']}
+        assert terms['n'] == {'type': 'literal', 'value': '42', 'datatype': str(XSD.integer)}
+        assert terms['label'] == {'type': 'literal', 'value': 'chat', 'xml:lang': 'fr'}
+        assert terms['note'] == {'type': 'literal', 'value': 'plain'}
+        assert terms['link']['type'] == 'bnode'
+
+
+class TestPaging:
+    """Test limits and cursors"""
+
+    @pytest.mark.asyncio
+    async def test_cursor_resumes_after_the_limit(self, client):
+        values = []
+        request = {'graph': 'g', 'sparql': ROWS, 'limit': 2}
+        for _ in range(3):
+            body = (await client.post('/mcp/query', json=request)).json()
+            values += [b['v']['value'] for b in body['results']['bindings']]
+            request['cursor'] = body['next_cursor']
+
+        assert values == [f'value {i}' for i in range(5)]
+        assert request['cursor'] is None
+
+    @pytest.mark.asyncio
+    async def test_limits_and_cursors_are_checked(self, client, monkeypatch):
+        monkeypatch.setattr(main, 'QUERY_MAX_ROWS', 3)
+        capped = await client.post('/mcp/query', json={'graph': 'g', 'sparql': ROWS, 'limit': 100})
+        cursor = capped.json()['next_cursor']
+        other_query = await client.post('/mcp/query', json={'graph': 'g', 'sparql': ROWS + ' LIMIT 4', 'cursor': cursor})
+        negative = await client.post('/mcp/query', json={'graph': 'g', 'sparql': ROWS, 'offset': -1})
+
+        assert capped.json()['rows'] == 3 and cursor is not None
+        assert [r.status_code for r in (other_query, negative)] == [400, 400]
+
+
+class TestTimeouts:
+    """Test query timeouts and the cap on abandoned queries"""
+
+    @pytest.mark.asyncio
+    async def test_timeout_before_first_row_and_abandoned_cap(self, client, monkeypatch):
+        monkeypatch.setattr(main, 'QUERY_TIMEOUT', 0.1)
+        monkeypatch.setattr(main, 'QUERY_MAX_ABANDONED', 1)
+        release = blocking_query(await main.graphs.get('g'), monkeypatch)
+
+        timed_out = await client.post('/mcp/query', json={'graph': 'g', 'sparql': ROWS})
+        refused = await client.post('/mcp/query', json={'graph': 'g', 'sparql': ROWS})
+        assert timed_out.status_code == 504
+        assert main.QueryStream.abandoned == 1
+        assert refused.status_code == 503
+        assert 'Retry-After' in refused.headers
+
+        # Once the abandoned query finishes, queries run again
+        release.set()
+        await wait_until(lambda: main.QueryStream.abandoned == 0)
+        monkeypatch.setattr(main, 'QUERY_TIMEOUT', 5)
+        assert (await client.post('/mcp/query', json={'graph': 'g', 'sparql': ROWS})).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_timeout_while_streaming_ends_with_a_cursor(self, client, monkeypatch):
+        store = await main.graphs.get('g')
+        query = store.query
+
+        def slow_rows(sparql):
+            result = query(sparql)
+            return result._replace(rows=(time.sleep(0.06) or row for row in result.rows))
+        monkeypatch.setattr(store, 'query', slow_rows)
+        monkeypatch.setattr(main, 'QUERY_TIMEOUT', 0.1)
+
+        body = (await client.post('/mcp/query', json={'graph': 'g', 'sparql': ROWS})).json()
+
+        assert 'timed out' in body['error']
+        assert 0 < body['rows'] < 5
+        assert body['next_cursor'] is not None
+        assert main.QueryStream.abandoned == 0
@@ -1,21 +1,30 @@
-import os, json, time, subprocess, tempfile, shutil, uuid
+import os, json, time, subprocess, tempfile, shutil, uuid, asyncio
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import JSONResponse
 import jwt
-from jwt import InvalidTokenError
+from job_envelope import EnvelopeReplayed, EnvelopeVerifier
+from job_trace import JobTrace
 
 app = FastAPI(title='MetaMCP Fallback Oracle Worker')
 
 META_PUBLIC_KEY = os.environ.get('META_PUBLIC_KEY')  # PEM public key to verify envelope
 WORKER_ID = os.environ.get('WORKER_ID', f'oracle-worker-{uuid.uuid4().hex[:6]}')
+TRACE_FILE = os.environ.get('TRACE_FILE')  # append spans as JSON lines
+OTLP_ENDPOINT = os.environ.get('OTEL_EXPORTER_OTLP_ENDPOINT')  # e.g. http://collector:4318
+SERVICE_NAME = os.environ.get('OTEL_SERVICE_NAME', 'metamcp-oracle-worker')
+ENVELOPE_ALGORITHMS = os.environ.get('ENVELOPE_ALGORITHMS', 'RS256,EdDSA').split(',')
+REPLAY_CACHE_SIZE = int(os.environ.get('REPLAY_CACHE_SIZE', '10000'))  # envelope IDs remembered
+
+envelope_verifier = EnvelopeVerifier(META_PUBLIC_KEY, ENVELOPE_ALGORITHMS, REPLAY_CACHE_SIZE) if META_PUBLIC_KEY else None
 
 def verify_envelope(token: str):
-    if not META_PUBLIC_KEY:
+    if envelope_verifier is None:
         raise HTTPException(status_code=500, detail='META_PUBLIC_KEY not configured')
     try:
-        payload = jwt.decode(token, META_PUBLIC_KEY, algorithms=['RS256'], options={'verify_aud': False})
-        return payload
-    except InvalidTokenError as e:
+        return envelope_verifier.verify(token)
+    except EnvelopeReplayed:
+        raise HTTPException(status_code=409, detail='Envelope already used')
+    except jwt.PyJWTError as e:
         raise HTTPException(status_code=401, detail=f'Invalid token: {str(e)}')
 
 def run_cmd(cmd, cwd=None, timeout=600):
@@ -39,20 +48,25 @@ async def exec_fallback(request: Request):
     task_id = payload.get('task_id', str(uuid.uuid4()))
     repo = payload.get('repo_url')
     ref = payload.get('ref', 'main')
+    trace = JobTrace(payload.get('traceparent') or request.headers.get('traceparent'), SERVICE_NAME, TRACE_FILE, OTLP_ENDPOINT)
     workdir = tempfile.mkdtemp(prefix='fallback-')
-    result = {'task_id': task_id, 'worker': WORKER_ID}
+    result = {'task_id': task_id, 'worker': WORKER_ID, 'trace_id': trace.trace_id}
     try:
-        if repo:
-            clone_cmd = f"git clone --depth 1 --branch {ref} {repo} {workdir}/repo"
-            result['clone'] = run_cmd(clone_cmd)
-            repo_dir = f"{workdir}/repo"
-        else:
-            repo_dir = workdir
-        # simple run: create a tar.gz of repo as artifact (replace with heavy processing)
-        tar_path = f"{workdir}/artifact_{task_id}.tar.gz"
-        run_cmd(f"tar -czf {tar_path} -C {repo_dir} .")
-        result['artifact'] = tar_path
-        result['status'] = 'completed'
+        with trace.span('worker.job', task_id=task_id, worker_id=WORKER_ID):
+            if repo:
+                with trace.span('worker.clone', repo_url=repo, ref=ref) as span:
+                    clone_cmd = f"git clone --depth 1 --branch {ref} {repo} {workdir}/repo"
+                    result['clone'] = run_cmd(clone_cmd)
+                    span['attributes']['returncode'] = result['clone']['rc']
+                repo_dir = f"{workdir}/repo"
+            else:
+                repo_dir = workdir
+            # simple run: create a tar.gz of repo as artifact (replace with heavy processing)
+            with trace.span('worker.tool', tool='tar'):
+                tar_path = f"{workdir}/artifact_{task_id}.tar.gz"
+                run_cmd(f"tar -czf {tar_path} -C {repo_dir} .")
+            result['artifact'] = tar_path
+            result['status'] = 'completed'
     except Exception as e:
         result['status'] = 'failed'
         result['error'] = str(e)
@@ -62,4 +76,5 @@ async def exec_fallback(request: Request):
             shutil.rmtree(workdir)
         except Exception:
             pass
+        await asyncio.to_thread(trace.export)
     return JSONResponse(result)
@@ -1,24 +1,14 @@
 # Python: Job envelope signer (RS256) using PyJWT
 # Save your MetaMCP private key PEM to META_PRIVATE_KEY.pem and use this script to sign job payloads.
 # Install: pip install pyjwt[crypto]
-import json, sys, time
-import jwt
+import json, sys
+
+from job_envelope import load_key, sign_job
 
 PRIVATE_KEY_PATH = 'META_PRIVATE_KEY.pem'  # path to RSA private key in PEM format
 
 def load_private_key(path=PRIVATE_KEY_PATH):
-    with open(path, 'r', encoding='utf-8') as f:
-        return f.read()
-
-def sign_job(payload: dict, private_key_pem: str, exp_seconds=900):
-    now = int(time.time())
-    claims = payload.copy()
-    claims['iat'] = now
-    claims['exp'] = now + exp_seconds
-    # optional: add issuer/audience
-    claims['iss'] = 'metamcp.example.com'
-    token = jwt.encode(claims, private_key_pem, algorithm='RS256')
-    return token
+    return load_key(path)
 
 if __name__ == '__main__':
     if len(sys.argv) < 2:
@@ -1,21 +1,14 @@
 # Python: Job envelope verifier (RS256) for workers (uses public key)
 # Save MetaMCP public key PEM to META_PUBLIC_KEY.pem
 # Install: pip install pyjwt[crypto]
-import jwt, json, sys
-from jwt import InvalidTokenError
+import json, sys
+
+from job_envelope import load_key, verify_job
 
 PUBLIC_KEY_PATH = 'META_PUBLIC_KEY.pem'
 
 def load_public_key(path=PUBLIC_KEY_PATH):
-    with open(path, 'r', encoding='utf-8') as f:
-        return f.read()
-
-def verify_job(token: str, public_key_pem: str):
-    try:
-        payload = jwt.decode(token, public_key_pem, algorithms=['RS256'], options={'verify_aud': False})
-        return payload
-    except InvalidTokenError as e:
-        raise
+    return load_key(path)
 
 if __name__ == '__main__':
     if len(sys.argv) < 2:
@@ -0,0 +1,22 @@
+#!/bin/sh
+# Copy the shared modules over the copies carried by the deployables, which are each built
+# from their own directory; with --check, only report copies that differ (exit 1).
+# Run from anywhere inside the repository.
+set -e
+ROOT="$(cd "$(dirname "$0")/.." && pwd)"
+STATUS=0
+while read -r SOURCE COPY; do
+    if [ "$1" = "--check" ]; then
+        cmp -s "$ROOT/$SOURCE" "$ROOT/$COPY" || { echo "out of date: $COPY"; STATUS=1; }
+    else
+        cp "$ROOT/$SOURCE" "$ROOT/$COPY"
+    fi
+done <<MODULES
+metamcp_artifacts/job_signing_samples/job_envelope.py vibe-coding-tool/orchestrator/core/job_envelope.py
+metamcp_artifacts/job_signing_samples/job_envelope.py hfspace-worker-template/worker/job_envelope.py
+metamcp_artifacts/job_signing_samples/job_envelope.py vibe-coding-tool/hfspace-worker-template/worker/job_envelope.py
+metamcp_artifacts/job_signing_samples/job_envelope.py metamcp_artifacts/fallback_oracle_worker/job_envelope.py
+hfspace-worker-template/worker/job_trace.py vibe-coding-tool/hfspace-worker-template/worker/job_trace.py
+hfspace-worker-template/worker/job_trace.py metamcp_artifacts/fallback_oracle_worker/job_trace.py
+MODULES
+exit $STATUS
@@ -0,0 +1,130 @@
+"""
+Benchmark of the graph stores on a code knowledge graph
+
+Usage:
+
+    python benchmark_stores.py [--triples 1000000] [--store memory --store oxigraph]
+
+For each store, in its own process and a fresh DATA_DIR: ingests
+``--triples`` triples through ``GraphManager.add`` in ingest-sized batches,
+reopens the graph as after a restart, then times a fixed SPARQL workload
+(point lookups, reverse lookups, joins, an aggregate and a count) and reports
+the peak RSS. The graph models a codebase: modules, functions with names and
+line counts, calls and imports.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+EX = 'http://example.org/code/'
+BATCH = 1000
+
+WORKLOAD = {
+    'describe function': f'SELECT ?p ?o WHERE {{ <{EX}function/{{f}}> ?p ?o }}',
+    'callers of function': f'SELECT ?caller WHERE {{ ?caller <{EX}calls> <{EX}function/{{f}}> }}',
+    'function by name': f'SELECT ?fn WHERE {{ ?fn <{EX}name> "func_{{f}}" }}',
+    'functions of module': (
+        f'SELECT ?fn ?name WHERE {{ ?fn <{EX}definedIn> <{EX}module/{{m}}> ; <{EX}name> ?name }}'
+    ),
+    'two-hop calls': (
+        f'SELECT DISTINCT ?callee2 WHERE {{ <{EX}function/{{f}}> <{EX}calls> ?callee . ?callee <{EX}calls> ?callee2 }}'
+    ),
+    'large functions of module': (
+        f'SELECT ?fn WHERE {{ ?fn <{EX}definedIn> <{EX}module/{{m}}> ; <{EX}lines> ?n FILTER(?n > 150) }}'
+    ),
+    'largest modules': (
+        f'SELECT ?m (COUNT(?fn) AS ?n) WHERE {{ ?fn <{EX}definedIn> ?m }} GROUP BY ?m ORDER BY DESC(?n) LIMIT 10'
+    ),
+    'count triples': 'SELECT (COUNT(*) AS ?n) WHERE { ?s ?p ?o }',
+}
+
+def code_graph(triples: int, seed: int = 7):
+    """About eight triples per function and fifty functions per module"""
+    from rdflib import Literal, URIRef
+    from rdflib.namespace import RDF, XSD
+
+    rng = random.Random(seed)
+    functions = max(triples // 8, 1)
+    modules = max(functions // 50, 1)
+    calls, defined_in, name, lines, imports = (URIRef(EX + p) for p in ('calls', 'definedIn', 'name', 'lines', 'imports'))
+    function_type = URIRef(EX + 'Function')
+    emitted = 0
+    for i in range(functions):
+        fn = URIRef(f'{EX}function/{i}')
+        module = URIRef(f'{EX}module/{i % modules}')
+        batch = [
+            (fn, RDF.type, function_type),
+            (fn, defined_in, module),
+            (fn, name, Literal(f'func_{i}')),
+            (fn, lines, Literal(rng.randint(1, 200), datatype=XSD.integer)),
+        ]
+        batch += [(fn, calls, URIRef(f'{EX}function/{rng.randrange(functions)}')) for _ in range(3)]
+        batch.append((module, imports, URIRef(f'{EX}module/{rng.randrange(modules)}')))
+        for t in batch:
+            if emitted == triples:
+                return
+            emitted += 1
+            yield t
+
+async def run_store(kind: str, triples: int, repeat: int):
+    import main
+
+    functions, modules = max(triples // 8, 1), max(triples // 400, 1)
+    graphs = main.GraphManager(budget=1 << 62)
+    started = time.perf_counter()
+    batch = []
+    for t in code_graph(triples):
+        batch.append(t)
+        if len(batch) == BATCH:
+            await graphs.add('bench', batch, kind=kind)
+            batch = []
+    if batch:
+        await graphs.add('bench', batch, kind=kind)
+    await graphs.close()
+    ingest = time.perf_counter() - started
+    print(f'{kind:<9} ingest   {triples:>10,} triples in {ingest:7.1f}s   {triples / ingest:>9,.0f} triples/s')
+
+    graphs = main.GraphManager(budget=1 << 62)
+    started = time.perf_counter()
+    store = await graphs.get('bench')
+    print(f'{kind:<9} reopen   {len(store):>10,} triples in {time.perf_counter() - started:7.1f}s')
+
+    rng = random.Random(11)
+    for label, template in WORKLOAD.items():
+        samples = []
+        for _ in range(repeat):
+            sparql = template.replace('{f}', str(rng.randrange(functions))).replace('{m}', str(rng.randrange(modules)))
+            start = time.perf_counter()
+            rows = sum(1 for _ in store.query(sparql).rows)
+            samples.append(time.perf_counter() - start)
+        print(f'{kind:<9} query    {label:<26} median {statistics.median(samples) * 1e3:9.2f}ms   ({rows} rows)')
+    await graphs.close()
+    print(f'{kind:<9} peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MiB')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--triples', type=int, default=1000000)
+    parser.add_argument('--store', action='append', choices=['memory', 'oxigraph'], help='store to benchmark (repeatable)')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each workload query')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(run_store(args.store[0], args.triples, args.repeat))
+    else:
+        # One process per store so that peak RSS is measured separately
+        for kind in args.store or ['memory', 'oxigraph']:
+            with tempfile.TemporaryDirectory() as data_dir:
+                subprocess.run(
+                    [sys.executable, __file__, '--child', '--store', kind, '--triples', str(args.triples), '--repeat', str(args.repeat)],
+                    env={**os.environ, 'DATA_DIR': data_dir},
+                    check=True,
+                )
@@ -1,9 +1,21 @@
 import os
 import io
+import re
 import json
+import time
 import uuid
+import base64
+import shutil
+import asyncio
+import hashlib
+import logging
+import itertools
+import threading
+import multiprocessing
 import httpx
-from typing import Optional
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Iterator, List, NamedTuple
 from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from bs4 import BeautifulSoup
@@ -14,147 +26,933 @@ try:
     KGLAB_AVAILABLE = True
 except Exception:
     KGLAB_AVAILABLE = False
-from rdflib import Graph, URIRef, Literal, Namespace
+# Optional embedded on-disk store
+try:
+    import pyoxigraph
+    OXIGRAPH_AVAILABLE = True
+except Exception:
+    OXIGRAPH_AVAILABLE = False
+# BeautifulSoup builds its tree faster from lxml than from the pure-Python html.parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except Exception:
+    HTML_PARSER = 'html.parser'
+from rdflib import Graph, URIRef, Literal, Namespace, BNode
+from rdflib.plugins.sparql import prepareQuery
+from rdflib.plugins.sparql.evaluate import evalQuery
 
 app = FastAPI(title='kglab GKG Ingestion Adapter')
+logger = logging.getLogger(__name__)
 
 DATA_DIR = os.environ.get('DATA_DIR', 'data')
 os.makedirs(DATA_DIR, exist_ok=True)
+WAL_FSYNC_INTERVAL = float(os.environ.get('WAL_FSYNC_INTERVAL', '1.0'))  # seconds between batched fsyncs
+WAL_COMPACT_BYTES = int(os.environ.get('WAL_COMPACT_BYTES', str(64 * 1024 * 1024)))  # log size that triggers compaction
+GRAPH_MEMORY_BYTES = int(os.environ.get('GRAPH_MEMORY_BYTES', str(1024 * 1024 * 1024)))  # budget for resident graphs
+GRAPH_STORE = os.environ.get('GRAPH_STORE', 'memory')  # store of new graphs: memory or oxigraph
+INGEST_CONCURRENCY = int(os.environ.get('INGEST_CONCURRENCY', '16'))  # concurrent fetches per batch
+INGEST_PARSE_WORKERS = int(os.environ.get('INGEST_PARSE_WORKERS', str(os.cpu_count() or 1)))  # HTML parsing processes
+INGEST_BATCH_MAX = int(os.environ.get('INGEST_BATCH_MAX', '1000'))  # items per /mcp/ingest_batch request
+QUERY_TIMEOUT = float(os.environ.get('QUERY_TIMEOUT', '30'))  # seconds a query may run
+QUERY_MAX_ROWS = int(os.environ.get('QUERY_MAX_ROWS', '10000'))  # rows per /mcp/query response
+QUERY_MAX_ABANDONED = int(os.environ.get('QUERY_MAX_ABANDONED', '4'))  # timed-out queries left running before new ones get 503
+# rdflib's in-memory store costs about this much per triple on top of the terms themselves
+TRIPLE_OVERHEAD_BYTES = 1200
 
-# Simple in-memory graph registry (named graphs)
-GRAPHS = {}
-
-def _get_graph(name='default'):
-    if name in GRAPHS:
-        return GRAPHS[name]
-    if KGLAB_AVAILABLE:
-        kg = kglab.KnowledgeGraph(name=name)
-        GRAPHS[name] = kg
-        return kg
-    else:
-        g = Graph()
-        GRAPHS[name] = g
-        return g
-
-def _save_graph_to_disk(name='default'):
-    g = GRAPHS.get(name)
-    if g is None:
-        return None
-    path = os.path.join(DATA_DIR, f"{name}.ttl")
+def _rdf(g):
     # If kglab object, get underlying rdflib graph
     if KGLAB_AVAILABLE and hasattr(g, 'graph'):
-        rdf = g.graph
-    else:
-        rdf = g
-    rdf.serialize(destination=path, format='turtle')
-    return path
+        return g.graph
+    return g
 
-async def _fetch_url_text(url: str):
-    async with httpx.AsyncClient(timeout=20.0) as client:
-        r = await client.get(url)
-        r.raise_for_status()
-        ct = r.headers.get('content-type','')
-        if 'html' in ct:
-            soup = BeautifulSoup(r.text, 'html.parser')
-            # naive extraction: join visible paragraph text
-            paragraphs = [p.get_text(separator=' ', strip=True) for p in soup.find_all('p')]
-            text = '\n\n'.join(paragraphs)
-            return text
+def _new_graph(name):
+    if KGLAB_AVAILABLE:
+        return kglab.KnowledgeGraph(name=name)
+    return Graph()
+
+# Graph names become file names in DATA_DIR
+GRAPH_NAME = re.compile(r'[A-Za-z0-9_-]+')
+
+def _graph_path(name, suffix):
+    """Path of one of a graph's files; raises ValueError for a name that is not a GRAPH_NAME"""
+    if not isinstance(name, str) or not GRAPH_NAME.fullmatch(name):
+        raise ValueError(f'invalid graph name {name!r}: use letters, digits, _ and -')
+    return os.path.join(DATA_DIR, name + suffix)
+
+TRIPLE_VARS = ['subject', 'predicate', 'object']
+XSD_STRING = 'http://www.w3.org/2001/XMLSchema#string'
+
+class QueryResult(NamedTuple):
+    """Variables and lazily produced rows of a query, each row a dict of
+    SPARQL JSON terms by variable; ASK queries set boolean instead"""
+    variables: List[str]
+    rows: Iterator[Dict[str, dict]]
+    boolean: Optional[bool] = None
+
+def _rdflib_binding(term):
+    if isinstance(term, URIRef):
+        return {'type': 'uri', 'value': str(term)}
+    if isinstance(term, BNode):
+        return {'type': 'bnode', 'value': str(term)}
+    binding = {'type': 'literal', 'value': str(term)}
+    if term.language:
+        binding['xml:lang'] = term.language
+    elif term.datatype:
+        binding['datatype'] = str(term.datatype)
+    return binding
+
+class MemoryStore:
+    """rdflib (or kglab) graph held in memory and persisted by a GraphLog"""
+
+    kind = 'memory'
+    evictable = True
+
+    def __init__(self, name: str):
+        self.graph = _new_graph(name)
+        self.rdf = _rdf(self.graph)
+        self.log = GraphLog(name)
+        self.path = self.log.log_path
+        self.size = 0  # estimated bytes in memory
+
+    @staticmethod
+    def exists(name):
+        return any(os.path.exists(_graph_path(name, suffix)) for suffix in ('.log.nt.compacting', '.log.nt', '.nt', '.ttl'))
+
+    def load(self):
+        if self.log.on_disk():
+            self.size = self.log.replay(self.rdf)
+
+    @property
+    def busy(self):
+        return self.log.compaction is not None
+
+    @property
+    def dirty(self):
+        return self.log.dirty
+
+    def add(self, triples):
+        new = [t for t in dict.fromkeys(triples) if t not in self.rdf]
+        # Logged first: a triple that cannot be written is not added either
+        self.size += self.log.append(new) + len(new) * TRIPLE_OVERHEAD_BYTES
+        self.rdf.addN((s, p, o, self.rdf) for s, p, o in new)
+        return len(new)
+
+    def __len__(self):
+        return len(self.rdf)
+
+    def query(self, sparql):
+        # Evaluated below rdf.query, whose result keeps every row it yields
+        res = evalQuery(self.rdf, prepareQuery(sparql, initNs=dict(self.rdf.namespaces())))
+        if res['type_'] == 'ASK':
+            return QueryResult([], iter(()), res['askAnswer'])
+        if res['type_'] == 'SELECT':
+            return QueryResult(
+                [str(v) for v in res['vars_']],
+                ({str(k): _rdflib_binding(v) for k, v in row.items() if v is not None} for row in res['bindings']),
+            )
+        # CONSTRUCT and DESCRIBE
+        return QueryResult(TRIPLE_VARS, (dict(zip(TRIPLE_VARS, map(_rdflib_binding, t))) for t in res['graph']))
+
+    def serialize(self, fmt):
+        return self.rdf.serialize(format=fmt, encoding='utf-8')
+
+    def sync(self):
+        self.log.sync()
+
+    async def close(self):
+        if self.log.compaction is not None:
+            await self.log.compaction
+        await asyncio.to_thread(self.log.close)
+
+class OxigraphStore:
+    """Embedded on-disk store in DATA_DIR/<name>.oxigraph.
+
+    Oxigraph keeps triples in RocksDB under SPO, POS and OSP indexes and
+    evaluates SPARQL natively, so a graph is not limited by RAM and queries do
+    not go through rdflib's Python engine. Its memory use is bounded by RocksDB
+    rather than by the graph, so it is kept open once loaded (RocksDB allows a
+    single open handle per directory) and is not part of the memory budget."""
+
+    kind = 'oxigraph'
+    evictable = False
+    busy = False
+    size = 0
+
+    def __init__(self, name: str):
+        if not OXIGRAPH_AVAILABLE:
+            raise ValueError('the oxigraph store needs pyoxigraph installed')
+        self.path = _graph_path(name, '.oxigraph')
+        self.store = pyoxigraph.Store(self.path)
+        self.count = 0
+        self.dirty = False
+
+    @staticmethod
+    def exists(name):
+        return os.path.isdir(_graph_path(name, '.oxigraph'))
+
+    def load(self):
+        self.count = len(self.store)  # a full scan, done once per open
+
+    def add(self, triples):
+        quads = (pyoxigraph.Quad(_ox_term(s), _ox_term(p), _ox_term(o)) for s, p, o in dict.fromkeys(triples))
+        new = [q for q in quads if q not in self.store]
+        self.store.extend(new)
+        self.count += len(new)
+        self.dirty = self.dirty or bool(new)
+        return len(new)
+
+    def __len__(self):
+        return self.count
+
+    def query(self, sparql):
+        res = self.store.query(sparql)
+        if isinstance(res, pyoxigraph.QueryBoolean):
+            return QueryResult([], iter(()), bool(res))
+        if isinstance(res, pyoxigraph.QueryTriples):
+            return QueryResult(TRIPLE_VARS, (
+                dict(zip(TRIPLE_VARS, (_ox_binding(t.subject), _ox_binding(t.predicate), _ox_binding(t.object))))
+                for t in res
+            ))
+        variables = [v.value for v in res.variables]
+        return QueryResult(variables, (
+            {name: _ox_binding(v) for name, v in zip(variables, row) if v is not None} for row in res
+        ))
+
+    def serialize(self, fmt):
+        ox_format = {'turtle': pyoxigraph.RdfFormat.TURTLE, 'json-ld': pyoxigraph.RdfFormat.JSON_LD}.get(fmt, pyoxigraph.RdfFormat.N_TRIPLES)
+        return self.store.dump(format=ox_format, from_graph=pyoxigraph.DefaultGraph())
+
+    def sync(self):
+        self.dirty = False
+        self.store.flush()
+
+    async def close(self):
+        await asyncio.to_thread(self.sync)
+
+STORES = {'memory': MemoryStore, 'oxigraph': OxigraphStore}
+
+def _ox_term(term):
+    if isinstance(term, URIRef):
+        return pyoxigraph.NamedNode(str(term))
+    if isinstance(term, BNode):
+        return pyoxigraph.BlankNode(str(term))
+    return pyoxigraph.Literal(
+        str(term),
+        language=term.language,
+        datatype=pyoxigraph.NamedNode(str(term.datatype)) if term.datatype else None,
+    )
+
+def _ox_binding(term):
+    if isinstance(term, pyoxigraph.NamedNode):
+        return {'type': 'uri', 'value': term.value}
+    if isinstance(term, pyoxigraph.BlankNode):
+        return {'type': 'bnode', 'value': term.value}
+    if isinstance(term, pyoxigraph.Literal):
+        binding = {'type': 'literal', 'value': term.value}
+        if term.language:
+            binding['xml:lang'] = term.language
+        elif term.datatype.value != XSD_STRING:
+            binding['datatype'] = term.datatype.value
+        return binding
+    return {'type': 'triple', 'value': str(term)}
+
+def _store_on_disk(name):
+    """Kind of the store a graph is saved in, None if it has not been saved"""
+    for kind, store_cls in STORES.items():
+        if store_cls.exists(name):
+            return kind
+    return None
+
+class GraphManager:
+    """Named graph stores, with in-memory graphs held under GRAPH_MEMORY_BYTES.
+
+    A graph is opened from DATA_DIR on first access in the store it was saved
+    with; a new graph uses the requested store, GRAPH_STORE by default. The
+    size of an in-memory graph is estimated from the N-Triples it holds plus
+    TRIPLE_OVERHEAD_BYTES per triple, and once they exceed the budget the least
+    recently used ones are dropped; their log already has everything, so
+    eviction only syncs and closes it."""
+
+    def __init__(self, budget: int = GRAPH_MEMORY_BYTES):
+        self.budget = budget
+        self.graphs: 'OrderedDict[str, object]' = OrderedDict()  # least recently used first
+        self.loading: Dict[str, asyncio.Future] = {}
+        self.loads = 0
+        self.evictions = 0
+
+    def __contains__(self, name):
+        return name in self.graphs
+
+    async def get(self, name='default', create=False, kind=None):
+        """Store of a graph, opening it if needed; None if it does not exist.
+
+        Raises ValueError for an invalid graph name, or if the graph exists in
+        another store than kind."""
+        _graph_path(name, '')
+        if name in self.loading:
+            await asyncio.shield(self.loading[name])
+        if name in self.graphs:
+            self.graphs.move_to_end(name)
+            store = self.graphs[name]
         else:
-            return r.text
+            saved = _store_on_disk(name)
+            if saved is None and not create:
+                return None
+            store = await self._open(name, saved or kind or GRAPH_STORE)
+        if kind is not None and kind != store.kind:
+            raise ValueError(f'graph {name} uses the {store.kind} store')
+        return store
+
+    async def _open(self, name, kind):
+        if kind not in STORES:
+            raise ValueError(f'unknown store {kind}')
+        self.loading[name] = asyncio.get_running_loop().create_future()
+        try:
+            store = STORES[kind](name)
+            await asyncio.to_thread(store.load)
+            self.loads += 1
+            self.graphs[name] = store
+            self.loading.pop(name).set_result(store)
+        except BaseException as e:
+            future = self.loading.pop(name)
+            future.set_exception(e)
+            future.exception()  # retrieved here so waiters are optional
+            raise
+        await self.evict(keep=name)
+        return store
+
+    async def add(self, name, triples, kind=None):
+        """Add triples to a named graph, persisting the ones it did not have"""
+        store = await self.get(name, create=True, kind=kind)
+        added = store.add(triples)
+        await self.evict(keep=name)
+        return store, added
+
+    def resident_bytes(self):
+        return sum(store.size for store in self.graphs.values())
+
+    async def evict(self, keep=None):
+        while self.resident_bytes() > self.budget:
+            # A graph being compacted stays until its log is rotated
+            name = next((n for n, s in self.graphs.items() if n != keep and s.evictable and not s.busy), None)
+            if name is None:
+                return
+            store = self.graphs.pop(name)
+            self.evictions += 1
+            await store.close()
+
+    async def close(self):
+        for store in list(self.graphs.values()):
+            await store.close()
+
+    def stats(self):
+        return {
+            'resident': {name: store.kind for name, store in self.graphs.items()},
+            'resident_bytes': self.resident_bytes(),
+            'budget_bytes': self.budget,
+            'loads': self.loads,
+            'evictions': self.evictions,
+        }
+
+graphs = GraphManager()
+
+class GraphLog:
+    """Append-only N-Triples persistence of one named graph.
+
+    DATA_DIR/<name>.nt is a snapshot and <name>.log.nt holds the triples added
+    since, so an ingest writes only its own triples. fsyncs are batched by the
+    background flusher. Once the log passes WAL_COMPACT_BYTES it is sealed and
+    folded into the snapshot in a thread, by concatenating files rather than
+    re-serializing the graph; a crash mid-compaction leaves
+    <name>.log.nt.compacting, which is folded in on the next start unless the
+    snapshot already ends with it. Lines that do not parse on replay, such as
+    one torn by a crash mid-append, are logged and skipped."""
+
+    def __init__(self, name: str):
+        self.snapshot_path = _graph_path(name, '.nt')
+        self.log_path = _graph_path(name, '.log.nt')
+        self.sealed_path = _graph_path(name, '.log.nt.compacting')
+        if os.path.exists(self.sealed_path):
+            self._merge()
+        self.file = open(self.log_path, 'ab')
+        self.size = self.file.tell()
+        if self.size and not _ends_with_newline(self.log_path):
+            # Torn last line: keep the next append off it
+            self.size += self.file.write(b'\n')
+        self.dirty = False
+        self.compaction: Optional[asyncio.Task] = None
+
+    def on_disk(self):
+        return any(os.path.exists(p) and os.path.getsize(p) for p in (self.snapshot_path, self.log_path, self.snapshot_path[:-3] + '.ttl'))
+
+    def replay(self, rdf):
+        """Load snapshot then log into an rdflib graph; returns its estimated size in bytes"""
+        legacy = self.snapshot_path[:-3] + '.ttl'
+        if not os.path.exists(self.snapshot_path) and os.path.exists(legacy):
+            # Graph saved as Turtle by an earlier version: becomes the first snapshot
+            rdf.parse(legacy, format='turtle')
+            rdf.serialize(destination=self.snapshot_path, format='nt', encoding='utf-8')
+        bnodes = {}  # blank node labels are shared between the files
+        nbytes = 0
+        for path in (self.snapshot_path, self.log_path):
+            if os.path.exists(path) and os.path.getsize(path):
+                _read_nt(rdf, path, bnodes)
+                nbytes += os.path.getsize(path)
+        return nbytes + len(rdf) * TRIPLE_OVERHEAD_BYTES
+
+    def append(self, triples: List[tuple]) -> int:
+        """Raises ValueError, having written nothing, if a triple cannot be written as N-Triples"""
+        if not triples:
+            return 0
+        data = ''.join(f"{_nt_term(s)} {_nt_term(p)} {_nt_term(o)} .\n" for s, p, o in triples).encode('utf-8')
+        self.file.write(data)
+        self.file.flush()
+        self.size += len(data)
+        self.dirty = True
+        if self.size >= WAL_COMPACT_BYTES and self.compaction is None:
+            self.compaction = asyncio.get_running_loop().create_task(self.compact())
+        return len(data)
+
+    def sync(self):
+        if self.dirty:
+            self.dirty = False
+            os.fsync(self.file.fileno())
+
+    async def compact(self):
+        try:
+            self.sync()
+            self.file.close()
+            os.replace(self.log_path, self.sealed_path)
+            self.file = open(self.log_path, 'ab')
+            self.size = 0
+            await asyncio.to_thread(self._merge)
+        finally:
+            self.compaction = None
+
+    def _merge(self):
+        if self._snapshot_has_sealed():
+            # Crashed after replacing the snapshot but before removing the sealed log
+            os.remove(self.sealed_path)
+            return
+        tmp = f"{self.snapshot_path}.tmp"
+        with open(tmp, 'wb') as out:
+            for path in (self.snapshot_path, self.sealed_path):
+                if os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        shutil.copyfileobj(f, out, 1024 * 1024)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, self.snapshot_path)
+        os.remove(self.sealed_path)
+
+    def _snapshot_has_sealed(self):
+        """Whether the snapshot ends with the sealed log. A log holds only triples
+        the graph did not have, so an unmerged snapshot cannot end with them."""
+        sealed_size = os.path.getsize(self.sealed_path)
+        if not sealed_size:
+            return True
+        if not os.path.exists(self.snapshot_path) or os.path.getsize(self.snapshot_path) < sealed_size:
+            return False
+        with open(self.snapshot_path, 'rb') as snapshot, open(self.sealed_path, 'rb') as sealed:
+            snapshot.seek(-sealed_size, os.SEEK_END)
+            while chunk := sealed.read(1024 * 1024):
+                if snapshot.read(len(chunk)) != chunk:
+                    return False
+        return True
+
+    def close(self):
+        self.sync()
+        self.file.close()
+
+# One N-Triples statement as rdflib writes them; anything else goes to rdflib's parser
+_NT_TERM = r'<([^>\\]*)>|_:(\S+)'
+_NT_LINE = re.compile(
+    rf'(?:{_NT_TERM}) <([^>\\]*)> (?:{_NT_TERM}|"((?:[^"\\]|\\.)*)"(?:@([A-Za-z0-9-]+)|\^\^<([^>]*)>)?) \.\s*$'
+)
+_NT_ESCAPE = re.compile(r'\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)')
+_NT_ESCAPES = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+
+# Characters N-Triples does not allow in an IRI
+_IRI_INVALID = re.compile(r'[\x00-\x20<>"{}|^`\\]')
 
-def _simple_text_to_triples(graph_obj, text, source_name=None):
+def _iri_quote(text):
+    """Percent-encode the characters of text that are not allowed in an IRI"""
+    return _IRI_INVALID.sub(lambda m: f'%{ord(m.group()):02X}', text)
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+def _nt_unescape(match):
+    esc = match.group(1)
+    return chr(int(esc[1:], 16)) if esc[0] in 'uU' else _NT_ESCAPES.get(esc, esc)
+
+def _nt_iri(iri):
+    if _IRI_INVALID.search(iri):
+        raise ValueError(f'invalid IRI {str(iri)!r}')
+    return f"<{iri}>"
+
+def _nt_term(term):
+    if isinstance(term, URIRef):
+        return _nt_iri(term)
+    if isinstance(term, BNode):
+        return f"_:{term}"
+    lexical = str(term).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+    if term.language:
+        return f'"{lexical}"@{term.language}'
+    if term.datatype:
+        return f'"{lexical}"^^{_nt_iri(term.datatype)}'
+    return f'"{lexical}"'
+
+def _read_nt(rdf, path, bnodes):
+    """Load an N-Triples file into rdf; parses about twice as fast as rdflib's parser.
+
+    Lines that do not parse are logged and skipped, so that one bad line does
+    not make the whole graph unloadable."""
+    def bnode(label):
+        if label not in bnodes:
+            bnodes[label] = BNode()
+        return bnodes[label]
+
+    def triples(f, rest):
+        for lineno, line in enumerate(f, 1):
+            m = _NT_LINE.match(line)
+            if m is None:
+                if line.strip() and not line.lstrip().startswith('#'):
+                    rest.append((lineno, line))
+                continue
+            s_iri, s_bnode, p, o_iri, o_bnode, lexical, lang, datatype = m.groups()
+            if o_iri is not None:
+                o = URIRef(o_iri)
+            elif o_bnode is not None:
+                o = bnode(o_bnode)
+            else:
+                if '\\' in lexical:
+                    lexical = _NT_ESCAPE.sub(_nt_unescape, lexical)
+                o = Literal(lexical, lang=lang, datatype=URIRef(datatype) if datatype else None)
+            yield (URIRef(s_iri) if s_iri is not None else bnode(s_bnode), URIRef(p), o, rdf)
+
+    rest = []
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        rdf.addN(triples(f, rest))
+    if not rest:
+        return
+    try:
+        rdf.parse(data=''.join(line for _, line in rest), format='nt', bnode_context=bnodes)
+    except Exception:
+        # Line by line, to keep the good ones
+        for lineno, line in rest:
+            try:
+                rdf.parse(data=line, format='nt', bnode_context=bnodes)
+            except Exception as e:
+                logger.warning(f'{path}:{lineno}: skipped N-Triples line that does not parse: {e}')
+
+_GRAPH_SUFFIXES = ('.log.nt.compacting', '.log.nt', '.nt', '.ttl', '.oxigraph')
+
+def _graph_names_on_disk():
+    names = set()
+    for fname in os.listdir(DATA_DIR):
+        for suffix in _GRAPH_SUFFIXES:
+            if fname.endswith(suffix):
+                names.add(fname[:-len(suffix)])
+                break
+    return names
+
+async def _flush_logs():
+    while True:
+        await asyncio.sleep(WAL_FSYNC_INTERVAL)
+        for store in list(graphs.graphs.values()):
+            if store.dirty:
+                try:
+                    await asyncio.to_thread(store.sync)
+                except (OSError, ValueError):
+                    # Closed by a compaction or an eviction, both of which sync it first
+                    pass
+
+_flusher: Optional[asyncio.Task] = None
+# Shared by all ingestion so connections are pooled and kept alive between requests
+_http: Optional[httpx.AsyncClient] = None
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+def _http_client():
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(timeout=20.0)
+    return _http
+
+def _parse_executor():
+    global _parse_pool
+    if _parse_pool is None:
+        # Not forked: the event loop and the flusher, fetch and query threads are running
+        _parse_pool = ProcessPoolExecutor(max_workers=INGEST_PARSE_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+    return _parse_pool
+
+@app.on_event('startup')
+async def _startup():
+    global _flusher
+    # Graphs are loaded from DATA_DIR on first access
+    _flusher = asyncio.create_task(_flush_logs())
+
+@app.on_event('shutdown')
+async def _shutdown():
+    if _flusher is not None:
+        _flusher.cancel()
+    if _http is not None:
+        await _http.aclose()
+    if _parse_pool is not None:
+        _parse_pool.shutdown(cancel_futures=True)
+    await graphs.close()
+
+def _html_to_text(html: str):
+    # Runs in the parse pool, away from the event loop
+    soup = BeautifulSoup(html, HTML_PARSER)
+    # naive extraction: join visible paragraph text
+    paragraphs = [p.get_text(separator=' ', strip=True) for p in soup.find_all('p')]
+    return '\n\n'.join(paragraphs)
+
+async def _fetch_url_text(url: str):
+    r = await _http_client().get(url)
+    r.raise_for_status()
+    ct = r.headers.get('content-type','')
+    if 'html' in ct:
+        return await asyncio.get_running_loop().run_in_executor(_parse_executor(), _html_to_text, r.text)
+    else:
+        return r.text
+
+def _simple_text_to_triples(text, source_name=None):
     # Basic scaffold: create a source node and add sentence literals as triples
     # Replace this with entity/relation extraction for real KG building
     ns = Namespace('http://example.org/gkg/')
-    source_uri = URIRef(ns[f'source/{source_name or str(uuid.uuid4())}'])
-    if KGLAB_AVAILABLE and hasattr(graph_obj, 'graph'):
-        g = graph_obj.graph
-    else:
-        g = graph_obj
+    source_uri = URIRef(ns[f'source/{_iri_quote(source_name) if source_name else uuid.uuid4()}'])
     # split into sentences naively
     sentences = [s.strip() for s in text.split('\n') if s.strip()][:100]
+    triples = []
     for i, s in enumerate(sentences):
         triple_subj = URIRef(f"{source_uri}/sent/{i}")
-        g.add((triple_subj, ns['text'], Literal(s)))
-        g.add((source_uri, ns['hasSentence'], triple_subj))
-    # return number of triples added (approx)
-    return len(sentences) * 2
+        triples.append((triple_subj, ns['text'], Literal(s)))
+        triples.append((source_uri, ns['hasSentence'], triple_subj))
+    return triples
+
+async def _ingest(payload: dict, text: str):
+    graph_name = payload.get('graph', 'default')
+    triples = _simple_text_to_triples(text, source_name=payload.get('source_name'))
+    try:
+        store, added = await graphs.add(graph_name, triples, kind=payload.get('store'))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse({'graph': graph_name, 'store': store.kind, 'triples_added': added, 'saved': store.path})
+
+async def _existing_graph(name):
+    """Store of a graph, None if it does not exist; 400 for an invalid name"""
+    try:
+        return await graphs.get(name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.post('/mcp/ingest_url')
 async def ingest_url(payload: dict):
     url = payload.get('url')
     if not url:
         raise HTTPException(status_code=400, detail='url is required')
-    source_name = payload.get('source_name')
-    graph_name = payload.get('graph', 'default')
     text = await _fetch_url_text(url)
-    g = _get_graph(graph_name)
-    added = _simple_text_to_triples(g, text, source_name=source_name)
-    path = _save_graph_to_disk(graph_name)
-    return JSONResponse({'graph': graph_name, 'triples_added': added, 'saved': path})
+    return await _ingest(payload, text)
 
 @app.post('/mcp/ingest_text')
 async def ingest_text(payload: dict):
     text = payload.get('text')
     if not text:
         raise HTTPException(status_code=400, detail='text is required')
-    source_name = payload.get('source_name')
-    graph_name = payload.get('graph', 'default')
-    g = _get_graph(graph_name)
-    added = _simple_text_to_triples(g, text, source_name=source_name)
-    path = _save_graph_to_disk(graph_name)
-    return JSONResponse({'graph': graph_name, 'triples_added': added, 'saved': path})
+    return await _ingest(payload, text)
+
+@app.post('/mcp/ingest_batch')
+async def ingest_batch(payload: dict):
+    """Ingest many URLs and texts: items are fetched INGEST_CONCURRENCY at a
+    time, and each graph gets their triples in one add, persisted once"""
+    items = payload.get('items')
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail='items is required')
+    if len(items) > INGEST_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f'at most {INGEST_BATCH_MAX} items per batch')
+    default_graph = payload.get('graph', 'default')
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(INGEST_CONCURRENCY)
+
+    async def prepare(item, result):
+        try:
+            if not isinstance(item, dict) or not (item.get('url') or item.get('text')):
+                raise ValueError('url or text is required')
+            text = item.get('text')
+            if not text:
+                async with semaphore:
+                    text = await _fetch_url_text(item['url'])
+            triples = _simple_text_to_triples(text, source_name=item.get('source_name'))
+        except Exception as e:
+            result.update(status='error', error=str(e) or type(e).__name__)
+            return []
+        result.update(status='ok', triples=len(triples))
+        return triples
+
+    results = [
+        {'index': i, 'graph': item.get('graph', default_graph) if isinstance(item, dict) else default_graph}
+        for i, item in enumerate(items)
+    ]
+    prepared = await asyncio.gather(*(prepare(item, result) for item, result in zip(items, results)))
+
+    by_graph: Dict[str, List[int]] = {}
+    for result in results:
+        if result['status'] == 'ok':
+            by_graph.setdefault(result['graph'], []).append(result['index'])
+    saved = []
+    triples_added = 0
+    for graph_name, indexes in by_graph.items():
+        try:
+            store, added = await graphs.add(graph_name, [t for i in indexes for t in prepared[i]], kind=payload.get('store'))
+        except ValueError as e:
+            for i in indexes:
+                results[i].pop('triples')
+                results[i].update(status='error', error=str(e))
+            continue
+        triples_added += added
+        saved.append({'graph': graph_name, 'store': store.kind, 'triples_added': added, 'saved': store.path})
+
+    elapsed = time.perf_counter() - started
+    succeeded = sum(1 for result in results if result['status'] == 'ok')
+    return JSONResponse({
+        'items': results,
+        'graphs': saved,
+        'stats': {
+            'items': len(items),
+            'succeeded': succeeded,
+            'failed': len(items) - succeeded,
+            'triples_added': triples_added,
+            'seconds': round(elapsed, 3),
+            'items_per_second': round(len(items) / elapsed, 1),
+            'triples_per_second': round(triples_added / elapsed, 1),
+        },
+    })
+
+def _encode_cursor(graph_name, sparql, offset):
+    token = json.dumps({'offset': offset, 'query': _query_key(graph_name, sparql)})
+    return base64.urlsafe_b64encode(token.encode()).decode()
+
+def _decode_cursor(cursor, graph_name, sparql):
+    try:
+        token = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if token['query'] == _query_key(graph_name, sparql) and isinstance(token['offset'], int):
+            return token['offset']
+    except Exception:
+        pass
+    raise HTTPException(status_code=400, detail='invalid cursor for this query')
+
+def _query_key(graph_name, sparql):
+    return hashlib.sha256(f'{graph_name}\0{sparql}'.encode()).hexdigest()[:16]
+
+def _open_query(store, sparql, offset):
+    """Run a query up to its first row after offset, so that errors surface before streaming"""
+    result = store.query(sparql)
+    rows = itertools.islice(result.rows, offset, None)
+    first = next(rows, None)
+    if first is not None:
+        rows = itertools.chain([first], rows)
+    return result, rows
+
+# json.dumps with options builds a new encoder per call
+_encode_row = json.JSONEncoder(separators=(',', ':')).encode
+
+def _stream_query(result, rows, ndjson, limit, deadline, next_cursor):
+    """Response body in chunks of about 64 KiB of rows"""
+    if ndjson:
+        yield json.dumps({'head': {'vars': result.variables}}) + '\n'
+    else:
+        yield '{"head":' + json.dumps({'vars': result.variables}) + ',"results":{"bindings":['
+    count = 0
+    more = False
+    error = None
+    chunk = []
+    size = 0
+    try:
+        for row in rows:
+            if count == limit:
+                more = True
+                break
+            if time.monotonic() > deadline:
+                error = f'query timed out after {QUERY_TIMEOUT:g}s'
+                more = True
+                break
+            line = _encode_row(row)
+            chunk.append(line + '\n' if ndjson else (',' if count else '') + line)
+            size += len(line)
+            count += 1
+            if size >= 65536:
+                yield ''.join(chunk)
+                chunk = []
+                size = 0
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    yield ''.join(chunk)
+    trailer = {'rows': count, 'next_cursor': next_cursor(count) if more else None}
+    if error:
+        trailer['error'] = error
+    if ndjson:
+        yield json.dumps(trailer) + '\n'
+    else:
+        yield ']},' + json.dumps(trailer)[1:]
+
+class QueryStream:
+    """A query and its response body, produced on a worker thread of their own
+    (pyoxigraph results cannot move between threads) and handed over through a
+    bounded queue, so a slow client holds back the query instead of buffering
+    its rows.
+
+    Neither engine can interrupt a running query, so one that times out before
+    its first row is abandoned to finish on its own; abandoned counts those
+    still running, which the endpoint holds under QUERY_MAX_ABANDONED."""
+
+    abandoned = 0
+    _lock = threading.Lock()
+
+    def __init__(self, store, sparql, offset, ndjson, limit, next_cursor):
+        self.loop = asyncio.get_running_loop()
+        self.chunks: asyncio.Queue = asyncio.Queue(maxsize=8)
+        self.stop = threading.Event()
+        self.deadline = time.monotonic() + QUERY_TIMEOUT
+        self.args = (store, sparql, offset, ndjson, limit, next_cursor)
+        self.finished = False
+        self.is_abandoned = False
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            self._produce()
+        finally:
+            with QueryStream._lock:
+                self.finished = True
+                if self.is_abandoned:
+                    QueryStream.abandoned -= 1
+
+    def _abandon(self):
+        with QueryStream._lock:
+            if not self.finished:
+                self.is_abandoned = True
+                QueryStream.abandoned += 1
+        self.close()
+
+    def _put(self, item):
+        asyncio.run_coroutine_threadsafe(self.chunks.put(item), self.loop).result()
+        return not self.stop.is_set()
+
+    def _produce(self):
+        store, sparql, offset, ndjson, limit, next_cursor = self.args
+        try:
+            result, rows = _open_query(store, sparql, offset)
+        except Exception as e:
+            self._put(e)
+            return
+        if not self._put(result) or result.boolean is not None:
+            return
+        for chunk in _stream_query(result, rows, ndjson, limit, self.deadline, next_cursor):
+            if not self._put(chunk):
+                return
+        self._put(None)
+
+    async def open(self) -> QueryResult:
+        """Wait for the first row; raises the query's error or asyncio.TimeoutError"""
+        try:
+            first = await asyncio.wait_for(self.chunks.get(), QUERY_TIMEOUT)
+        except asyncio.TimeoutError:
+            self._abandon()
+            raise
+        if isinstance(first, Exception):
+            raise first
+        return first
+
+    async def body(self):
+        try:
+            while (chunk := await self.chunks.get()) is not None:
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self):
+        # Unblocks a pending put, after which the producer sees stop and exits
+        self.stop.set()
+        while not self.chunks.empty():
+            self.chunks.get_nowait()
 
 @app.post('/mcp/query')
 async def query(payload: dict):
+    """Stream the results of a SPARQL query.
+
+    Rows are SPARQL JSON bindings, sent as a SPARQL JSON results document
+    ('format': 'json', the default) or as NDJSON, one binding per line between
+    a head line and a trailer line. A response holds at most 'limit' rows
+    (capped at QUERY_MAX_ROWS) from 'offset'; when more rows follow, the
+    trailer's next_cursor resumes after them. Each request re-runs the query,
+    so pages are only stable for queries with an ORDER BY. A query stops after
+    QUERY_TIMEOUT seconds: before its first row with a 504, afterwards with an
+    error in the trailer and a next_cursor to resume from. While
+    QUERY_MAX_ABANDONED timed-out queries are still running, queries get a 503."""
     sparql = payload.get('sparql')
     graph_name = payload.get('graph', 'default')
     if not sparql:
         raise HTTPException(status_code=400, detail='sparql is required')
-    g = GRAPHS.get(graph_name)
-    if g is None:
+    fmt = payload.get('format', 'json')
+    if fmt not in ('json', 'ndjson'):
+        raise HTTPException(status_code=400, detail='format must be json or ndjson')
+    limit = payload.get('limit', QUERY_MAX_ROWS)
+    offset = payload.get('offset', 0)
+    if not isinstance(limit, int) or not isinstance(offset, int) or limit < 0 or offset < 0:
+        raise HTTPException(status_code=400, detail='limit and offset must be non-negative integers')
+    limit = min(limit, QUERY_MAX_ROWS)
+    if payload.get('cursor'):
+        offset = _decode_cursor(payload['cursor'], graph_name, sparql)
+    store = await _existing_graph(graph_name)
+    if store is None:
         raise HTTPException(status_code=404, detail=f'graph {graph_name} not found')
-    if KGLAB_AVAILABLE and hasattr(g, 'graph'):
-        rdf = g.graph
-    else:
-        rdf = g
+
+    if QueryStream.abandoned >= QUERY_MAX_ABANDONED:
+        raise HTTPException(
+            status_code=503, detail='too many timed-out queries still running',
+            headers={'Retry-After': str(max(int(QUERY_TIMEOUT), 1))},
+        )
+    ndjson = fmt == 'ndjson'
+    stream = QueryStream(
+        store, sparql, offset, ndjson, limit,
+        lambda count: _encode_cursor(graph_name, sparql, offset + count),
+    )
     try:
-        res = rdf.query(sparql)
+        result = await stream.open()
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f'query timed out after {QUERY_TIMEOUT:g}s')
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
-    # Convert results to simple JSON
-    results = []
-    for row in res:
-        row_obj = {}
-        for i, v in enumerate(row):
-            row_obj[f'col{i}'] = str(v)
-        results.append(row_obj)
-    return JSONResponse({'graph': graph_name, 'results': results})
+
+    if result.boolean is not None:
+        answer = {'head': {}, 'boolean': result.boolean}
+        if ndjson:
+            return PlainTextResponse(json.dumps(answer) + '\n', media_type='application/x-ndjson')
+        return JSONResponse(answer, media_type='application/sparql-results+json')
+    return StreamingResponse(stream.body(), media_type='application/x-ndjson' if ndjson else 'application/sparql-results+json')
 
 @app.get('/mcp/export_graph')
 async def export_graph(graph: Optional[str] = 'default', format: Optional[str] = 'ttl'):
-    g = GRAPHS.get(graph)
-    if g is None:
+    store = await _existing_graph(graph)
+    if store is None:
         raise HTTPException(status_code=404, detail=f'graph {graph} not found')
-    if KGLAB_AVAILABLE and hasattr(g, 'graph'):
-        rdf = g.graph
-    else:
-        rdf = g
-    buf = io.BytesIO()
     fmt = 'turtle' if format == 'ttl' else ('json-ld' if format == 'json-ld' else 'nt')
-    rdf.serialize(destination=buf, format=fmt)
-    buf.seek(0)
+    buf = io.BytesIO(store.serialize(fmt))
     media = 'text/turtle' if fmt == 'turtle' else ('application/ld+json' if fmt == 'json-ld' else 'application/n-triples')
     return StreamingResponse(buf, media_type=media, headers={"Content-Disposition": f"attachment; filename={graph}.{format}"})
 
 @app.get('/mcp/stats')
 async def stats(graph: Optional[str] = 'default'):
-    g = GRAPHS.get(graph)
-    if g is None:
+    store = await _existing_graph(graph)
+    if store is None:
         return JSONResponse({'graph': graph, 'triples': 0})
-    if KGLAB_AVAILABLE and hasattr(g, 'graph'):
-        rdf = g.graph
-    else:
-        rdf = g
-    return JSONResponse({'graph': graph, 'triples': len(rdf)})
+    return JSONResponse({'graph': graph, 'store': store.kind, 'triples': len(store)})
+
+@app.get('/mcp/graphs')
+async def list_graphs():
+    return JSONResponse({'graphs': sorted(_graph_names_on_disk() | set(graphs.graphs)), **graphs.stats()})
@@ -0,0 +1,129 @@
+"""
+Test suite for the append-only N-Triples persistence of graphs
+"""
+
+import logging
+import os
+from unittest.mock import patch
+
+import pytest
+from rdflib import BNode, Literal, URIRef
+
+import main
+
+EX = 'http://example.org/'
+
+
+def triple(i, obj=None):
+    return (URIRef(f'{EX}s/{i}'), URIRef(f'{EX}p'), obj if obj is not None else Literal(f'value {i}'))
+
+
+async def reopen(name='g'):
+    """The graph as loaded after a restart"""
+    return await main.GraphManager().get(name)
+
+
+class TestAppendAndReplay:
+    """Test that ingested triples survive a restart"""
+
+    @pytest.mark.asyncio
+    async def test_appended_triples_are_replayed(self, data_dir):
+        tricky = [
+            triple(0),
+            triple(1, Literal('quote " backslash \\ newline \n tab \t', lang='en')),
+            triple(2, Literal('42', datatype=URIRef('http://www.w3.org/2001/XMLSchema#integer'))),
+            (BNode('b1'), URIRef(f'{EX}p'), URIRef(f'{EX}o')),
+        ]
+        store, added = await main.graphs.add('g', tricky)
+        _, added_again = await main.graphs.add('g', tricky[:2])
+        await main.graphs.close()
+
+        assert (added, added_again) == (4, 0)
+        assert os.path.getsize(data_dir / 'g.log.nt') > 0
+        replayed = await reopen()
+        assert len(replayed) == 4
+        for t in tricky[:3]:
+            assert t in replayed.rdf
+
+    @pytest.mark.asyncio
+    async def test_source_names_are_percent_encoded(self, data_dir):
+        triples = main._simple_text_to_triples('one\ntwo', source_name='a>b\nc d')
+        await main.graphs.add('g', triples)
+        await main.graphs.close()
+
+        replayed = await reopen()
+        assert len(replayed) == 4
+        assert URIRef('http://example.org/gkg/source/a%3Eb%0Ac%20d') in set(replayed.rdf.subjects())
+
+    @pytest.mark.asyncio
+    async def test_invalid_iri_is_rejected_before_anything_is_written(self, data_dir):
+        store, _ = await main.graphs.add('g', [triple(0)])
+        size = os.path.getsize(data_dir / 'g.log.nt')
+
+        with pytest.raises(ValueError):
+            store.add([triple(1), (URIRef(f'{EX}s/a>b'), URIRef(f'{EX}p'), Literal('x'))])
+
+        assert len(store) == 1
+        assert os.path.getsize(data_dir / 'g.log.nt') == size
+
+    @pytest.mark.asyncio
+    async def test_unparseable_lines_are_skipped_and_logged(self, data_dir, caplog):
+        good = ''.join(f'<{EX}s/{i}> <{EX}p> "value {i}" .\n' for i in range(3))
+        (data_dir / 'g.nt').write_text(good)
+        # An IRI broken by a newline, as earlier versions could write, then a line torn by a crash
+        (data_dir / 'g.log.nt').write_text(
+            f'<{EX}s/a>b> <{EX}p> "x" .\n<{EX}s/\nc> <{EX}p> "y" .\n<{EX}s/3> <{EX}p> "value 3" .\n<{EX}s/4> <{EX}p'
+        )
+
+        with caplog.at_level(logging.WARNING, logger='main'):
+            store = await main.graphs.get('g')
+        assert len(store) == 4
+        assert len([r for r in caplog.records if 'skipped' in r.getMessage()]) == 4
+
+        # The next append starts on a line of its own
+        store.add([triple(5)])
+        await main.graphs.close()
+        assert len(await reopen()) == 5
+
+
+class TestCompaction:
+    """Test that the log is folded into the snapshot exactly once"""
+
+    @pytest.mark.asyncio
+    async def test_compaction_folds_log_into_snapshot(self, data_dir, monkeypatch):
+        monkeypatch.setattr(main, 'WAL_COMPACT_BYTES', 1)
+        store, _ = await main.graphs.add('g', [triple(0), triple(1)])
+        await store.log.compaction
+        store.add([triple(2)])
+        await main.graphs.close()
+
+        assert not (data_dir / 'g.log.nt.compacting').exists()
+        assert (data_dir / 'g.nt').read_text().count('\n') >= 2
+        assert len(await reopen()) == 3
+
+    def test_crash_before_snapshot_replace_is_merged_on_open(self, data_dir):
+        (data_dir / 'g.nt').write_text(f'<{EX}s/0> <{EX}p> "value 0" .\n')
+        (data_dir / 'g.log.nt.compacting').write_text(f'<{EX}s/1> <{EX}p> "value 1" .\n')
+
+        log = main.GraphLog('g')
+        log.close()
+
+        assert not (data_dir / 'g.log.nt.compacting').exists()
+        assert (data_dir / 'g.nt').read_text().count('\n') == 2
+
+    def test_crash_after_snapshot_replace_does_not_duplicate(self, data_dir):
+        (data_dir / 'g.nt').write_text(f'<{EX}s/0> <{EX}p> "value 0" .\n')
+        (data_dir / 'g.log.nt.compacting').write_text(f'<{EX}s/1> <{EX}p> "value 1" .\n')
+
+        # The snapshot is replaced, then the process dies before removing the sealed log
+        log = main.GraphLog.__new__(main.GraphLog)
+        log.snapshot_path = str(data_dir / 'g.nt')
+        log.sealed_path = str(data_dir / 'g.log.nt.compacting')
+        with patch('os.remove', side_effect=SystemExit), pytest.raises(SystemExit):
+            log._merge()
+        assert (data_dir / 'g.log.nt.compacting').exists()
+
+        main.GraphLog('g').close()
+
+        assert not (data_dir / 'g.log.nt.compacting').exists()
+        assert (data_dir / 'g.nt').read_text().count('\n') == 2
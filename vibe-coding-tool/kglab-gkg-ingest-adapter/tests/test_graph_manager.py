@@ -0,0 +1,120 @@
+"""
+Test suite for graph names, lazy loading and LRU eviction of named graphs
+"""
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from rdflib import Literal, URIRef
+
+import main
+
+EX = 'http://example.org/'
+
+
+def triples(n, graph='g'):
+    return [(URIRef(f'{EX}{graph}/{i}'), URIRef(f'{EX}p'), Literal(f'value {i}')) for i in range(n)]
+
+
+async def saved_graph(name, n):
+    """A graph on disk that is not loaded"""
+    manager = main.GraphManager()
+    await manager.add(name, triples(n, name))
+    await manager.close()
+
+
+class TestGraphNames:
+    """Test that graph names cannot reach outside DATA_DIR"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('name', ['../x', 'a/b', '..', '', 'a.b', 'a b', '/tmp/x'])
+    async def test_invalid_names_are_rejected(self, data_dir, name):
+        with pytest.raises(ValueError):
+            await main.graphs.get(name, create=True)
+        with pytest.raises(ValueError):
+            await main.graphs.add(name, triples(1))
+        assert list(data_dir.parent.glob('x*')) == []
+
+    @pytest.mark.asyncio
+    async def test_routes_answer_400(self, data_dir):
+        async with AsyncClient(app=main.app, base_url='http://test') as client:
+            ingest = await client.post('/mcp/ingest_text', json={'text': 'hello', 'graph': '../escape'})
+            query = await client.post('/mcp/query', json={'sparql': 'ASK {}', 'graph': '../escape'})
+            export = await client.get('/mcp/export_graph', params={'graph': '../escape'})
+            stats = await client.get('/mcp/stats', params={'graph': 'a/b'})
+            batch = await client.post('/mcp/ingest_batch', json={'items': [
+                {'text': 'fine', 'graph': 'ok-graph_1'},
+                {'text': 'escapes', 'graph': '../escape'},
+            ]})
+
+        assert [r.status_code for r in (ingest, query, export, stats)] == [400] * 4
+        assert [item['status'] for item in batch.json()['items']] == ['ok', 'error']
+        assert not (data_dir.parent / 'escape.log.nt').exists()
+
+
+class TestLazyLoading:
+    """Test that graphs are opened from DATA_DIR on first access only"""
+
+    @pytest.mark.asyncio
+    async def test_graph_is_loaded_on_first_access(self, data_dir):
+        await saved_graph('g', 5)
+        manager = main.GraphManager()
+        assert 'g' not in manager
+
+        store = await manager.get('g')
+        assert len(store) == 5
+        assert await manager.get('g') is store
+        assert manager.loads == 1
+        assert await manager.get('missing') is None
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_accesses_share_one_load(self, data_dir):
+        await saved_graph('g', 5)
+        manager = main.GraphManager()
+
+        stores = await asyncio.gather(*(manager.get('g') for _ in range(5)))
+
+        assert all(store is stores[0] for store in stores)
+        assert manager.loads == 1
+        await manager.close()
+
+
+class TestEviction:
+    """Test that least recently used graphs are dropped past the memory budget"""
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_graph_is_evicted(self, data_dir):
+        for name in ('a', 'b', 'c'):
+            await saved_graph(name, 10)
+        one = main.GraphManager()
+        graph_bytes = (await one.get('a')).size
+        await one.close()
+
+        # Room for two graphs
+        manager = main.GraphManager(budget=graph_bytes * 2)
+        await manager.get('a')
+        await manager.get('b')
+        await manager.get('a')
+        await manager.get('c')
+
+        assert list(manager.graphs) == ['a', 'c']
+        assert manager.evictions == 1
+
+        # An evicted graph is reloaded with everything it had
+        assert len(await manager.get('b')) == 10
+        assert manager.loads == 4
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_graph_in_use_is_kept_over_budget(self, data_dir):
+        manager = main.GraphManager(budget=1)
+        await manager.add('big', triples(10))
+        await manager.add('other', triples(10, 'other'))
+
+        assert list(manager.graphs) == ['other']
+        await manager.add('other', triples(20, 'other'))
+        assert list(manager.graphs) == ['other']
+        assert len(await manager.get('big')) == 10
+        await manager.close()
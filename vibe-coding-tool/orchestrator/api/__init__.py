@@ -2,8 +2,8 @@
 API package for Vibe Coding Tool
 """
 
-from . import tasks, projects, mcps, auth, health, kg, agents
-
+# Routers are imported by name (from api import tasks, ...), so importing one
+# does not import the others and their services
 __all__ = [
     'tasks',
     'projects', 
@@ -11,5 +11,6 @@ __all__ = [
     'auth',
     'health',
     'kg',
-    'agents'
+    'agents',
+    'jobs'
 ]
\ No newline at end of file
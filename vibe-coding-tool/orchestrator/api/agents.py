@@ -9,31 +9,40 @@ from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 from fastapi.security import HTTPBearer
 
 from models.agent import Agent, AgentCreate, AgentUpdate, AgentStatus, AgentTemplate
-from models.response import StandardResponse
+from models.response import StandardResponse, PaginatedResponse
 from core.auth_service import get_current_user, get_current_active_user
 from config.settings import settings
+from utils.pagination import decode_cursor, next_cursor
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 security = HTTPBearer()
 
-@router.get("/agents", response_model=StandardResponse[List[Agent]])
+@router.get("/agents", response_model=PaginatedResponse[Agent])
 async def list_agents(
     current_user: str = Depends(get_current_active_user),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     status: Optional[AgentStatus] = None,
     project_id: Optional[str] = None
 ):
-    """List user's agents"""
+    """List user's agents, newest first"""
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
-        # TODO: Get agents from database
+        # TODO: Get agents from database, seeking past ``after`` on (created_at, id)
         # For now, return empty list
         agents = []
+        cursor_out = next_cursor(agents, limit)
         
-        return StandardResponse(
+        return PaginatedResponse(
             success=True,
             data=agents,
+            next_cursor=cursor_out,
+            pagination={'limit': limit, 'has_more': cursor_out is not None},
             message="Agents retrieved successfully"
         )
     
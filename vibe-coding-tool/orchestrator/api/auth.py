@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict, Any
 from datetime import datetime
 
-from core.auth_service import AuthService
+from core.auth_service import AuthService, get_auth_service
 from models.user import User
 from api.response import StandardResponse
 
@@ -12,7 +12,7 @@ router = APIRouter()
 async def login(
     username: str,
     password: str,
-    auth_service: AuthService = Depends()
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """Login endpoint (placeholder for OAuth)"""
     user = await auth_service.authenticate_user(username, password)
@@ -36,7 +36,7 @@ async def login(
 @router.post("/oauth/github/callback")
 async def github_callback(
     code: str,
-    auth_service: AuthService = Depends()
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """GitHub OAuth callback"""
     # Placeholder - implement token exchange
@@ -49,7 +49,7 @@ async def github_callback(
 @router.post("/oauth/hf/callback")
 async def hf_callback(
     code: str,
-    auth_service: AuthService = Depends()
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """HuggingFace OAuth callback"""
     # Placeholder - implement token exchange
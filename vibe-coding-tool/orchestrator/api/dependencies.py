@@ -0,0 +1,27 @@
+"""
+Request dependencies resolving the services built by the app lifespan
+
+Routes must share the lifespan instances: the job manager owns the
+dispatcher workers and the event bus, and the registry the state kept
+current by discovery and health probes. ``HTTPConnection`` lets HTTP and
+WebSocket routes use the same providers.
+"""
+
+from fastapi.requests import HTTPConnection
+
+from core.job_manager import JobManager
+from core.registry import MCPRegistry
+from core.result_manager import ResultManager
+from core.task_router import TaskRouter
+
+def get_job_manager(connection: HTTPConnection) -> JobManager:
+    return connection.app.state.job_manager
+
+def get_task_router(connection: HTTPConnection) -> TaskRouter:
+    return connection.app.state.task_router
+
+def get_registry(connection: HTTPConnection) -> MCPRegistry:
+    return connection.app.state.registry
+
+def get_result_manager(connection: HTTPConnection) -> ResultManager:
+    return connection.app.state.result_manager
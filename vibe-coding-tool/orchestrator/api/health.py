@@ -11,9 +11,12 @@ from fastapi.responses import JSONResponse
 
 from models.response import StandardResponse
 from core.registry import MCPRegistry
-from core.auth_service import AuthService
+from core.health_monitor import CircuitState
+from models.mcp import MCPStatus
+from core.auth_service import AuthService, get_auth_service
 from core.job_manager import JobManager
 from core.result_manager import ResultManager
+from api.dependencies import get_registry, get_job_manager, get_result_manager
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -39,10 +42,10 @@ async def health_check():
 
 @router.get("/health/detailed", response_model=StandardResponse[Dict[str, Any]])
 async def detailed_health_check(
-    registry: MCPRegistry = Depends(),
-    auth_service: AuthService = Depends(),
-    job_manager: JobManager = Depends(),
-    result_manager: ResultManager = Depends()
+    registry: MCPRegistry = Depends(get_registry),
+    auth_service: AuthService = Depends(get_auth_service),
+    job_manager: JobManager = Depends(get_job_manager),
+    result_manager: ResultManager = Depends(get_result_manager)
 ):
     """Detailed health check with component status"""
     try:
@@ -181,52 +184,51 @@ async def detailed_health_check(
 
 @router.get("/health/mcps", response_model=StandardResponse[Dict[str, Any]])
 async def mcp_health_check(
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
-    """Check health of all registered MCPs"""
+    """Report health of all registered MCPs from the background probe snapshot"""
     try:
         # Get all MCPs
         all_mcps = list(registry.mcps.values())
+        probes = registry.health_monitor.snapshot()
         
-        # Check health of each MCP
         mcp_health_status = {
             "total_mcps": len(all_mcps),
             "healthy_mcps": 0,
             "unhealthy_mcps": 0,
             "warning_mcps": 0,
+            "unknown_mcps": 0,
+            "open_circuits": 0,
             "mcp_details": []
         }
         
         for mcp in all_mcps:
-            try:
-                # Perform health check
-                is_healthy = await registry.check_mcp_health(mcp.id)
-                
-                if is_healthy:
-                    mcp_health_status["healthy_mcps"] += 1
-                    status = "healthy"
-                else:
-                    mcp_health_status["unhealthy_mcps"] += 1
-                    status = "unhealthy"
-                
-                mcp_health_status["mcp_details"].append({
-                    "id": mcp.id,
-                    "name": mcp.name,
-                    "url": mcp.url,
-                    "status": status,
-                    "last_health_check": mcp.last_health_check.isoformat() if mcp.last_health_check else None
-                })
-                
-            except Exception as e:
+            status = mcp.status
+            probe = probes.get(mcp.id, {})
+            
+            if status == MCPStatus.HEALTHY:
+                mcp_health_status["healthy_mcps"] += 1
+            elif status == MCPStatus.WARNING:
+                mcp_health_status["warning_mcps"] += 1
+            elif status == MCPStatus.UNHEALTHY:
                 mcp_health_status["unhealthy_mcps"] += 1
-                mcp_health_status["mcp_details"].append({
-                    "id": mcp.id,
-                    "name": mcp.name,
-                    "url": mcp.url,
-                    "status": "error",
-                    "error": str(e),
-                    "last_health_check": mcp.last_health_check.isoformat() if mcp.last_health_check else None
-                })
+            else:
+                mcp_health_status["unknown_mcps"] += 1
+            
+            if probe.get("circuit") == CircuitState.OPEN:
+                mcp_health_status["open_circuits"] += 1
+            
+            mcp_health_status["mcp_details"].append({
+                "id": mcp.id,
+                "name": mcp.name,
+                "url": mcp.url,
+                "status": status,
+                "latency_ms": probe.get("latency_ms"),
+                "error_rate": probe.get("error_rate"),
+                "circuit": probe.get("circuit", CircuitState.CLOSED),
+                "last_error": probe.get("last_error"),
+                "last_health_check": mcp.last_health_check.isoformat() if mcp.last_health_check else None
+            })
         
         # Determine overall status
         if mcp_health_status["unhealthy_mcps"] > 0:
@@ -252,7 +254,7 @@ async def mcp_health_check(
 
 @router.get("/health/queue", response_model=StandardResponse[Dict[str, Any]])
 async def queue_health_check(
-    job_manager: JobManager = Depends()
+    job_manager: JobManager = Depends(get_job_manager)
 ):
     """Check queue health"""
     try:
@@ -275,8 +277,8 @@ async def queue_health_check(
 
 @router.get("/health/metrics", response_model=StandardResponse[Dict[str, Any]])
 async def metrics_health_check(
-    registry: MCPRegistry = Depends(),
-    job_manager: JobManager = Depends()
+    registry: MCPRegistry = Depends(get_registry),
+    job_manager: JobManager = Depends(get_job_manager)
 ):
     """Get system metrics"""
     try:
@@ -310,13 +312,12 @@ async def metrics_health_check(
 
 @router.post("/health/refresh")
 async def refresh_health_cache(
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Refresh health cache"""
     try:
         # Clear health cache
-        registry.mcp_health.clear()
-        registry.last_health_check.clear()
+        registry.health_cache.clear()
         
         # Force health check for all MCPs
         await registry.check_all_mcps_health()
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, status as http_status
+from typing import Optional
+import json
+import logging
+
+from core.job_manager import JobManager, CallbackOutcome
+from api.dependencies import get_job_manager
+from api.response import StandardResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.post("/jobs/{job_id}/callback", response_model=StandardResponse[dict])
+async def job_callback(
+    job_id: str,
+    request: Request,
+    job_manager: JobManager = Depends(get_job_manager),
+    x_callback_timestamp: Optional[str] = Header(None),
+    x_callback_signature: Optional[str] = Header(None)
+):
+    """
+    Progress and result callbacks from workers running submitted jobs.
+
+    The signature covers the raw body, so it is read before parsing.
+    Repeated deliveries of a committed callback are acknowledged with 200
+    so workers can retry safely.
+    """
+    body = await request.body()
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail="Invalid JSON body")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail="Invalid JSON body")
+
+    outcome = await job_manager.handle_callback(
+        job_id, payload, body, x_callback_timestamp, x_callback_signature
+    )
+
+    if outcome == CallbackOutcome.UNKNOWN:
+        raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if outcome == CallbackOutcome.INVALID:
+        raise HTTPException(status_code=http_status.HTTP_401_UNAUTHORIZED, detail="Invalid callback signature")
+    if outcome == CallbackOutcome.STALE:
+        raise HTTPException(status_code=http_status.HTTP_409_CONFLICT, detail="Callback is for a superseded attempt")
+
+    return StandardResponse(
+        success=True,
+        data={"job_id": job_id, "outcome": outcome.value},
+        message="Callback already processed" if outcome == CallbackOutcome.DUPLICATE else "Callback accepted"
+    )
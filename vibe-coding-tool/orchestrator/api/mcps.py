@@ -9,10 +9,12 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.security import HTTPBearer
 
 from models.mcp import MCPInfo, MCPCreate, MCPUpdate, MCPStatus, Capability
-from models.response import StandardResponse
+from models.response import StandardResponse, PaginatedResponse
 from core.registry import MCPRegistry
 from core.auth_service import get_current_user, get_current_active_user
+from api.dependencies import get_registry
 from config.settings import settings
+from utils.pagination import decode_cursor, next_cursor
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -22,7 +24,7 @@ security = HTTPBearer()
 async def register_mcp(
     mcp: MCPCreate,
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Register a new MCP"""
     try:
@@ -60,7 +62,7 @@ async def register_mcp(
 async def get_mcp(
     mcp_id: str,
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Get MCP details"""
     try:
@@ -81,37 +83,31 @@ async def get_mcp(
         logger.error(f"Error getting MCP: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/mcps", response_model=StandardResponse[List[MCPInfo]])
+@router.get("/mcps", response_model=PaginatedResponse[MCPInfo])
 async def list_mcps(
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends(),
+    registry: MCPRegistry = Depends(get_registry),
     status: Optional[MCPStatus] = None,
     capability: Optional[str] = None,
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    cursor: Optional[str] = None
 ):
-    """List all MCPs"""
+    """List all MCPs in registration order"""
     try:
-        # Get all MCPs
-        all_mcps = list(registry.mcps.values())
-        
-        # Filter by status if provided
-        if status:
-            all_mcps = [mcp for mcp in all_mcps if mcp.status == status]
-        
-        # Filter by capability if provided
-        if capability:
-            all_mcps = [
-                mcp for mcp in all_mcps
-                if any(cap.name == capability for cap in mcp.capabilities)
-            ]
-        
-        # Apply pagination
-        mcps = all_mcps[offset:offset + limit]
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        # Filters resolve through the registry indexes, the page start by bisection
+        mcps = registry.list_mcps_page(limit, after=after, status=status, capability=capability)
+        cursor_out = next_cursor(mcps, limit, key=lambda mcp: (registry.registered_at[mcp.id], mcp.id))
         
-        return StandardResponse(
+        return PaginatedResponse(
             success=True,
             data=mcps,
+            next_cursor=cursor_out,
+            pagination={'limit': limit, 'has_more': cursor_out is not None},
             message="MCPs retrieved successfully"
         )
     
@@ -124,7 +120,7 @@ async def update_mcp(
     mcp_id: str,
     mcp_update: MCPUpdate,
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Update MCP details"""
     try:
@@ -148,8 +144,8 @@ async def update_mcp(
         
         existing_mcp.last_health_check = datetime.utcnow()
         
-        # TODO: Update MCP in registry
-        # For now, return the updated MCP
+        # Re-register so the registry indexes pick up the changes
+        await registry.register_mcp(existing_mcp)
         
         return StandardResponse(
             success=True,
@@ -167,7 +163,7 @@ async def update_mcp(
 async def unregister_mcp(
     mcp_id: str,
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Unregister an MCP"""
     try:
@@ -192,7 +188,7 @@ async def unregister_mcp(
 async def check_mcp_health(
     mcp_id: str,
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Check MCP health"""
     try:
@@ -211,7 +207,7 @@ async def check_mcp_health(
 @router.post("/mcps/health-check-all")
 async def check_all_mcps_health(
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Check health of all MCPs"""
     try:
@@ -230,7 +226,7 @@ async def check_all_mcps_health(
 @router.get("/mcps/capabilities", response_model=StandardResponse[List[str]])
 async def get_mcp_capabilities(
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Get all available MCP capabilities"""
     try:
@@ -250,7 +246,7 @@ async def get_mcp_capabilities(
 async def get_mcps_by_capability(
     capability: str,
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Get MCPs that have a specific capability"""
     try:
@@ -272,7 +268,7 @@ async def get_mcps_by_capability(
 @router.get("/mcps/task-types", response_model=StandardResponse[List[str]])
 async def get_mcp_task_types(
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Get all available task types"""
     try:
@@ -292,7 +288,7 @@ async def get_mcp_task_types(
 async def get_mcps_by_task_type(
     task_type: str,
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Get MCPs that can handle a specific task type"""
     try:
@@ -319,7 +315,7 @@ async def get_mcps_by_task_type(
 @router.get("/mcps/user-space", response_model=StandardResponse[List[MCPInfo]])
 async def get_user_space_mcps(
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Get MCPs that can run on user space"""
     try:
@@ -338,7 +334,7 @@ async def get_user_space_mcps(
 @router.get("/mcps/oracle", response_model=StandardResponse[List[MCPInfo]])
 async def get_oracle_mcps(
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Get MCPs that run on Oracle"""
     try:
@@ -354,10 +350,27 @@ async def get_oracle_mcps(
         logger.error(f"Error getting Oracle MCPs: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/mcps/discovery/status", response_model=StandardResponse[dict])
+async def get_mcp_discovery_status(
+    current_user: str = Depends(get_current_active_user),
+    registry: MCPRegistry = Depends(get_registry)
+):
+    """Get progress of the background user MCP discovery"""
+    try:
+        return StandardResponse(
+            success=True,
+            data=dict(registry.discovery_progress),
+            message="MCP discovery status retrieved successfully"
+        )
+    
+    except Exception as e:
+        logger.error(f"Error getting MCP discovery status: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/mcps/stats", response_model=StandardResponse[dict])
 async def get_mcp_stats(
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Get MCP statistics"""
     try:
@@ -377,7 +390,7 @@ async def get_mcp_stats(
 async def get_mcp_history(
     mcp_id: str,
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends(),
+    registry: MCPRegistry = Depends(get_registry),
     limit: int = Query(100, ge=1, le=1000)
 ):
     """Get MCP history"""
@@ -398,7 +411,7 @@ async def get_mcp_history(
 async def get_mcp_performance(
     mcp_id: str,
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends(),
+    registry: MCPRegistry = Depends(get_registry),
     days: int = Query(7, ge=1, le=365)
 ):
     """Get MCP performance analysis"""
@@ -418,7 +431,7 @@ async def get_mcp_performance(
 @router.get("/mcps/optimization", response_model=StandardResponse[dict])
 async def optimize_mcp_distribution(
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Get MCP distribution optimization suggestions"""
     try:
@@ -438,7 +451,7 @@ async def optimize_mcp_distribution(
 async def enable_mcp(
     mcp_id: str,
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Enable an MCP"""
     try:
@@ -463,7 +476,7 @@ async def enable_mcp(
 async def disable_mcp(
     mcp_id: str,
     current_user: str = Depends(get_current_active_user),
-    registry: MCPRegistry = Depends()
+    registry: MCPRegistry = Depends(get_registry)
 ):
     """Disable an MCP"""
     try:
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
 from datetime import datetime
 import uuid
 
@@ -7,6 +7,8 @@ from models.project import Project, ProjectCreate
 from core.project_service import ProjectService
 from core.auth_service import get_current_user
 from api.response import StandardResponse
+from models.response import PaginatedResponse
+from utils.pagination import decode_cursor, next_cursor
 
 router = APIRouter()
 
@@ -62,18 +64,28 @@ async def get_project(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/projects", response_model=StandardResponse[List[Project]])
+@router.get("/projects", response_model=PaginatedResponse[Project])
 async def list_projects(
     current_user: str = Depends(get_current_user),
-    project_service: ProjectService = Depends()
+    project_service: ProjectService = Depends(),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None
 ):
-    """List user's projects"""
+    """List user's projects, newest first"""
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
-        projects = await project_service.list_projects(current_user)
+        projects = await project_service.list_projects(current_user, limit=limit, after=after)
+        cursor_out = next_cursor(projects, limit)
         
-        return StandardResponse(
+        return PaginatedResponse(
             success=True,
             data=projects,
+            next_cursor=cursor_out,
+            pagination={'limit': limit, 'has_more': cursor_out is not None},
             message="Projects retrieved successfully"
         )
     
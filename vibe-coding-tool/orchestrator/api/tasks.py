@@ -1,26 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Request, WebSocket, WebSocketDisconnect, status as http_status
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional
+from contextlib import aclosing
 from datetime import datetime
 import uuid
 import logging
 
-from models.task import Task, TaskCreate, TaskStatus, TaskType
+from models.task import Task, TaskCreate, TaskStatus, TaskType, TaskBatchCreate, TaskRoutingDecision
 from core.task_router import TaskRouter
 from core.job_manager import JobManager
-from core.auth_service import AuthService, get_current_user
+from core.event_bus import Event, Subscription, task_topic
+from core.auth_service import auth_service, get_current_user
+from api.dependencies import get_job_manager, get_task_router
 from api.response import StandardResponse
+from models.response import PaginatedResponse
+from config.settings import settings
+from utils.pagination import decode_cursor, next_cursor
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+TERMINAL_TASK_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
 @router.post("/tasks", response_model=StandardResponse[Task])
 async def create_task(
     task: TaskCreate,
-    background_tasks: BackgroundTasks,
     current_user: str = Depends(get_current_user),
-    task_router: TaskRouter = Depends(),
-    job_manager: JobManager = Depends()
+    task_router: TaskRouter = Depends(get_task_router),
+    job_manager: JobManager = Depends(get_job_manager)
 ):
     """Create a new task"""
     try:
@@ -40,11 +48,8 @@ async def create_task(
         # Route task to appropriate MCP
         mcp_info = await task_router.route_task(task_obj, current_user)
         
-        # Create job
-        job = await job_manager.create_job(task_obj, mcp_info)
-        
-        # Add to background queue
-        background_tasks.add_task(job_manager.process_job, job.id)
+        # Create job; dispatcher workers pick it up from the queue
+        await job_manager.create_job(task_obj, mcp_info)
         
         return StandardResponse(
             success=True,
@@ -52,15 +57,85 @@ async def create_task(
             message="Task created successfully"
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating task: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/tasks/batch", response_model=StandardResponse[List[TaskRoutingDecision]])
+async def create_tasks_batch(
+    batch: TaskBatchCreate,
+    current_user: str = Depends(get_current_user),
+    task_router: TaskRouter = Depends(get_task_router),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """Create, route and queue many tasks in one request"""
+    if not batch.tasks:
+        raise HTTPException(status_code=400, detail="Batch contains no tasks")
+    if len(batch.tasks) > settings.max_batch_tasks:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds the maximum of {settings.max_batch_tasks} tasks"
+        )
+    
+    try:
+        now = datetime.utcnow()
+        task_objs = [
+            Task(
+                id=str(uuid.uuid4()),
+                user_id=current_user,
+                type=task.type,
+                priority=task.priority,
+                input=task.input,
+                required_capabilities=task.required_capabilities,
+                is_heavy=task.is_heavy,
+                status=TaskStatus.PENDING,
+                created_at=now
+            )
+            for task in batch.tasks
+        ]
+        
+        # Route all tasks in one scoring pass
+        routes = await task_router.route_many(task_objs, current_user)
+        
+        # Create jobs for every routed task in bulk
+        routed = [
+            (task_obj, route['mcp_info'])
+            for task_obj, route in zip(task_objs, routes)
+            if route['mcp_info'] is not None
+        ]
+        jobs = await job_manager.create_jobs(routed)
+        job_ids = {job.task_id: job.id for job in jobs}
+        
+        decisions = [
+            TaskRoutingDecision(
+                task_id=task_obj.id,
+                status=task_obj.status if route['mcp_info'] else TaskStatus.FAILED,
+                mcp_id=route['mcp_info'].id if route['mcp_info'] else None,
+                job_id=job_ids.get(task_obj.id),
+                error=route['error']
+            )
+            for task_obj, route in zip(task_objs, routes)
+        ]
+        
+        return StandardResponse(
+            success=True,
+            data=decisions,
+            message=f"{len(jobs)} of {len(task_objs)} tasks queued"
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating task batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/tasks/{task_id}", response_model=StandardResponse[Task])
 async def get_task(
     task_id: str,
     current_user: str = Depends(get_current_user),
-    job_manager: JobManager = Depends()
+    job_manager: JobManager = Depends(get_job_manager)
 ):
     """Get task status and result"""
     try:
@@ -80,26 +155,34 @@ async def get_task(
         logger.error(f"Error getting task: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/tasks", response_model=StandardResponse[List[Task]])
+@router.get("/tasks", response_model=PaginatedResponse[Task])
 async def list_tasks(
     current_user: str = Depends(get_current_user),
-    job_manager: JobManager = Depends(),
-    limit: int = 50,
-    offset: int = 0,
+    job_manager: JobManager = Depends(get_job_manager),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     status: Optional[TaskStatus] = None
 ):
-    """List user's tasks"""
+    """List user's tasks, newest first"""
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         tasks = await job_manager.list_user_tasks(
             current_user, 
             limit=limit, 
-            offset=offset, 
-            status=status
+            status=status,
+            after=after
         )
+        cursor_out = next_cursor(tasks, limit)
         
-        return StandardResponse(
+        return PaginatedResponse(
             success=True,
             data=tasks,
+            next_cursor=cursor_out,
+            pagination={'limit': limit, 'has_more': cursor_out is not None},
             message="Tasks retrieved successfully"
         )
     
@@ -111,7 +194,7 @@ async def list_tasks(
 async def cancel_task(
     task_id: str,
     current_user: str = Depends(get_current_user),
-    job_manager: JobManager = Depends()
+    job_manager: JobManager = Depends(get_job_manager)
 ):
     """Cancel a running task"""
     try:
@@ -129,4 +212,133 @@ async def cancel_task(
         raise
     except Exception as e:
         logger.error(f"Error cancelling task: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid Last-Event-ID: {value}")
+
+def _status_event(task: Task, last_event_id: Optional[int]) -> Event:
+    """The task's current status as a status event, final once the task has finished"""
+    return Event(
+        (last_event_id or 0) + 1, 'status',
+        {'task_id': task.id, 'status': task.status.value},
+        final=task.status in TERMINAL_TASK_STATUSES
+    )
+
+def _subscribe(job_manager: JobManager, task: Task, last_event_id: Optional[int]) -> Optional[Subscription]:
+    """
+    Subscribe to a task's events, or None for a finished task whose topic
+    this replica no longer holds: it finished before a restart, on another
+    replica or long enough ago for its topic to be evicted.
+    """
+    topic = task_topic(task.id)
+    if task.status in TERMINAL_TASK_STATUSES and not job_manager.event_bus.has_ended(topic):
+        return None
+    return job_manager.event_bus.subscribe(topic, last_event_id)
+
+async def _task_events(
+    job_manager: JobManager,
+    subscription: Optional[Subscription],
+    task: Task,
+    user_id: str
+) -> AsyncIterator[Optional[Event]]:
+    """
+    A task's events, and None after each heartbeat interval without one.
+    A task running on another replica publishes nothing here, and an evicted
+    topic publishes nothing more, so such streams end with the task's current
+    status instead of idling forever.
+    """
+    if subscription is None:
+        yield _status_event(task, None)
+        return
+    
+    try:
+        while True:
+            try:
+                event = await subscription.next_event(timeout=settings.event_heartbeat_interval)
+            except StopAsyncIteration:
+                break
+            
+            if event is None:
+                task = await job_manager.get_task(task.id, user_id) or task
+                if task.status in TERMINAL_TASK_STATUSES:
+                    yield _status_event(task, subscription.last_event_id)
+                    return
+            yield event
+        
+        if subscription.orphaned:
+            task = await job_manager.get_task(task.id, user_id) or task
+            yield _status_event(task, subscription.last_event_id)
+    finally:
+        subscription.close()
+
+async def _sse_frames(events: AsyncIterator[Optional[Event]], subscription: Optional[Subscription], request: Request):
+    """SSE frames for a task's events, with heartbeats while the task is idle"""
+    async with aclosing(events):
+        async for event in events:
+            if await request.is_disconnected():
+                return
+            yield ": keepalive\n\n" if event is None else event.to_sse()
+    
+    if subscription is not None and subscription.lagged:
+        # The client reconnects with Last-Event-ID and catches up from the replay buffer
+        yield "event: lagged\ndata: {}\n\n"
+
+@router.get("/tasks/{task_id}/events")
+async def stream_task_events(
+    task_id: str,
+    request: Request,
+    current_user: str = Depends(get_current_user),
+    job_manager: JobManager = Depends(get_job_manager),
+    last_event_id: Optional[str] = Header(None)
+):
+    """Stream a task's status changes, retries and progress as Server-Sent Events"""
+    task = await job_manager.get_task(task_id, current_user)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    subscription = _subscribe(job_manager, task, _parse_last_event_id(last_event_id))
+    return StreamingResponse(
+        _sse_frames(_task_events(job_manager, subscription, task, current_user), subscription, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/tasks/{task_id}/ws")
+async def task_events_websocket(
+    websocket: WebSocket,
+    task_id: str,
+    last_event_id: Optional[int] = None,
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """WebSocket variant of the task event stream; authenticate with ``?token=`` or a bearer header"""
+    token = websocket.query_params.get("token")
+    authorization = websocket.headers.get("authorization", "")
+    if not token and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    
+    current_user = auth_service.get_current_user(token) if token else None
+    task = await job_manager.get_task(task_id, current_user) if current_user else None
+    if not task:
+        await websocket.close(code=http_status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    subscription = _subscribe(job_manager, task, last_event_id)
+    events = _task_events(job_manager, subscription, task, current_user)
+    try:
+        async with aclosing(events):
+            async for event in events:
+                if event is not None:
+                    await websocket.send_json(event.to_dict())
+        
+        if subscription is not None and subscription.lagged:
+            await websocket.send_json({'type': 'lagged', 'last_event_id': subscription.last_event_id})
+            await websocket.close(code=http_status.WS_1013_TRY_AGAIN_LATER)
+        else:
+            await websocket.close()
+    except WebSocketDisconnect:
+        pass
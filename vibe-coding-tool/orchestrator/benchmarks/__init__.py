@@ -0,0 +1,3 @@
+"""
+Benchmarks for Vibe Coding Tool
+"""
@@ -0,0 +1,78 @@
+"""
+Benchmark of the authentication dependency over 10k requests
+
+Usage (from the orchestrator directory):
+
+    python -m benchmarks.auth [--requests 10000] [--users 200]
+
+Serves one authenticated route from an in-process FastAPI app and sends
+``--requests`` requests through it, spread over ``--users`` bearer tokens,
+twice: once with a dependency that builds an ``AuthService`` and fully
+decodes the token per request (the previous behaviour), and once with
+``get_current_user``, which shares one service and its verified token cache.
+Only the dependency differs, so the gap is the per-request auth cost.
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+
+from config.settings import settings
+from core.auth_service import AuthService, auth_service, get_current_user, security
+
+def uncached_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
+    service = AuthService()
+    payload = jwt.decode(credentials.credentials, service.secret_key, algorithms=[service.algorithm])
+    return payload["sub"]
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/uncached")
+    async def uncached(user_id: str = Depends(uncached_current_user)):
+        return {"user_id": user_id}
+
+    @app.get("/cached")
+    async def cached(user_id: str = Depends(get_current_user)):
+        return {"user_id": user_id}
+
+    return app
+
+async def run(client: httpx.AsyncClient, path: str, tokens, requests: int) -> float:
+    started = time.perf_counter()
+    for i in range(requests):
+        response = await client.get(path, headers={"Authorization": f"Bearer {tokens[i % len(tokens)]}"})
+        response.raise_for_status()
+    return time.perf_counter() - started
+
+async def main(args):
+    if not settings.jwt_algorithm.startswith("HS"):
+        raise SystemExit("The uncached baseline decodes with jwt_secret; run with an HS* JWT_ALGORITHM")
+
+    tokens = [auth_service.create_access_token({"sub": f"user_{i}"}) for i in range(args.users)]
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up both routes outside the measurement
+        await run(client, "/uncached", tokens, 50)
+        await run(client, "/cached", tokens, 50)
+
+        uncached = await run(client, "/uncached", tokens, args.requests)
+        cached = await run(client, "/cached", tokens, args.requests)
+
+    for name, elapsed in (("uncached", uncached), ("cached", cached)):
+        print(f"{name:<9} {args.requests} requests in {elapsed:6.2f}s   {elapsed / args.requests * 1e6:8.1f}us/request")
+    print(
+        f"saved {(uncached - cached) / args.requests * 1e6:.1f}us per request; "
+        f"token cache hit rate {auth_service.token_cache.stats()['hit_rate']:.1%}"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=200, help="distinct bearer tokens")
+    asyncio.run(main(parser.parse_args()))
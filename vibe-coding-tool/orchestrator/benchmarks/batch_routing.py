@@ -0,0 +1,89 @@
+"""
+Benchmark of single task submissions against one batch submission
+
+Usage (from the orchestrator directory):
+
+    python -m benchmarks.batch_routing [--tasks 1000] [--mcps 4]
+
+Routes and queues ``--tasks`` tasks over ``--mcps`` equivalent MCPs twice:
+once as one ``route_task`` and ``create_job`` call per task, as
+``POST /tasks`` does, and once as a single ``route_many`` and
+``create_jobs`` call, as ``POST /tasks/batch`` does.
+"""
+
+import argparse
+import asyncio
+import gc
+import random
+import time
+from datetime import datetime
+from unittest.mock import Mock
+
+from models.task import Task, TaskStatus, TaskType
+from models.mcp import MCPInfo, MCPStatus, RoutingFlags
+from core.registry import MCPRegistry
+from core.job_manager import JobManager
+from core.task_router import TaskRouter
+from utils.metrics import MetricsCollector
+
+def make_task(task_id: str) -> Task:
+    return Task(
+        id=task_id,
+        user_id="bench_user",
+        type=TaskType.SECURITY_SCAN,
+        input={},
+        status=TaskStatus.PENDING,
+        created_at=datetime.utcnow()
+    )
+
+async def build_router(mcps: int) -> TaskRouter:
+    registry = MCPRegistry(Mock(), Mock(), Mock())
+    for mcp_id in list(registry.mcps):
+        await registry.unregister_mcp(mcp_id)
+    for i in range(mcps):
+        await registry.register_mcp(MCPInfo(
+            id=f"scan-{i}",
+            name=f"scan-{i}",
+            url=f"https://scan-{i}.example.com",
+            capabilities=[],
+            supported_task_types=["security-scan"],
+            routing_flags=RoutingFlags(can_run_on_user_space=True),
+            status=MCPStatus.HEALTHY,
+            last_health_check=datetime.utcnow()
+        ))
+
+    metrics = MetricsCollector()
+    job_manager = JobManager(Mock(), Mock(), Mock(), Mock(), metrics_collector=metrics)
+    router = TaskRouter(registry, Mock(), job_manager, metrics)
+    router._rng = random.Random(7)
+    return router
+
+async def main(args):
+    router = await build_router(args.mcps)
+
+    gc.collect()
+    start = time.perf_counter()
+    for i in range(args.tasks):
+        task = make_task(f"single_{i}")
+        mcp = await router.route_task(task, "bench_user")
+        await router.job_manager.create_job(task, mcp)
+    single_elapsed = time.perf_counter() - start
+
+    tasks = [make_task(f"batch_{i}") for i in range(args.tasks)]
+    gc.collect()
+    start = time.perf_counter()
+    decisions = await router.route_many(tasks, "bench_user")
+    await router.job_manager.create_jobs([
+        (task, decision["mcp_info"]) for task, decision in zip(tasks, decisions)
+    ])
+    batch_elapsed = time.perf_counter() - start
+
+    print(f"single {args.tasks:>8,} submissions   {single_elapsed * 1e3:>9.1f}ms")
+    print(f"batch  {args.tasks:>8,} tasks         {batch_elapsed * 1e3:>9.1f}ms   ({single_elapsed / batch_elapsed:.1f}x)")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--mcps", type=int, default=4, help="equivalent MCPs to route over")
+    raise SystemExit(asyncio.run(main(parser.parse_args())))
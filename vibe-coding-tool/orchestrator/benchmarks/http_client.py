@@ -0,0 +1,71 @@
+"""
+Benchmark of a fresh HTTP client per request against the shared pool
+
+Usage (from the orchestrator directory):
+
+    python -m benchmarks.http_client [--requests 200]
+
+Serves a minimal keep-alive HTTP/1.1 stub on localhost and reports the
+requests per second of ``--requests`` sequential GETs, first with a new
+``httpx.AsyncClient`` per request and then with the pooled client of
+``HTTPClientRegistry``.
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from utils.http_client import HTTPClientRegistry
+
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: 20\r\n"
+    b"Connection: keep-alive\r\n"
+    b"\r\n"
+    b'{"status":"healthy"}'
+)
+
+async def handle_connection(reader, writer):
+    """Answer every request on the connection with 200"""
+    try:
+        while True:
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(RESPONSE)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+async def main(args):
+    server = await asyncio.start_server(handle_connection, "127.0.0.1", 0)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/health"
+
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        async with httpx.AsyncClient() as client:
+            (await client.get(url)).raise_for_status()
+    fresh_rps = args.requests / (time.perf_counter() - start)
+
+    registry = HTTPClientRegistry()
+    client = registry.get("mcp")
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        (await client.get(url)).raise_for_status()
+    shared_rps = args.requests / (time.perf_counter() - start)
+    await registry.aclose()
+
+    server.close()
+    await server.wait_closed()
+
+    print(f"fresh client {fresh_rps:>10,.0f} req/s")
+    print(f"shared pool  {shared_rps:>10,.0f} req/s   ({shared_rps / fresh_rps:.1f}x)")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=200)
+    raise SystemExit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,77 @@
+"""
+Benchmark of the per-request rate limit check
+
+Usage (from the orchestrator directory):
+
+    python -m benchmarks.rate_limiter [--requests 100000] [--keys 10000] [--redis redis://localhost:6379/0]
+
+Reports the latency of ``RateLimiter.check`` as the middleware calls it,
+against the in-memory backend and, with ``--redis``, against a real Redis
+server. The budget is sub-millisecond per request at p99.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import List
+
+from utils.rate_limiter import RateLimiter, MemoryRateLimitBackend, RedisRateLimitBackend
+
+BUDGET_SECONDS = 0.001
+
+def report(name: str, samples: List[float], elapsed: float) -> bool:
+    samples.sort()
+    p50 = samples[len(samples) // 2]
+    p99 = samples[int(len(samples) * 0.99)]
+    print(
+        f"{name:<8} {len(samples) / elapsed:>12,.0f} checks/s   "
+        f"p50 {p50 * 1e6:>8.1f}us   p99 {p99 * 1e6:>8.1f}us   max {samples[-1] * 1e6:>8.1f}us"
+    )
+    return p99 < BUDGET_SECONDS
+
+async def run(limiter: RateLimiter, requests: int, keys: int) -> tuple:
+    # Skewed traffic: half from the busiest 1% of callers, half from everyone
+    busy = max(keys // 100, 1)
+    names = [
+        f"read:user:{random.randrange(busy if random.random() < 0.5 else keys)}"
+        for _ in range(requests)
+    ]
+    samples = []
+
+    started = time.perf_counter()
+    for name in names:
+        start = time.perf_counter()
+        await limiter.check(name)
+        samples.append(time.perf_counter() - start)
+    return samples, time.perf_counter() - started
+
+async def main(args):
+    within_budget = True
+
+    backend = MemoryRateLimitBackend(max_keys=args.max_keys)
+    limiter = RateLimiter(args.limit, 60, backend=backend)
+    samples, elapsed = await run(limiter, args.requests, args.keys)
+    within_budget &= report("memory", samples, elapsed)
+    print(f"         {len(backend)} keys tracked, {backend.evictions} evicted")
+
+    if args.redis:
+        import redis.asyncio as redis
+
+        backend = RedisRateLimitBackend(redis.Redis.from_url(args.redis), prefix="bench:ratelimit", owns_client=True)
+        limiter = RateLimiter(args.limit, 60, backend=backend)
+        samples, elapsed = await run(limiter, min(args.requests, 20000), args.keys)
+        within_budget &= report("redis", samples, elapsed)
+        await backend.close()
+
+    print("within budget" if within_budget else f"p99 above {BUDGET_SECONDS * 1e3:.0f}ms budget")
+    return 0 if within_budget else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--keys", type=int, default=10000, help="distinct callers")
+    parser.add_argument("--max-keys", type=int, default=100000, help="memory backend key table size")
+    parser.add_argument("--limit", type=int, default=100, help="requests per minute per caller")
+    parser.add_argument("--redis", help="Redis URL to benchmark the shared backend")
+    raise SystemExit(asyncio.run(main(parser.parse_args())))
@@ -13,6 +13,10 @@ class Settings(BaseSettings):
     database_url: str = Field(env="DATABASE_URL")
     database_pool_size: int = Field(default=20, env="DATABASE_POOL_SIZE")
     database_max_overflow: int = Field(default=30, env="DATABASE_MAX_OVERFLOW")
+    database_pool_timeout: float = Field(default=30.0, env="DATABASE_POOL_TIMEOUT")
+    database_create_tables: bool = Field(default=True, env="DATABASE_CREATE_TABLES")
+    database_flush_interval: float = Field(default=0.05, env="DATABASE_FLUSH_INTERVAL")
+    database_flush_batch_size: int = Field(default=500, env="DATABASE_FLUSH_BATCH_SIZE")
     
     # Redis settings
     redis_url: str = Field(env="REDIS_URL")
@@ -23,6 +27,12 @@ class Settings(BaseSettings):
     jwt_algorithm: str = Field(default="HS256", env="JWT_ALGORITHM")
     jwt_access_token_expire_minutes: int = Field(default=30, env="JWT_ACCESS_TOKEN_EXPIRE_MINUTES")
     jwt_refresh_token_expire_days: int = Field(default=7, env="JWT_REFRESH_TOKEN_EXPIRE_DAYS")
+    # PEM keys for asymmetric algorithms (RS256, ES256); HS* algorithms use jwt_secret
+    jwt_private_key: Optional[str] = Field(default=None, env="JWT_PRIVATE_KEY")
+    jwt_public_key: Optional[str] = Field(default=None, env="JWT_PUBLIC_KEY")
+    # Verified tokens are trusted for at most this long (and never past their exp)
+    auth_token_cache_ttl: float = Field(default=300.0, env="AUTH_TOKEN_CACHE_TTL")
+    auth_token_cache_max_entries: int = Field(default=10000, env="AUTH_TOKEN_CACHE_MAX_ENTRIES")
     
     # GitHub OAuth settings
     github_client_id: str = Field(env="GITHUB_CLIENT_ID")
@@ -52,11 +62,89 @@ class Settings(BaseSettings):
     # Rate limiting settings
     rate_limit_requests: int = Field(default=100, env="RATE_LIMIT_REQUESTS")
     rate_limit_window: int = Field(default=60, env="RATE_LIMIT_WINDOW")
+    rate_limit_burst: Optional[int] = Field(default=None, env="RATE_LIMIT_BURST")
+    rate_limit_write_requests: int = Field(default=30, env="RATE_LIMIT_WRITE_REQUESTS")
+    rate_limit_auth_requests: int = Field(default=10, env="RATE_LIMIT_AUTH_REQUESTS")
+    
+    # Rate limit state ("memory" is per replica; "redis" shares limits between replicas)
+    rate_limit_backend: str = Field(default="memory", env="RATE_LIMIT_BACKEND")
+    rate_limit_max_keys: int = Field(default=100000, env="RATE_LIMIT_MAX_KEYS")
+    rate_limit_key_prefix: str = Field(default="vibe:ratelimit", env="RATE_LIMIT_KEY_PREFIX")
     
     # Task settings
     max_concurrent_jobs: int = Field(default=10, env="MAX_CONCURRENT_JOBS")
     default_task_timeout: int = Field(default=300, env="DEFAULT_TASK_TIMEOUT")
     max_task_retries: int = Field(default=3, env="MAX_TASK_RETRIES")
+    job_worker_count: int = Field(default=10, env="JOB_WORKER_COUNT")
+    job_shutdown_timeout: int = Field(default=30, env="JOB_SHUTDOWN_TIMEOUT")
+    job_priority_aging_seconds: float = Field(default=30.0, env="JOB_PRIORITY_AGING_SECONDS")
+    finished_jobs_ttl: int = Field(default=3600, env="FINISHED_JOBS_TTL")
+    finished_jobs_max_entries: int = Field(default=10000, env="FINISHED_JOBS_MAX_ENTRIES")
+    
+    # Job queue settings ("memory" or "redis"; redis shares jobs between replicas)
+    job_queue_backend: str = Field(default="memory", env="JOB_QUEUE_BACKEND")
+    job_queue_name: str = Field(default="vibe:jobs", env="JOB_QUEUE_NAME")
+    # Lease on a claimed job, renewed while its replica runs; a crashed replica's jobs are redelivered after it
+    job_visibility_timeout: float = Field(default=60.0, env="JOB_VISIBILITY_TIMEOUT")
+    job_queue_poll_interval: float = Field(default=1.0, env="JOB_QUEUE_POLL_INTERVAL")
+    
+    # Job envelope signing (workers verify envelopes with the matching META_PUBLIC_KEY)
+    job_envelope_private_key: Optional[str] = Field(default=None, env="JOB_ENVELOPE_PRIVATE_KEY")
+    job_envelope_private_key_file: Optional[str] = Field(default=None, env="JOB_ENVELOPE_PRIVATE_KEY_FILE")
+    job_envelope_algorithm: str = Field(default="RS256", env="JOB_ENVELOPE_ALGORITHM")
+    job_envelope_key_id: Optional[str] = Field(default=None, env="JOB_ENVELOPE_KEY_ID")
+    job_envelope_issuer: str = Field(default="metamcp", env="JOB_ENVELOPE_ISSUER")
+    job_envelope_ttl: int = Field(default=900, env="JOB_ENVELOPE_TTL")
+    
+    # Worker callback settings (set the base URL, with envelope signing, to submit HF Space jobs and return)
+    job_callback_base_url: Optional[str] = Field(default=None, env="JOB_CALLBACK_BASE_URL")
+    # This replica's own address; with a shared job queue only the replica that dispatched a job can take its callback
+    job_callback_replica_url: Optional[str] = Field(default=None, env="JOB_CALLBACK_REPLICA_URL")
+    job_callback_max_skew: int = Field(default=300, env="JOB_CALLBACK_MAX_SKEW")
+    job_callback_dedup_ttl: int = Field(default=3600, env="JOB_CALLBACK_DEDUP_TTL")
+    
+    # Cache settings
+    result_cache_max_bytes: int = Field(default=256 * 1024 * 1024, env="RESULT_CACHE_MAX_BYTES")
+    result_cache_user_quota_bytes: int = Field(default=32 * 1024 * 1024, env="RESULT_CACHE_USER_QUOTA_BYTES")
+    result_cache_ttl: int = Field(default=3600, env="RESULT_CACHE_TTL")
+    health_cache_ttl: int = Field(default=300, env="HEALTH_CACHE_TTL")
+    health_cache_max_entries: int = Field(default=10000, env="HEALTH_CACHE_MAX_ENTRIES")
+    cache_sweep_interval: float = Field(default=60.0, env="CACHE_SWEEP_INTERVAL")
+    
+    # Event stream settings
+    event_replay_size: int = Field(default=256, env="EVENT_REPLAY_SIZE")
+    event_subscriber_queue_size: int = Field(default=64, env="EVENT_SUBSCRIBER_QUEUE_SIZE")
+    event_topic_ttl: int = Field(default=3600, env="EVENT_TOPIC_TTL")
+    event_max_topics: int = Field(default=10000, env="EVENT_MAX_TOPICS")
+    event_heartbeat_interval: float = Field(default=15.0, env="EVENT_HEARTBEAT_INTERVAL")
+    
+    # Task routing settings
+    max_batch_tasks: int = Field(default=1000, env="MAX_BATCH_TASKS")
+    route_cache_ttl: float = Field(default=2.0, env="ROUTE_CACHE_TTL")
+    route_cache_max_entries: int = Field(default=10000, env="ROUTE_CACHE_MAX_ENTRIES")
+    routing_latency_reference: float = Field(default=1.0, env="ROUTING_LATENCY_REFERENCE")
+    
+    # MCP discovery settings
+    mcp_discovery_concurrency: int = Field(default=16, env="MCP_DISCOVERY_CONCURRENCY")
+    mcp_discovery_host_rate: int = Field(default=10, env="MCP_DISCOVERY_HOST_RATE")
+    mcp_discovery_interval: int = Field(default=900, env="MCP_DISCOVERY_INTERVAL")
+    
+    # MCP health probe settings
+    mcp_health_interval: float = Field(default=30.0, env="MCP_HEALTH_INTERVAL")
+    mcp_health_jitter: float = Field(default=0.2, env="MCP_HEALTH_JITTER")
+    mcp_health_timeout: float = Field(default=5.0, env="MCP_HEALTH_TIMEOUT")
+    mcp_health_concurrency: int = Field(default=32, env="MCP_HEALTH_CONCURRENCY")
+    mcp_health_ewma_alpha: float = Field(default=0.3, env="MCP_HEALTH_EWMA_ALPHA")
+    mcp_circuit_failure_threshold: int = Field(default=3, env="MCP_CIRCUIT_FAILURE_THRESHOLD")
+    mcp_circuit_reset_timeout: float = Field(default=30.0, env="MCP_CIRCUIT_RESET_TIMEOUT")
+    
+    # Outbound HTTP settings
+    http_timeout: float = Field(default=30.0, env="HTTP_TIMEOUT")
+    http_connect_timeout: float = Field(default=5.0, env="HTTP_CONNECT_TIMEOUT")
+    http_max_connections: int = Field(default=100, env="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive_connections: int = Field(default=20, env="HTTP_MAX_KEEPALIVE_CONNECTIONS")
+    http_keepalive_expiry: float = Field(default=30.0, env="HTTP_KEEPALIVE_EXPIRY")
+    http2_enabled: bool = Field(default=True, env="HTTP2_ENABLED")
     
     # Logging settings
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
@@ -65,6 +153,15 @@ class Settings(BaseSettings):
     # Monitoring settings
     enable_metrics: bool = Field(default=True, env="ENABLE_METRICS")
     metrics_port: int = Field(default=8090, env="METRICS_PORT")
+    metrics_host: str = Field(default="0.0.0.0", env="METRICS_HOST")
+    metrics_refresh_interval: float = Field(default=5.0, env="METRICS_REFRESH_INTERVAL")
+    
+    # Tracing settings (exporter: "file" writes JSON lines, "otlp" posts to a collector)
+    tracing_enabled: bool = Field(default=False, env="TRACING_ENABLED")
+    tracing_service_name: str = Field(default="vibe-orchestrator", env="TRACING_SERVICE_NAME")
+    tracing_exporter: str = Field(default="file", env="TRACING_EXPORTER")
+    tracing_file: str = Field(default="traces.jsonl", env="TRACING_FILE")
+    tracing_otlp_endpoint: str = Field(default="http://localhost:4318/v1/traces", env="TRACING_OTLP_ENDPOINT")
     
     class Config:
         env_file = ".env"
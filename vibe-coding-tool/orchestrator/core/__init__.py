@@ -7,11 +7,22 @@ from .task_router import TaskRouter
 from .job_manager import JobManager
 from .result_manager import ResultManager
 from .registry import MCPRegistry
+from .health_monitor import MCPHealthMonitor, CircuitBreaker
+from .database import Database
+from .repositories import TaskRepository, JobRepository, ResultRepository
+from .event_bus import EventBus
 
 __all__ = [
     'AuthService',
     'TaskRouter', 
     'JobManager',
     'ResultManager',
-    'MCPRegistry'
+    'MCPRegistry',
+    'MCPHealthMonitor',
+    'CircuitBreaker',
+    'Database',
+    'TaskRepository',
+    'JobRepository',
+    'ResultRepository',
+    'EventBus'
 ]
\ No newline at end of file
@@ -1,14 +1,18 @@
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
+import hashlib
 import logging
-from jose import JWTError, jwt
+import time
+from jose import JWTError, jwk, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.security import HTTPBearer
 
 from models.user import User, UserCreate
 from config.settings import settings
+from utils.cache import BoundedCache
+from utils.crypto import hmac_sha256_hex, secure_compare
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +20,39 @@ class AuthService:
     def __init__(self):
         self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
         self.secret_key = settings.jwt_secret
-        self.algorithm = "HS256"
-        self.access_token_expire_minutes = 30
-        self.refresh_token_expire_days = 7
+        self.algorithm = settings.jwt_algorithm
+        self.access_token_expire_minutes = settings.jwt_access_token_expire_minutes
+        self.refresh_token_expire_days = settings.jwt_refresh_token_expire_days
+        
+        # Parse key material once; constructing an RSA key from PEM costs
+        # far more than the signature itself
+        self.signing_key, self.verifying_key = self._load_keys()
+        
+        # Claims of verified tokens, keyed by token hash so raw bearer tokens
+        # are not held in memory
+        self.token_cache = BoundedCache(
+            "verified_tokens",
+            max_entries=settings.auth_token_cache_max_entries,
+            default_ttl=settings.auth_token_cache_ttl
+        )
+    
+    def _load_keys(self):
+        """(signing key, verifying key) objects for the configured algorithm"""
+        if self.algorithm.startswith("HS"):
+            key = jwk.construct(self.secret_key, self.algorithm)
+            return key, key
+        
+        if not settings.jwt_public_key:
+            raise ValueError(f"JWT_PUBLIC_KEY is required for {self.algorithm} tokens")
+        verifying_key = jwk.construct(settings.jwt_public_key, self.algorithm)
+        # Replicas that only verify tokens need not hold the private key
+        signing_key = jwk.construct(settings.jwt_private_key, self.algorithm) if settings.jwt_private_key else None
+        return signing_key, verifying_key
+    
+    def _encode(self, claims: Dict[str, Any]) -> str:
+        if self.signing_key is None:
+            raise ValueError("JWT_PRIVATE_KEY is not configured; this instance cannot issue tokens")
+        return jwt.encode(claims, self.signing_key, algorithm=self.algorithm)
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify a password against its hash"""
@@ -37,24 +71,35 @@ class AuthService:
             expire = datetime.utcnow() + timedelta(minutes=self.access_token_expire_minutes)
         
         to_encode.update({"exp": expire, "type": "access"})
-        encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
-        return encoded_jwt
+        return self._encode(to_encode)
     
     def create_refresh_token(self, data: Dict[str, Any]) -> str:
         """Create a refresh token"""
         to_encode = data.copy()
         expire = datetime.utcnow() + timedelta(days=self.refresh_token_expire_days)
         to_encode.update({"exp": expire, "type": "refresh"})
-        encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
-        return encoded_jwt
+        return self._encode(to_encode)
     
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
-        """Verify and decode a token"""
+        """Verify and decode a token; repeat presentations are served from the cache"""
+        cache_key = hashlib.sha256(token.encode()).digest()
+        payload = self.token_cache.get(cache_key)
+        if payload is not None:
+            return dict(payload)
+        
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            return payload
+            payload = jwt.decode(token, self.verifying_key, algorithms=[self.algorithm])
         except JWTError:
+            # Failures are not cached, so garbage tokens cannot flush valid ones
             return None
+        
+        ttl = settings.auth_token_cache_ttl
+        expires = payload.get("exp")
+        if isinstance(expires, (int, float)):
+            ttl = min(ttl, expires - time.time())
+        if ttl > 0:
+            self.token_cache.set(cache_key, payload, ttl=ttl, size=len(token))
+        return dict(payload)
     
     def get_current_user(self, token: str) -> Optional[str]:
         """Get current user ID from token"""
@@ -71,18 +116,12 @@ class AuthService:
         job_key = f"{user_id}_{payload['task_id']}_{datetime.utcnow().isoformat()}"
         
         # Sign the payload
-        signature = jwt.encode(
-            {"job_key": job_key, "timestamp": datetime.utcnow().isoformat()},
-            self.secret_key,
-            algorithm=self.algorithm
-        )
-        
-        return signature
+        return self._encode({"job_key": job_key, "timestamp": datetime.utcnow().isoformat()})
     
     def verify_job_signature(self, payload: Dict[str, Any], signature: str, user_id: str) -> bool:
         """Verify job signature"""
         try:
-            decoded = jwt.decode(signature, self.secret_key, algorithms=[self.algorithm])
+            decoded = jwt.decode(signature, self.verifying_key, algorithms=[self.algorithm])
             
             # Check if signature matches expected format
             timestamp_str = decoded.get("timestamp")
@@ -98,6 +137,36 @@ class AuthService:
         except JWTError:
             return False
     
+    def job_callback_secret(self, job_id: str, meta_request_id: str) -> str:
+        """
+        Secret a worker signs its callbacks for one job attempt with.
+        
+        Derived from the server secret rather than stored, so any replica can
+        verify a callback; it travels to the worker inside the signed payload.
+        """
+        return hmac_sha256_hex(self.secret_key, f"job-callback:{job_id}:{meta_request_id}".encode())
+    
+    def verify_job_callback(
+        self,
+        job_id: str,
+        meta_request_id: str,
+        body: bytes,
+        timestamp: Optional[str],
+        signature: Optional[str]
+    ) -> bool:
+        """Verify ``X-Callback-Signature``: hex HMAC-SHA256 of ``{timestamp}.{body}``"""
+        if not timestamp or not signature:
+            return False
+        try:
+            if abs(time.time() - float(timestamp)) > settings.job_callback_max_skew:
+                return False
+        except ValueError:
+            return False
+        
+        secret = self.job_callback_secret(job_id, meta_request_id)
+        expected = hmac_sha256_hex(secret, timestamp.encode() + b"." + body)
+        return secure_compare(expected, signature.removeprefix("sha256="))
+    
     async def authenticate_user(self, username: str, password: str) -> Optional[User]:
         """Authenticate user with username and password"""
         # This would typically check against a database
@@ -122,51 +191,25 @@ class AuthService:
         # For now, return None
         return None
 
-security = HTTPBearer(auto_error=False)
+# Shared by every request: the bcrypt context, key objects and verified
+# token cache are built once per process
+auth_service = AuthService()
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    if credentials:
-        if not credentials.credentials:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        try:
-            payload = jwt.decode(
-                credentials.credentials, settings.jwt_secret, algorithms=[settings.jwt_algorithm]
-            )
-            username: str = payload.get("sub")
-            if username is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Could not validate credentials",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            token_data = payload.get("user", {})
-            user_id = token_data.get("id")
-            if user_id is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Could not validate credentials",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            return user_id
-        except JWTError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-    else:
+def get_auth_service() -> AuthService:
+    return auth_service
+
+security = HTTPBearer()
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
+    user_id = auth_service.get_current_user(credentials.credentials)
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return user_id
 
-security = HTTPBearer()
-
-def get_current_user(credentials: str = Depends(security)):
-    auth_service = AuthService()
-    return auth_service.get_current_user(credentials)
\ No newline at end of file
+def get_current_active_user(user_id: str = Depends(get_current_user)) -> str:
+    # Users are not stored yet, so every authenticated user is active
+    return user_id
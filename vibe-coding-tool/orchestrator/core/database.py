@@ -0,0 +1,98 @@
+from typing import Optional
+from contextlib import asynccontextmanager
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from models.sql_models import Base
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Async drivers for URLs configured with a plain or sync dialect
+ASYNC_DRIVERS = {
+    'postgresql': 'asyncpg',
+    'sqlite': 'aiosqlite',
+}
+
+def to_async_url(url: str) -> str:
+    """Rewrite ``postgresql://`` style URLs to use the async driver"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver and parsed.get_driver_name() != driver:
+        parsed = parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}")
+    return parsed.render_as_string(hide_password=False)
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite ignores foreign keys unless asked, PostgreSQL always enforces them"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+class Database:
+    """
+    Owns the process-wide async engine and session factory.
+
+    The engine is created once by ``connect()`` during application startup,
+    with the pool sized from settings, and disposed by ``close()`` on
+    shutdown. Repositories share it through ``session()``.
+    """
+
+    def __init__(self, url: str = None, create_tables: bool = None):
+        self.url = to_async_url(url or settings.database_url)
+        self.create_tables = settings.database_create_tables if create_tables is None else create_tables
+        self.engine: Optional[AsyncEngine] = None
+        self._sessions: Optional[async_sessionmaker] = None
+
+    @property
+    def dialect(self) -> str:
+        return make_url(self.url).get_backend_name()
+
+    async def connect(self):
+        """Create the engine and, if configured, any missing tables"""
+        if self.engine is not None:
+            return
+
+        options = {'pool_pre_ping': True}
+        if self.dialect != 'sqlite':
+            # SQLite uses a single-file pool that takes no sizing arguments
+            options.update(
+                pool_size=settings.database_pool_size,
+                max_overflow=settings.database_max_overflow,
+                pool_timeout=settings.database_pool_timeout
+            )
+
+        self.engine = create_async_engine(self.url, **options)
+        if self.dialect == 'sqlite':
+            event.listen(self.engine.sync_engine, 'connect', _enable_sqlite_foreign_keys)
+        self._sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        if self.create_tables:
+            async with self.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+        logger.info(f"Database engine created for {make_url(self.url).render_as_string()}")
+
+    async def close(self):
+        if self.engine is None:
+            return
+
+        await self.engine.dispose()
+        self.engine = None
+        self._sessions = None
+
+    @asynccontextmanager
+    async def session(self):
+        """Session that commits on success and rolls back on error"""
+        if self._sessions is None:
+            raise RuntimeError("Database is not connected")
+
+        async with self._sessions() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
@@ -0,0 +1,36 @@
+"""
+Job envelope signing for Vibe Coding Tool
+
+Workers authenticate jobs with a JWT "envelope" signed by the orchestrator's
+private key and verified with ``META_PUBLIC_KEY``, so a worker never holds a
+secret that could mint jobs. Signing is done by ``core.job_envelope``, the
+orchestrator's copy of the shared ``metamcp_artifacts/job_signing_samples``
+library that the workers verify envelopes with.
+"""
+
+import logging
+from typing import Optional
+
+from config.settings import settings
+from core.job_envelope import EnvelopeSigner
+
+logger = logging.getLogger(__name__)
+
+def create_envelope_signer() -> Optional[EnvelopeSigner]:
+    """Signer for the configured key, None if envelopes are not configured"""
+    pem = settings.job_envelope_private_key
+    if not pem and settings.job_envelope_private_key_file:
+        with open(settings.job_envelope_private_key_file, "r", encoding="utf-8") as f:
+            pem = f.read()
+    if not pem:
+        return None
+
+    signer = EnvelopeSigner(
+        pem,
+        settings.job_envelope_algorithm,
+        issuer=settings.job_envelope_issuer,
+        ttl=settings.job_envelope_ttl,
+        key_id=settings.job_envelope_key_id
+    )
+    logger.info(f"Signing job envelopes with {signer.algorithm}")
+    return signer
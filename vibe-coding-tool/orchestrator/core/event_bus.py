@@ -0,0 +1,221 @@
+from typing import Any, Dict, Optional
+from collections import deque
+from datetime import datetime
+import asyncio
+import json
+import logging
+
+from config.settings import settings
+from utils.cache import BoundedCache
+
+logger = logging.getLogger(__name__)
+
+def task_topic(task_id: str) -> str:
+    """Topic carrying the events of one task"""
+    return f"task:{task_id}"
+
+class Event:
+    """One published event; ``id`` increases monotonically within its topic"""
+
+    __slots__ = ('id', 'type', 'data', 'timestamp', 'final')
+
+    def __init__(self, event_id: int, event_type: str, data: Dict[str, Any], final: bool = False):
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+        self.timestamp = datetime.utcnow()
+        self.final = final
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'type': self.type,
+            'data': self.data,
+            'timestamp': self.timestamp.isoformat(),
+            'final': self.final
+        }
+
+    def to_sse(self) -> str:
+        """Server-Sent Events frame; clients resume with ``Last-Event-ID``"""
+        payload = json.dumps(self.to_dict(), default=str, separators=(",", ":"))
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+class _Topic:
+    __slots__ = ('name', 'replay', 'subscribers', 'next_id', 'closed')
+
+    def __init__(self, name: str, replay_size: int):
+        self.name = name
+        self.replay: deque = deque(maxlen=replay_size)
+        self.subscribers: set = set()
+        self.next_id = 1
+        self.closed = False
+
+class Subscription:
+    """
+    A subscriber's bounded buffer on one topic.
+
+    Iterating yields events until the topic's final event has been delivered.
+    A subscriber that falls more than ``max_queue`` events behind is dropped
+    with ``lagged`` set instead of slowing the publisher down; it can
+    resubscribe from its last event id and catch up from the replay buffer.
+    A subscription whose topic is evicted before its final event ends with
+    ``orphaned`` set, since nothing more will reach it.
+    """
+
+    def __init__(self, topic: _Topic, max_queue: int):
+        self.topic = topic
+        self.max_queue = max_queue
+        self.lagged = False
+        self.orphaned = False
+        self.closed = False
+        self.last_event_id: Optional[int] = None
+        self._buffer: deque = deque()
+        self._ready = asyncio.Event()
+
+    def _push(self, event: Event, bounded: bool = True) -> bool:
+        if self.closed:
+            return False
+
+        if bounded and len(self._buffer) >= self.max_queue:
+            self.lagged = True
+            self._buffer.clear()
+            self.close()
+            return False
+
+        self._buffer.append(event)
+        self._ready.set()
+        return True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Event:
+        return await self.next_event()
+
+    async def next_event(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """
+        Next event, or None if ``timeout`` passes first (useful for
+        heartbeats). Raises StopAsyncIteration once the stream has ended.
+        """
+        while not self._buffer:
+            if self.closed:
+                raise StopAsyncIteration
+
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        event = self._buffer.popleft()
+        self.last_event_id = event.id
+        if event.final:
+            self.close()
+        return event
+
+    def close(self):
+        """Stop receiving events; buffered events can still be read"""
+        self.closed = True
+        self.topic.subscribers.discard(self)
+        self._ready.set()
+
+class EventBus:
+    """
+    In-process publish/subscribe for job progress.
+
+    Every topic keeps the last ``replay_size`` events so late subscribers (and
+    reconnecting ones, via their last event id) see what they missed.
+    Publishing never blocks: each subscriber has its own bounded buffer and
+    slow subscribers are dropped rather than applying backpressure to job
+    processing. Topics idle for ``topic_ttl`` seconds, or beyond
+    ``max_topics``, are evicted and their subscriptions closed.
+    """
+
+    def __init__(
+        self,
+        replay_size: int = None,
+        queue_size: int = None,
+        topic_ttl: float = None,
+        max_topics: int = None
+    ):
+        self.replay_size = replay_size or settings.event_replay_size
+        self.queue_size = queue_size or settings.event_subscriber_queue_size
+        self.topics = BoundedCache(
+            name="event_topics",
+            max_entries=max_topics or settings.event_max_topics,
+            default_ttl=topic_ttl if topic_ttl is not None else settings.event_topic_ttl,
+            sizer=lambda topic: 0,
+            on_evict=self._close_topic
+        )
+
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def _topic(self, name: str) -> _Topic:
+        topic = self.topics.get(name)
+        if topic is None:
+            topic = _Topic(name, self.replay_size)
+        # Refresh the idle timeout on every use
+        self.topics.set(name, topic)
+        return topic
+
+    def _close_topic(self, name: str, topic: _Topic):
+        for subscription in list(topic.subscribers):
+            subscription.orphaned = True
+            subscription.close()
+
+    def has_ended(self, topic_name: str) -> bool:
+        """Whether the topic is held here and its final event was published"""
+        topic = self.topics.get(topic_name)
+        return topic is not None and topic.closed
+
+    def publish(self, topic_name: str, event_type: str, data: Dict[str, Any], final: bool = False) -> Event:
+        """Publish an event; ``final`` ends every subscription once it is delivered"""
+        topic = self._topic(topic_name)
+        event = Event(topic.next_id, event_type, data, final)
+        topic.next_id += 1
+        topic.replay.append(event)
+        topic.closed = final
+        self.published += 1
+
+        for subscription in list(topic.subscribers):
+            if not subscription._push(event):
+                self.dropped_subscribers += 1
+                logger.info(f"Dropped lagging subscriber on {topic_name}")
+
+        return event
+
+    def subscribe(self, topic_name: str, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Subscribe to a topic. Buffered events newer than ``last_event_id``
+        (all of them if None) are replayed first; if some of those have
+        already left the replay buffer, a ``resync`` event comes first so
+        the client refetches the current state.
+        """
+        topic = self._topic(topic_name)
+        subscription = Subscription(topic, self.queue_size)
+
+        replay = [event for event in topic.replay if last_event_id is None or event.id > last_event_id]
+        if last_event_id is not None and topic.replay and topic.replay[0].id > last_event_id + 1:
+            subscription._push(Event(topic.replay[0].id - 1, 'resync', {'topic': topic_name}), bounded=False)
+        for event in replay:
+            subscription._push(event, bounded=False)
+
+        if topic.closed:
+            # Nothing more will be published; end after the replay
+            subscription.close()
+        else:
+            topic.subscribers.add(subscription)
+        return subscription
+
+    def subscriber_count(self, topic_name: str) -> int:
+        topic = self.topics.get(topic_name)
+        return len(topic.subscribers) if topic else 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'topics': len(self.topics),
+            'subscribers': sum(len(topic.subscribers) for topic in self.topics.values()),
+            'published': self.published,
+            'dropped_subscribers': self.dropped_subscribers
+        }
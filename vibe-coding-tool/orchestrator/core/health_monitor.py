@@ -0,0 +1,259 @@
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+from datetime import datetime
+from enum import Enum
+import asyncio
+import logging
+import random
+import time
+
+from models.mcp import MCPInfo, MCPStatus
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """
+    Per-MCP circuit breaker.
+
+    The breaker opens after ``failure_threshold`` consecutive failures and
+    stays open for ``reset_timeout`` seconds. After that it is half-open: the
+    next outcome either closes it again or re-opens it for another timeout.
+    All checks are in-memory so they are safe to call on the request path.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> CircuitState:
+        if self.opened_at is None:
+            return CircuitState.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return CircuitState.HALF_OPEN
+        return CircuitState.OPEN
+
+    def allow_request(self) -> bool:
+        """Whether traffic may be sent to the MCP"""
+        return self.state != CircuitState.OPEN
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+class MCPHealth:
+    """Rolling health statistics for one MCP"""
+
+    __slots__ = (
+        'status', 'latency_ewma', 'error_rate', 'probes', 'failures',
+        'last_checked', 'last_error', 'next_probe_at', 'breaker'
+    )
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.status = MCPStatus.UNKNOWN
+        self.latency_ewma: Optional[float] = None
+        self.error_rate = 0.0
+        self.probes = 0
+        self.failures = 0
+        self.last_checked: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.next_probe_at = 0.0
+        self.breaker = breaker
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'status': self.status,
+            'latency_ms': round(self.latency_ewma * 1000, 2) if self.latency_ewma is not None else None,
+            'error_rate': round(self.error_rate, 4),
+            'probes': self.probes,
+            'failures': self.failures,
+            'circuit': self.breaker.state,
+            'last_checked': self.last_checked.isoformat() if self.last_checked else None,
+            'last_error': self.last_error
+        }
+
+class MCPHealthMonitor:
+    """
+    Background health-probe scheduler for registered MCPs.
+
+    Every MCP is probed on its own jittered interval so probes do not arrive
+    in lockstep; due probes run concurrently, bounded by a semaphore. Results
+    feed an EWMA of latency and error rate, the MCP's circuit breaker and the
+    registry status. Readers (the task router, ``/health/mcps``) only look at
+    the in-memory snapshot and never wait on the network.
+    """
+
+    def __init__(
+        self,
+        registry,
+        probe: Callable[[MCPInfo], Awaitable[MCPStatus]],
+        interval: float = None,
+        jitter: float = None,
+        alpha: float = None,
+        concurrency: int = None
+    ):
+        self.registry = registry
+        self.probe = probe
+        self.interval = interval if interval is not None else settings.mcp_health_interval
+        self.jitter = jitter if jitter is not None else settings.mcp_health_jitter
+        self.alpha = alpha if alpha is not None else settings.mcp_health_ewma_alpha
+        self.concurrency = concurrency if concurrency is not None else settings.mcp_health_concurrency
+        self.health: Dict[str, MCPHealth] = {}
+        # Bumped whenever an MCP's status or circuit state changes
+        self.version = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def start(self):
+        """Start the background probe loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="mcp-health-monitor")
+
+    async def stop(self):
+        """Stop the background probe loop"""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def get(self, mcp_id: str) -> MCPHealth:
+        """Health record for an MCP, created on first use"""
+        health = self.health.get(mcp_id)
+        if health is None:
+            health = MCPHealth(CircuitBreaker(
+                failure_threshold=settings.mcp_circuit_failure_threshold,
+                reset_timeout=settings.mcp_circuit_reset_timeout
+            ))
+            # Spread first probes of newly seen MCPs over one interval
+            health.next_probe_at = time.monotonic() + random.uniform(0, self.interval)
+            self.health[mcp_id] = health
+            self._wakeup.set()
+        return health
+
+    def is_available(self, mcp_id: str) -> bool:
+        """Whether the MCP's circuit lets traffic through (no I/O)"""
+        health = self.health.get(mcp_id)
+        return health is None or health.breaker.allow_request()
+
+    def error_rate(self, mcp_id: str) -> float:
+        health = self.health.get(mcp_id)
+        return health.error_rate if health else 0.0
+
+    def latency(self, mcp_id: str) -> Optional[float]:
+        health = self.health.get(mcp_id)
+        return health.latency_ewma if health else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Health statistics for every tracked MCP"""
+        return {mcp_id: health.to_dict() for mcp_id, health in self.health.items()}
+
+    def forget(self, mcp_id: str):
+        if self.health.pop(mcp_id, None) is not None:
+            self.version += 1
+
+    def record(self, mcp_id: str, status: MCPStatus, latency: float, error: Optional[str] = None):
+        """Fold one probe outcome into the MCP's statistics"""
+        health = self.get(mcp_id)
+        failed = status == MCPStatus.UNHEALTHY
+        previous = (health.status, health.breaker.state)
+
+        if health.latency_ewma is None:
+            health.latency_ewma = latency
+        else:
+            health.latency_ewma += self.alpha * (latency - health.latency_ewma)
+        health.error_rate += self.alpha * ((1.0 if failed else 0.0) - health.error_rate)
+
+        health.probes += 1
+        health.status = status
+        health.last_checked = datetime.utcnow()
+        health.last_error = error
+        if failed:
+            health.failures += 1
+            health.breaker.record_failure()
+        else:
+            health.breaker.record_success()
+
+        if (health.status, health.breaker.state) != previous:
+            self.version += 1
+
+    async def probe_mcp(self, mcp_id: str) -> MCPStatus:
+        """Probe one MCP now and update its statistics and registry status"""
+        mcp = self.registry.mcps.get(mcp_id)
+        if mcp is None:
+            self.forget(mcp_id)
+            return MCPStatus.UNKNOWN
+
+        health = self.get(mcp_id)
+        start = time.perf_counter()
+        error = None
+        try:
+            status = await self.probe(mcp)
+        except Exception as e:
+            status = MCPStatus.UNHEALTHY
+            error = str(e)
+
+        self.record(mcp_id, status, time.perf_counter() - start, error)
+        health.next_probe_at = self._next_probe_time()
+        await self.registry.update_mcp_status(mcp_id, status)
+        return status
+
+    async def probe_all(self, mcp_ids: Optional[List[str]] = None) -> Dict[str, MCPStatus]:
+        """Probe the given (default: all) MCPs concurrently"""
+        mcp_ids = list(self.registry.mcps) if mcp_ids is None else mcp_ids
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(mcp_id: str) -> MCPStatus:
+            async with slots:
+                return await self.probe_mcp(mcp_id)
+
+        statuses = await asyncio.gather(*(bounded(mcp_id) for mcp_id in mcp_ids))
+        return dict(zip(mcp_ids, statuses))
+
+    def _next_probe_time(self) -> float:
+        spread = self.interval * self.jitter
+        return time.monotonic() + self.interval + random.uniform(-spread, spread)
+
+    async def _run(self):
+        while True:
+            try:
+                # Track newly registered MCPs and drop removed ones
+                for mcp_id in self.registry.mcps:
+                    self.get(mcp_id)
+                for mcp_id in list(self.health):
+                    if mcp_id not in self.registry.mcps:
+                        self.forget(mcp_id)
+
+                now = time.monotonic()
+                due = [mcp_id for mcp_id, health in self.health.items() if health.next_probe_at <= now]
+                if due:
+                    await self.probe_all(due)
+
+                next_at = min((health.next_probe_at for health in self.health.values()), default=now + self.interval)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(next_at - time.monotonic(), 0.05))
+                except asyncio.TimeoutError:
+                    pass
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in MCP health monitor: {str(e)}")
+                await asyncio.sleep(1)
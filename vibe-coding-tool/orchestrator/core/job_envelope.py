@@ -0,0 +1,84 @@
+# Job envelopes: JWTs signed with MetaMCP's private key and verified by workers with the
+# matching public key, so a worker never holds a secret that could mint jobs.
+# Install: pip install pyjwt[crypto]
+#
+# This is the shared library behind python_sign_job.py and python_verify_job.py. Deployables
+# that are built from their own directory carry a byte-identical copy of this file:
+#   vibe-coding-tool/orchestrator/core/job_envelope.py
+#   hfspace-worker-template/worker/job_envelope.py (and its vibe-coding-tool mirror)
+#   metamcp_artifacts/fallback_oracle_worker/job_envelope.py
+# Edit this file and copy it over them with metamcp_artifacts/sync_shared_modules.sh.
+import json, time, uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+import jwt
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+
+DEFAULT_ISSUER = 'metamcp.example.com'
+DEFAULT_TTL = 900  # seconds
+# Asymmetric algorithms only: an envelope must not be forgeable by whoever holds a shared secret
+SUPPORTED_ALGORITHMS = ('RS256', 'RS384', 'RS512', 'PS256', 'ES256', 'EdDSA')
+
+def load_key(path: str) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+class _ClaimsEncoder(json.JSONEncoder):
+    def default(self, o):
+        return str(o)
+
+class EnvelopeSigner:
+    """Signs envelopes with a private key parsed once. Each envelope is issued when it is
+    signed and gets its own jti, which workers use to reject replays."""
+
+    def __init__(self, private_key_pem: str, algorithm: str = 'RS256', issuer: str = DEFAULT_ISSUER,
+                 ttl: int = DEFAULT_TTL, key_id: Optional[str] = None):
+        if algorithm not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f'Unsupported envelope algorithm: {algorithm}')
+        self.algorithm = algorithm
+        self.issuer = issuer
+        self.ttl = ttl
+        self.private_key = load_pem_private_key(private_key_pem.encode(), password=None)
+        self.headers = {'kid': key_id} if key_id else None
+
+    def sign(self, payload: Dict[str, Any]) -> str:
+        now = int(time.time())
+        claims = {**payload, 'iat': now, 'exp': now + self.ttl, 'iss': self.issuer, 'jti': uuid.uuid4().hex}
+        return jwt.encode(claims, self.private_key, algorithm=self.algorithm, headers=self.headers,
+                          json_encoder=_ClaimsEncoder)
+
+class EnvelopeReplayed(Exception):
+    pass
+
+class EnvelopeVerifier:
+    """Verifies envelopes against a public key parsed once, and rejects an
+    envelope whose jti was already seen. A jti is remembered until its
+    envelope expires, or until max_entries newer ones push it out."""
+
+    def __init__(self, public_key_pem: str, algorithms: Iterable[str] = ('RS256', 'EdDSA'), max_entries: int = 10000):
+        self.public_key = load_pem_public_key(public_key_pem.encode())
+        self.algorithms = list(algorithms)
+        self.max_entries = max_entries
+        self.seen: 'OrderedDict[str, float]' = OrderedDict()  # jti -> exp
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        payload = jwt.decode(token, self.public_key, algorithms=self.algorithms, options={'verify_aud': False})
+        jti = payload.get('jti')
+        if jti:
+            now = time.time()
+            while self.seen and next(iter(self.seen.values())) <= now:
+                self.seen.popitem(last=False)
+            if jti in self.seen:
+                raise EnvelopeReplayed(jti)
+            self.seen[jti] = payload.get('exp', now + DEFAULT_TTL)
+            if len(self.seen) > self.max_entries:
+                self.seen.popitem(last=False)
+        return payload
+
+def sign_job(payload: dict, private_key_pem: str, exp_seconds: int = DEFAULT_TTL, algorithm: str = 'RS256') -> str:
+    return EnvelopeSigner(private_key_pem, algorithm, ttl=exp_seconds).sign(payload)
+
+def verify_job(token: str, public_key_pem: str, algorithms: Iterable[str] = ('RS256',)) -> Dict[str, Any]:
+    """Signature and expiry only; use an EnvelopeVerifier to also reject replays"""
+    return jwt.decode(token, public_key_pem, algorithms=list(algorithms), options={'verify_aud': False})
@@ -1,37 +1,190 @@
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from typing import List, Optional, Dict, Any, Set, Tuple
+from datetime import datetime, timedelta, timezone
 import asyncio
+import heapq
+import itertools
 import logging
+import time
 import uuid
-import httpx
 from enum import Enum
 
 from models.task import Task, TaskStatus, TaskType
 from models.mcp import MCPInfo
 from models.job import JobStatus
 from models.job import Job, JobCreate
+from models.result import ResultCreate, ResultType
 from core.result_manager import ResultManager
+from core.job_queue import JobQueue, create_job_queue
+from core.repositories import TaskRepository, JobRepository, task_status_for
+from core.event_bus import EventBus, task_topic
 from core.auth_service import AuthService
+from core.envelope_signer import EnvelopeSigner
 from services.github_service import GitHubService
 from services.hf_service import HuggingFaceService
+from config.settings import settings
+from utils.http_client import HTTPClientRegistry, http_clients as default_http_clients
+from utils.metrics import MetricsCollector
+from utils.cache import BoundedCache
+from utils.tracing import tracer, parse_traceparent
 
 logger = logging.getLogger(__name__)
 
+TERMINAL_JOB_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+# Returned by an executor when the worker accepted the job and will call back
+CALLBACK_PENDING = object()
+
+def _utc_ns(moment: datetime) -> int:
+    """Epoch nanoseconds of a naive UTC datetime"""
+    return int(moment.replace(tzinfo=timezone.utc).timestamp() * 1e9)
+
+class CallbackOutcome(str, Enum):
+    ACCEPTED = "accepted"
+    DUPLICATE = "duplicate"
+    STALE = "stale"
+    INVALID = "invalid"
+    UNKNOWN = "unknown"
+
 class JobManager:
     def __init__(
         self, 
         result_manager: ResultManager,
         github_service: GitHubService,
         hf_service: HuggingFaceService,
-        auth_service: AuthService
+        auth_service: AuthService,
+        http_clients: Optional[HTTPClientRegistry] = None,
+        metrics_collector: Optional[MetricsCollector] = None,
+        job_queue: Optional[JobQueue] = None,
+        task_repository: Optional[TaskRepository] = None,
+        job_repository: Optional[JobRepository] = None,
+        event_bus: Optional[EventBus] = None,
+        envelope_signer: Optional[EnvelopeSigner] = None
     ):
         self.result_manager = result_manager
         self.github_service = github_service
         self.hf_service = hf_service
         self.auth_service = auth_service
-        self.active_jobs = {}
-        self.job_queue = asyncio.Queue()
-        self.max_concurrent_jobs = 10
+        self.http_clients = http_clients or default_http_clients
+        self.metrics_collector = metrics_collector
+        # Unfinished jobs by ID and by task ID; finished ones move to finished_jobs
+        self.active_jobs: Dict[str, Job] = {}
+        self._active_by_task: Dict[str, Job] = {}
+        self.finished_jobs = BoundedCache(
+            name="finished_jobs",
+            max_entries=settings.finished_jobs_max_entries,
+            default_ttl=settings.finished_jobs_ttl,
+            sizer=lambda value: 0
+        )
+        self.job_queue = job_queue or create_job_queue()
+        self.job_queue.watch_cancellations(self._cancel_owned_job)
+        self.task_repository = task_repository
+        self.job_repository = job_repository
+        self.event_bus = event_bus or EventBus()
+        self.envelope_signer = envelope_signer
+        self.max_concurrent_jobs = settings.max_concurrent_jobs
+        self.worker_count = settings.job_worker_count
+        self.shutdown_timeout = settings.job_shutdown_timeout
+        self._slots = asyncio.Semaphore(self.max_concurrent_jobs)
+        self._workers: List[asyncio.Task] = []
+        self._running = False
+        self.running_jobs = 0
+        
+        # Jobs assigned to each MCP that are queued, awaiting retry or running
+        self.in_flight: Dict[str, int] = {}
+        self._in_flight_jobs: Set[str] = set()
+        
+        # Submitted jobs awaiting their worker callback: job ID ->
+        # (meta_request_id, deadline timer, start time). They stay owned in the
+        # queue, but no longer hold a worker slot or an HTTP connection.
+        self._awaiting_callback: Dict[str, Tuple[str, asyncio.TimerHandle, float]] = {}
+        self._callback_tasks: Set[asyncio.Task] = set()
+        # Executing attempt of each running job, cancelled with its task
+        self._attempts: Dict[str, asyncio.Task] = {}
+        # meta_request_ids whose final callback has been committed
+        self.committed_callbacks = BoundedCache(
+            name="job_callbacks",
+            default_ttl=settings.job_callback_dedup_ttl,
+            sizer=lambda value: 0
+        )
+    
+    async def start(self):
+        """Start the long-lived dispatcher workers"""
+        if self._running:
+            return
+        
+        self._running = True
+        self._workers = [
+            asyncio.create_task(self._worker_loop(i), name=f"job-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        logger.info(
+            f"Job dispatcher started with {self.worker_count} workers, "
+            f"max {self.max_concurrent_jobs} concurrent jobs"
+        )
+    
+    async def stop(self):
+        """Drain queued jobs and stop the dispatcher workers"""
+        if not self._running:
+            return
+        
+        self._running = False
+        
+        # Give queued and in-flight jobs a chance to finish
+        try:
+            await asyncio.wait_for(self.job_queue.join(), timeout=self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Job queue not drained after {self.shutdown_timeout}s, "
+                f"{await self.job_queue.depth()} jobs left queued"
+            )
+        
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        
+        # Unacked submitted jobs are redelivered by a shared queue
+        for _, deadline, _ in self._awaiting_callback.values():
+            deadline.cancel()
+        self._awaiting_callback.clear()
+        
+        await self.job_queue.close()
+        
+        logger.info("Job dispatcher stopped")
+    
+    async def _worker_loop(self, worker_id: int):
+        """Pull jobs off the queue and run them within the concurrency limit"""
+        while True:
+            # Take a slot first, so a job is only claimed when it can start
+            # and the queue keeps ordering everything still waiting
+            async with self._slots:
+                delivered = await self.job_queue.dequeue()
+                
+                # A redelivery of a job this replica already finished is dropped
+                finished = self.finished_jobs.get(delivered.task_id)
+                if finished is not None and finished.id == delivered.id:
+                    await self.job_queue.ack(delivered)
+                    continue
+                
+                # Jobs created by another replica are adopted on delivery
+                job = self.active_jobs.get(delivered.id)
+                if job is None:
+                    job = delivered
+                    self._track(job)
+                self._acquire_load(job)
+                self.running_jobs += 1
+                try:
+                    await self.process_job(job.id)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Worker {worker_id} failed on job {job.id}: {str(e)}")
+                finally:
+                    self.running_jobs -= 1
+                    # A job put back for retry has already been nacked, and a
+                    # submitted job is acked when its callback arrives
+                    if job.status != JobStatus.QUEUED and job.id not in self._awaiting_callback:
+                        await self.job_queue.ack(job)
     
     async def create_job(self, task: Task, mcp_info: MCPInfo) -> Job:
         """Create a new job"""
@@ -44,73 +197,293 @@ class JobManager:
             status=JobStatus.QUEUED,
             created_at=datetime.utcnow(),
             priority=task.priority,
-            timeout=task.timeout or 300,  # 5 minutes default
+            timeout=settings.default_task_timeout,
             retry_count=0,
-            max_retries=3
+            max_retries=settings.max_task_retries,
+            trace_parent=tracer.current_traceparent(),
+            task=task
         )
         
         # Store job
-        self.active_jobs[job.id] = job
+        self._track(job)
+        self._acquire_load(job)
+        self._record_state(job)
+        self._publish_status(job)
         
         # Add to queue
-        await self.job_queue.put(job)
+        await self.job_queue.enqueue(job)
         
         return job
     
+    async def create_jobs(self, assignments: List[Tuple[Task, MCPInfo]]) -> List[Job]:
+        """Create jobs for already routed tasks and queue them in one operation"""
+        now = datetime.utcnow()
+        trace_parent = tracer.current_traceparent()
+        jobs = [
+            Job(
+                id=str(uuid.uuid4()),
+                task_id=task.id,
+                user_id=task.user_id,
+                mcp_id=mcp_info.id,
+                mcp_url=mcp_info.url,
+                status=JobStatus.QUEUED,
+                created_at=now,
+                priority=task.priority,
+                timeout=settings.default_task_timeout,
+                retry_count=0,
+                max_retries=settings.max_task_retries,
+                trace_parent=trace_parent,
+                task=task
+            )
+            for task, mcp_info in assignments
+        ]
+        
+        for job in jobs:
+            self._track(job)
+            self._acquire_load(job)
+            self._record_state(job)
+            self._publish_status(job)
+        
+        await self.job_queue.enqueue_many(jobs)
+        
+        return jobs
+    
     async def process_job(self, job_id: str):
-        """Process a job from the queue"""
-        try:
-            job = self.active_jobs.get(job_id)
-            if not job:
-                logger.error(f"Job {job_id} not found")
-                return
-            
-            # Check concurrency limits
-            if len(self.active_jobs) >= self.max_concurrent_jobs:
-                await asyncio.sleep(1)
-                await self.job_queue.put(job)
-                return
-            
-            # Update job status
-            job.status = JobStatus.RUNNING
-            job.started_at = datetime.utcnow()
-            
+        """Process a single job; called by dispatcher workers"""
+        job = self.active_jobs.get(job_id)
+        if not job:
+            logger.error(f"Job {job_id} not found")
+            return
+        
+        # Job may have been cancelled while it was waiting in the queue
+        if job.status != JobStatus.QUEUED:
+            return
+        
+        # Update job status
+        job.started_at = datetime.utcnow()
+        self._transition(job, JobStatus.RUNNING)
+        
+        # Continue the trace of the request that created the job
+        parent = parse_traceparent(job.trace_parent)
+        attributes = {'job.id': job.id, 'task.id': job.task_id, 'mcp.id': job.mcp_id, 'job.attempt': job.retry_count}
+        queued_since = job.last_error_at if job.retry_count else job.created_at
+        tracer.create_span(
+            "job.queued", parent, attributes=attributes, start_ns=_utc_ns(queued_since)
+        ).end(_utc_ns(job.started_at))
+        
+        with tracer.start_span("job.execute", parent, kind="consumer", attributes=attributes) as span:
+            start = time.perf_counter()
             try:
-                # Execute job
-                result = await self._execute_job(job)
+                # Execute job, bounded by its own timeout
+                attempt = asyncio.ensure_future(self._execute_job(job))
+                self._attempts[job.id] = attempt
+                try:
+                    response = await asyncio.wait_for(attempt, timeout=job.timeout)
+                except asyncio.CancelledError:
+                    if attempt.cancelled() and job.status == JobStatus.CANCELLED:
+                        span.set_attribute('job.cancelled', True)
+                        return
+                    raise
+                except Exception:
+                    await self._record_mcp_call(job, time.perf_counter() - start, False)
+                    raise
+                finally:
+                    self._attempts.pop(job.id, None)
                 
-                # Store result
-                await self.result_manager.store_result(result)
+                if response is CALLBACK_PENDING:
+                    span.set_attribute('job.callback', True)
+                    self._await_callback(job, start)
+                    return
                 
-                # Update job status
-                job.status = JobStatus.COMPLETED
-                job.completed_at = datetime.utcnow()
-                job.result_id = result.id
+                await self._record_mcp_call(job, time.perf_counter() - start, True)
+                await self._complete_job(job, response)
                 
+            except asyncio.TimeoutError:
+                error = TimeoutError(f"Job exceeded timeout of {job.timeout}s")
+                span.record_error(error)
+                await self._handle_job_failure(job, error)
             except Exception as e:
                 # Handle failure
+                span.record_error(e)
                 await self._handle_job_failure(job, e)
-                
+    
+    async def _complete_job(self, job: Job, data: Dict[str, Any]):
+        """Store a job's result and mark it completed, unless it was cancelled"""
+        if job.status == JobStatus.CANCELLED:
+            return
+        
+        result_id = await self.result_manager.store_result(ResultCreate(
+            task_id=job.task_id,
+            user_id=job.user_id,
+            type=ResultType.DIRECT,
+            data=data
+        ), task=job.task)
+        if job.status == JobStatus.CANCELLED:
+            return
+        
+        job.completed_at = datetime.utcnow()
+        job.result_id = result_id
+        self._transition(job, JobStatus.COMPLETED)
+        self._release_load(job)
+        await self._record_job(job)
+    
+    def _callback_base_url(self) -> Optional[str]:
+        """Address workers call back on; it must reach this replica, which alone waits for the callback"""
+        if settings.job_callback_replica_url:
+            return settings.job_callback_replica_url
+        # Behind a shared queue the common base URL may land on any replica
+        if self.job_queue.shared:
+            return None
+        return settings.job_callback_base_url
+    
+    def _uses_callback(self, job: Job) -> bool:
+        """Whether the job is submitted to its worker and completed by callback"""
+        # Workers only accept callback jobs in a signed envelope at /mcp/exec
+        return (
+            bool(self._callback_base_url())
+            and self.envelope_signer is not None
+            and job.mcp_url.startswith('hf://')
+        )
+    
+    @staticmethod
+    def _meta_request_id(job: Job) -> str:
+        # One per attempt, so a late callback of an earlier attempt is recognised
+        return f"{job.id}:{job.retry_count}"
+    
+    def _await_callback(self, job: Job, start: float):
+        meta_request_id = self._meta_request_id(job)
+        remaining = max(job.timeout - (time.perf_counter() - start), 0)
+        deadline = asyncio.get_running_loop().call_later(
+            remaining, self._expire_callback, job.id, meta_request_id
+        )
+        self._awaiting_callback[job.id] = (meta_request_id, deadline, start)
+    
+    def _expire_callback(self, job_id: str, meta_request_id: str):
+        pending = self._awaiting_callback.get(job_id)
+        if pending is None or pending[0] != meta_request_id:
+            return
+        
+        job = self.active_jobs[job_id]
+        task = asyncio.create_task(self._finish_callback(
+            job, None, TimeoutError(f"Job exceeded timeout of {job.timeout}s")
+        ))
+        self._callback_tasks.add(task)
+        task.add_done_callback(self._callback_tasks.discard)
+    
+    async def handle_callback(
+        self,
+        job_id: str,
+        payload: Dict[str, Any],
+        body: bytes,
+        timestamp: Optional[str],
+        signature: Optional[str]
+    ) -> CallbackOutcome:
+        """
+        Apply a signed worker callback.
+        
+        ``status: running`` callbacks publish progress; ``completed`` and
+        ``failed`` finish the attempt exactly once per ``meta_request_id``,
+        so worker retries of the same callback are acknowledged as duplicates.
+        """
+        job = self.active_jobs.get(job_id)
+        meta_request_id = str(payload.get('meta_request_id') or '')
+        if job is None:
+            # A valid signature shows the job existed here and has since finished
+            if not meta_request_id or not self.auth_service.verify_job_callback(
+                job_id, meta_request_id, body, timestamp, signature
+            ):
+                return CallbackOutcome.UNKNOWN
+            if meta_request_id in self.committed_callbacks:
+                return CallbackOutcome.DUPLICATE
+            return CallbackOutcome.STALE
+        
+        if not meta_request_id or not self.auth_service.verify_job_callback(
+            job_id, meta_request_id, body, timestamp, signature
+        ):
+            return CallbackOutcome.INVALID
+        
+        if meta_request_id in self.committed_callbacks:
+            return CallbackOutcome.DUPLICATE
+        
+        pending = self._awaiting_callback.get(job_id)
+        if pending is None or pending[0] != meta_request_id:
+            return CallbackOutcome.STALE
+        
+        status = payload.get('status')
+        if status == 'running':
+            self.report_progress(job.task_id, job.user_id, payload.get('progress') or {})
+            return CallbackOutcome.ACCEPTED
+        
+        # Claim the attempt before any await so a concurrent duplicate is rejected
+        self.committed_callbacks.set(meta_request_id, True)
+        if status == 'completed':
+            await self._finish_callback(job, payload.get('results') or {}, None)
+        else:
+            await self._finish_callback(job, None, RuntimeError(payload.get('error') or f"Worker reported {status}"))
+        return CallbackOutcome.ACCEPTED
+    
+    async def _finish_callback(self, job: Job, results: Optional[Dict[str, Any]], error: Optional[Exception]):
+        """Complete or fail a submitted job and release its queue ownership"""
+        _, deadline, start = self._awaiting_callback.pop(job.id)
+        deadline.cancel()
+        
+        duration = time.perf_counter() - start
+        span = tracer.create_span(
+            "job.await_callback", parse_traceparent(job.trace_parent),
+            attributes={'job.id': job.id, 'job.attempt': job.retry_count},
+            start_ns=time.time_ns() - int(duration * 1e9)
+        )
+        if error is not None:
+            span.record_error(error)
+        span.end()
+        
+        await self._record_mcp_call(job, duration, error is None)
+        try:
+            if error is None:
+                await self._complete_job(job, results)
+            else:
+                await self._handle_job_failure(job, error)
         except Exception as e:
-            logger.error(f"Error processing job {job_id}: {str(e)}")
             await self._handle_job_failure(job, e)
+        finally:
+            # A retry has already been nacked
+            if job.status != JobStatus.QUEUED:
+                await self.job_queue.ack(job)
+    
+    def _job_payload(self, job: Job) -> Dict[str, Any]:
+        """Payload of the job's current attempt, as sent to and signed for the worker"""
+        payload = {
+            'task_id': job.task_id,
+            'user_id': job.user_id,
+            'input': job.task.input,
+            'required_capabilities': job.task.required_capabilities,
+            'timeout': job.timeout,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+        
+        if self._uses_callback(job):
+            # The worker replies 202 at once and reports back here
+            meta_request_id = self._meta_request_id(job)
+            payload.update({
+                'callback_url': f"{self._callback_base_url().rstrip('/')}/api/jobs/{job.id}/callback",
+                'meta_request_id': meta_request_id,
+                'callback_secret': self.auth_service.job_callback_secret(job.id, meta_request_id)
+            })
+        
+        # Workers continue the trace from the signed envelope
+        return tracer.inject(payload)
     
     async def _execute_job(self, job: Job) -> Any:
         """Execute a job on the appropriate MCP"""
         try:
-            # Prepare job payload
-            payload = {
-                'task_id': job.task_id,
-                'user_id': job.user_id,
-                'input': job.task.input,
-                'required_capabilities': job.task.required_capabilities,
-                'timeout': job.timeout,
-                'timestamp': datetime.utcnow().isoformat()
-            }
+            payload = self._job_payload(job)
             
-            # Sign the payload
-            signature = self.auth_service.sign_job_payload(payload, job.user_id)
-            payload['signature'] = signature
+            # Sign at dispatch, so the envelope's issue time and traceparent are this attempt's
+            with tracer.start_span("job.sign_payload"):
+                if self.envelope_signer is not None:
+                    payload['envelope_jwt'] = self.envelope_signer.sign(payload)
+                else:
+                    payload['signature'] = self.auth_service.sign_job_payload(payload, job.user_id)
             
             # Execute based on MCP type
             if job.mcp_url.startswith('hf://'):
@@ -132,16 +505,28 @@ class JobManager:
             # Get user's HF Space URL
             space_url = await self.hf_service.get_space_url(job.user_id, "vibe-worker")  # Assuming space name
             
+            # The worker template takes the job as a signed envelope at /mcp/exec
+            if 'envelope_jwt' in payload:
+                url, body = f"{space_url}/mcp/exec", {'envelope_jwt': payload['envelope_jwt']}
+            else:
+                url, body = f"{space_url}/execute", payload
+            
             # Send request to HF Space
-            async with httpx.AsyncClient() as client:
+            client = self.http_clients.get("mcp")
+            with tracer.start_span("mcp.request", kind="client", attributes={'http.url': url}) as span:
                 response = await client.post(
-                    f"{space_url}/execute",
-                    json=payload,
+                    url,
+                    json=body,
+                    headers=tracer.inject({}),
                     timeout=job.timeout
                 )
+                span.set_attribute('http.status_code', response.status_code)
                 response.raise_for_status()
-                
-                return await response.json()
+            
+            if response.status_code == 202 and 'callback_url' in payload:
+                return CALLBACK_PENDING
+            
+            return response.json()
                 
         except Exception as e:
             logger.error(f"Error executing on HF Space: {str(e)}")
@@ -151,15 +536,18 @@ class JobManager:
         """Execute job on Oracle-hosted MCP"""
         try:
             # Send request to MCP
-            async with httpx.AsyncClient() as client:
+            client = self.http_clients.get("mcp")
+            with tracer.start_span("mcp.request", kind="client", attributes={'http.url': f"{job.mcp_url}/execute"}) as span:
                 response = await client.post(
                     f"{job.mcp_url}/execute",
                     json=payload,
+                    headers=tracer.inject({}),
                     timeout=job.timeout
                 )
+                span.set_attribute('http.status_code', response.status_code)
                 response.raise_for_status()
-                
-                return await response.json()
+            
+            return response.json()
                 
         except Exception as e:
             logger.error(f"Error executing on Oracle MCP: {str(e)}")
@@ -167,34 +555,138 @@ class JobManager:
     
     async def _handle_job_failure(self, job: Job, error: Exception):
         """Handle job failure with retry logic"""
+        # A cancelled job is neither retried nor failed
+        if job.status == JobStatus.CANCELLED:
+            return
+        
         job.retry_count += 1
         job.error_message = str(error)
         job.last_error_at = datetime.utcnow()
         
-        if job.retry_count < job.max_retries:
-            # Retry with exponential backoff
+        if job.retry_count < job.max_retries and self._running:
+            # Retry with exponential backoff, without holding a worker slot
             delay = min(2 ** job.retry_count, 60)  # Max 60 seconds
-            await asyncio.sleep(delay)
             
-            # Reset job status and requeue
-            job.status = JobStatus.QUEUED
             job.started_at = None
-            await self.job_queue.put(job)
+            self.event_bus.publish(task_topic(job.task_id), 'retry', {
+                'job_id': job.id,
+                'attempt': job.retry_count,
+                'max_retries': job.max_retries,
+                'delay': delay,
+                'error': job.error_message
+            })
+            self._transition(job, JobStatus.QUEUED)
+            await self.job_queue.nack(job, delay)
             
         else:
             # Max retries reached
-            job.status = JobStatus.FAILED
             job.completed_at = datetime.utcnow()
+            self._transition(job, JobStatus.FAILED)
+            self._release_load(job)
+            await self._record_job(job)
             
             # Log failure
-            logger.error(f"Job {job.id} failed after {job.max_retries} retries")
+            logger.error(f"Job {job.id} failed after {job.retry_count} attempts: {job.error_message}")
+    
+    def _transition(self, job: Job, status: JobStatus):
+        """Move a job to a new state, mirrored on its task and persisted in the next batch"""
+        job.status = status
+        if job.task is not None:
+            job.task.status = task_status_for(status)
+        if status in TERMINAL_JOB_STATUSES:
+            self._retire(job)
+        self._record_state(job)
+        self._publish_status(job)
+    
+    def _track(self, job: Job):
+        self.active_jobs[job.id] = job
+        self._active_by_task[job.task_id] = job
+    
+    def _retire(self, job: Job):
+        """Stop tracking a finished job, keeping it readable for a while"""
+        self.active_jobs.pop(job.id, None)
+        if self._active_by_task.get(job.task_id) is job:
+            del self._active_by_task[job.task_id]
+        self.finished_jobs.set(job.task_id, job)
+    
+    def _publish_status(self, job: Job):
+        """Publish the job's state to its task's event stream"""
+        self.event_bus.publish(task_topic(job.task_id), 'status', {
+            'task_id': job.task_id,
+            'job_id': job.id,
+            'status': task_status_for(job.status).value,
+            'job_status': job.status.value,
+            'mcp_id': job.mcp_id,
+            'retry_count': job.retry_count,
+            'result_id': job.result_id,
+            'error': job.error_message
+        }, final=job.status in TERMINAL_JOB_STATUSES)
+    
+    def report_progress(self, task_id: str, user_id: str, progress: Dict[str, Any]) -> bool:
+        """Publish partial progress or results reported for a running task"""
+        job = self._active_by_task.get(task_id)
+        if job is None or job.user_id != user_id:
+            return False
+        
+        self.event_bus.publish(task_topic(task_id), 'progress', {
+            **progress,
+            'task_id': task_id,
+            'job_id': job.id
+        })
+        return True
+    
+    def _record_state(self, job: Job):
+        if self.job_repository is not None:
+            self.job_repository.record(job)
+    
+    def _acquire_load(self, job: Job):
+        """Count a job against its MCP until it reaches a terminal state"""
+        if job.id not in self._in_flight_jobs:
+            self._in_flight_jobs.add(job.id)
+            self.in_flight[job.mcp_id] = self.in_flight.get(job.mcp_id, 0) + 1
+    
+    def _release_load(self, job: Job):
+        if job.id in self._in_flight_jobs:
+            self._in_flight_jobs.discard(job.id)
+            remaining = self.in_flight.get(job.mcp_id, 1) - 1
+            if remaining > 0:
+                self.in_flight[job.mcp_id] = remaining
+            else:
+                self.in_flight.pop(job.mcp_id, None)
+    
+    def get_in_flight(self, mcp_id: str) -> int:
+        """Number of unfinished jobs assigned to an MCP"""
+        return self.in_flight.get(mcp_id, 0)
+    
+    async def _record_mcp_call(self, job: Job, duration: float, success: bool):
+        if self.metrics_collector is None:
+            return
+        
+        job_type = job.task.type.value if job.task else "unknown"
+        await self.metrics_collector.record_mcp_call(job.mcp_id, job_type, duration, success)
+    
+    async def _record_job(self, job: Job):
+        """Record a finished job's outcome and total duration"""
+        if self.metrics_collector is None:
+            return
+        
+        job_type = job.task.type.value if job.task else "unknown"
+        duration = (job.completed_at - job.created_at).total_seconds()
+        await self.metrics_collector.record_job(
+            job.id, job_type, job.status.value, duration, job.status == JobStatus.COMPLETED
+        )
     
     async def get_task(self, task_id: str, user_id: str) -> Optional[Task]:
         """Get task by ID"""
-        # Search through active jobs
-        for job in self.active_jobs.values():
-            if job.task_id == task_id and job.user_id == user_id:
-                return job.task
+        # Unfinished and recently finished jobs are held in memory
+        job = self._active_by_task.get(task_id) or self.finished_jobs.get(task_id)
+        if job is not None and job.user_id == user_id:
+            return job.task
+        
+        if self.task_repository is not None:
+            task = await self.task_repository.get(task_id, user_id)
+            if task:
+                return task
         
         # Check completed jobs in result manager
         return await self.result_manager.get_task(task_id, user_id)
@@ -204,34 +696,91 @@ class JobManager:
         user_id: str, 
         limit: int = 50, 
         offset: int = 0,
-        status: Optional[TaskStatus] = None
+        status: Optional[TaskStatus] = None,
+        after: Optional[Tuple[datetime, str]] = None
     ) -> List[Task]:
-        """List user's tasks"""
-        # Get active tasks
-        active_tasks = [
-            job.task for job in self.active_jobs.values()
-            if job.user_id == user_id and (status is None or job.task.status == status)
-        ]
+        """List user's tasks newest first, starting after the ``(created_at, id)`` key ``after``"""
+        if self.task_repository is not None:
+            # Make transitions still waiting in the write buffer visible first
+            if self.job_repository is not None and self.job_repository.pending:
+                await self.job_repository.flush()
+            return await self.task_repository.list_for_user(user_id, limit, offset, status, after)
         
         # Get completed tasks from result manager
-        completed_tasks = await self.result_manager.list_user_tasks(
-            user_id, limit, offset, status
-        )
+        tasks = {
+            task.id: task
+            for task in await self.result_manager.list_user_tasks(user_id, limit, offset, status, after)
+        }
         
-        # Combine and sort
-        all_tasks = active_tasks + completed_tasks
-        all_tasks.sort(key=lambda x: x.created_at, reverse=True)
+        # Active and recently finished tasks carry the current status
+        tasks.update(
+            (job.task.id, job.task)
+            for job in itertools.chain(self.active_jobs.values(), self.finished_jobs.values())
+            if job.user_id == user_id and (status is None or job.task.status == status)
+            and (after is None or (job.task.created_at, job.task.id) < after)
+        )
         
-        return all_tasks[:limit]
+        # Combine and keep the newest page without sorting everything
+        return heapq.nlargest(limit, tasks.values(), key=lambda task: (task.created_at, task.id))
     
     async def cancel_task(self, task_id: str, user_id: str) -> bool:
         """Cancel a running task"""
-        # Check active jobs
-        for job_id, job in self.active_jobs.items():
-            if job.task_id == task_id and job.user_id == user_id:
-                if job.status in [JobStatus.QUEUED, JobStatus.RUNNING]:
-                    job.status = JobStatus.CANCELLED
-                    job.completed_at = datetime.utcnow()
-                    return True
-        
-        return False
\ No newline at end of file
+        job = self._active_by_task.get(task_id)
+        if job is None or job.user_id != user_id:
+            return False
+        
+        await self._stop_job(job)
+        
+        # Drop it from the queue or its pending retry, or flag it for the
+        # replica that claimed it
+        await self.job_queue.cancel(job.id)
+        return True
+    
+    async def _cancel_owned_job(self, job_id: str):
+        """Stop a job this replica owns that was cancelled on another replica"""
+        job = self.active_jobs.get(job_id)
+        if job is None or job.status in TERMINAL_JOB_STATUSES:
+            return
+        logger.info(f"Job {job_id} cancelled by another replica")
+        await self._stop_job(job)
+    
+    async def _stop_job(self, job: Job):
+        job.completed_at = datetime.utcnow()
+        self._transition(job, JobStatus.CANCELLED)
+        self._release_load(job)
+        
+        # Stop a running attempt
+        attempt = self._attempts.get(job.id)
+        if attempt is not None:
+            attempt.cancel()
+        
+        # Stop waiting for a submitted job's callback
+        pending = self._awaiting_callback.pop(job.id, None)
+        if pending is not None:
+            pending[1].cancel()
+            await self.job_queue.ack(job)
+    
+    async def reprioritize_task(self, task_id: str, user_id: str, priority: int) -> bool:
+        """Change the priority of a queued task"""
+        job = self._active_by_task.get(task_id)
+        if job is None or job.user_id != user_id:
+            return False
+        
+        if job.task:
+            job.task.priority = priority
+        if await self.job_queue.set_priority(job.id, priority):
+            job.priority = priority
+            self._record_state(job)
+            return True
+        job.priority = priority
+        self._record_state(job)
+        return job.status == JobStatus.QUEUED
+    
+    async def get_task_queue_status(self) -> Dict[str, Any]:
+        """Queue depth, delivery statistics and local load"""
+        return {
+            **(await self.job_queue.stats()),
+            'running_jobs': self.running_jobs,
+            'max_concurrent_jobs': self.max_concurrent_jobs,
+            'in_flight_by_mcp': dict(self.in_flight)
+        }
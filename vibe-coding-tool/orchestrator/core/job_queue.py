@@ -0,0 +1,359 @@
+from typing import List, Optional, Dict, Any, Callable, Awaitable
+from abc import ABC, abstractmethod
+from collections import deque
+import asyncio
+import heapq
+import logging
+import time
+
+from models.job import Job
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+def _before(a: list, b: list) -> bool:
+    """Heap ordering on (effective enqueue time, insertion sequence)"""
+    return a[0] < b[0] or (a[0] == b[0] and a[1] < b[1])
+
+class JobQueue(ABC):
+    """
+    Queue interface used by the JobManager dispatcher.
+
+    Delivery is at-least-once: a dequeued job stays owned by this process
+    until it is acked (finished, successfully or terminally) or nacked (put
+    back, optionally after a delay). Backends that are shared between
+    replicas redeliver jobs whose owner never acked them.
+    """
+
+    # Whether other orchestrator replicas dequeue from the same queue
+    shared = False
+
+    @abstractmethod
+    async def enqueue(self, job: Job):
+        """Queue a job"""
+
+    async def enqueue_many(self, jobs: List[Job]):
+        """Queue several jobs"""
+        for job in jobs:
+            await self.enqueue(job)
+
+    @abstractmethod
+    async def dequeue(self) -> Job:
+        """Wait for the next job and take ownership of it"""
+
+    @abstractmethod
+    async def ack(self, job: Job):
+        """Mark an owned job as finished"""
+
+    @abstractmethod
+    async def nack(self, job: Job, delay: float = 0):
+        """Give an owned job back to the queue after ``delay`` seconds"""
+
+    @abstractmethod
+    async def discard(self, job_id: str) -> bool:
+        """Drop a queued or delayed job, returning whether it was found"""
+
+    async def cancel(self, job_id: str) -> bool:
+        """Drop a queued or delayed job, or have the replica that owns it stop it"""
+        return await self.discard(job_id)
+
+    def watch_cancellations(self, callback: Callable[[str], Awaitable[None]]):
+        """Await ``callback(job_id)`` when another replica cancels a job owned here"""
+
+    @abstractmethod
+    async def set_priority(self, job_id: str, priority: int) -> bool:
+        """Change the priority of a queued job"""
+
+    @abstractmethod
+    async def depth(self) -> int:
+        """Number of jobs ready to be dequeued"""
+
+    @abstractmethod
+    async def stats(self) -> Dict[str, Any]:
+        """Queue depth and delivery statistics"""
+
+    @abstractmethod
+    async def join(self):
+        """Wait until every job this process is responsible for is finished"""
+
+    async def close(self):
+        """Release resources held by the queue"""
+
+class JobPriorityQueue(JobQueue):
+    """
+    Async priority queue for jobs with starvation aging.
+
+    Jobs are ordered by an effective enqueue time of
+    ``enqueued_at - priority * aging_seconds``: each priority level is worth
+    ``aging_seconds`` of waiting, so a low priority job always overtakes newer
+    high priority work once it has waited long enough. The heap is indexed by
+    job id, which keeps push, pop, remove and reprioritize at O(log n).
+
+    Besides the ``JobQueue`` interface it mirrors ``asyncio.Queue``
+    (put/get/task_done/join). Retry delays are local timers, so delayed jobs
+    are lost if the process exits; this is the single-replica default.
+    """
+
+    def __init__(self, aging_seconds: float = 30.0):
+        self.aging_seconds = aging_seconds
+        self._heap: List[list] = []
+        self._positions: Dict[str, int] = {}
+        self._counter = 0
+        self._getters = deque()
+        self._unfinished_tasks = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
+        self._delayed: Dict[str, asyncio.TimerHandle] = {}
+
+    def qsize(self) -> int:
+        """Number of queued jobs"""
+        return len(self._heap)
+
+    def empty(self) -> bool:
+        """Whether the queue is empty"""
+        return not self._heap
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._positions
+
+    def put_nowait(self, job: Job):
+        """Queue a job; re-queuing a job already present replaces its entry"""
+        if job.id in self._positions:
+            self._remove_at(self._positions[job.id])
+        else:
+            self._unfinished_tasks += 1
+            self._finished.clear()
+
+        enqueued_at = time.monotonic()
+        self._counter += 1
+        entry = [self._sort_key(job.priority, enqueued_at), self._counter, enqueued_at, job]
+        self._heap.append(entry)
+        self._positions[job.id] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+        self._wakeup_next()
+
+    def put_many(self, jobs: List[Job]):
+        """Queue several jobs at once, re-heapifying when the batch dominates the heap"""
+        if len(jobs) <= len(self._heap):
+            for job in jobs:
+                self.put_nowait(job)
+            return
+
+        for job in jobs:
+            if job.id in self._positions:
+                self._remove_at(self._positions[job.id])
+            else:
+                self._unfinished_tasks += 1
+
+        enqueued_at = time.monotonic()
+        for job in jobs:
+            self._counter += 1
+            self._heap.append([self._sort_key(job.priority, enqueued_at), self._counter, enqueued_at, job])
+
+        heapq.heapify(self._heap)
+        self._positions = {entry[3].id: index for index, entry in enumerate(self._heap)}
+        if self._unfinished_tasks:
+            self._finished.clear()
+
+        for _ in range(len(jobs)):
+            if not self._getters:
+                break
+            self._wakeup_next()
+
+    async def put(self, job: Job):
+        """Queue a job (never blocks, the queue is unbounded)"""
+        self.put_nowait(job)
+
+    def get_nowait(self) -> Job:
+        """Pop the job with the lowest effective enqueue time"""
+        if not self._heap:
+            raise asyncio.QueueEmpty
+        return self._remove_at(0)
+
+    async def get(self) -> Job:
+        """Wait for and pop the next job"""
+        while not self._heap:
+            getter = asyncio.get_running_loop().create_future()
+            self._getters.append(getter)
+            try:
+                await getter
+            except BaseException:
+                getter.cancel()
+                try:
+                    self._getters.remove(getter)
+                except ValueError:
+                    pass
+                if self._heap and not getter.cancelled():
+                    self._wakeup_next()
+                raise
+        return self.get_nowait()
+
+    def remove(self, job_id: str) -> Optional[Job]:
+        """Remove a queued job, returning it if it was queued"""
+        index = self._positions.get(job_id)
+        if index is None:
+            return None
+
+        job = self._remove_at(index)
+        self.task_done()
+        return job
+
+    def reprioritize(self, job_id: str, priority: int) -> bool:
+        """Change the priority of a queued job, keeping its original enqueue time"""
+        index = self._positions.get(job_id)
+        if index is None:
+            return False
+
+        entry = self._heap[index]
+        job = entry[3]
+        job.priority = priority
+        old_key = entry[0]
+        entry[0] = self._sort_key(priority, entry[2])
+
+        if entry[0] < old_key:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+        return True
+
+    def task_done(self):
+        """Mark a previously dequeued job as processed"""
+        if self._unfinished_tasks <= 0:
+            raise ValueError('task_done() called too many times')
+        self._unfinished_tasks -= 1
+        if self._unfinished_tasks == 0:
+            self._finished.set()
+
+    async def join(self):
+        """Block until every queued job has been processed"""
+        if self._unfinished_tasks > 0:
+            await self._finished.wait()
+
+    async def enqueue(self, job: Job):
+        self.put_nowait(job)
+
+    async def enqueue_many(self, jobs: List[Job]):
+        self.put_many(jobs)
+
+    async def dequeue(self) -> Job:
+        return await self.get()
+
+    async def ack(self, job: Job):
+        self.task_done()
+
+    async def nack(self, job: Job, delay: float = 0):
+        if delay > 0:
+            self._delayed[job.id] = asyncio.get_running_loop().call_later(delay, self._put_delayed, job)
+        else:
+            self.put_nowait(job)
+        self.task_done()
+
+    async def discard(self, job_id: str) -> bool:
+        handle = self._delayed.pop(job_id, None)
+        if handle:
+            handle.cancel()
+        return self.remove(job_id) is not None or handle is not None
+
+    async def set_priority(self, job_id: str, priority: int) -> bool:
+        return self.reprioritize(job_id, priority)
+
+    async def depth(self) -> int:
+        return self.qsize()
+
+    async def stats(self) -> Dict[str, Any]:
+        return {**self.snapshot(), 'delayed': len(self._delayed), 'backend': 'memory'}
+
+    async def close(self):
+        # Pending retries will never fire once the loop shuts down
+        for handle in self._delayed.values():
+            handle.cancel()
+        self._delayed.clear()
+
+    def _put_delayed(self, job: Job):
+        self._delayed.pop(job.id, None)
+        self.put_nowait(job)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Queue depth per priority class"""
+        depth: Dict[int, int] = {}
+        for entry in self._heap:
+            priority = entry[3].priority
+            depth[priority] = depth.get(priority, 0) + 1
+
+        return {
+            'queued': len(self._heap),
+            'unfinished': self._unfinished_tasks,
+            'by_priority': depth
+        }
+
+    def _sort_key(self, priority: int, enqueued_at: float) -> float:
+        return enqueued_at - priority * self.aging_seconds
+
+    def _wakeup_next(self):
+        while self._getters:
+            getter = self._getters.popleft()
+            if not getter.done():
+                getter.set_result(None)
+                break
+
+    def _remove_at(self, index: int) -> Job:
+        entry = self._heap[index]
+        last = self._heap.pop()
+        del self._positions[entry[3].id]
+
+        if index < len(self._heap):
+            self._heap[index] = last
+            self._positions[last[3].id] = index
+            if _before(last, entry):
+                self._sift_up(index)
+            else:
+                self._sift_down(index)
+
+        return entry[3]
+
+    def _swap(self, i: int, j: int):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._positions[heap[i][3].id] = i
+        self._positions[heap[j][3].id] = j
+
+    def _sift_up(self, index: int):
+        heap = self._heap
+        while index > 0:
+            parent = (index - 1) >> 1
+            if _before(heap[index], heap[parent]):
+                self._swap(index, parent)
+                index = parent
+            else:
+                break
+
+    def _sift_down(self, index: int):
+        heap = self._heap
+        size = len(heap)
+        while True:
+            smallest = index
+            left = 2 * index + 1
+            right = left + 1
+            if left < size and _before(heap[left], heap[smallest]):
+                smallest = left
+            if right < size and _before(heap[right], heap[smallest]):
+                smallest = right
+            if smallest == index:
+                break
+            self._swap(index, smallest)
+            index = smallest
+
+def create_job_queue() -> JobQueue:
+    """Build the job queue backend selected by ``settings.job_queue_backend``"""
+    if settings.job_queue_backend == "redis":
+        import redis.asyncio as redis
+        from core.redis_job_queue import RedisJobQueue
+
+        client = redis.Redis.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_max_connections
+        )
+        return RedisJobQueue(client, owns_client=True)
+
+    return JobPriorityQueue(aging_seconds=settings.job_priority_aging_seconds)
@@ -0,0 +1,366 @@
+from typing import List, Optional, Dict, Any, Callable, Awaitable
+import asyncio
+import logging
+import socket
+import time
+import uuid
+
+from models.job import Job
+from core.job_queue import JobQueue
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# All scripts take KEYS = ready, inflight, delayed, jobs, scores, owners, deliveries, cancelled
+
+# Move due delayed jobs and expired in-flight jobs back to ready, dropping
+# those cancelled while their owner held them, then claim the job with the
+# lowest score.
+# ARGV: now, visibility deadline, consumer
+DEQUEUE_SCRIPT = """
+local now = tonumber(ARGV[1])
+for _, key in ipairs({KEYS[3], KEYS[2]}) do
+    local due = redis.call('ZRANGEBYSCORE', key, '-inf', now)
+    for _, job_id in ipairs(due) do
+        redis.call('ZREM', key, job_id)
+        redis.call('HDEL', KEYS[6], job_id)
+        local score = redis.call('HGET', KEYS[5], job_id)
+        if redis.call('HDEL', KEYS[8], job_id) == 1 then
+            redis.call('HDEL', KEYS[4], job_id)
+            redis.call('HDEL', KEYS[5], job_id)
+            redis.call('HDEL', KEYS[7], job_id)
+        elseif score then
+            redis.call('ZADD', KEYS[1], score, job_id)
+        end
+    end
+end
+
+local head = redis.call('ZRANGE', KEYS[1], 0, 0)
+if #head == 0 then
+    return false
+end
+
+local job_id = head[1]
+redis.call('ZREM', KEYS[1], job_id)
+redis.call('ZADD', KEYS[2], ARGV[2], job_id)
+redis.call('HSET', KEYS[6], job_id, ARGV[3])
+local deliveries = redis.call('HINCRBY', KEYS[7], job_id, 1)
+return {job_id, redis.call('HGET', KEYS[4], job_id), deliveries}
+"""
+
+# Finish a job, but only if this consumer still owns it: a job redelivered
+# after its visibility timeout belongs to the new consumer.
+# ARGV: job_id, consumer
+ACK_SCRIPT = """
+if redis.call('HGET', KEYS[6], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[6], ARGV[1])
+redis.call('HDEL', KEYS[4], ARGV[1])
+redis.call('HDEL', KEYS[5], ARGV[1])
+redis.call('HDEL', KEYS[7], ARGV[1])
+redis.call('HDEL', KEYS[8], ARGV[1])
+return 1
+"""
+
+# Give an owned job back, immediately or after a delay. A job cancelled
+# while it was owned is dropped instead.
+# ARGV: job_id, consumer, payload, ready at (0 = now)
+NACK_SCRIPT = """
+if redis.call('HGET', KEYS[6], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[6], ARGV[1])
+if redis.call('HDEL', KEYS[8], ARGV[1]) == 1 then
+    redis.call('HDEL', KEYS[4], ARGV[1])
+    redis.call('HDEL', KEYS[5], ARGV[1])
+    redis.call('HDEL', KEYS[7], ARGV[1])
+    return 1
+end
+redis.call('HSET', KEYS[4], ARGV[1], ARGV[3])
+if tonumber(ARGV[4]) > 0 then
+    redis.call('ZADD', KEYS[3], ARGV[4], ARGV[1])
+else
+    redis.call('ZADD', KEYS[1], redis.call('HGET', KEYS[5], ARGV[1]), ARGV[1])
+end
+return 1
+"""
+
+# Push back the visibility deadline of the listed jobs this consumer still owns.
+# ARGV: deadline, consumer, job_id...
+EXTEND_SCRIPT = """
+local extended = 0
+for i = 3, #ARGV do
+    if redis.call('HGET', KEYS[6], ARGV[i]) == ARGV[2] then
+        redis.call('ZADD', KEYS[2], 'XX', ARGV[1], ARGV[i])
+        extended = extended + 1
+    end
+end
+return extended
+"""
+
+# Drop a job that is not currently owned by any consumer.
+# ARGV: job_id
+DISCARD_SCRIPT = """
+local removed = redis.call('ZREM', KEYS[1], ARGV[1]) + redis.call('ZREM', KEYS[3], ARGV[1])
+if removed == 0 then
+    return 0
+end
+redis.call('HDEL', KEYS[4], ARGV[1])
+redis.call('HDEL', KEYS[5], ARGV[1])
+redis.call('HDEL', KEYS[7], ARGV[1])
+return 1
+"""
+
+# Drop a waiting job, or flag an owned one as cancelled for its owner to stop.
+# ARGV: job_id, cancelled at
+CANCEL_SCRIPT = """
+local removed = redis.call('ZREM', KEYS[1], ARGV[1]) + redis.call('ZREM', KEYS[3], ARGV[1])
+if removed > 0 then
+    redis.call('HDEL', KEYS[4], ARGV[1])
+    redis.call('HDEL', KEYS[5], ARGV[1])
+    redis.call('HDEL', KEYS[7], ARGV[1])
+    return 1
+end
+if redis.call('HEXISTS', KEYS[6], ARGV[1]) == 1 then
+    redis.call('HSET', KEYS[8], ARGV[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# Re-score a waiting job, keeping its original enqueue time.
+# ARGV: job_id, score, payload
+SET_PRIORITY_SCRIPT = """
+if redis.call('HEXISTS', KEYS[4], ARGV[1]) == 0 or redis.call('HEXISTS', KEYS[6], ARGV[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[5], ARGV[1], ARGV[2])
+redis.call('HSET', KEYS[4], ARGV[1], ARGV[3])
+redis.call('ZADD', KEYS[1], 'XX', ARGV[2], ARGV[1])
+return 1
+"""
+
+class RedisJobQueue(JobQueue):
+    """
+    Job queue shared between orchestrator replicas through Redis.
+
+    Layout under ``{name}:``
+    - ``ready``: sorted set of waiting job ids, scored like the in-memory
+      queue (``enqueued_at - priority * aging_seconds``) so priority aging
+      behaves the same
+    - ``inflight``: sorted set of claimed job ids scored by visibility deadline
+    - ``delayed``: sorted set of nacked job ids scored by retry time
+    - ``jobs``/``scores``/``owners``/``deliveries``: hashes of payload, ready
+      score, owning consumer and delivery count per job
+
+    Every state change is a single Lua script, so a job is owned by at most
+    one consumer at a time. Each replica is one consumer of the shared group.
+    A job not acked within ``visibility_timeout`` is returned to ``ready`` and
+    redelivered to whichever replica dequeues next (at-least-once delivery).
+    While a replica is alive it renews the visibility deadline of every job
+    it owns every third of ``visibility_timeout``, so a job may run (or wait
+    for its worker callback) longer than the timeout without being delivered
+    twice; the timeout only bounds how long a crashed replica's jobs wait.
+
+    Cancelling a job another replica owns flags it in ``cancelled``. The owner
+    sees the flag when it next renews its leases and stops the job; a flagged
+    job is dropped instead of being nacked or redelivered.
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        client,
+        name: str = None,
+        consumer: str = None,
+        visibility_timeout: float = None,
+        aging_seconds: float = None,
+        poll_interval: float = None,
+        owns_client: bool = False
+    ):
+        self.client = client
+        self.name = name or settings.job_queue_name
+        self.consumer = consumer or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.visibility_timeout = visibility_timeout if visibility_timeout is not None else settings.job_visibility_timeout
+        self.aging_seconds = aging_seconds if aging_seconds is not None else settings.job_priority_aging_seconds
+        self.poll_interval = poll_interval if poll_interval is not None else settings.job_queue_poll_interval
+        self.owns_client = owns_client
+
+        self.keys = [
+            f"{self.name}:{key}"
+            for key in ("ready", "inflight", "delayed", "jobs", "scores", "owners", "deliveries", "cancelled")
+        ]
+        self._dequeue = client.register_script(DEQUEUE_SCRIPT)
+        self._ack = client.register_script(ACK_SCRIPT)
+        self._nack = client.register_script(NACK_SCRIPT)
+        self._discard = client.register_script(DISCARD_SCRIPT)
+        self._cancel = client.register_script(CANCEL_SCRIPT)
+        self._set_priority = client.register_script(SET_PRIORITY_SCRIPT)
+        self._extend = client.register_script(EXTEND_SCRIPT)
+
+        # Jobs claimed by this replica and not yet acked or nacked
+        self._owned: Dict[str, Job] = {}
+        self._idle = asyncio.Event()
+        self._idle.set()
+        # Wakes local consumers as soon as this replica enqueues
+        self._wakeup = asyncio.Event()
+        self._renewer: Optional[asyncio.Task] = None
+        self._on_cancel: Optional[Callable[[str], Awaitable[None]]] = None
+        self.delivered = 0
+        self.redelivered = 0
+
+    async def enqueue(self, job: Job):
+        await self.enqueue_many([job])
+
+    async def enqueue_many(self, jobs: List[Job]):
+        if not jobs:
+            return
+
+        now = time.time()
+        ready, _, _, jobs_key, scores_key, *_ = self.keys
+        pipe = self.client.pipeline(transaction=True)
+        for job in jobs:
+            score = now - job.priority * self.aging_seconds
+            pipe.hset(jobs_key, job.id, job.model_dump_json())
+            pipe.hset(scores_key, job.id, score)
+            pipe.zadd(ready, {job.id: score})
+        await pipe.execute()
+        self._wakeup.set()
+
+    async def dequeue(self) -> Job:
+        delay = self.poll_interval / 8
+        while True:
+            job = await self.try_dequeue()
+            if job is not None:
+                return job
+
+            # Back off while idle, but wake immediately on local enqueues
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                delay = self.poll_interval / 8
+            except asyncio.TimeoutError:
+                delay = min(delay * 2, self.poll_interval)
+
+    async def try_dequeue(self) -> Optional[Job]:
+        """Claim the next ready job without waiting"""
+        now = time.time()
+        claimed = await self._dequeue(
+            keys=self.keys,
+            args=[now, now + self.visibility_timeout, self.consumer]
+        )
+        if not claimed:
+            return None
+
+        job_id, payload, deliveries = claimed
+        job = Job.model_validate_json(payload)
+        self._owned[job.id] = job
+        self._idle.clear()
+        if self._renewer is None:
+            self._renewer = asyncio.create_task(self._renew_loop(), name=f"{self.name}-lease-renewer")
+        self.delivered += 1
+        if int(deliveries) > 1:
+            self.redelivered += 1
+            logger.info(f"Job {job.id} redelivered (delivery {int(deliveries)})")
+        return job
+
+    async def ack(self, job: Job):
+        if not await self._ack(keys=self.keys, args=[job.id, self.consumer]):
+            logger.warning(f"Job {job.id} was acked after its visibility timeout expired")
+        self._release(job.id)
+
+    async def nack(self, job: Job, delay: float = 0):
+        ready_at = time.time() + delay if delay > 0 else 0
+        await self._nack(keys=self.keys, args=[job.id, self.consumer, job.model_dump_json(), ready_at])
+        self._release(job.id)
+
+    async def discard(self, job_id: str) -> bool:
+        return bool(await self._discard(keys=self.keys, args=[job_id]))
+
+    async def cancel(self, job_id: str) -> bool:
+        return bool(await self._cancel(keys=self.keys, args=[job_id, time.time()]))
+
+    def watch_cancellations(self, callback: Callable[[str], Awaitable[None]]):
+        self._on_cancel = callback
+
+    async def set_priority(self, job_id: str, priority: int) -> bool:
+        jobs_key = self.keys[3]
+        payload = await self.client.hget(jobs_key, job_id)
+        if payload is None:
+            return False
+
+        job = Job.model_validate_json(payload)
+        enqueued_at = float(await self.client.hget(self.keys[4], job_id)) + job.priority * self.aging_seconds
+        job.priority = priority
+        score = enqueued_at - priority * self.aging_seconds
+        return bool(await self._set_priority(keys=self.keys, args=[job_id, score, job.model_dump_json()]))
+
+    async def extend(self, job: Job, visibility_timeout: float = None) -> bool:
+        """Push back an owned job's visibility deadline, returning whether this replica still owns it"""
+        timeout = visibility_timeout or self.visibility_timeout
+        return bool(await self._extend(keys=self.keys, args=[time.time() + timeout, self.consumer, job.id]))
+
+    async def depth(self) -> int:
+        return await self.client.zcard(self.keys[0])
+
+    async def stats(self) -> Dict[str, Any]:
+        pipe = self.client.pipeline(transaction=False)
+        for key in self.keys[:3]:
+            pipe.zcard(key)
+        queued, in_flight, delayed = await pipe.execute()
+        return {
+            'backend': 'redis',
+            'queued': queued,
+            'in_flight': in_flight,
+            'delayed': delayed,
+            'owned_by_this_replica': len(self._owned),
+            'delivered': self.delivered,
+            'redelivered': self.redelivered
+        }
+
+    async def join(self):
+        # Other replicas drain the shared queue; only wait for our own jobs
+        await self._idle.wait()
+
+    async def close(self):
+        if self._renewer is not None:
+            self._renewer.cancel()
+            await asyncio.gather(self._renewer, return_exceptions=True)
+            self._renewer = None
+        if self.owns_client:
+            await self.client.aclose()
+
+    async def _renew_loop(self):
+        """Keep renewing the visibility deadline of owned jobs while this replica
+        runs, and stop those another replica has cancelled"""
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            if not self._owned:
+                continue
+            owned = list(self._owned)
+            try:
+                await self._extend(
+                    keys=self.keys,
+                    args=[time.time() + self.visibility_timeout, self.consumer, *owned]
+                )
+                cancelled = await self.client.hmget(self.keys[7], owned)
+            except Exception as e:
+                logger.warning(f"Failed to renew job visibility: {str(e)}")
+                continue
+
+            for job_id, flag in zip(owned, cancelled):
+                if flag is None or self._on_cancel is None:
+                    continue
+                try:
+                    await self._on_cancel(job_id)
+                except Exception as e:
+                    logger.warning(f"Failed to stop cancelled job {job_id}: {str(e)}")
+
+    def _release(self, job_id: str):
+        self._owned.pop(job_id, None)
+        if not self._owned:
+            self._idle.set()
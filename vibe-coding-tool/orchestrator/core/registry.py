@@ -1,41 +1,109 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, Tuple
 from datetime import datetime, timedelta
+from enum import Enum
 import logging
 import json
 import asyncio
+import bisect
 import httpx
+from urllib.parse import urlsplit
 
 from models.mcp import MCPInfo, MCPStatus, Capability, RoutingFlags
 from core.auth_service import AuthService
+from core.health_monitor import MCPHealthMonitor
 from services.github_service import GitHubService
 from services.hf_service import HuggingFaceService
+from utils.http_client import HTTPClientRegistry, http_clients as default_http_clients
+from utils.rate_limiter import RateLimiter
+from utils.cache import BoundedCache
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Sort rank for routing: healthier MCPs first
+STATUS_RANK = {
+    MCPStatus.HEALTHY: 0,
+    MCPStatus.WARNING: 1,
+    MCPStatus.UNKNOWN: 2,
+    MCPStatus.UNHEALTHY: 3
+}
+
+ROUTING_FLAGS = tuple(RoutingFlags.model_fields.keys())
+
+def _task_type_key(task_type: Any) -> str:
+    """Normalize TaskType enums and plain strings to one index key"""
+    return task_type.value if isinstance(task_type, Enum) else str(task_type)
+
+def _space_mcp_id(space: Dict[str, Any]) -> str:
+    """ID of the MCP discovered in a user's HF Space"""
+    return f"{space['owner']}-{space['name']}"
+
 class MCPRegistry:
     def __init__(
         self,
         auth_service: AuthService,
         github_service: GitHubService,
-        hf_service: HuggingFaceService
+        hf_service: HuggingFaceService,
+        http_clients: Optional[HTTPClientRegistry] = None
     ):
         self.auth_service = auth_service
         self.github_service = github_service
         self.hf_service = hf_service
+        self.http_clients = http_clients or default_http_clients
         self.registry = {}
-        self.health_cache = {}
-        self.health_cache_ttl = timedelta(minutes=5)
+        
+        # Inverted indexes, maintained incrementally on every registry change
+        self.task_type_index: Dict[str, Set[str]] = {}
+        self.capability_index: Dict[str, Dict[str, Set[str]]] = {}
+        self.routing_flag_index: Dict[Tuple[str, bool], Set[str]] = {
+            (flag, value): set() for flag in ROUTING_FLAGS for value in (True, False)
+        }
+        self.status_index: Dict[MCPStatus, Set[str]] = {status: set() for status in MCPStatus}
+        self._indexed_keys: Dict[str, Tuple[Set[str], Set[Tuple[str, str]], Set[Tuple[str, bool]]]] = {}
+        # Registration order as sorted (registered_at, id) keys, for keyset listing
+        self.registered_at: Dict[str, datetime] = {}
+        self._listing_keys: List[Tuple[datetime, str]] = []
+        # Bumped on every registration change so callers can drop derived caches
+        self.revision = 0
+        
+        self.health_cache = BoundedCache(
+            name="mcp_health",
+            max_entries=settings.health_cache_max_entries,
+            default_ttl=settings.health_cache_ttl
+        )
+        self.health_monitor = MCPHealthMonitor(self, self._perform_health_check)
+        
+        # User MCP discovery state
+        self.discovery_concurrency = settings.mcp_discovery_concurrency
+        self.discovery_interval = settings.mcp_discovery_interval
+        self.host_rate_limiter = RateLimiter(
+            max_requests=settings.mcp_discovery_host_rate,
+            window_seconds=1
+        )
+        self.manifest_cache: Dict[str, Dict[str, Any]] = {}
+        self.user_mcp_ids: Dict[str, Set[str]] = {}
+        self.discovery_progress: Dict[str, Any] = {
+            'running': False,
+            'users_total': 0,
+            'users_done': 0,
+            'spaces_probed': 0,
+            'manifests_not_modified': 0,
+            'mcps_found': 0,
+            'errors': 0,
+            'started_at': None,
+            'finished_at': None
+        }
+        self._discovery_task: Optional[asyncio.Task] = None
+        self._discovery_slots: Optional[asyncio.Semaphore] = None
+        
         self.load_registry()
     
     def load_registry(self):
         """Load MCP registry from configuration"""
         try:
-            # Load built-in MCPs
+            # Load built-in MCPs; user MCPs are discovered in the background
             self._load_builtin_mcps()
             
-            # Load user MCPs
-            asyncio.create_task(self._load_user_mcps())
-            
         except Exception as e:
             logger.error(f"Error loading registry: {str(e)}")
     
@@ -110,44 +178,195 @@ class MCPRegistry:
         ]
         
         for mcp in builtin_mcps:
-            self.registry[mcp.id] = mcp
+            self._store_mcp(mcp)
+    
+    @property
+    def mcps(self) -> Dict[str, MCPInfo]:
+        """All registered MCPs by ID"""
+        return self.registry
+    
+    def _store_mcp(self, mcp: MCPInfo):
+        """Insert or replace an MCP and update the indexes"""
+        if mcp.id in self.registry:
+            self._unindex_mcp(mcp.id)
+        else:
+            registered_at = datetime.utcnow()
+            self.registered_at[mcp.id] = registered_at
+            bisect.insort(self._listing_keys, (registered_at, mcp.id))
+        
+        self.registry[mcp.id] = mcp
+        self._index_mcp(mcp)
+        self.revision += 1
+    
+    def _index_mcp(self, mcp: MCPInfo):
+        """Add an MCP to every index"""
+        # Remember the keys used so unindexing stays correct even if the
+        # MCPInfo object is later mutated in place
+        task_types = {_task_type_key(task_type) for task_type in mcp.supported_task_types}
+        capabilities = {(cap.name, cap.version) for cap in mcp.capabilities}
+        flags = {(flag, bool(getattr(mcp.routing_flags, flag))) for flag in ROUTING_FLAGS}
+        self._indexed_keys[mcp.id] = (task_types, capabilities, flags)
+        
+        for task_type in task_types:
+            self.task_type_index.setdefault(task_type, set()).add(mcp.id)
+        
+        for name, version in capabilities:
+            versions = self.capability_index.setdefault(name, {})
+            versions.setdefault(version, set()).add(mcp.id)
+        
+        for key in flags:
+            self.routing_flag_index[key].add(mcp.id)
+        
+        self.status_index[mcp.status].add(mcp.id)
+    
+    def _unindex_mcp(self, mcp_id: str):
+        """Remove an MCP from every index, dropping empty buckets"""
+        task_types, capabilities, flags = self._indexed_keys.pop(mcp_id, (set(), set(), set()))
+        
+        for task_type in task_types:
+            bucket = self.task_type_index.get(task_type)
+            if bucket is not None:
+                bucket.discard(mcp_id)
+                if not bucket:
+                    del self.task_type_index[task_type]
+        
+        for name, version in capabilities:
+            versions = self.capability_index.get(name)
+            if versions is None:
+                continue
+            bucket = versions.get(version)
+            if bucket is not None:
+                bucket.discard(mcp_id)
+                if not bucket:
+                    del versions[version]
+            if not versions:
+                del self.capability_index[name]
+        
+        for key in flags:
+            self.routing_flag_index[key].discard(mcp_id)
+        
+        for bucket in self.status_index.values():
+            bucket.discard(mcp_id)
+    
+    async def register_mcp(self, mcp: MCPInfo) -> bool:
+        """Register or replace an MCP"""
+        try:
+            self._store_mcp(mcp)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error registering MCP {mcp.id}: {str(e)}")
+            return False
+    
+    async def unregister_mcp(self, mcp_id: str) -> bool:
+        """Remove an MCP from the registry"""
+        if self.registry.pop(mcp_id, None) is None:
+            return False
+        
+        self._unindex_mcp(mcp_id)
+        key = (self.registered_at.pop(mcp_id), mcp_id)
+        del self._listing_keys[bisect.bisect_left(self._listing_keys, key)]
+        self.health_cache.pop(mcp_id, None)
+        self.health_monitor.forget(mcp_id)
+        self.revision += 1
+        return True
+    
+    def start_discovery(self):
+        """Start the background user MCP discovery refresher"""
+        if self._discovery_task is None or self._discovery_task.done():
+            self._discovery_task = asyncio.create_task(self._discovery_loop(), name="mcp-discovery")
+    
+    async def stop_discovery(self):
+        """Stop the background user MCP discovery refresher"""
+        if self._discovery_task is None:
+            return
+        
+        self._discovery_task.cancel()
+        try:
+            await self._discovery_task
+        except asyncio.CancelledError:
+            pass
+        self._discovery_task = None
+    
+    async def _discovery_loop(self):
+        """Refresh user MCPs every discovery_interval seconds"""
+        while True:
+            await self._load_user_mcps()
+            await asyncio.sleep(self.discovery_interval)
     
     async def _load_user_mcps(self):
         """Load user-owned MCPs from HF Spaces"""
+        progress = self.discovery_progress
         try:
             # Get all users
             users = await self.auth_service.get_all_users()
             
-            for user in users:
-                # Discover user's MCPs
-                user_mcps = await self.discover_user_mcps(user.id)
-                
-                for mcp in user_mcps:
-                    self.registry[mcp.id] = mcp
+            progress.update({
+                'running': True,
+                'users_total': len(users),
+                'users_done': 0,
+                'spaces_probed': 0,
+                'manifests_not_modified': 0,
+                'mcps_found': 0,
+                'errors': 0,
+                'started_at': datetime.utcnow().isoformat(),
+                'finished_at': None
+            })
+            
+            # Discover all users' MCPs concurrently; the semaphore bounds
+            # the number of outbound requests across all users
+            self._discovery_slots = asyncio.Semaphore(self.discovery_concurrency)
+            await asyncio.gather(*(self._refresh_user_mcps(user.id) for user in users))
                     
         except Exception as e:
             logger.error(f"Error loading user MCPs: {str(e)}")
+        finally:
+            progress['running'] = False
+            progress['finished_at'] = datetime.utcnow().isoformat()
+    
+    async def _refresh_user_mcps(self, user_id: str):
+        """Replace a user's registered MCPs with a fresh discovery result"""
+        previous_ids = self.user_mcp_ids.get(user_id, set())
+        try:
+            user_mcps, unreachable_ids = await self._discover_user_mcps(user_id)
+        except Exception as e:
+            # The Spaces could not be listed: keep what the user had
+            logger.error(f"Error discovering MCPs of user {user_id}, keeping {len(previous_ids)} registered: {str(e)}")
+            self.discovery_progress['errors'] += 1
+            user_mcps, unreachable_ids = [], previous_ids
+        
+        found_ids = set()
+        for mcp in user_mcps:
+            self._store_mcp(mcp)
+            found_ids.add(mcp.id)
+        
+        # Drop MCPs whose Space is gone or no longer exposes a manifest; keep
+        # the ones whose Space could not be probed this round
+        kept_ids = previous_ids & unreachable_ids
+        for mcp_id in previous_ids - found_ids - kept_ids:
+            await self.unregister_mcp(mcp_id)
+        self.user_mcp_ids[user_id] = found_ids | kept_ids
+        
+        self.discovery_progress['users_done'] += 1
+        self.discovery_progress['mcps_found'] += len(found_ids)
     
-    async def get_mcps_for_task(self, task_type: str, user_id: str) -> List[MCPInfo]:
+    async def get_mcps_for_task(self, task_type: str, user_id: Optional[str] = None) -> List[MCPInfo]:
         """Get MCPs that can handle a specific task type"""
         try:
-            # Get all MCPs for this task type
-            suitable_mcps = [
-                mcp for mcp in self.registry.values()
-                if task_type in mcp.supported_task_types
-            ]
+            # Look up MCPs for this task type in the index
+            mcp_ids = self.task_type_index.get(_task_type_key(task_type), ())
             
             # Filter by user permissions
-            user_mcps = []
-            for mcp in suitable_mcps:
-                if await self._user_can_access_mcp(user_id, mcp):
-                    user_mcps.append(mcp)
+            user_mcps = [
+                self.registry[mcp_id] for mcp_id in mcp_ids
+                if self._user_can_access_mcp(user_id, self.registry[mcp_id])
+            ]
             
             # Sort by health and priority
             user_mcps.sort(key=lambda x: (
-                x.status.value,  # Healthier first
+                STATUS_RANK[x.status],  # Healthier first
                 -x.routing_flags.can_run_on_user_space,  # Prefer user space for heavy tasks
-                x.last_health_check.timestamp()  # Recently checked first
+                x.last_health_check.timestamp() if x.last_health_check else 0  # Recently checked first
             ))
             
             return user_mcps
@@ -156,54 +375,148 @@ class MCPRegistry:
             logger.error(f"Error getting MCPs for task: {str(e)}")
             return []
     
+    def get_mcp_ids_by_capability(self, capability: Capability) -> Set[str]:
+        """Get IDs of MCPs providing a capability at or above the required version"""
+        versions = self.capability_index.get(capability.name, {})
+        
+        mcp_ids = set()
+        for version, ids in versions.items():
+            if capability.version <= version:
+                mcp_ids.update(ids)
+        
+        if not capability.parameters:
+            return mcp_ids
+        
+        # Parameter sets are not indexed; check them on the (small) match set
+        return {
+            mcp_id for mcp_id in mcp_ids
+            if any(
+                cap.name == capability.name and capability.parameters.issubset(cap.parameters)
+                for cap in self.registry[mcp_id].capabilities
+            )
+        }
+    
+    async def get_mcps_by_capability(self, capability: Capability) -> List[MCPInfo]:
+        """Get MCPs providing a capability"""
+        return [self.registry[mcp_id] for mcp_id in self.get_mcp_ids_by_capability(capability)]
+    
+    def get_mcp_ids_by_flag(self, flag: str, value: bool = True) -> Set[str]:
+        """Get IDs of MCPs whose routing flag has the given value"""
+        return self.routing_flag_index.get((flag, value), set())
+    
+    async def get_user_space_mcps(self) -> List[MCPInfo]:
+        """Get MCPs that can run on a user's HF Space"""
+        return [self.registry[mcp_id] for mcp_id in self.get_mcp_ids_by_flag('can_run_on_user_space', True)]
+    
+    async def get_oracle_mcps(self) -> List[MCPInfo]:
+        """Get MCPs that only run on Oracle"""
+        return [self.registry[mcp_id] for mcp_id in self.get_mcp_ids_by_flag('can_run_on_user_space', False)]
+    
     async def discover_user_mcps(self, user_id: str) -> List[MCPInfo]:
         """Discover MCPs in user's HF Space"""
         try:
-            # Get user's HF Spaces
-            spaces = await self.hf_service.get_user_spaces(user_id)
-            
-            user_mcps = []
-            for space in spaces:
-                # Check if space contains MCP
-                mcp_info = await self._check_space_for_mcp(space)
-                if mcp_info:
-                    user_mcps.append(mcp_info)
-            
+            user_mcps, _ = await self._discover_user_mcps(user_id)
             return user_mcps
             
         except Exception as e:
             logger.error(f"Error discovering user MCPs: {str(e)}")
+            self.discovery_progress['errors'] += 1
             return []
     
-    async def _check_space_for_mcp(self, space: Dict[str, Any]) -> Optional[MCPInfo]:
-        """Check if HF Space contains an MCP"""
-        try:
-            # Check for MCP manifest
-            manifest_url = f"{space['url']}/mcp.json"
-            async with httpx.AsyncClient() as client:
-                response = await client.get(manifest_url)
-                if response.status_code == 200:
-                    manifest = response.json()
-                    
-                    # Create MCP info
-                    mcp_info = MCPInfo(
-                        id=f"{space['owner']}-{space['name']}",
-                        name=manifest.get('name', space['name']),
-                        url=space['url'],
-                        capabilities=self._parse_capabilities(manifest),
-                        supported_task_types=self._parse_task_types(manifest),
-                        routing_flags=self._parse_routing_flags(manifest),
-                        status=MCPStatus.UNKNOWN,
-                        last_health_check=datetime.utcnow()
-                    )
-                    
-                    return mcp_info
-            
+    async def _discover_user_mcps(self, user_id: str) -> Tuple[List[MCPInfo], Set[str]]:
+        """MCPs found in the user's Spaces, and the MCP ids of Spaces that could
+        not be probed. Raises if the user's Spaces cannot be listed."""
+        # Get user's HF Spaces
+        async with self._get_discovery_slots():
+            spaces = await self.hf_service.get_user_spaces(user_id)
+        
+        # Probe every Space concurrently
+        results = await asyncio.gather(
+            *(self._check_space_for_mcp(space) for space in spaces), return_exceptions=True
+        )
+        
+        user_mcps, unreachable_ids = [], set()
+        for space, result in zip(spaces, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error checking space for MCP: {str(result)}")
+                self.discovery_progress['errors'] += 1
+                unreachable_ids.add(_space_mcp_id(space))
+            elif result:
+                user_mcps.append(result)
+        return user_mcps, unreachable_ids
+    
+    def _get_discovery_slots(self) -> asyncio.Semaphore:
+        if self._discovery_slots is None:
+            self._discovery_slots = asyncio.Semaphore(self.discovery_concurrency)
+        return self._discovery_slots
+    
+    async def _fetch_manifest(self, manifest_url: str) -> Optional[Dict[str, Any]]:
+        """Fetch an MCP manifest, revalidating cached copies with ETag/Last-Modified.
+        Returns None if the Space has no manifest, raises on any other failure."""
+        cached = self.manifest_cache.get(manifest_url)
+        
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        
+        # Respect the per-host request rate
+        await self.host_rate_limiter.wait_if_needed(urlsplit(manifest_url).netloc)
+        
+        async with self._get_discovery_slots():
+            client = self.http_clients.get("huggingface")
+            response = await client.get(manifest_url, headers=headers)
+        
+        self.discovery_progress['spaces_probed'] += 1
+        
+        if response.status_code == 304 and cached:
+            self.discovery_progress['manifests_not_modified'] += 1
+            return cached['manifest']
+        
+        if response.status_code in (404, 410):
+            self.manifest_cache.pop(manifest_url, None)
             return None
-            
-        except Exception as e:
-            logger.error(f"Error checking space for MCP: {str(e)}")
+        
+        # Rate limits and server errors say nothing about the manifest
+        if response.status_code != 200:
+            raise httpx.HTTPStatusError(
+                f"Unexpected status {response.status_code} for {manifest_url}",
+                request=response.request, response=response
+            )
+        
+        manifest = response.json()
+        self.manifest_cache[manifest_url] = {
+            'manifest': manifest,
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified')
+        }
+        return manifest
+    
+    async def _check_space_for_mcp(self, space: Dict[str, Any]) -> Optional[MCPInfo]:
+        """Check if HF Space contains an MCP. Returns None if it has no manifest,
+        raises if the manifest could not be fetched or parsed."""
+        # Check for MCP manifest
+        manifest = await self._fetch_manifest(f"{space['url']}/mcp.json")
+        if manifest is None:
             return None
+        
+        # Keep the current health status of an already known MCP
+        mcp_id = _space_mcp_id(space)
+        existing = self.registry.get(mcp_id)
+        
+        # Create MCP info
+        return MCPInfo(
+            id=mcp_id,
+            name=manifest.get('name', space['name']),
+            url=space['url'],
+            capabilities=self._parse_capabilities(manifest),
+            supported_task_types=self._parse_task_types(manifest),
+            routing_flags=self._parse_routing_flags(manifest),
+            status=existing.status if existing else MCPStatus.UNKNOWN,
+            last_health_check=existing.last_health_check if existing else datetime.utcnow()
+        )
     
     def _parse_capabilities(self, manifest: Dict[str, Any]) -> List[Capability]:
         """Parse capabilities from MCP manifest"""
@@ -238,86 +551,88 @@ class MCPRegistry:
             fallback_to_oracle=manifest.get('fallback_to_oracle', True)
         )
     
-    async def update_mcp_status(self, mcp_id: str, status: MCPStatus):
+    async def update_mcp_status(self, mcp_id: str, status: MCPStatus) -> bool:
         """Update MCP status"""
         try:
-            if mcp_id in self.registry:
-                self.registry[mcp_id].status = status
-                self.registry[mcp_id].last_health_check = datetime.utcnow()
-                
-                # Update health cache
-                self.health_cache[mcp_id] = {
-                    'status': status,
-                    'timestamp': datetime.utcnow()
-                }
-                
-        except Exception as e:
-            logger.error(f"Error updating MCP status: {str(e)}")
-    
-    async def validate_mcp_health(self, mcp_id: str) -> MCPStatus:
-        """Check MCP health and return status"""
-        try:
-            # Check cache first
-            if mcp_id in self.health_cache:
-                cached = self.health_cache[mcp_id]
-                if datetime.utcnow() - cached['timestamp'] < self.health_cache_ttl:
-                    return cached['status']
-            
-            # Get MCP info
             mcp = self.registry.get(mcp_id)
-            if not mcp:
-                return MCPStatus.UNKNOWN
+            if mcp is None:
+                return False
+            
+            if mcp.status != status:
+                self.status_index[mcp.status].discard(mcp_id)
+                self.status_index[status].add(mcp_id)
             
-            # Perform health check
-            status = await self._perform_health_check(mcp)
+            mcp.status = status
+            mcp.last_health_check = datetime.utcnow()
             
-            # Update cache
-            self.health_cache[mcp_id] = {
+            # Update health cache
+            self.health_cache.set(mcp_id, {
                 'status': status,
                 'timestamp': datetime.utcnow()
-            }
-            
-            # Update registry
-            await self.update_mcp_status(mcp_id, status)
-            
-            return status
-            
+            })
+            return True
+                
         except Exception as e:
-            logger.error(f"Error validating MCP health: {str(e)}")
+            logger.error(f"Error updating MCP status: {str(e)}")
+            return False
+    
+    async def validate_mcp_health(self, mcp_id: str) -> MCPStatus:
+        """Return the MCP's last probed status without any network I/O"""
+        mcp = self.registry.get(mcp_id)
+        if not mcp:
+            return MCPStatus.UNKNOWN
+        
+        # An open circuit overrides the last probe result
+        if not self.health_monitor.is_available(mcp_id):
             return MCPStatus.UNHEALTHY
+        
+        return mcp.status
+    
+    async def check_mcp_health(self, mcp_id: str) -> bool:
+        """Probe an MCP now, bypassing the background schedule"""
+        if mcp_id not in self.registry:
+            raise ValueError(f"MCP {mcp_id} not found")
+        
+        status = await self.health_monitor.probe_mcp(mcp_id)
+        return status == MCPStatus.HEALTHY
+    
+    async def check_all_mcps_health(self) -> Dict[str, MCPStatus]:
+        """Probe every MCP now, concurrently"""
+        return await self.health_monitor.probe_all()
     
     async def _perform_health_check(self, mcp: MCPInfo) -> MCPStatus:
         """Perform actual health check on MCP"""
         try:
             # Check if MCP is accessible
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{mcp.url}/health",
-                    timeout=10
-                )
+            client = self.http_clients.get("mcp")
+            response = await client.get(
+                f"{mcp.url}/health",
+                timeout=settings.mcp_health_timeout
+            )
+            
+            if response.status_code == 200:
+                health_data = response.json()
                 
-                if response.status_code == 200:
-                    health_data = response.json()
-                    
-                    # Check specific health indicators
-                    if health_data.get('status') == 'healthy':
-                        return MCPStatus.HEALTHY
-                    elif health_data.get('status') == 'warning':
-                        return MCPStatus.WARNING
-                    else:
-                        return MCPStatus.UNHEALTHY
+                # Check specific health indicators
+                if health_data.get('status') == 'healthy':
+                    return MCPStatus.HEALTHY
+                elif health_data.get('status') == 'warning':
+                    return MCPStatus.WARNING
                 else:
                     return MCPStatus.UNHEALTHY
+            else:
+                return MCPStatus.UNHEALTHY
                     
         except Exception as e:
             logger.error(f"Error performing health check on {mcp.id}: {str(e)}")
             return MCPStatus.UNHEALTHY
     
-    async def _user_can_access_mcp(self, user_id: str, mcp: MCPInfo) -> bool:
+    def _user_can_access_mcp(self, user_id: Optional[str], mcp: MCPInfo) -> bool:
         """Check if user can access MCP"""
         try:
             # For now, allow all users to access all MCPs
             # In the future, this could check user permissions, subscriptions, etc.
+            # Keep this free of I/O: it runs for every candidate on every routing call
             return True
             
         except Exception as e:
@@ -328,13 +643,45 @@ class MCPRegistry:
         """Get MCP information by ID"""
         return self.registry.get(mcp_id)
     
+    async def get_mcp(self, mcp_id: str) -> Optional[MCPInfo]:
+        """Get MCP information by ID"""
+        return self.registry.get(mcp_id)
+    
+    def list_mcps_page(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, str]] = None,
+        status: Optional[MCPStatus] = None,
+        capability: Optional[str] = None
+    ) -> List[MCPInfo]:
+        """
+        MCPs in registration order, starting after the ``(registered_at, id)``
+        key ``after``. Filters resolve through the indexes; the page start is a
+        bisect, so deep pages cost the same as the first.
+        """
+        mcp_ids = None
+        if status:
+            mcp_ids = set(self.status_index[status])
+        if capability:
+            capability_ids = set().union(*self.capability_index.get(capability, {}).values())
+            mcp_ids = capability_ids if mcp_ids is None else mcp_ids & capability_ids
+        
+        if mcp_ids is None:
+            keys = self._listing_keys
+        else:
+            keys = sorted((self.registered_at[mcp_id], mcp_id) for mcp_id in mcp_ids)
+        
+        # bisect_right lands just past ``after`` itself
+        start = bisect.bisect_right(keys, after) if after else 0
+        return [self.registry[mcp_id] for _, mcp_id in keys[start:start + limit]]
+    
     async def list_mcps(self, user_id: Optional[str] = None) -> List[MCPInfo]:
         """List all MCPs, optionally filtered by user"""
         try:
             if user_id:
                 return [
                     mcp for mcp in self.registry.values()
-                    if await self._user_can_access_mcp(user_id, mcp)
+                    if self._user_can_access_mcp(user_id, mcp)
                 ]
             else:
                 return list(self.registry.values())
@@ -0,0 +1,304 @@
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime
+import asyncio
+import json
+import logging
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models.task import Task, TaskStatus, TaskType
+from models.job import Job, JobStatus
+from models.result import Result, ResultType
+from models import sql_models
+from core.database import Database
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Stay under the bind parameter limits of PostgreSQL (32767) and SQLite (32766)
+MAX_BIND_PARAMS = 32000
+
+UPSERT_DIALECTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+async def _upsert(session, table, rows: List[Dict[str, Any]], update_columns: List[str]):
+    """Insert rows, updating ``update_columns`` of rows that already exist"""
+    if not rows:
+        return
+
+    insert = UPSERT_DIALECTS[session.bind.dialect.name]
+    chunk_size = max(1, MAX_BIND_PARAMS // len(rows[0]))
+    for start in range(0, len(rows), chunk_size):
+        stmt = insert(table).values(rows[start:start + chunk_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+        await session.execute(stmt)
+
+def task_status_for(job_status: JobStatus) -> TaskStatus:
+    """Task status mirrored from the state of its job"""
+    if job_status == JobStatus.QUEUED:
+        return TaskStatus.PENDING
+    return TaskStatus(job_status.value)
+
+class TaskRepository:
+    """Tasks persisted in the ``tasks`` table"""
+
+    table = sql_models.Task.__table__
+
+    def __init__(self, database: Database):
+        self.database = database
+
+    @staticmethod
+    def to_row(task: Task) -> Dict[str, Any]:
+        return {
+            'id': task.id,
+            'user_id': task.user_id,
+            'type': sql_models.TaskType(task.type.value),
+            'priority': task.priority,
+            'input_data': json.dumps(task.input, default=str),
+            'required_capabilities': json.dumps([
+                capability.model_dump(mode='json') for capability in task.required_capabilities
+            ]) if task.required_capabilities is not None else None,
+            'is_heavy': task.is_heavy,
+            'status': sql_models.TaskStatus(task.status.value),
+            'created_at': task.created_at,
+            'completed_at': None,
+            'result_id': None,
+            'error_message': None,
+        }
+
+    @staticmethod
+    def from_row(row) -> Task:
+        return Task(
+            id=row.id,
+            user_id=row.user_id,
+            type=TaskType(row.type.value),
+            priority=row.priority,
+            input=json.loads(row.input_data) if row.input_data else {},
+            required_capabilities=json.loads(row.required_capabilities) if row.required_capabilities else None,
+            is_heavy=row.is_heavy,
+            status=TaskStatus(row.status.value),
+            created_at=row.created_at
+        )
+
+    async def add_many(self, tasks: List[Task]):
+        async with self.database.session() as session:
+            await _upsert(session, self.table, [self.to_row(task) for task in tasks], ['status', 'priority'])
+
+    async def get(self, task_id: str, user_id: str) -> Optional[Task]:
+        async with self.database.session() as session:
+            row = (await session.execute(
+                select(self.table).where(self.table.c.id == task_id, self.table.c.user_id == user_id)
+            )).first()
+        return self.from_row(row) if row else None
+
+    async def list_for_user(
+        self,
+        user_id: str,
+        limit: int = 50,
+        offset: int = 0,
+        status: Optional[TaskStatus] = None,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> List[Task]:
+        """
+        A page of a user's tasks, newest first, served from the
+        (user_id, [status,] created_at, id) indexes. ``after`` is the
+        ``(created_at, id)`` key of the previous page's last task; seeking to
+        it is an index range scan, so deep pages cost the same as the first.
+        """
+        columns = self.table.c
+        query = select(self.table).where(columns.user_id == user_id)
+        if status is not None:
+            query = query.where(columns.status == sql_models.TaskStatus(status.value))
+        if after is not None:
+            query = query.where(tuple_(columns.created_at, columns.id) < tuple_(*after))
+        query = query.order_by(columns.created_at.desc(), columns.id.desc()).limit(limit)
+        if offset:
+            query = query.offset(offset)
+
+        async with self.database.session() as session:
+            rows = (await session.execute(query)).all()
+        return [self.from_row(row) for row in rows]
+
+class JobRepository:
+    """
+    Job state transitions persisted in the ``jobs`` table.
+
+    ``record()`` only buffers the latest state of each job; a background
+    flusher writes the buffer every ``flush_interval`` seconds (or as soon as
+    ``batch_size`` jobs are pending) as one multi-row upsert of jobs and the
+    tasks whose status they mirror. A job that moves through several states
+    between flushes costs a single row write.
+    """
+
+    table = sql_models.Job.__table__
+    task_table = sql_models.Task.__table__
+
+    JOB_UPDATE_COLUMNS = [
+        'status', 'priority', 'retry_count', 'started_at', 'completed_at',
+        'error_message', 'last_error_at', 'result_id'
+    ]
+    TASK_UPDATE_COLUMNS = ['status', 'priority', 'completed_at', 'result_id', 'error_message']
+
+    def __init__(self, database: Database, flush_interval: float = None, batch_size: int = None):
+        self.database = database
+        self.flush_interval = flush_interval if flush_interval is not None else settings.database_flush_interval
+        self.batch_size = batch_size or settings.database_flush_batch_size
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._pending_tasks: Dict[str, Dict[str, Any]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.rows_written = 0
+
+    def record(self, job: Job):
+        """Buffer the job's current state for the next batched write"""
+        self._pending[job.id] = {
+            'id': job.id,
+            'task_id': job.task_id,
+            'user_id': job.user_id,
+            'mcp_id': job.mcp_id,
+            'mcp_url': job.mcp_url,
+            'status': sql_models.JobStatus(job.status.value),
+            'priority': job.priority,
+            'timeout': job.timeout,
+            'retry_count': job.retry_count,
+            'max_retries': job.max_retries,
+            'created_at': job.created_at,
+            'started_at': job.started_at,
+            'completed_at': job.completed_at,
+            'error_message': job.error_message,
+            'last_error_at': job.last_error_at,
+            'result_id': job.result_id,
+        }
+
+        if job.task is not None:
+            task_row = TaskRepository.to_row(job.task)
+            task_row.update(
+                status=sql_models.TaskStatus(task_status_for(job.status).value),
+                completed_at=job.completed_at,
+                result_id=job.result_id,
+                error_message=job.error_message
+            )
+            self._pending_tasks[job.task_id] = task_row
+
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        """Write every buffered transition; returns the number of jobs written"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            jobs, self._pending = self._pending, {}
+            tasks, self._pending_tasks = self._pending_tasks, {}
+            try:
+                async with self.database.session() as session:
+                    # Tasks first so new jobs satisfy their foreign key
+                    await _upsert(session, self.task_table, list(tasks.values()), self.TASK_UPDATE_COLUMNS)
+                    await _upsert(session, self.table, list(jobs.values()), self.JOB_UPDATE_COLUMNS)
+            except Exception:
+                # Keep the failed batch unless a newer state was recorded meanwhile
+                self._pending = {**jobs, **self._pending}
+                self._pending_tasks = {**tasks, **self._pending_tasks}
+                raise
+
+            self.flushes += 1
+            self.rows_written += len(jobs) + len(tasks)
+            return len(jobs)
+
+    def start(self):
+        """Start the background flusher"""
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop(), name="job-state-flusher")
+
+    async def stop(self):
+        """Stop the flusher and write whatever is still buffered"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+
+        await self.flush()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        async with self.database.session() as session:
+            row = (await session.execute(select(self.table).where(self.table.c.id == job_id))).first()
+        return dict(row._mapping) if row else None
+
+    async def list_for_task(self, task_id: str) -> List[Dict[str, Any]]:
+        query = select(self.table).where(self.table.c.task_id == task_id).order_by(self.table.c.created_at)
+        async with self.database.session() as session:
+            rows = (await session.execute(query)).all()
+        return [dict(row._mapping) for row in rows]
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing job states: {str(e)}")
+                # Back off before retrying the same batch
+                await asyncio.sleep(max(self.flush_interval, 1.0))
+
+class ResultRepository:
+    """Results persisted in the ``results`` table; pointer results keep only their pointer"""
+
+    table = sql_models.Result.__table__
+
+    def __init__(self, database: Database):
+        self.database = database
+
+    async def add(self, result: Result):
+        row = {
+            'id': result.id,
+            'task_id': result.task_id,
+            'user_id': result.user_id,
+            'type': sql_models.ResultType(result.type.value),
+            'data': json.dumps(result.data, default=str) if result.type == ResultType.DIRECT else None,
+            'metadata': json.dumps(result.metadata, default=str),
+            'pointer_id': result.pointer_id,
+            'created_at': result.created_at,
+        }
+        async with self.database.session() as session:
+            await session.execute(self.table.insert().values(row))
+
+    async def get(self, result_id: str, user_id: str) -> Optional[Result]:
+        """A direct result; pointer results are resolved by the caller"""
+        async with self.database.session() as session:
+            row = (await session.execute(
+                select(self.table).where(self.table.c.id == result_id, self.table.c.user_id == user_id)
+            )).first()
+
+        if row is None or row.type != sql_models.ResultType.DIRECT:
+            return None
+
+        return Result(
+            id=row.id,
+            task_id=row.task_id,
+            user_id=row.user_id,
+            type=ResultType.DIRECT,
+            data=json.loads(row.data) if row.data else {},
+            metadata=json.loads(row.metadata) if row.metadata else {},
+            created_at=row.created_at
+        )
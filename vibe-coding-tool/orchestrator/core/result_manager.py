@@ -1,5 +1,6 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
+import heapq
 import logging
 import json
 import uuid
@@ -7,7 +8,10 @@ import uuid
 from models.task import Task, TaskStatus
 from models.result import Result, ResultCreate, ResultType
 from core.auth_service import AuthService
+from core.repositories import ResultRepository
 from services.hf_service import HuggingFaceService
+from config.settings import settings
+from utils.cache import BoundedCache, estimate_size
 
 logger = logging.getLogger(__name__)
 
@@ -15,15 +19,22 @@ class ResultManager:
     def __init__(
         self, 
         auth_service: AuthService,
-        hf_service: HuggingFaceService
+        hf_service: HuggingFaceService,
+        result_repository: Optional[ResultRepository] = None
     ):
         self.auth_service = auth_service
         self.hf_service = hf_service
-        self.results_cache = {}
-        self.cache_ttl = timedelta(hours=1)
+        self.result_repository = result_repository
+        # Direct results, charged by the size of their data to the owning user
+        self.results_cache = BoundedCache(
+            name="results",
+            max_bytes=settings.result_cache_max_bytes,
+            default_ttl=settings.result_cache_ttl,
+            max_bytes_per_owner=settings.result_cache_user_quota_bytes
+        )
     
-    async def store_result(self, result: ResultCreate) -> str:
-        """Store a result and return its ID"""
+    async def store_result(self, result: ResultCreate, task: Optional[Task] = None) -> str:
+        """Store a result and return its ID; ``task`` is listed with the cached result"""
         try:
             # Create result object
             result_obj = Result(
@@ -43,11 +54,23 @@ class ResultManager:
                 result_obj.pointer_id = pointer_id
             else:
                 # Store locally
-                self.results_cache[result_obj.id] = {
-                    'data': result_obj.data,
-                    'created_at': result_obj.created_at,
-                    'metadata': result_obj.metadata
-                }
+                self.results_cache.set(
+                    result_obj.id,
+                    {
+                        'task_id': result_obj.task_id,
+                        'user_id': result_obj.user_id,
+                        'data': result_obj.data,
+                        'created_at': result_obj.created_at,
+                        'metadata': result_obj.metadata,
+                        'task': task
+                    },
+                    owner=result_obj.user_id,
+                    size=estimate_size(result_obj.data)
+                )
+            
+            # Persist; the cache only holds recent direct results
+            if self.result_repository is not None:
+                await self.result_repository.add(result_obj)
             
             return result_obj.id
             
@@ -58,22 +81,24 @@ class ResultManager:
     async def get_result(self, result_id: str, user_id: str) -> Optional[Result]:
         """Get a result by ID"""
         try:
-            # Check cache first
-            if result_id in self.results_cache:
-                cached = self.results_cache[result_id]
-                if datetime.utcnow() - cached['created_at'] < self.cache_ttl:
-                    return Result(
-                        id=result_id,
-                        task_id=cached.get('task_id'),
-                        user_id=user_id,
-                        type=ResultType.DIRECT,
-                        data=cached['data'],
-                        metadata=cached['metadata'],
-                        created_at=cached['created_at']
-                    )
-                else:
-                    # Remove expired cache
-                    del self.results_cache[result_id]
+            # Check cache first; expired entries are dropped by the cache
+            cached = self.results_cache.get(result_id)
+            if cached is not None and cached['user_id'] == user_id:
+                return Result(
+                    id=result_id,
+                    task_id=cached['task_id'],
+                    user_id=user_id,
+                    type=ResultType.DIRECT,
+                    data=cached['data'],
+                    metadata=cached['metadata'],
+                    created_at=cached['created_at']
+                )
+            
+            # Fall back to the database for evicted or expired direct results
+            if self.result_repository is not None:
+                stored = await self.result_repository.get(result_id, user_id)
+                if stored:
+                    return stored
             
             # Check if it's a pointer result
             pointer_result = await self._get_pointer_result(result_id, user_id)
@@ -105,25 +130,25 @@ class ResultManager:
         user_id: str, 
         limit: int = 50, 
         offset: int = 0,
-        status: Optional[TaskStatus] = None
+        status: Optional[TaskStatus] = None,
+        after: Optional[Tuple[datetime, str]] = None
     ) -> List[Task]:
-        """List user's completed tasks"""
+        """List user's completed tasks newest first, starting after the ``(created_at, id)`` key ``after``"""
         try:
             # Get tasks from HF Dataset
-            tasks = await self._get_user_tasks_from_hf(user_id, limit, offset, status)
-            
-            # Add cached tasks
-            cached_tasks = [
-                result for result in self.results_cache.values()
-                if result.get('user_id') == user_id and 
-                   (status is None or result.get('status') == status)
-            ]
+            tasks = {task.id: task for task in await self._get_user_tasks_from_hf(user_id, limit, offset, status)}
             
-            # Combine and sort
-            all_tasks = tasks + cached_tasks
-            all_tasks.sort(key=lambda x: x.get('created_at', datetime.min), reverse=True)
+            # Add the tasks of cached results
+            for _, result in self.results_cache.owner_items(user_id):
+                if result.get('task') is not None:
+                    tasks[result['task'].id] = result['task']
             
-            return all_tasks[:limit]
+            # Combine and keep the newest page
+            return heapq.nlargest(limit, (
+                task for task in tasks.values()
+                if (status is None or task.status == status)
+                and (after is None or (task.created_at, task.id) < after)
+            ), key=lambda task: (task.created_at, task.id))
             
         except Exception as e:
             logger.error(f"Error listing user tasks: {str(e)}")
@@ -1,21 +1,50 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
+import heapq
 import logging
+import random
+import numpy as np
 from fastapi import HTTPException
 
 from models.task import Task, TaskStatus, TaskType
 from models.mcp import MCPInfo, MCPStatus, Capability
 from core.registry import MCPRegistry
 from core.auth_service import AuthService
+from config.settings import settings
+from utils.cache import BoundedCache
+from utils.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
+# Candidates whose static score is within this margin of the best one are
+# treated as equivalent and compete on load
+EQUIVALENCE_MARGIN = 1e-6
+
 class TaskRouter:
-    def __init__(self, registry: MCPRegistry, auth_service: AuthService):
+    def __init__(
+        self,
+        registry: MCPRegistry,
+        auth_service: AuthService,
+        job_manager=None,
+        metrics_collector=None
+    ):
         self.registry = registry
         self.auth_service = auth_service
-        self.route_cache = {}
+        self.job_manager = job_manager
+        self.metrics_collector = metrics_collector
+        self.latency_reference = settings.routing_latency_reference
+        # Route key -> (equivalent candidates with their static scores,
+        # (registry revision, health version) they were scored at). Load is
+        # read live on every selection, so it does not invalidate entries.
+        self.route_cache = BoundedCache(
+            name="task_routes",
+            max_entries=settings.route_cache_max_entries,
+            default_ttl=settings.route_cache_ttl,
+            sizer=lambda value: 0
+        )
+        self._rng = random.Random()
     
+    @tracer.traced("router.route_task")
     async def route_task(self, task: Task, user_id: str) -> MCPInfo:
         """
         Determine the best MCP for executing a task based on:
@@ -23,11 +52,23 @@ class TaskRouter:
         - Resource requirements (light vs heavy)
         - Current MCP health and load
         - User preferences and permissions
+        
+        Equivalent candidates are chosen between with power-of-two-choices on
+        their live load, which spreads traffic without herding onto whichever
+        MCP looked best a moment ago.
         """
+        health_monitor = self.registry.health_monitor
+        span = tracer.current_span()
+        span.set_attribute('task.type', getattr(task.type, 'value', task.type))
+        
         # Check cache first
-        cache_key = f"{task.type}_{task.priority}_{user_id}"
-        if cache_key in self.route_cache:
-            return self.route_cache[cache_key]
+        cache_key = self._route_key(task, user_id)
+        candidates = self._get_cached_candidates(cache_key)
+        if candidates is not None:
+            mcp = self._select(candidates)
+            span.set_attribute('route.cached', True)
+            span.set_attribute('mcp.id', mcp.id)
+            return mcp
         
         # Get available MCPs for this task type
         available_mcps = await self.registry.get_mcps_for_task(
@@ -41,47 +82,236 @@ class TaskRouter:
                 detail=f"No MCP available for task type: {task.type}"
             )
         
-        # Score MCPs based on suitability
+        # Skip MCPs with an open circuit breaker (in-memory, no network I/O)
+        available_mcps = [mcp for mcp in available_mcps if health_monitor.is_available(mcp.id)]
+        
+        if not available_mcps:
+            raise HTTPException(
+                status_code=503,
+                detail=f"All MCPs for task type {task.type} are currently unavailable"
+            )
+        
+        # Score MCPs based on suitability and keep the equivalent best ones
         scored_mcps = self._score_mcps(task, available_mcps)
+        best_static = max(entry['static_score'] for entry in scored_mcps)
+        candidates = [
+            (entry['mcp_info'], entry['static_score']) for entry in scored_mcps
+            if entry['static_score'] >= best_static - EQUIVALENCE_MARGIN
+        ]
+        self.route_cache.set(cache_key, (candidates, self._cache_version()))
         
         # Select best MCP
-        best_mcp = max(scored_mcps, key=lambda x: x['score'])
+        mcp = self._select(candidates)
+        
+        span.set_attribute('route.candidates', len(available_mcps))
+        span.set_attribute('mcp.id', mcp.id)
+        return mcp
+    
+    @tracer.traced("router.route_many")
+    async def route_many(self, tasks: List[Task], user_id: str) -> List[Dict[str, Any]]:
+        """
+        Route a batch of tasks in one pass.
+        
+        For each task type the static capability/resource/preference scores of
+        all tasks against all candidate MCPs are computed as one NumPy matrix.
+        Tasks are then assigned, highest priority first, to the eligible MCP
+        with the best health and load score, counting the batch's own
+        assignments as load so the batch spreads across equivalent MCPs.
+        
+        Returns one decision per task, in input order, with either an
+        ``mcp_info`` or an ``error``.
+        """
+        health_monitor = self.registry.health_monitor
+        decisions: List[Dict[str, Any]] = [None] * len(tasks)
+        
+        by_type: Dict[Any, List[int]] = {}
+        for index, task in enumerate(tasks):
+            by_type.setdefault(task.type, []).append(index)
+        
+        # Load added by this batch, shared across task types
+        assigned: Dict[str, int] = {}
+        
+        for task_type, indexes in by_type.items():
+            type_name = getattr(task_type, 'value', task_type)
+            candidates = await self.registry.get_mcps_for_task(task_type, user_id=user_id)
+            if not candidates:
+                error = f"No MCP available for task type: {type_name}"
+            else:
+                candidates = [mcp for mcp in candidates if health_monitor.is_available(mcp.id)]
+                error = None if candidates else f"All MCPs for task type {type_name} are currently unavailable"
+            
+            if error:
+                for index in indexes:
+                    decisions[index] = {'mcp_info': None, 'score': 0.0, 'error': error}
+                continue
+            
+            group = [tasks[index] for index in indexes]
+            static = self._static_score_matrix(group, candidates)
+            eligible = static >= static.max(axis=1, keepdims=True) - EQUIVALENCE_MARGIN
+            
+            # health * latency factor per candidate; divided by (1 + load) on use
+            capacity = np.array([
+                self._calculate_health_score(mcp) * self._calculate_latency_factor(mcp)
+                for mcp in candidates
+            ])
+            base_load = np.array([self._get_in_flight(mcp.id) for mcp in candidates], dtype=float)
+            
+            # Tasks with the same eligible set share one lazily updated heap
+            patterns, pattern_of = np.unique(eligible, axis=0, return_inverse=True)
+            pattern_of = pattern_of.reshape(-1)
+            heaps = [None] * len(patterns)
+            
+            order = sorted(range(len(group)), key=lambda i: -group[i].priority)
+            for i in order:
+                pattern = int(pattern_of[i])
+                if heaps[pattern] is None:
+                    heaps[pattern] = [
+                        (-self._dynamic_score(static[i, j], capacity[j], base_load[j], assigned.get(candidates[j].id, 0)),
+                         assigned.get(candidates[j].id, 0), j)
+                        for j in np.flatnonzero(patterns[pattern])
+                    ]
+                    heapq.heapify(heaps[pattern])
+                
+                heap = heaps[pattern]
+                while True:
+                    _, seen, j = heap[0]
+                    mcp_id = candidates[j].id
+                    current = assigned.get(mcp_id, 0)
+                    if seen == current:
+                        break
+                    # Stale entry: another assignment changed this MCP's load
+                    heapq.heapreplace(heap, (
+                        -self._dynamic_score(static[i, j], capacity[j], base_load[j], current), current, j
+                    ))
+                
+                assigned[mcp_id] = current + 1
+                heapq.heapreplace(heap, (
+                    -self._dynamic_score(static[i, j], capacity[j], base_load[j], current + 1), current + 1, j
+                ))
+                decisions[indexes[i]] = {
+                    'mcp_info': candidates[j],
+                    'score': self._dynamic_score(static[i, j], capacity[j], base_load[j], current),
+                    'error': None
+                }
+        
+        return decisions
+    
+    def _static_score_matrix(self, tasks: List[Task], mcps: List[MCPInfo]) -> np.ndarray:
+        """Capability/resource/preference scores of every task against every MCP"""
+        # Rows only differ by required capabilities and weight class, so each
+        # distinct row is scored once and then gathered into the matrix
+        capability_rows: Dict[Any, int] = {}
+        capability_scores = []
+        capability_index = np.empty(len(tasks), dtype=np.intp)
+        for i, task in enumerate(tasks):
+            key = tuple(
+                (cap.name, cap.version, frozenset(cap.parameters))
+                for cap in task.required_capabilities or ()
+            )
+            row = capability_rows.get(key)
+            if row is None:
+                row = capability_rows[key] = len(capability_scores)
+                capability_scores.append([self._calculate_capability_match(task, mcp) for mcp in mcps])
+            capability_index[i] = row
         
-        # Cache the result
-        self.route_cache[cache_key] = best_mcp['mcp_info']
+        heavy = np.fromiter((task.is_heavy for task in tasks), dtype=bool, count=len(tasks))
+        representative = {task.is_heavy: task for task in tasks}
+        resource_scores = np.array([
+            [self._calculate_resource_match(representative[is_heavy], mcp) for mcp in mcps]
+            if is_heavy in representative else [0.0] * len(mcps)
+            for is_heavy in (False, True)
+        ])
+        preference_scores = np.array([self._calculate_user_preference(tasks[0], mcp) for mcp in mcps])
         
-        return best_mcp['mcp_info']
+        return (
+            np.array(capability_scores)[capability_index] * 0.4
+            + resource_scores[heavy.astype(np.intp)] * 0.3
+            + preference_scores * 0.1
+        )
+    
+    @staticmethod
+    def _dynamic_score(static: float, capacity: float, base_load: float, assigned: int) -> float:
+        return float(static + capacity / (1 + base_load + assigned) * 0.2)
+    
+    @staticmethod
+    def _route_key(task: Task, user_id: str) -> Tuple:
+        """Everything the static scores of a task depend on"""
+        capabilities = tuple(
+            (cap.name, str(cap.version), frozenset(cap.parameters)) for cap in task.required_capabilities or ()
+        )
+        return (getattr(task.type, 'value', task.type), user_id, task.is_heavy, capabilities)
+    
+    def _get_cached_candidates(self, cache_key: Tuple) -> Optional[List[Tuple[MCPInfo, float]]]:
+        """Return cached candidates unless they expired or the registry or health changed since"""
+        entry = self.route_cache.get(cache_key)
+        if entry is None:
+            return None
+        
+        candidates, version = entry
+        if version == self._cache_version():
+            return candidates
+        
+        self.route_cache.pop(cache_key)
+        return None
+    
+    def _cache_version(self) -> Tuple[int, int]:
+        return (self.registry.revision, self.registry.health_monitor.version)
+    
+    def _get_in_flight(self, mcp_id: str) -> int:
+        if self.job_manager is None:
+            return 0
+        return self.job_manager.get_in_flight(mcp_id)
+    
+    def _get_p95_latency(self, mcp_id: str) -> Optional[float]:
+        if self.metrics_collector is not None:
+            p95 = self.metrics_collector.get_mcp_latency_percentile(mcp_id, 95)
+            if p95 is not None:
+                return p95
+        # Fall back to the health probe latency until real calls were recorded
+        return self.registry.health_monitor.latency(mcp_id)
+    
+    def _select(self, candidates: List[Tuple[MCPInfo, float]]) -> MCPInfo:
+        """Power-of-two-choices on live health and load among equivalent candidates"""
+        if len(candidates) > 2:
+            candidates = self._rng.sample(candidates, 2)
+        
+        mcp, _ = max(
+            candidates,
+            key=lambda candidate: candidate[1] + self._calculate_health_score(candidate[0])
+            * self._calculate_load_score(candidate[0]) * 0.2
+        )
+        return mcp
     
     def _score_mcps(self, task: Task, mcps: List[MCPInfo]) -> List[Dict[str, Any]]:
         """Score MCPs based on various factors"""
         scored = []
         
         for mcp in mcps:
-            score = 0.0
-            
             # Capability match (40% weight)
             capability_score = self._calculate_capability_match(task, mcp)
-            score += capability_score * 0.4
             
             # Resource suitability (30% weight)
             resource_score = self._calculate_resource_match(task, mcp)
-            score += resource_score * 0.3
-            
-            # Health and load (20% weight)
-            health_score = self._calculate_health_score(mcp)
-            score += health_score * 0.2
             
             # User preference (10% weight)
             preference_score = self._calculate_user_preference(task, mcp)
-            score += preference_score * 0.1
+            
+            static_score = capability_score * 0.4 + resource_score * 0.3 + preference_score * 0.1
+            
+            # Health and load (20% weight)
+            health_score = self._calculate_health_score(mcp)
+            load_score = self._calculate_load_score(mcp)
+            score = static_score + health_score * load_score * 0.2
             
             scored.append({
                 'mcp_info': mcp,
                 'score': score,
+                'static_score': static_score,
                 'breakdown': {
                     'capability': capability_score,
                     'resource': resource_score,
                     'health': health_score,
+                    'load': load_score,
                     'preference': preference_score
                 }
             })
@@ -111,21 +341,33 @@ class TaskRouter:
         # Check resource requirements
         if task.is_heavy and not mcp.routing_flags.can_run_on_user_space:
             return 0.0
-        elif not task.is_heavy and mcp.routing_flags.requires_user_space:
+        elif not task.is_heavy and not mcp.routing_flags.can_run_on_user_space:
             return 0.5  # Prefer lightweight MCPs for light tasks
         
         return 1.0
     
     def _calculate_health_score(self, mcp: MCPInfo) -> float:
-        """Calculate health score based on MCP status"""
+        """Calculate health score based on MCP status and recent probe error rate"""
         if mcp.status == MCPStatus.HEALTHY:
-            return 1.0
+            score = 1.0
         elif mcp.status == MCPStatus.WARNING:
-            return 0.7
+            score = 0.7
         elif mcp.status == MCPStatus.UNHEALTHY:
-            return 0.3
+            score = 0.3
         else:
             return 0.0
+        
+        return score * (1.0 - self.registry.health_monitor.error_rate(mcp.id))
+    
+    def _calculate_load_score(self, mcp: MCPInfo) -> float:
+        """Calculate load score from live in-flight jobs and recent p95 latency"""
+        return self._calculate_latency_factor(mcp) / (1 + self._get_in_flight(mcp.id))
+    
+    def _calculate_latency_factor(self, mcp: MCPInfo) -> float:
+        p95 = self._get_p95_latency(mcp.id)
+        if p95 is None:
+            return 1.0
+        return 1.0 / (1 + p95 / self.latency_reference)
     
     def _calculate_user_preference(self, task: Task, mcp: MCPInfo) -> float:
         """Calculate user preference score"""
@@ -3,28 +3,42 @@ Main FastAPI application for Vibe Coding Tool MetaMCP Orchestrator
 """
 
 import logging
+import math
 import os
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Dict, Any
 
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.security import HTTPBearer
 
-from api import tasks, projects, mcps, auth, health, kg, agents
-from core.auth_service import AuthService
+from api import tasks, projects, mcps, auth, health, kg, agents, jobs
+from core.auth_service import auth_service
+from core.envelope_signer import create_envelope_signer
 from core.registry import MCPRegistry
 from core.job_manager import JobManager
+from core.task_router import TaskRouter
 from core.result_manager import ResultManager
+from core.database import Database
+from core.event_bus import EventBus
+from core.repositories import TaskRepository, JobRepository, ResultRepository
+from services.github_service import GitHubService
+from services.hf_service import HuggingFaceService
 from config.settings import settings
+from models.mcp import MCPStatus
 from middleware.error_handler import (
     http_exception_handler,
     validation_exception_handler,
     general_exception_handler
 )
 from utils.metrics import MetricsCollector
+from utils.metrics_server import MetricsServer
+from utils.http_client import http_clients
+from utils.rate_limiter import RateLimiter, create_rate_limit_backend, retry_after_header
+from utils.tracing import tracer, parse_traceparent, TRACEPARENT_HEADER
 
 # Configure logging
 logging.basicConfig(
@@ -37,11 +51,76 @@ logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
 # Initialize services
-auth_service = AuthService()
-registry = MCPRegistry()
-job_manager = JobManager()
-result_manager = ResultManager()
+database = Database()
+task_repository = TaskRepository(database)
+job_repository = JobRepository(database)
+result_repository = ResultRepository(database)
+github_service = GitHubService(http_clients)
+hf_service = HuggingFaceService(http_clients)
+registry = MCPRegistry(auth_service, github_service, hf_service, http_clients)
+result_manager = ResultManager(auth_service, hf_service, result_repository)
 metrics_collector = MetricsCollector()
+event_bus = EventBus()
+job_manager = JobManager(
+    result_manager, github_service, hf_service, auth_service, http_clients, metrics_collector,
+    task_repository=task_repository, job_repository=job_repository, event_bus=event_bus,
+    envelope_signer=create_envelope_signer()
+)
+task_router = TaskRouter(registry, auth_service, job_manager, metrics_collector)
+metrics_collector.register_cache(result_manager.results_cache)
+metrics_collector.register_cache(registry.health_cache)
+metrics_collector.register_cache(task_router.route_cache)
+metrics_collector.register_cache(job_manager.finished_jobs)
+metrics_collector.register_cache(event_bus.topics)
+metrics_collector.register_cache(auth_service.token_cache)
+metrics_server = MetricsServer(metrics_collector, settings.metrics_host, settings.metrics_port)
+rate_limit_backend = create_rate_limit_backend()
+rate_limiters = {
+    "auth": RateLimiter(settings.rate_limit_auth_requests, settings.rate_limit_window, backend=rate_limit_backend),
+    "write": RateLimiter(settings.rate_limit_write_requests, settings.rate_limit_window, backend=rate_limit_backend),
+    "read": RateLimiter(
+        settings.rate_limit_requests, settings.rate_limit_window,
+        burst=settings.rate_limit_burst, backend=rate_limit_backend
+    )
+}
+
+# Probes, scrapes, docs and signed worker callbacks are not rate limited
+RATE_LIMIT_EXEMPT_PREFIXES = ("/health", "/metrics", "/docs", "/redoc", "/openapi.json", "/api/health", "/api/jobs/")
+AUTH_ROUTE_PREFIXES = ("/api/login", "/api/oauth/", "/api/auth/")
+
+async def refresh_service_gauges():
+    """Snapshot queue, load, registry and health state for the metrics listener"""
+    queue_stats = await job_manager.job_queue.stats()
+    metrics_collector.set_gauge("mcp_queue_length", "Jobs waiting to be dispatched", (), {
+        (): queue_stats.get('queued', 0)
+    })
+    metrics_collector.set_gauge("job_queue_delayed", "Jobs waiting for a retry", (), {
+        (): queue_stats.get('delayed', 0)
+    })
+    metrics_collector.set_gauge("jobs_running", "Jobs executing in this process", (), {
+        (): job_manager.running_jobs
+    })
+    metrics_collector.set_gauge("mcp_in_flight_jobs", "Unfinished jobs assigned to an MCP", ("mcp_id",), {
+        (mcp_id,): count for mcp_id, count in job_manager.in_flight.items()
+    })
+    metrics_collector.set_gauge("mcp_registry_size", "Registered MCPs", (), {
+        (): len(registry.mcps)
+    })
+    
+    health = registry.health_monitor.health
+    metrics_collector.set_gauge("mcp_server_health", "1 if the last health probe succeeded", ("mcp_id",), {
+        (mcp_id,): 1 if record.status == MCPStatus.HEALTHY else 0 for mcp_id, record in health.items()
+    })
+    metrics_collector.set_gauge(
+        "mcp_health_probe_latency_seconds", "Moving average of health probe latency", ("mcp_id",), {
+            (mcp_id,): record.latency_ewma for mcp_id, record in health.items() if record.latency_ewma is not None
+        }
+    )
+    metrics_collector.set_gauge("event_stream_subscribers", "Open task event subscriptions", (), {
+        (): event_bus.stats()['subscribers']
+    })
+
+metrics_collector.register_gauge_source(refresh_service_gauges)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -50,23 +129,39 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Vibe Coding Tool MetaMCP Orchestrator")
     
     # Initialize database connections
-    # TODO: Initialize database connections
+    await database.connect()
+    job_repository.start()
     
     # Initialize Redis connections
     # TODO: Initialize Redis connections
     
-    # Register default MCPs
-    await registry.register_default_mcps()
+    # Open pooled outbound HTTP clients
+    http_clients.open()
     
     # Start background tasks
-    # TODO: Start background tasks for health checks, etc.
+    await job_manager.start()
+    registry.start_discovery()
+    registry.health_monitor.start()
+    result_manager.results_cache.start_sweeper(settings.cache_sweep_interval)
+    registry.health_cache.start_sweeper(settings.cache_sweep_interval)
+    task_router.route_cache.start_sweeper(settings.cache_sweep_interval)
+    event_bus.topics.start_sweeper(settings.cache_sweep_interval)
+    job_manager.finished_jobs.start_sweeper(settings.cache_sweep_interval)
+    
+    # Serve Prometheus metrics on their own port, off the event loop
+    if settings.enable_metrics:
+        metrics_collector.start_gauge_refresh(settings.metrics_refresh_interval)
+        metrics_server.start()
     
     # Store services in app state
     app.state.auth_service = auth_service
     app.state.registry = registry
     app.state.job_manager = job_manager
+    app.state.task_router = task_router
     app.state.result_manager = result_manager
+    app.state.database = database
     app.state.metrics_collector = metrics_collector
+    app.state.event_bus = event_bus
     
     logger.info("Vibe Coding Tool MetaMCP Orchestrator started successfully")
     
@@ -75,14 +170,31 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Vibe Coding Tool MetaMCP Orchestrator")
     
-    # Close database connections
-    # TODO: Close database connections
-    
     # Close Redis connections
     # TODO: Close Redis connections
     
     # Stop background tasks
-    # TODO: Stop background tasks
+    metrics_server.stop()
+    await metrics_collector.stop_gauge_refresh()
+    await result_manager.results_cache.stop_sweeper()
+    await registry.health_cache.stop_sweeper()
+    await task_router.route_cache.stop_sweeper()
+    await event_bus.topics.stop_sweeper()
+    await job_manager.finished_jobs.stop_sweeper()
+    await registry.health_monitor.stop()
+    await registry.stop_discovery()
+    await job_manager.stop()
+    
+    # Write buffered job states, then close database connections
+    await job_repository.stop()
+    await database.close()
+    
+    # Close pooled outbound HTTP clients
+    await http_clients.aclose()
+    await rate_limit_backend.close()
+    
+    # Export the spans still buffered
+    tracer.shutdown()
     
     logger.info("Vibe Coding Tool MetaMCP Orchestrator shut down successfully")
 
@@ -119,6 +231,7 @@ app.include_router(projects.router, prefix="/api", tags=["projects"])
 app.include_router(mcps.router, prefix="/api", tags=["mcps"])
 app.include_router(kg.router, prefix="/api", tags=["kg"])
 app.include_router(agents.router, prefix="/api", tags=["agents"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
 
 @app.get("/")
 async def root():
@@ -140,20 +253,109 @@ async def health_check():
     }
 
 @app.get("/metrics")
-async def get_metrics():
-    """Get application metrics"""
+async def get_metrics(request: Request):
+    """Get application metrics; Prometheus scrapes receive the text exposition format"""
+    accept = request.headers.get("accept", "")
+    if "text/plain" in accept or "openmetrics" in accept:
+        return PlainTextResponse(
+            metrics_collector.render_prometheus(),
+            media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
     return await metrics_collector.get_metrics()
 
+@app.middleware("http")
+async def rate_limiting(request: Request, call_next):
+    """Rate limit each user (or client IP when anonymous) per route class"""
+    route_class = rate_limit_class(request.method, request.url.path)
+    if route_class is None:
+        return await call_next(request)
+    
+    result = await rate_limiters[route_class].check(f"{route_class}:{rate_limit_identity(request)}")
+    headers = {
+        "X-RateLimit-Limit": str(result.limit),
+        "X-RateLimit-Remaining": str(result.remaining),
+        "X-RateLimit-Reset": str(math.ceil(result.reset_after))
+    }
+    
+    if not result.allowed:
+        headers["Retry-After"] = retry_after_header(result)
+        return JSONResponse(
+            status_code=429,
+            content={
+                "error": {
+                    "type": "rate_limit_exceeded",
+                    "status_code": 429,
+                    "message": f"Rate limit exceeded, retry in {headers['Retry-After']}s",
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "path": request.url.path
+                }
+            },
+            headers=headers
+        )
+    
+    response = await call_next(request)
+    response.headers.update(headers)
+    return response
+
+def rate_limit_class(method: str, path: str):
+    """Limit class of a request, None for traffic that is not rate limited"""
+    if method == "OPTIONS" or path == "/" or path.startswith(RATE_LIMIT_EXEMPT_PREFIXES):
+        return None
+    if path.startswith(AUTH_ROUTE_PREFIXES):
+        return "auth"
+    if method in ("GET", "HEAD"):
+        return "read"
+    return "write"
+
+def rate_limit_identity(request: Request) -> str:
+    """Authenticated user ID, falling back to the client address"""
+    authorization = request.headers.get("authorization")
+    if authorization and authorization[:7].lower() == "bearer ":
+        user_id = auth_service.get_current_user(authorization[7:])
+        if user_id:
+            return f"user:{user_id}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+@app.middleware("http")
+async def security_headers(request: Request, call_next):
+    """Add security headers"""
+    response = await call_next(request)
+    
+    # Add security headers
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    response.headers["X-Frame-Options"] = "DENY"
+    response.headers["X-XSS-Protection"] = "1; mode=block"
+    response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+    
+    return response
+
+# Registered last so it runs outermost: requests the middleware above rejects
+# (rate limited 429s) are still traced, logged and counted
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Log HTTP requests"""
-    start_time = datetime.utcnow()
+    start_time = time.perf_counter()
     
-    # Process request
-    response = await call_next(request)
+    # Process request inside a server span, continuing the caller's trace
+    with tracer.start_span(
+        f"{request.method} {request.url.path}",
+        parent=parse_traceparent(request.headers.get(TRACEPARENT_HEADER)),
+        kind="server",
+        attributes={"http.method": request.method}
+    ) as span:
+        response = await call_next(request)
+        
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        span.name = f"{request.method} {route_path}"
+        span.set_attribute("http.route", route_path)
+        span.set_attribute("http.status_code", response.status_code)
+        if response.status_code >= 500:
+            span.status = "error"
+        response.headers["X-Trace-Id"] = span.trace_id
     
     # Calculate processing time
-    processing_time = (datetime.utcnow() - start_time).total_seconds()
+    processing_time = time.perf_counter() - start_time
     
     # Log request
     logger.info(
@@ -162,36 +364,16 @@ async def log_requests(request: Request, call_next):
         f"Time: {processing_time:.3f}s"
     )
     
-    # Collect metrics
+    # Collect metrics, labelled by route template to bound their cardinality
     await metrics_collector.record_request(
         method=request.method,
-        path=request.url.path,
+        path=route_path,
         status_code=response.status_code,
         processing_time=processing_time
     )
     
     return response
 
-@app.middleware("http")
-async def rate_limiting(request: Request, call_next):
-    """Rate limiting middleware"""
-    # TODO: Implement rate limiting
-    # For now, just pass through
-    return await call_next(request)
-
-@app.middleware("http")
-async def security_headers(request: Request, call_next):
-    """Add security headers"""
-    response = await call_next(request)
-    
-    # Add security headers
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-    
-    return response
-
 if __name__ == "__main__":
     import uvicorn
     
@@ -1,5 +1,5 @@
 from .user import User, UserCreate
-from .task import Task, TaskCreate, TaskStatus, TaskType
+from .task import Task, TaskCreate, TaskStatus, TaskType, TaskBatchCreate, TaskRoutingDecision
 from .mcp import MCPInfo, MCPStatus, Capability, RoutingFlags
 from .job import Job, JobStatus
 from .result import Result, ResultCreate, ResultType
\ No newline at end of file
@@ -3,6 +3,8 @@ from typing import Optional
 from enum import Enum
 from datetime import datetime
 
+from .task import Task
+
 class JobStatus(str, Enum):
     QUEUED = "queued"
     RUNNING = "running"
@@ -26,6 +28,10 @@ class Job(BaseModel):
     completed_at: Optional[datetime] = None
     error_message: Optional[str] = None
     last_error_at: Optional[datetime] = None
+    result_id: Optional[str] = None
+    # W3C traceparent of the request that created the job
+    trace_parent: Optional[str] = None
+    task: Optional[Task] = None
 
     class Config:
         from_attributes = True
@@ -24,11 +24,12 @@ class StandardResponse(BaseModel, Generic[T]):
         }
 
 class PaginatedResponse(BaseModel, Generic[T]):
-    """Paginated API response model"""
+    """Paginated API response model; pass ``next_cursor`` back as ``cursor`` for the next page"""
     success: bool
     message: str
     data: List[T]
-    pagination: Dict[str, Any]
+    next_cursor: Optional[str] = None
+    pagination: Dict[str, Any] = Field(default_factory=dict)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     metadata: Dict[str, Any] = Field(default_factory=dict)
     
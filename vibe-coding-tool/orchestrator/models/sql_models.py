@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Index, Enum as SQLEnum
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -13,6 +13,17 @@ class TaskStatus(Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class ResultType(Enum):
+    DIRECT = "direct"
+    POINTER = "pointer"
+
 class TaskType(Enum):
     CODE_GENERATION = "code-generation"
     FILE_SEARCH = "file-search"
@@ -28,13 +39,13 @@ class User(Base):
     hashed_password = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    tasks = relationship("Task", back_populates="user")
-
 class Task(Base):
     __tablename__ = "tasks"
 
     id = Column(String, primary_key=True)
-    user_id = Column(String, ForeignKey("users.id"))
+    # The ID the identity provider authenticated; users are not stored in
+    # ``users`` on login, so this is not a foreign key
+    user_id = Column(String, nullable=False)
     type = Column(SQLEnum(TaskType))
     priority = Column(Integer, default=0)
     input_data = Column(Text)  # JSON string
@@ -43,5 +54,57 @@ class Task(Base):
     status = Column(SQLEnum(TaskStatus), default=TaskStatus.PENDING)
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
+    result_id = Column(String, nullable=True)
+    error_message = Column(Text, nullable=True)
+
+    jobs = relationship("Job", back_populates="task")
+
+    __table_args__ = (
+        # Task listing: a user's tasks newest first, optionally by status
+        Index("ix_tasks_user_created", "user_id", "created_at", "id"),
+        Index("ix_tasks_user_status_created", "user_id", "status", "created_at", "id"),
+    )
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True)
+    task_id = Column(String, ForeignKey("tasks.id"), nullable=False)
+    user_id = Column(String, nullable=False)
+    mcp_id = Column(String, nullable=False)
+    mcp_url = Column(String, nullable=False)
+    status = Column(SQLEnum(JobStatus), default=JobStatus.QUEUED)
+    priority = Column(Integer, default=0)
+    timeout = Column(Integer, default=300)
+    retry_count = Column(Integer, default=0)
+    max_retries = Column(Integer, default=3)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    error_message = Column(Text, nullable=True)
+    last_error_at = Column(DateTime, nullable=True)
+    result_id = Column(String, nullable=True)
+
+    task = relationship("Task", back_populates="jobs")
+
+    __table_args__ = (
+        Index("ix_jobs_task_id", "task_id"),
+        Index("ix_jobs_user_status_created", "user_id", "status", "created_at"),
+    )
+
+class Result(Base):
+    __tablename__ = "results"
+
+    id = Column(String, primary_key=True)
+    task_id = Column(String, nullable=False)
+    user_id = Column(String, nullable=False)
+    type = Column(SQLEnum(ResultType))
+    data = Column(Text)  # JSON string
+    result_metadata = Column("metadata", Text, nullable=True)  # JSON string
+    pointer_id = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
 
-    user = relationship("User", back_populates="tasks")
\ No newline at end of file
+    __table_args__ = (
+        Index("ix_results_task_id", "task_id"),
+        Index("ix_results_user_created", "user_id", "created_at"),
+    )
\ No newline at end of file
@@ -25,6 +25,9 @@ class TaskCreate(BaseModel):
     required_capabilities: Optional[List[Capability]] = None
     is_heavy: bool = False
 
+class TaskBatchCreate(BaseModel):
+    tasks: List[TaskCreate]
+
 class Task(BaseModel):
     id: str
     user_id: str
@@ -37,4 +40,11 @@ class Task(BaseModel):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class TaskRoutingDecision(BaseModel):
+    task_id: str
+    status: TaskStatus
+    mcp_id: Optional[str] = None
+    job_id: Optional[str] = None
+    error: Optional[str] = None
@@ -1,15 +1,16 @@
 from typing import Dict, Any, List, Optional
 from datetime import datetime
-import httpx
 import logging
 
 from models.user import User
 from config.settings import settings
+from utils.http_client import HTTPClientRegistry, http_clients as default_http_clients
 
 logger = logging.getLogger(__name__)
 
 class GitHubService:
-    def __init__(self):
+    def __init__(self, http_clients: Optional[HTTPClientRegistry] = None):
+        self.http_clients = http_clients or default_http_clients
         self.base_url = "https://api.github.com"
         self.client_id = settings.github_client_id
         self.client_secret = settings.github_client_secret
@@ -35,43 +36,43 @@ class GitHubService:
             "redirect_uri": self.redirect_uri
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/login/oauth/access_token",
-                data=data,
-                headers={"Accept": "application/json"}
-            )
-            
-            if response.status_code == 200:
-                token_data = response.json()
-                return token_data.get("access_token")
+        client = self.http_clients.get("github")
+        response = await client.post(
+            f"{self.base_url}/login/oauth/access_token",
+            data=data,
+            headers={"Accept": "application/json"}
+        )
+        
+        if response.status_code == 200:
+            token_data = response.json()
+            return token_data.get("access_token")
         
         return None
     
     async def get_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
         """Get user information from GitHub"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/user",
-                headers={"Authorization": f"token {access_token}"}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
+        client = self.http_clients.get("github")
+        response = await client.get(
+            f"{self.base_url}/user",
+            headers={"Authorization": f"token {access_token}"}
+        )
+        
+        if response.status_code == 200:
+            return response.json()
         
         return None
     
     async def get_user_repos(self, access_token: str) -> List[Dict[str, Any]]:
         """Get user's repositories"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/user/repos",
-                headers={"Authorization": f"token {access_token}"},
-                params={"type": "all", "sort": "updated", "per_page": 100}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
+        client = self.http_clients.get("github")
+        response = await client.get(
+            f"{self.base_url}/user/repos",
+            headers={"Authorization": f"token {access_token}"},
+            params={"type": "all", "sort": "updated", "per_page": 100}
+        )
+        
+        if response.status_code == 200:
+            return response.json()
         
         return []
     
@@ -84,42 +85,42 @@ class GitHubService:
             "auto_init": True
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/user/repos",
-                headers={"Authorization": f"token {access_token}"},
-                json=data
-            )
-            
-            if response.status_code == 201:
-                return response.json()
+        client = self.http_clients.get("github")
+        response = await client.post(
+            f"{self.base_url}/user/repos",
+            headers={"Authorization": f"token {access_token}"},
+            json=data
+        )
+        
+        if response.status_code == 201:
+            return response.json()
         
         return None
     
     async def get_repo_contents(self, access_token: str, owner: str, repo: str, path: str = "") -> List[Dict[str, Any]]:
         """Get repository contents"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/repos/{owner}/{repo}/contents/{path}",
-                headers={"Authorization": f"token {access_token}"}
-            )
-            
-            if response.status_code == 200:
-                return response.json() if isinstance(response.json(), list) else [response.json()]
+        client = self.http_clients.get("github")
+        response = await client.get(
+            f"{self.base_url}/repos/{owner}/{repo}/contents/{path}",
+            headers={"Authorization": f"token {access_token}"}
+        )
+        
+        if response.status_code == 200:
+            return response.json() if isinstance(response.json(), list) else [response.json()]
         
         return []
     
     async def get_file_content(self, access_token: str, owner: str, repo: str, path: str) -> Optional[str]:
         """Get file content"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/repos/{owner}/{repo}/contents/{path}",
-                headers={"Authorization": f"token {access_token}"}
-            )
-            
-            if response.status_code == 200:
-                file_data = response.json()
-                return file_data.get("content")
+        client = self.http_clients.get("github")
+        response = await client.get(
+            f"{self.base_url}/repos/{owner}/{repo}/contents/{path}",
+            headers={"Authorization": f"token {access_token}"}
+        )
+        
+        if response.status_code == 200:
+            file_data = response.json()
+            return file_data.get("content")
         
         return None
     
@@ -131,14 +132,14 @@ class GitHubService:
             "branch": "main"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                f"{self.base_url}/repos/{owner}/{repo}/contents/{path}",
-                headers={"Authorization": f"token {access_token}"},
-                json=data
-            )
-            
-            if response.status_code == 201 or response.status_code == 200:
-                return response.json()
+        client = self.http_clients.get("github")
+        response = await client.put(
+            f"{self.base_url}/repos/{owner}/{repo}/contents/{path}",
+            headers={"Authorization": f"token {access_token}"},
+            json=data
+        )
+        
+        if response.status_code == 201 or response.status_code == 200:
+            return response.json()
         
         return None
\ No newline at end of file
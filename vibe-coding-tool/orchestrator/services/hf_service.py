@@ -1,15 +1,16 @@
 from typing import Dict, Any, List, Optional
 from datetime import datetime
-import httpx
 import logging
 
 from models.user import User
 from config.settings import settings
+from utils.http_client import HTTPClientRegistry, http_clients as default_http_clients
 
 logger = logging.getLogger(__name__)
 
 class HuggingFaceService:
-    def __init__(self):
+    def __init__(self, http_clients: Optional[HTTPClientRegistry] = None):
+        self.http_clients = http_clients or default_http_clients
         self.base_url = "https://huggingface.co"
         self.api_url = "https://huggingface.co/api"
         self.client_id = settings.hf_client_id
@@ -38,44 +39,43 @@ class HuggingFaceService:
             "redirect_uri": self.redirect_uri
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.api_url}/oauth/token",
-                data=data
-            )
-            
-            if response.status_code == 200:
-                token_data = response.json()
-                return token_data.get("access_token")
+        client = self.http_clients.get("huggingface")
+        response = await client.post(
+            f"{self.api_url}/oauth/token",
+            data=data
+        )
+        
+        if response.status_code == 200:
+            token_data = response.json()
+            return token_data.get("access_token")
         
         return None
     
     async def get_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
         """Get user information from HuggingFace"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.api_url}/whoami",
-                headers={"Authorization": f"Bearer {access_token}"}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
+        client = self.http_clients.get("huggingface")
+        response = await client.get(
+            f"{self.api_url}/whoami",
+            headers={"Authorization": f"Bearer {access_token}"}
+        )
+        
+        if response.status_code == 200:
+            return response.json()
         
         return None
     
     async def get_user_spaces(self, access_token: str) -> List[Dict[str, Any]]:
-        """Get user's Spaces"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.api_url}/spaces",
-                headers={"Authorization": f"Bearer {access_token}"},
-                params={"author": "me", "sort": "modified", "limit": 50}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
+        """Get user's Spaces; raises httpx.HTTPStatusError if they cannot be listed,
+        so that a failed listing is not mistaken for a user without Spaces"""
+        client = self.http_clients.get("huggingface")
+        response = await client.get(
+            f"{self.api_url}/spaces",
+            headers={"Authorization": f"Bearer {access_token}"},
+            params={"author": "me", "sort": "modified", "limit": 50}
+        )
         
-        return []
+        response.raise_for_status()
+        return response.json()
     
     async def create_space(self, access_token: str, space_name: str, template: str = "gradio/huggingface-space-template") -> Optional[Dict[str, Any]]:
         """Create a new Space"""
@@ -86,15 +86,15 @@ class HuggingFaceService:
             "hardware": "cpu-basic"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.api_url}/spaces/{access_token.split(':')[0]}/{space_name}",
-                headers={"Authorization": f"Bearer {access_token}"},
-                json=data
-            )
-            
-            if response.status_code == 201:
-                return response.json()
+        client = self.http_clients.get("huggingface")
+        response = await client.post(
+            f"{self.api_url}/spaces/{access_token.split(':')[0]}/{space_name}",
+            headers={"Authorization": f"Bearer {access_token}"},
+            json=data
+        )
+        
+        if response.status_code == 201:
+            return response.json()
         
         return None
     
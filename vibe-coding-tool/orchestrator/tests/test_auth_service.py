@@ -0,0 +1,112 @@
+"""
+Test suite for token verification caching and key handling in AuthService
+"""
+
+import pytest
+import time
+from datetime import timedelta
+from unittest.mock import Mock
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwt
+
+from config.settings import settings
+from core import auth_service as auth_module
+from core.auth_service import AuthService
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [10000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def rsa_keys(monkeypatch):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    monkeypatch.setattr(settings, "jwt_algorithm", "RS256")
+    monkeypatch.setattr(settings, "jwt_public_key", public_pem)
+    return private_pem
+
+
+class TestTokenCache:
+    """Test that verified claims are reused only while the token is valid"""
+
+    def test_repeat_verifications_hit_the_cache(self, monkeypatch):
+        service = AuthService()
+        token = service.create_access_token({"sub": "user_1"})
+        decode = Mock(wraps=jwt.decode)
+        monkeypatch.setattr(auth_module.jwt, "decode", decode)
+
+        for _ in range(3):
+            assert service.get_current_user(token) == "user_1"
+        assert decode.call_count == 1
+        assert service.token_cache.hits == 2
+
+        # Callers get their own copy of the claims
+        service.verify_token(token)["sub"] = "someone_else"
+        assert service.get_current_user(token) == "user_1"
+
+        # Invalid tokens are rejected every time and never cached
+        assert service.verify_token(token[:-2] + "xx") is None
+        assert service.verify_token("not-a-token") is None
+        assert len(service.token_cache) == 1
+
+    def test_cache_entry_expires_with_the_token(self, monkeypatch, clock):
+        service = AuthService()
+        token = service.create_access_token({"sub": "user_1"}, expires_delta=timedelta(seconds=30))
+        decode = Mock(wraps=jwt.decode)
+        monkeypatch.setattr(auth_module.jwt, "decode", decode)
+        assert service.get_current_user(token) == "user_1"
+
+        # Trusted until exp, which comes before the cache TTL
+        clock[0] += 29
+        assert service.get_current_user(token) == "user_1"
+        assert decode.call_count == 1
+        clock[0] += 2
+        assert service.get_current_user(token) == "user_1"
+        assert decode.call_count == 2
+
+    def test_dependency_rejects_invalid_credentials(self):
+        token = auth_module.auth_service.create_access_token({"sub": "user_1"})
+        assert auth_module.get_current_user(Mock(credentials=token)) == "user_1"
+
+        refresh = auth_module.auth_service.create_refresh_token({"sub": "user_1"})
+        with pytest.raises(HTTPException) as exc_info:
+            auth_module.get_current_user(Mock(credentials=refresh))
+        assert exc_info.value.status_code == 401
+
+
+class TestAsymmetricKeys:
+    """Test RS256 tokens signed and verified with keys parsed once"""
+
+    def test_rs256_round_trip(self, monkeypatch, rsa_keys):
+        monkeypatch.setattr(settings, "jwt_private_key", rsa_keys)
+        service = AuthService()
+        token = service.create_access_token({"sub": "user_1"})
+
+        assert jwt.get_unverified_header(token)["alg"] == "RS256"
+        assert service.get_current_user(token) == "user_1"
+
+        # HS256 tokens made with the shared secret are no longer accepted
+        forged = jwt.encode({"sub": "user_1", "type": "access"}, settings.jwt_secret, algorithm="HS256")
+        assert service.verify_token(forged) is None
+
+    def test_verify_only_replica(self, monkeypatch, rsa_keys):
+        monkeypatch.setattr(settings, "jwt_private_key", rsa_keys)
+        token = AuthService().create_access_token({"sub": "user_1"})
+
+        monkeypatch.setattr(settings, "jwt_private_key", None)
+        verifier = AuthService()
+        assert verifier.get_current_user(token) == "user_1"
+        with pytest.raises(ValueError):
+            verifier.create_access_token({"sub": "user_1"})
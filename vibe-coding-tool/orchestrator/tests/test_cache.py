@@ -0,0 +1,112 @@
+"""
+Test suite for the bounded LRU/TTL cache
+"""
+
+import pytest
+import time
+from unittest.mock import Mock
+
+from models.result import ResultCreate, ResultType
+from core.result_manager import ResultManager
+from utils.cache import BoundedCache, estimate_size
+from utils.metrics import MetricsCollector
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+class TestBoundedCache:
+    """Test eviction, expiry, quotas and counters"""
+
+    def test_lru_eviction_under_memory_budget(self):
+        cache = BoundedCache("test", max_bytes=300)
+        for key in ("a", "b", "c"):
+            cache.set(key, "x" * 100)
+
+        assert cache.get("a") == "x" * 100
+        cache.set("d", "x" * 100)
+
+        assert "b" not in cache
+        assert {"a", "c", "d"} == {key for key, _ in cache.items()}
+        assert cache.bytes == 300
+        assert cache.evictions == 1
+
+    def test_ttl_expiry_and_sweep(self, clock):
+        cache = BoundedCache("test", default_ttl=10)
+        cache.set("short", 1, ttl=5)
+        cache.set("long", 2)
+        cache.set("forever", 3, ttl=None)
+
+        clock[0] += 6
+        assert cache.get("short") is None
+        assert cache.expirations == 1
+
+        clock[0] += 5
+        assert cache.sweep() == 1
+        assert len(cache) == 1
+        assert cache.get("forever") == 3
+
+    def test_replaced_entry_is_not_swept_early(self, clock):
+        cache = BoundedCache("test", default_ttl=10)
+        cache.set("key", 1)
+        clock[0] += 8
+        cache.set("key", 2)
+
+        clock[0] += 5
+        assert cache.sweep() == 0
+        assert cache.get("key") == 2
+
+    def test_per_owner_quota_evicts_only_that_owner(self):
+        cache = BoundedCache("test", max_bytes=10_000, max_bytes_per_owner=250)
+        cache.set("other", "y" * 100, owner="user_2")
+        for i in range(3):
+            cache.set(f"mine_{i}", "x" * 100, owner="user_1")
+
+        assert "mine_0" not in cache
+        assert cache.owner_bytes("user_1") == 200
+        assert "other" in cache
+
+        assert not cache.set("huge", "x" * 300, owner="user_1")
+        assert cache.rejections == 1
+
+    def test_stats_counters(self):
+        cache = BoundedCache("test")
+        cache.set("a", {"status": "ok"})
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["bytes"] == estimate_size({"status": "ok"})
+
+
+class TestResultManagerCache:
+    """Test the result cache wiring in ResultManager"""
+
+    @pytest.mark.asyncio
+    async def test_results_are_cached_and_exported(self):
+        manager = ResultManager(Mock(), Mock())
+        metrics = MetricsCollector()
+        metrics.register_cache(manager.results_cache)
+
+        result_id = await manager.store_result(ResultCreate(
+            task_id="task_1",
+            user_id="test_user_1",
+            type=ResultType.DIRECT,
+            data={"findings": ["a", "b"]}
+        ))
+
+        result = await manager.get_result(result_id, "test_user_1")
+        assert result.task_id == "task_1"
+        assert result.data == {"findings": ["a", "b"]}
+        assert manager.results_cache.owner_bytes("test_user_1") == estimate_size({"findings": ["a", "b"]})
+
+        cache_metrics = (await metrics.get_metrics())["caches"]["results"]
+        assert cache_metrics["hits"] == 1
+        assert cache_metrics["entries"] == 1
@@ -0,0 +1,152 @@
+"""
+Test suite for job envelope signing and verification
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+import jwt
+from unittest.mock import Mock, AsyncMock, patch
+from datetime import datetime
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+from models.task import Task, TaskStatus, TaskType
+from models.mcp import MCPInfo, MCPStatus, RoutingFlags
+from core.envelope_signer import EnvelopeSigner
+from core.job_envelope import EnvelopeReplayed, EnvelopeVerifier
+from core.job_manager import JobManager
+
+
+def key_pair(private_key):
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    return private_pem, private_key.public_key()
+
+
+@pytest.fixture(scope="module")
+def rsa_pair():
+    return key_pair(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+
+
+def make_task(task_id: str) -> Task:
+    return Task(
+        id=task_id,
+        user_id="test_user_1",
+        type=TaskType.SECURITY_SCAN,
+        input={"repo": "test/repo"},
+        status=TaskStatus.PENDING,
+        created_at=datetime.utcnow()
+    )
+
+
+def make_mcp() -> MCPInfo:
+    return MCPInfo(
+        id="test_mcp_1",
+        name="Test MCP",
+        url="https://test-mcp.example.com",
+        capabilities=[],
+        supported_task_types=["security-scan"],
+        routing_flags=RoutingFlags(),
+        status=MCPStatus.HEALTHY
+    )
+
+
+# The shared library's canonical copy, when the orchestrator is checked out in the monorepo
+SHARED_LIBRARY = Path(__file__).resolve().parents[3] / "metamcp_artifacts" / "job_signing_samples" / "job_envelope.py"
+
+
+class TestEnvelopeSigner:
+    """Test that envelopes verify like those of the reference signer"""
+
+    def test_envelopes_verify_with_the_public_key(self, rsa_pair):
+        private_pem, public_key = rsa_pair
+        signer = EnvelopeSigner(private_pem, "RS256", issuer="metamcp.test", ttl=600, key_id="k1")
+
+        envelopes = [signer.sign({"task_id": f"task_{i}"}) for i in range(3)]
+        claims = [
+            jwt.decode(envelope, public_key, algorithms=["RS256"], options={"verify_aud": False})
+            for envelope in envelopes
+        ]
+
+        assert [c["task_id"] for c in claims] == ["task_0", "task_1", "task_2"]
+        assert all(c["iss"] == "metamcp.test" and c["exp"] - c["iat"] == 600 for c in claims)
+        assert len({c["jti"] for c in claims}) == 3
+        assert jwt.get_unverified_header(envelopes[0]) == {"alg": "RS256", "typ": "JWT", "kid": "k1"}
+
+    def test_ed25519_and_rejected_algorithms(self, rsa_pair):
+        private_pem, public_key = key_pair(ed25519.Ed25519PrivateKey.generate())
+        envelope = EnvelopeSigner(private_pem, "EdDSA").sign({"task_id": "task_1"})
+        assert jwt.decode(envelope, public_key, algorithms=["EdDSA"])["task_id"] == "task_1"
+
+        # Envelopes must not be forgeable by whoever holds a shared secret
+        with pytest.raises(ValueError):
+            EnvelopeSigner(rsa_pair[0], "HS256")
+
+    def test_verifier_rejects_replays_and_other_keys(self, rsa_pair):
+        private_pem, public_key = rsa_pair
+        public_pem = public_key.public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+        verifier = EnvelopeVerifier(public_pem, ["RS256"])
+        envelope = EnvelopeSigner(private_pem).sign({"task_id": "task_1"})
+
+        assert verifier.verify(envelope)["task_id"] == "task_1"
+        with pytest.raises(EnvelopeReplayed):
+            verifier.verify(envelope)
+
+        other_pem = key_pair(rsa.generate_private_key(public_exponent=65537, key_size=2048))[0]
+        with pytest.raises(jwt.InvalidSignatureError):
+            verifier.verify(EnvelopeSigner(other_pem).sign({"task_id": "task_1"}))
+
+    @pytest.mark.skipif(not SHARED_LIBRARY.exists(), reason="shared library not checked out")
+    def test_copy_matches_the_shared_library(self):
+        copy = Path(__file__).resolve().parents[1] / "core" / "job_envelope.py"
+        assert copy.read_bytes() == SHARED_LIBRARY.read_bytes(), "run metamcp_artifacts/sync_shared_modules.sh"
+
+
+class TestDispatchSigning:
+    """Test that each attempt is signed when it is dispatched"""
+
+    @pytest.mark.asyncio
+    async def test_envelopes_are_issued_at_dispatch(self, rsa_pair):
+        private_pem, public_key = rsa_pair
+        signer = EnvelopeSigner(private_pem)
+        signer.sign = Mock(wraps=signer.sign)
+        client = Mock()
+        client.post = AsyncMock(side_effect=[
+            Mock(status_code=500, raise_for_status=Mock(side_effect=RuntimeError("boom"))),
+            Mock(status_code=200, raise_for_status=Mock(), json=Mock(return_value={}))
+        ])
+        http_clients = Mock()
+        http_clients.get.return_value = client
+        result_manager = Mock()
+        result_manager.store_result = AsyncMock(return_value="result_1")
+        manager = JobManager(
+            result_manager, Mock(), Mock(), Mock(), http_clients=http_clients, envelope_signer=signer
+        )
+        manager._running = True
+        manager.job_queue.nack = AsyncMock()
+
+        created = time.time()
+        jobs = await manager.create_jobs([(make_task("task_0"), make_mcp())])
+        assert signer.sign.call_count == 0
+
+        # A job dispatched long after its submission, then retried
+        with patch("time.time", return_value=created + 3600):
+            await manager.process_job(jobs[0].id)
+            await manager.process_job(jobs[0].id)
+
+        sent = [call.kwargs["json"]["envelope_jwt"] for call in client.post.call_args_list]
+        claims = [
+            jwt.decode(envelope, public_key, algorithms=["RS256"], options={"verify_exp": False, "verify_iat": False})
+            for envelope in sent
+        ]
+        assert signer.sign.call_count == 2
+        assert [c["iat"] for c in claims] == [int(created + 3600)] * 2
+        assert claims[0]["jti"] != claims[1]["jti"]
+        assert all(c["task_id"] == "task_0" for c in claims)
+        assert "signature" not in client.post.call_args.kwargs["json"]
@@ -0,0 +1,150 @@
+"""
+Test suite for the task event bus and job progress streaming
+"""
+
+import pytest
+import asyncio
+from unittest.mock import Mock, AsyncMock
+from datetime import datetime
+
+from models.task import Task, TaskStatus, TaskType
+from models.mcp import MCPInfo, MCPStatus, RoutingFlags
+from core.event_bus import EventBus, task_topic
+from core.job_manager import JobManager
+
+
+def make_task(task_id: str) -> Task:
+    return Task(
+        id=task_id,
+        user_id="test_user_1",
+        type=TaskType.SECURITY_SCAN,
+        input={"repo": "test/repo"},
+        status=TaskStatus.PENDING,
+        created_at=datetime.utcnow()
+    )
+
+
+def make_mcp() -> MCPInfo:
+    return MCPInfo(
+        id="test_mcp_1",
+        name="Test MCP",
+        url="https://test-mcp.example.com",
+        capabilities=[],
+        supported_task_types=["security-scan"],
+        routing_flags=RoutingFlags(),
+        status=MCPStatus.HEALTHY
+    )
+
+
+async def drain(subscription) -> list:
+    return [event async for event in subscription]
+
+
+class TestEventBus:
+    """Test replay, resumption and backpressure"""
+
+    @pytest.mark.asyncio
+    async def test_late_subscriber_gets_replay_then_live_events(self):
+        bus = EventBus(replay_size=10, queue_size=10)
+        bus.publish("topic", "status", {"n": 1})
+        bus.publish("topic", "status", {"n": 2})
+
+        subscription = bus.subscribe("topic")
+        bus.publish("topic", "status", {"n": 3}, final=True)
+
+        events = await drain(subscription)
+        assert [event.data["n"] for event in events] == [1, 2, 3]
+        assert subscription.closed
+        assert bus.subscriber_count("topic") == 0
+
+    @pytest.mark.asyncio
+    async def test_resume_from_last_event_id(self):
+        bus = EventBus(replay_size=3, queue_size=10)
+        for n in range(1, 6):
+            bus.publish("topic", "status", {"n": n})
+
+        resumed = bus.subscribe("topic", last_event_id=3)
+        first = await resumed.next_event(timeout=0.1)
+        second = await resumed.next_event(timeout=0.1)
+        assert [first.id, second.id] == [4, 5]
+        assert await resumed.next_event(timeout=0.01) is None
+
+        # Events 2 and 3 have left the replay buffer
+        behind = bus.subscribe("topic", last_event_id=1)
+        assert (await behind.next_event(timeout=0.1)).type == "resync"
+        assert (await behind.next_event(timeout=0.1)).id == 3
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_is_dropped_without_blocking_publisher(self):
+        bus = EventBus(replay_size=100, queue_size=5)
+        slow = bus.subscribe("topic")
+        fast = bus.subscribe("topic")
+
+        for n in range(5):
+            bus.publish("topic", "progress", {"n": n})
+            assert (await fast.next_event(timeout=0.1)).data["n"] == n
+        bus.publish("topic", "progress", {"n": 5})
+
+        assert slow.lagged
+        assert await drain(slow) == []
+        assert bus.dropped_subscribers == 1
+        assert (await fast.next_event(timeout=0.1)).data["n"] == 5
+
+        # The dropped client catches up from the replay buffer
+        caught_up = bus.subscribe("topic", last_event_id=slow.last_event_id)
+        assert (await caught_up.next_event(timeout=0.1)).id == 1
+
+    @pytest.mark.asyncio
+    async def test_subscribing_after_final_event_ends_after_replay(self):
+        bus = EventBus()
+        final = bus.publish("topic", "status", {"status": "completed"}, final=True)
+
+        assert [event.id for event in await drain(bus.subscribe("topic"))] == [final.id]
+        assert await drain(bus.subscribe("topic", last_event_id=final.id)) == []
+
+    @pytest.mark.asyncio
+    async def test_evicted_topic_orphans_its_subscribers(self):
+        bus = EventBus(max_topics=1)
+        subscription = bus.subscribe("task:a")
+        bus.publish("task:a", "status", {"n": 1})
+
+        bus.publish("task:b", "status", {"n": 1})
+
+        assert [event.data for event in await drain(subscription)] == [{"n": 1}]
+        assert subscription.orphaned and not subscription.lagged
+
+
+class TestJobManagerEvents:
+    """Test the events JobManager publishes for a task"""
+
+    @pytest.mark.asyncio
+    async def test_retry_progress_and_completion_are_streamed(self):
+        result_manager = Mock()
+        result_manager.store_result = AsyncMock(return_value="result_1")
+        manager = JobManager(result_manager, Mock(), Mock(), Mock())
+        manager._running = True
+        manager.job_queue.nack = AsyncMock()
+        manager._execute_job = AsyncMock(side_effect=[RuntimeError("boom"), {"ok": True}])
+
+        job = await manager.create_job(make_task("task_1"), make_mcp())
+        subscription = manager.event_bus.subscribe(task_topic("task_1"))
+
+        await manager.process_job(job.id)
+        assert manager.report_progress("task_1", "test_user_1", {"stage": "clone", "percent": 50})
+        assert not manager.report_progress("task_1", "test_user_2", {"stage": "clone"})
+        await manager.process_job(job.id)
+
+        events = await asyncio.wait_for(drain(subscription), timeout=1)
+        assert [(event.type, event.data.get("status")) for event in events] == [
+            ("status", "pending"),
+            ("status", "running"),
+            ("retry", None),
+            ("status", "pending"),
+            ("progress", None),
+            ("status", "running"),
+            ("status", "completed"),
+        ]
+        assert events[2].data["error"] == "boom"
+        assert events[4].data["stage"] == "clone"
+        assert events[-1].final and events[-1].data["result_id"] == "result_1"
+        assert not manager.report_progress("task_1", "test_user_1", {"stage": "late"})
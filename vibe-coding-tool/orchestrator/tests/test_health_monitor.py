@@ -0,0 +1,143 @@
+"""
+Test suite for the MCP health-probe scheduler and circuit breakers
+"""
+
+import pytest
+import asyncio
+import time
+from unittest.mock import Mock
+from datetime import datetime
+
+from fastapi import HTTPException
+
+from models.task import Task, TaskStatus, TaskType
+from models.mcp import MCPInfo, MCPStatus, RoutingFlags
+from core.health_monitor import CircuitBreaker, CircuitState
+from core.registry import MCPRegistry
+from core.task_router import TaskRouter
+
+
+def make_mcp(mcp_id: str) -> MCPInfo:
+    return MCPInfo(
+        id=mcp_id,
+        name=mcp_id,
+        url=f"https://{mcp_id}.example.com",
+        capabilities=[],
+        supported_task_types=["security-scan"],
+        routing_flags=RoutingFlags(),
+        status=MCPStatus.HEALTHY,
+        last_health_check=datetime.utcnow()
+    )
+
+
+@pytest.fixture
+def registry():
+    """Registry whose health probes answer from a status table"""
+    registry = MCPRegistry(Mock(), Mock(), Mock())
+    registry.probe_results = {}
+
+    async def probe(mcp):
+        await asyncio.sleep(0.01)
+        return registry.probe_results.get(mcp.id, MCPStatus.HEALTHY)
+
+    registry.health_monitor.probe = probe
+    return registry
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions"""
+
+    def test_opens_after_threshold_and_half_opens(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr(time, "monotonic", lambda: now[0])
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.allow_request()
+
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allow_request()
+
+        now[0] += 10
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow_request()
+
+        # A failed trial re-opens immediately
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+
+        now[0] += 10
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+
+
+class TestMCPHealthMonitor:
+    """Test probing, EWMA statistics and router integration"""
+
+    @pytest.mark.asyncio
+    async def test_probe_all_is_concurrent(self, registry):
+        monitor = registry.health_monitor
+        mcp_ids = list(registry.mcps)
+
+        start = time.perf_counter()
+        statuses = await registry.check_all_mcps_health()
+        elapsed = time.perf_counter() - start
+
+        assert set(statuses) == set(mcp_ids)
+        assert elapsed < 0.01 * len(mcp_ids)
+        assert all(monitor.snapshot()[mcp_id]["probes"] == 1 for mcp_id in mcp_ids)
+
+    @pytest.mark.asyncio
+    async def test_ewma_tracks_error_rate(self, registry):
+        monitor = registry.health_monitor
+        monitor.alpha = 0.5
+
+        registry.probe_results["semgrep-mcp"] = MCPStatus.UNHEALTHY
+        await monitor.probe_mcp("semgrep-mcp")
+        assert monitor.error_rate("semgrep-mcp") == pytest.approx(0.5)
+        assert "semgrep-mcp" in registry.status_index[MCPStatus.UNHEALTHY]
+
+        registry.probe_results["semgrep-mcp"] = MCPStatus.HEALTHY
+        await monitor.probe_mcp("semgrep-mcp")
+        assert monitor.error_rate("semgrep-mcp") == pytest.approx(0.25)
+        assert monitor.latency("semgrep-mcp") > 0
+
+    @pytest.mark.asyncio
+    async def test_router_skips_open_circuits(self, registry):
+        await registry.register_mcp(make_mcp("scan-b"))
+        router = TaskRouter(registry, Mock())
+        task = Task(
+            id="task_1",
+            user_id="test_user_1",
+            type=TaskType.SECURITY_SCAN,
+            input={},
+            status=TaskStatus.PENDING,
+            created_at=datetime.utcnow()
+        )
+
+        for mcp_id in registry.task_type_index["security-scan"]:
+            if mcp_id != "scan-b":
+                for _ in range(3):
+                    registry.health_monitor.record(mcp_id, MCPStatus.UNHEALTHY, 0.1)
+
+        assert (await router.route_task(task, "test_user_1")).id == "scan-b"
+
+        for _ in range(3):
+            registry.health_monitor.record("scan-b", MCPStatus.UNHEALTHY, 0.1)
+        with pytest.raises(HTTPException) as exc_info:
+            await router.route_task(task, "test_user_1")
+        assert exc_info.value.status_code == 503
+
+    @pytest.mark.asyncio
+    async def test_scheduler_probes_registered_mcps(self, registry):
+        monitor = registry.health_monitor
+        monitor.interval = 0.05
+        monitor.start()
+        await asyncio.sleep(0.3)
+        await monitor.stop()
+
+        snapshot = monitor.snapshot()
+        assert set(snapshot) == set(registry.mcps)
+        assert all(entry["probes"] >= 2 for entry in snapshot.values())
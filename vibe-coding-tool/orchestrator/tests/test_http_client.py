@@ -0,0 +1,32 @@
+"""
+Test suite for the shared HTTP client registry
+"""
+
+import pytest
+
+from utils.http_client import HTTPClientRegistry
+
+
+class TestHTTPClientRegistry:
+    """Test pooled client lifecycle"""
+
+    @pytest.mark.asyncio
+    async def test_clients_are_shared_per_pool(self):
+        registry = HTTPClientRegistry(pool_names=("github", "mcp"))
+        registry.open()
+
+        assert registry.get("github") is registry.get("github")
+        assert registry.get("github") is not registry.get("mcp")
+
+        await registry.aclose()
+        assert registry.clients == {}
+
+    @pytest.mark.asyncio
+    async def test_closed_client_is_recreated(self):
+        registry = HTTPClientRegistry()
+        client = registry.get("mcp")
+        await client.aclose()
+
+        assert registry.get("mcp") is not client
+        await registry.aclose()
+
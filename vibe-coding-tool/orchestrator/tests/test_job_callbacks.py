@@ -0,0 +1,257 @@
+"""
+Test suite for submitted jobs completed by signed worker callbacks
+"""
+
+import pytest
+import asyncio
+import json
+import time
+import httpx
+import jwt
+from unittest.mock import Mock, AsyncMock
+from datetime import datetime
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from fastapi import FastAPI
+
+from models.task import Task, TaskStatus, TaskType
+from models.job import JobStatus
+from models.mcp import MCPInfo, MCPStatus, RoutingFlags
+from core.auth_service import AuthService
+from core.envelope_signer import EnvelopeSigner
+from core.event_bus import task_topic
+from core.job_manager import JobManager, CallbackOutcome
+from api import jobs as jobs_api
+from api.dependencies import get_job_manager
+from config.settings import settings
+from utils.crypto import hmac_sha256_hex
+
+
+def make_task(task_id: str) -> Task:
+    return Task(
+        id=task_id,
+        user_id="test_user_1",
+        type=TaskType.SECURITY_SCAN,
+        input={"repo": "test/repo"},
+        status=TaskStatus.PENDING,
+        created_at=datetime.utcnow()
+    )
+
+
+def make_mcp() -> MCPInfo:
+    return MCPInfo(
+        id="test_mcp_1",
+        name="User Space",
+        url="hf://test_user_1/vibe-worker",
+        capabilities=[],
+        supported_task_types=["security-scan"],
+        routing_flags=RoutingFlags(),
+        status=MCPStatus.HEALTHY
+    )
+
+
+def signed(secret: str, payload: dict, timestamp: float = None):
+    """Body and headers as the worker template sends them"""
+    body = json.dumps(payload).encode()
+    timestamp = str(int(timestamp if timestamp is not None else time.time()))
+    return body, timestamp, "sha256=" + hmac_sha256_hex(secret, timestamp.encode() + b"." + body)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(settings, "job_callback_base_url", "https://orchestrator.example.com/")
+    monkeypatch.setattr(settings, "job_callback_replica_url", None)
+
+    result_manager = Mock()
+    result_manager.store_result = AsyncMock(return_value="result_1")
+    hf_service = Mock()
+    hf_service.get_space_url = AsyncMock(return_value="https://user-vibe-worker.hf.space")
+    client = Mock()
+    client.post = AsyncMock(return_value=Mock(status_code=202, raise_for_status=Mock()))
+    http_clients = Mock()
+    http_clients.get.return_value = client
+
+    private_pem = ed25519.Ed25519PrivateKey.generate().private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    manager = JobManager(
+        result_manager, Mock(), hf_service, AuthService(), http_clients=http_clients,
+        envelope_signer=EnvelopeSigner(private_pem, "EdDSA")
+    )
+    manager._running = True
+    manager.job_queue.ack = AsyncMock()
+    manager.job_queue.nack = AsyncMock()
+    return manager
+
+
+def sent_payload(manager: JobManager) -> dict:
+    """Job payload of the last submission, as the worker reads it from the envelope"""
+    # The worker template's contract: only the envelope, posted to /mcp/exec
+    call = manager.http_clients.get.return_value.post.call_args
+    assert call.args[0] == "https://user-vibe-worker.hf.space/mcp/exec"
+    assert list(call.kwargs["json"]) == ["envelope_jwt"]
+    return jwt.decode(call.kwargs["json"]["envelope_jwt"], options={"verify_signature": False})
+
+
+async def submit(manager: JobManager, task_id: str = "task_1"):
+    job = await manager.create_job(make_task(task_id), make_mcp())
+    await manager.process_job(job.id)
+    return job, sent_payload(manager)
+
+
+class TestJobCallbacks:
+    """Test submit-and-return execution and callback ingestion"""
+
+    @pytest.mark.asyncio
+    async def test_submitted_job_waits_for_signed_callback(self, manager):
+        job, payload = await submit(manager)
+
+        assert payload["callback_url"] == f"https://orchestrator.example.com/api/jobs/{job.id}/callback"
+        assert payload["meta_request_id"] == f"{job.id}:0"
+        # The worker slot is free, but the job is still owned and counted as load
+        assert job.status == JobStatus.RUNNING
+        assert job.id in manager._awaiting_callback
+        assert manager.get_in_flight("test_mcp_1") == 1
+        manager.job_queue.ack.assert_not_awaited()
+
+        secret = payload["callback_secret"]
+        completed = {"status": "completed", "meta_request_id": payload["meta_request_id"], "results": {"ok": True}}
+        body, timestamp, signature = signed(secret, completed)
+
+        forged = signed("not-the-secret", completed)
+        assert await manager.handle_callback(job.id, completed, *forged) == CallbackOutcome.INVALID
+        expired = signed(secret, completed, time.time() - settings.job_callback_max_skew - 60)
+        assert await manager.handle_callback(job.id, completed, *expired) == CallbackOutcome.INVALID
+        assert await manager.handle_callback("job_x", completed, body, timestamp, signature) == CallbackOutcome.UNKNOWN
+
+        assert await manager.handle_callback(job.id, completed, body, timestamp, signature) == CallbackOutcome.ACCEPTED
+        assert job.status == JobStatus.COMPLETED
+        assert job.result_id == "result_1"
+        assert manager.get_in_flight("test_mcp_1") == 0
+        manager.job_queue.ack.assert_awaited_once_with(job)
+
+        # A redelivered callback does not store the result twice
+        assert await manager.handle_callback(job.id, completed, body, timestamp, signature) == CallbackOutcome.DUPLICATE
+        manager.result_manager.store_result.assert_awaited_once()
+        assert manager.result_manager.store_result.call_args.args[0].data == {"ok": True}
+
+    @pytest.mark.asyncio
+    async def test_progress_is_streamed_and_late_attempts_are_stale(self, manager):
+        job, payload = await submit(manager)
+        subscription = manager.event_bus.subscribe(task_topic("task_1"))
+        secret, meta_request_id = payload["callback_secret"], payload["meta_request_id"]
+
+        running = {"status": "running", "meta_request_id": meta_request_id, "progress": {"stage": "semgrep"}}
+        assert await manager.handle_callback(job.id, running, *signed(secret, running)) == CallbackOutcome.ACCEPTED
+
+        failed = {"status": "failed", "meta_request_id": meta_request_id, "error": "clone failed"}
+        assert await manager.handle_callback(job.id, failed, *signed(secret, failed)) == CallbackOutcome.ACCEPTED
+        assert job.status == JobStatus.QUEUED
+        assert job.error_message == "clone failed"
+        manager.job_queue.nack.assert_awaited_once()
+        manager.job_queue.ack.assert_not_awaited()
+
+        # The first attempt's result arrives after the retry was scheduled
+        completed = {"status": "completed", "meta_request_id": meta_request_id, "results": {}}
+        assert await manager.handle_callback(job.id, completed, *signed(secret, completed)) == CallbackOutcome.DUPLICATE
+
+        await manager.process_job(job.id)
+        assert manager._awaiting_callback[job.id][0] == f"{job.id}:1"
+
+        events = [await subscription.next_event(timeout=0.1) for _ in range(6)]
+        assert [(event.type, event.data.get("status")) for event in events] == [
+            ("status", "pending"),
+            ("status", "running"),
+            ("progress", None),
+            ("retry", None),
+            ("status", "pending"),
+            ("status", "running"),
+        ]
+        assert events[2].data["stage"] == "semgrep"
+
+    @pytest.mark.asyncio
+    async def test_missing_callback_times_out_into_retry(self, manager):
+        job = await manager.create_job(make_task("task_1"), make_mcp())
+        job.timeout = 0.05
+        await manager.process_job(job.id)
+        payload = sent_payload(manager)
+        assert job.id in manager._awaiting_callback
+
+        await asyncio.sleep(0.1)
+        assert job.id not in manager._awaiting_callback
+        assert job.status == JobStatus.QUEUED
+        assert "timeout" in job.error_message
+        manager.job_queue.nack.assert_awaited_once()
+
+        # The timed-out attempt reporting in late must not complete the retry
+        late = {"status": "completed", "meta_request_id": payload["meta_request_id"], "results": {}}
+        outcome = await manager.handle_callback(job.id, late, *signed(payload["callback_secret"], late))
+        assert outcome == CallbackOutcome.STALE
+        manager.result_manager.store_result.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_waiting_for_callback(self, manager):
+        job, payload = await submit(manager)
+
+        assert await manager.cancel_task("task_1", "test_user_1")
+        assert job.id not in manager._awaiting_callback
+        manager.job_queue.ack.assert_awaited_once_with(job)
+
+        completed = {"status": "completed", "meta_request_id": payload["meta_request_id"], "results": {}}
+        outcome = await manager.handle_callback(job.id, completed, *signed(payload["callback_secret"], completed))
+        assert outcome == CallbackOutcome.STALE
+        assert job.status == JobStatus.CANCELLED
+
+    @pytest.mark.asyncio
+    async def test_no_callback_without_envelope_signing(self, manager):
+        """Workers only take callback jobs as signed envelopes, so HMAC-signed jobs run synchronously"""
+        manager.envelope_signer = None
+        client = manager.http_clients.get.return_value
+        client.post.return_value = Mock(status_code=200, raise_for_status=Mock(), json=Mock(return_value={"ok": True}))
+
+        job = await manager.create_job(make_task("task_1"), make_mcp())
+        await manager.process_job(job.id)
+
+        payload = client.post.call_args.kwargs["json"]
+        assert "callback_url" not in payload and "signature" in payload
+        assert job.status == JobStatus.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_shared_queue_calls_back_the_dispatching_replica(self, manager, monkeypatch):
+        """Only the replica that dispatched a job waits for its callback, so the shared base URL is not used"""
+        manager.job_queue.shared = True
+        monkeypatch.setattr(settings, "job_callback_replica_url", "http://replica-a.internal:8000")
+
+        job, payload = await submit(manager)
+        assert payload["callback_url"] == f"http://replica-a.internal:8000/api/jobs/{job.id}/callback"
+        assert job.id in manager._awaiting_callback
+
+        # Without its own address a replica runs the job synchronously
+        monkeypatch.setattr(settings, "job_callback_replica_url", None)
+        client = manager.http_clients.get.return_value
+        client.post.return_value = Mock(status_code=200, raise_for_status=Mock(), json=Mock(return_value={"ok": True}))
+        job = await manager.create_job(make_task("task_2"), make_mcp())
+        await manager.process_job(job.id)
+
+        assert "callback_url" not in sent_payload(manager)
+        assert job.status == JobStatus.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_callback_route_uses_job_manager_dependency(self, manager):
+        job, payload = await submit(manager)
+        app = FastAPI()
+        app.include_router(jobs_api.router, prefix="/api")
+        app.dependency_overrides[get_job_manager] = lambda: manager
+
+        completed = {"status": "completed", "meta_request_id": payload["meta_request_id"], "results": {"ok": True}}
+        body, timestamp, signature = signed(payload["callback_secret"], completed)
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post(
+                f"/api/jobs/{job.id}/callback", content=body,
+                headers={"X-Callback-Timestamp": timestamp, "X-Callback-Signature": signature}
+            )
+
+        assert response.status_code == 200
+        assert response.json()["data"]["outcome"] == "accepted"
+        assert job.status == JobStatus.COMPLETED
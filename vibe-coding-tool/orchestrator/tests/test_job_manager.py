@@ -0,0 +1,247 @@
+"""
+Test suite for the JobManager dispatcher
+"""
+
+import pytest
+import asyncio
+from unittest.mock import Mock, AsyncMock
+from datetime import datetime
+
+from models.task import Task, TaskStatus, TaskType
+from models.job import JobStatus
+from models.mcp import MCPInfo, MCPStatus, RoutingFlags
+from core.job_manager import JobManager
+from core.result_manager import ResultManager
+
+
+def make_task(task_id: str, priority: int = 0) -> Task:
+    return Task(
+        id=task_id,
+        user_id="test_user_1",
+        type=TaskType.SECURITY_SCAN,
+        priority=priority,
+        input={"repo": "test/repo"},
+        status=TaskStatus.PENDING,
+        created_at=datetime.utcnow()
+    )
+
+
+def make_mcp(mcp_id: str = "test_mcp_1") -> MCPInfo:
+    return MCPInfo(
+        id=mcp_id,
+        name="Test MCP",
+        url="https://test-mcp.example.com",
+        capabilities=[],
+        supported_task_types=["security-scan"],
+        routing_flags=RoutingFlags(),
+        status=MCPStatus.HEALTHY
+    )
+
+
+@pytest.fixture
+def job_manager():
+    """Job manager with mocked collaborators"""
+    result_manager = Mock()
+    result_manager.store_result = AsyncMock(return_value="result_1")
+    manager = JobManager(result_manager, Mock(), Mock(), Mock())
+    manager.max_concurrent_jobs = 2
+    manager.worker_count = 4
+    manager._slots = asyncio.Semaphore(2)
+    manager.shutdown_timeout = 5
+    return manager
+
+
+class TestJobDispatcher:
+    """Test the bounded worker-pool dispatcher"""
+
+    @pytest.mark.asyncio
+    async def test_in_flight_jobs_are_bounded(self, job_manager):
+        """Never more than max_concurrent_jobs run at once"""
+        peak = 0
+
+        async def execute(job):
+            nonlocal peak
+            peak = max(peak, job_manager.running_jobs)
+            await asyncio.sleep(0.01)
+            return {"ok": True}
+
+        job_manager._execute_job = execute
+        await job_manager.start()
+
+        jobs = [await job_manager.create_job(make_task(f"task_{i}"), make_mcp()) for i in range(10)]
+        await job_manager.stop()
+
+        assert peak == 2
+        assert all(job.status == JobStatus.COMPLETED for job in jobs)
+        assert all(job.result_id == "result_1" for job in jobs)
+
+    @pytest.mark.asyncio
+    async def test_job_timeout_fails_job(self, job_manager):
+        """Jobs exceeding their timeout are failed rather than stalling a worker"""
+        async def execute(job):
+            await asyncio.sleep(10)
+
+        job_manager._execute_job = execute
+        await job_manager.start()
+
+        job = await job_manager.create_job(make_task("task_slow"), make_mcp())
+        job.timeout = 0.05
+        job.max_retries = 1
+        await job_manager.job_queue.join()
+        await job_manager.stop()
+
+        assert job.status == JobStatus.FAILED
+        assert "timeout" in job.error_message
+
+    @pytest.mark.asyncio
+    async def test_cancelled_job_is_skipped(self, job_manager):
+        """Jobs cancelled while queued are never executed"""
+        execute = AsyncMock(return_value={"ok": True})
+        job_manager._execute_job = execute
+
+        job = await job_manager.create_job(make_task("task_cancel"), make_mcp())
+        assert await job_manager.cancel_task("task_cancel", "test_user_1")
+
+        await job_manager.start()
+        await job_manager.stop()
+
+        execute.assert_not_called()
+        assert job.status == JobStatus.CANCELLED
+
+    @pytest.mark.asyncio
+    async def test_jobs_claimed_in_priority_order_when_slots_free(self, job_manager):
+        """Idle workers without a slot do not claim jobs ahead of later, higher priority ones"""
+        release = asyncio.Event()
+        order = []
+
+        async def execute(job):
+            if job.task_id.startswith("blocking"):
+                await release.wait()
+            else:
+                order.append(job.task_id)
+            return {"ok": True}
+
+        job_manager._execute_job = execute
+        await job_manager.start()
+
+        for i in range(2):
+            await job_manager.create_job(make_task(f"blocking_{i}"), make_mcp())
+        await asyncio.sleep(0.01)
+        for i in range(3):
+            await job_manager.create_job(make_task(f"low_{i}"), make_mcp())
+        await asyncio.sleep(0.01)
+        await job_manager.create_job(make_task("urgent", priority=10), make_mcp())
+
+        release.set()
+        await job_manager.stop()
+
+        assert order[0] == "urgent"
+
+    @pytest.mark.asyncio
+    async def test_cancelling_running_job_stops_it(self, job_manager):
+        """A running job's attempt is cancelled and the job is neither completed nor retried"""
+        started = asyncio.Event()
+        stopped = asyncio.Event()
+
+        async def execute(job):
+            if job.task_id != "task_running":
+                return {"ok": True}
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            finally:
+                stopped.set()
+
+        job_manager._execute_job = execute
+        await job_manager.start()
+
+        job = await job_manager.create_job(make_task("task_running"), make_mcp())
+        await asyncio.wait_for(started.wait(), timeout=1)
+        assert await job_manager.cancel_task("task_running", "test_user_1")
+        await asyncio.wait_for(stopped.wait(), timeout=1)
+
+        # The worker is still serving the queue
+        other = await job_manager.create_job(make_task("task_next"), make_mcp())
+        await job_manager.stop()
+
+        assert job.status == JobStatus.CANCELLED
+        assert job.retry_count == 0 and job.result_id is None
+        assert other.status == JobStatus.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_cancel_while_storing_result_is_kept(self, job_manager):
+        """A job cancelled while its result is stored stays cancelled"""
+        async def store_result(result, task=None):
+            await job_manager.cancel_task("task_racing", "test_user_1")
+            return "result_1"
+
+        job_manager.result_manager.store_result = store_result
+        job_manager._execute_job = AsyncMock(return_value={"ok": True})
+
+        job = await job_manager.create_job(make_task("task_racing"), make_mcp())
+        await job_manager.start()
+        await job_manager.stop()
+
+        assert job.status == JobStatus.CANCELLED
+        assert job.result_id is None
+
+
+class TestJobTracking:
+    """Test that only unfinished jobs are tracked, indexed by task"""
+
+    @pytest.mark.asyncio
+    async def test_finished_jobs_leave_active_jobs(self, job_manager):
+        job_manager._execute_job = AsyncMock(return_value={"ok": True})
+        job_manager.finished_jobs.max_entries = 3
+
+        jobs = [await job_manager.create_job(make_task(f"task_{i}"), make_mcp()) for i in range(5)]
+        assert job_manager._active_by_task["task_4"] is jobs[4]
+        await job_manager.start()
+        await job_manager.stop()
+
+        assert job_manager.active_jobs == {} and job_manager._active_by_task == {}
+        assert len(job_manager.finished_jobs) == 3
+        task = await job_manager.get_task("task_4", "test_user_1")
+        assert task.status == TaskStatus.COMPLETED
+        assert not job_manager.report_progress("task_4", "test_user_1", {"stage": "late"})
+        assert not await job_manager.cancel_task("task_4", "test_user_1")
+
+    @pytest.mark.asyncio
+    async def test_listing_pages_through_cached_results(self):
+        hf_service = Mock(list_user_tasks=AsyncMock(return_value=[]))
+        job_manager = JobManager(ResultManager(Mock(), hf_service), Mock(), Mock(), Mock())
+        job_manager._execute_job = AsyncMock(return_value={"ok": True})
+        job_manager.finished_jobs.max_entries = 2
+
+        for i in range(5):
+            await job_manager.create_job(make_task(f"task_{i}"), make_mcp())
+        await job_manager.start()
+        await job_manager.stop()
+
+        # Three finished tasks are only known through their cached results
+        pages, after = [], None
+        while True:
+            page = await job_manager.list_user_tasks("test_user_1", limit=2, after=after)
+            if not page:
+                break
+            pages.append([task.id for task in page])
+            after = (page[-1].created_at, page[-1].id)
+
+        assert pages == [["task_4", "task_3"], ["task_2", "task_1"], ["task_0"]]
+        completed = await job_manager.list_user_tasks("test_user_1", status=TaskStatus.COMPLETED)
+        assert len(completed) == 5
+
+    @pytest.mark.asyncio
+    async def test_redelivered_finished_job_is_not_run_again(self, job_manager):
+        execute = AsyncMock(return_value={"ok": True})
+        job_manager._execute_job = execute
+
+        job = await job_manager.create_job(make_task("task_1"), make_mcp())
+        await job_manager.start()
+        await job_manager.job_queue.join()
+
+        await job_manager.job_queue.enqueue(job.model_copy(update={"status": JobStatus.QUEUED}))
+        await job_manager.stop()
+
+        execute.assert_awaited_once()
+        assert job_manager.active_jobs == {}
@@ -0,0 +1,83 @@
+"""
+Test suite for the job priority queue
+"""
+
+import pytest
+import time
+from datetime import datetime
+
+from models.job import Job, JobStatus
+from core.job_queue import JobPriorityQueue
+
+
+def make_job(job_id: str, priority: int = 0) -> Job:
+    return Job(
+        id=job_id,
+        task_id=f"task_{job_id}",
+        user_id="test_user_1",
+        mcp_id="test_mcp_1",
+        mcp_url="https://test-mcp.example.com",
+        status=JobStatus.QUEUED,
+        created_at=datetime.utcnow(),
+        priority=priority
+    )
+
+
+class TestJobPriorityQueue:
+    """Test priority ordering, aging and indexed updates"""
+
+    def test_higher_priority_dequeued_first(self):
+        queue = JobPriorityQueue(aging_seconds=30)
+        queue.put_nowait(make_job("low", priority=0))
+        queue.put_nowait(make_job("high", priority=2))
+        queue.put_nowait(make_job("mid", priority=1))
+
+        assert [queue.get_nowait().id for _ in range(3)] == ["high", "mid", "low"]
+
+    def test_equal_priority_is_fifo(self):
+        queue = JobPriorityQueue()
+        for i in range(5):
+            queue.put_nowait(make_job(f"job_{i}"))
+
+        assert [queue.get_nowait().id for _ in range(5)] == [f"job_{i}" for i in range(5)]
+
+    def test_aging_prevents_starvation(self, monkeypatch):
+        """A low priority job overtakes newer high priority jobs once it has waited long enough"""
+        now = [1000.0]
+        monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+        queue = JobPriorityQueue(aging_seconds=10)
+        queue.put_nowait(make_job("old_low", priority=0))
+        now[0] += 11
+        queue.put_nowait(make_job("new_high", priority=1))
+
+        assert queue.get_nowait().id == "old_low"
+
+    def test_remove_and_reprioritize(self):
+        queue = JobPriorityQueue()
+        for i in range(10):
+            queue.put_nowait(make_job(f"job_{i}"))
+
+        assert queue.remove("job_3").id == "job_3"
+        assert queue.remove("job_3") is None
+        assert queue.reprioritize("job_9", 5)
+        assert "job_3" not in queue
+
+        order = [queue.get_nowait().id for _ in range(queue.qsize())]
+        assert order[0] == "job_9"
+        assert "job_3" not in order
+        assert len(order) == 9
+
+    @pytest.mark.asyncio
+    async def test_join_accounts_for_removed_jobs(self):
+        queue = JobPriorityQueue()
+        queue.put_nowait(make_job("job_1"))
+        queue.put_nowait(make_job("job_2"))
+
+        queue.remove("job_1")
+        await queue.get()
+        queue.task_done()
+
+        await queue.join()
+        assert queue.empty()
+
@@ -287,6 +287,20 @@ class TestMainApp:
             data = response.json()
             assert "error" in data
 
+    def test_rate_limited_requests_are_logged(self, client):
+        """Test 429 responses reach request logging and metrics"""
+        import main
+        from utils.rate_limiter import RateLimitResult
+
+        rejected = RateLimitResult(False, 10, 0, 5.0, 5.0)
+        with patch.object(main.rate_limiters["read"], "check", return_value=rejected), \
+                patch.object(main.metrics_collector, "record_request") as record_request:
+            response = client.get("/api/tasks")
+
+        assert response.status_code == 429
+        assert "X-Trace-Id" in response.headers
+        assert record_request.call_args.kwargs["status_code"] == 429
+
 
 class TestJobManager:
     """Test the JobManager class"""
@@ -0,0 +1,141 @@
+"""
+Test suite for the streaming metrics aggregation and Prometheus exposition
+"""
+
+import pytest
+import asyncio
+import time
+import urllib.request
+
+from utils.metrics import MetricsCollector, Histogram, quantile, LATENCY_BUCKETS
+from utils.metrics_server import MetricsServer
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [10000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+class TestHistogram:
+    """Test bucketing, percentile estimates and rolling windows"""
+
+    def test_percentiles_interpolate_within_buckets(self):
+        histogram = Histogram()
+        for i in range(1, 101):
+            histogram.observe(i / 100)
+
+        counts = histogram.lifetime()[:-3]
+        # Exact answers are 0.5, 0.95 and 0.99; estimates stay inside their buckets
+        assert 0.25 < quantile(counts, LATENCY_BUCKETS, 0.5) <= 0.5
+        assert 0.5 < quantile(counts, LATENCY_BUCKETS, 0.95) <= 1.0
+        assert 0.5 < quantile(counts, LATENCY_BUCKETS, 0.99) <= 1.0
+        assert quantile([0] * len(counts), LATENCY_BUCKETS, 0.5) is None
+
+        # Boundaries are inclusive, as for Prometheus "le" buckets
+        histogram = Histogram()
+        histogram.observe(0.005)
+        histogram.observe(1000)
+        assert histogram.counts[0] == 1 and histogram.counts[-1] == 1
+
+    def test_windows_only_see_recent_slots(self, clock):
+        histogram = Histogram()
+        histogram.observe(0.1, success=False)
+        clock[0] += 120
+        histogram.observe(0.2)
+        histogram.observe(0.3)
+
+        assert histogram.window(60)[-2:] == [2, 0]
+        assert histogram.window(300)[-2:] == [3, 1]
+        assert histogram.lifetime()[-2:] == [3, 1]
+
+        # The slot of the first sample is reused once the ring wraps
+        clock[0] += 3600
+        histogram.observe(0.4)
+        assert histogram.window(3600)[-2:] == [1, 0]
+        assert histogram.count == 4
+
+
+class TestMetricsCollector:
+    """Test the aggregated summaries and the text exposition"""
+
+    @pytest.mark.asyncio
+    async def test_summary_is_aggregated_per_route_and_window(self, clock):
+        metrics = MetricsCollector()
+        for _ in range(3):
+            await metrics.record_request("GET", "/api/tasks/{task_id}", 200, 0.02)
+        await metrics.record_request("POST", "/api/tasks", 503, 1.5)
+        await metrics.record_mcp_call("mcp_1", "security-scan", 2.0, True)
+        await metrics.record_job("job_1", "security-scan", "completed", 3.0, True)
+
+        summary = await metrics.get_metrics()
+        requests = summary["requests"]
+        assert requests["total_requests"] == 4
+        assert requests["success_rate"] == 75
+        assert requests["status_codes"] == {200: 3, 503: 1}
+        assert requests["routes"]["GET /api/tasks/{task_id}"]["count"] == 3
+        assert requests["latency"]["1m"]["count"] == 4
+
+        clock[0] += 600
+        later = (await metrics.get_metrics())["requests"]["latency"]
+        assert later["1m"]["count"] == 0 and later["1h"]["count"] == 4
+
+        assert summary["mcps"]["mcp_distribution"] == {"mcp_1": 1}
+        assert summary["jobs"]["status_distribution"] == {"completed": 1}
+
+    @pytest.mark.asyncio
+    async def test_prometheus_exposition(self):
+        metrics = MetricsCollector()
+        await metrics.record_request("GET", "/api/tasks", 200, 0.02)
+        await metrics.record_request("GET", "/api/tasks", 500, 0.3)
+        await metrics.record_mcp_call("mcp_\"1\"", "security-scan", 2.0, False)
+
+        text = metrics.render_prometheus()
+        assert "# TYPE http_request_duration_seconds histogram" in text
+        assert 'http_requests_total{method="GET",path="/api/tasks",status="500"} 1' in text
+        assert 'http_request_duration_seconds_bucket{method="GET",path="/api/tasks",le="0.025"} 1' in text
+        assert 'http_request_duration_seconds_bucket{method="GET",path="/api/tasks",le="+Inf"} 2' in text
+        assert 'http_request_duration_seconds_count{method="GET",path="/api/tasks"} 2' in text
+        assert 'mcp_calls_total{mcp_id="mcp_\\"1\\"",tool="security-scan",outcome="failure"} 1' in text
+        assert text.endswith("\n")
+
+
+class TestMetricsServer:
+    """Test the dedicated exposition listener"""
+
+    @pytest.mark.asyncio
+    async def test_scrape_is_served_from_listener_thread(self):
+        metrics = MetricsCollector()
+        depth = [3]
+
+        async def queue_gauges():
+            metrics.set_gauge("mcp_queue_length", "Jobs waiting to be dispatched", (), {(): depth[0]})
+
+        metrics.register_gauge_source(queue_gauges)
+        await metrics.record_request("GET", "/api/tasks", 200, 0.02)
+        await metrics.refresh_gauges()
+
+        server = MetricsServer(metrics, "127.0.0.1", 0)
+        assert server.start()
+        try:
+            url = f"http://127.0.0.1:{server.port}/metrics"
+            # The event loop is blocked while the scrape is served
+            with urllib.request.urlopen(url, timeout=5) as response:
+                assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                body = response.read().decode()
+            assert "mcp_queue_length 3" in body
+            assert 'http_requests_total{method="GET",path="/api/tasks",status="200"} 1' in body
+
+            # Gauges change only when refreshed on the event loop
+            depth[0] = 7
+            body = (await asyncio.to_thread(lambda: urllib.request.urlopen(url, timeout=5).read())).decode()
+            assert "mcp_queue_length 3" in body
+            await metrics.refresh_gauges()
+            body = (await asyncio.to_thread(lambda: urllib.request.urlopen(url, timeout=5).read())).decode()
+            assert "mcp_queue_length 7" in body
+
+            # A second listener on the same port fails softly
+            assert not MetricsServer(metrics, "127.0.0.1", server.port).start()
+        finally:
+            server.stop()
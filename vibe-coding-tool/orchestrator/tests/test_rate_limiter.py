@@ -0,0 +1,99 @@
+"""
+Test suite for the GCRA rate limiter and its memory and Redis backends
+"""
+
+import pytest
+import time
+
+import fakeredis
+
+from utils.rate_limiter import (
+    RateLimiter, MemoryRateLimitBackend, RedisRateLimitBackend, retry_after_header
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [10000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+class TestMemoryBackend:
+    """Test bursts, steady-state admission and key eviction"""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_steady_rate(self, clock):
+        limiter = RateLimiter(max_requests=10, window_seconds=10)
+
+        results = [await limiter.check("user:1") for _ in range(10)]
+        assert all(result.allowed for result in results)
+        assert [result.remaining for result in results[:3]] == [9, 8, 7]
+        assert results[-1].remaining == 0 and results[-1].limit == 10
+
+        denied = await limiter.check("user:1")
+        assert not denied.allowed
+        assert denied.retry_after == pytest.approx(1.0)
+        assert retry_after_header(denied) == "1"
+
+        # Other keys have their own bucket
+        assert await limiter.is_allowed("user:2")
+
+        # One token is replenished per interval
+        clock[0] += 1.0
+        assert await limiter.is_allowed("user:1")
+        assert not await limiter.is_allowed("user:1")
+
+    @pytest.mark.asyncio
+    async def test_idle_and_excess_keys_are_evicted(self, clock):
+        backend = MemoryRateLimitBackend(max_keys=3)
+        limiter = RateLimiter(max_requests=1, window_seconds=1, backend=backend)
+
+        for i in range(5):
+            await limiter.check(f"ip:{i}")
+        assert list(backend.tats) == ["ip:2", "ip:3", "ip:4"]
+
+        # Keys whose bucket has refilled are dropped as new requests arrive
+        clock[0] += 5
+        await limiter.check("ip:5")
+        assert list(backend.tats) == ["ip:4", "ip:5"]
+        assert backend.evictions == 4
+
+        # Denied requests leave the table untouched
+        assert not await limiter.is_allowed("ip:5")
+        assert len(backend) == 2
+
+
+class TestRedisBackend:
+    """Test the Lua GCRA script against fakeredis"""
+
+    @pytest.mark.asyncio
+    async def test_limits_are_shared_between_replicas(self):
+        server = fakeredis.FakeServer()
+        replicas = [
+            RateLimiter(max_requests=5, window_seconds=60, backend=RedisRateLimitBackend(
+                fakeredis.aioredis.FakeRedis(server=server), prefix="test:rl"
+            ))
+            for _ in range(2)
+        ]
+
+        results = [await replicas[i % 2].check("read:user:1") for i in range(6)]
+        assert [result.allowed for result in results] == [True] * 5 + [False]
+        assert [result.remaining for result in results[:5]] == [4, 3, 2, 1, 0]
+        assert 11.0 < results[-1].retry_after <= 12.0
+        assert retry_after_header(results[-1]) == "12"
+
+        client = replicas[0].backend.client
+        assert 0 < await client.pttl("test:rl:read:user:1") <= 60000
+        assert await replicas[1].is_allowed("read:user:2")
+
+    @pytest.mark.asyncio
+    async def test_fails_open_when_redis_is_unavailable(self):
+        server = fakeredis.FakeServer()
+        server.connected = False
+        limiter = RateLimiter(max_requests=1, window_seconds=60, backend=RedisRateLimitBackend(
+            fakeredis.aioredis.FakeRedis(server=server)
+        ))
+
+        assert await limiter.is_allowed("user:1")
+        assert await limiter.is_allowed("user:1")
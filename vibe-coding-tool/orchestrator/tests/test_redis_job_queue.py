@@ -0,0 +1,282 @@
+"""
+Test suite for the Redis-backed job queue, using fakeredis as the server
+"""
+
+import pytest
+import asyncio
+from unittest.mock import Mock, AsyncMock
+from datetime import datetime
+
+import fakeredis
+
+from models.task import Task, TaskStatus, TaskType
+from models.job import Job, JobStatus
+from models.mcp import MCPInfo, MCPStatus, RoutingFlags
+from core.job_manager import JobManager
+from core.redis_job_queue import RedisJobQueue
+
+
+def make_job(job_id: str, priority: int = 0) -> Job:
+    return Job(
+        id=job_id,
+        task_id=f"task_{job_id}",
+        user_id="test_user_1",
+        mcp_id="test_mcp_1",
+        mcp_url="https://test-mcp.example.com",
+        status=JobStatus.QUEUED,
+        created_at=datetime.utcnow(),
+        priority=priority
+    )
+
+
+def make_task(task_id: str) -> Task:
+    return Task(
+        id=task_id,
+        user_id="test_user_1",
+        type=TaskType.SECURITY_SCAN,
+        input={"repo": "test/repo"},
+        status=TaskStatus.PENDING,
+        created_at=datetime.utcnow()
+    )
+
+
+def make_mcp() -> MCPInfo:
+    return MCPInfo(
+        id="test_mcp_1",
+        name="Test MCP",
+        url="https://test-mcp.example.com",
+        capabilities=[],
+        supported_task_types=["security-scan"],
+        routing_flags=RoutingFlags(),
+        status=MCPStatus.HEALTHY
+    )
+
+
+@pytest.fixture
+def server():
+    """One fake Redis server shared by every simulated replica"""
+    return fakeredis.FakeServer()
+
+
+def make_queue(server, consumer: str, **kwargs) -> RedisJobQueue:
+    client = fakeredis.aioredis.FakeRedis(server=server)
+    return RedisJobQueue(client, name="test:jobs", consumer=consumer, poll_interval=0.05, **kwargs)
+
+
+def make_replica(server, consumer: str, executed: list, **kwargs) -> JobManager:
+    result_manager = Mock()
+    result_manager.store_result = AsyncMock(return_value="result_1")
+    manager = JobManager(
+        result_manager, Mock(), Mock(), Mock(),
+        job_queue=make_queue(server, consumer, **kwargs)
+    )
+    manager.worker_count = 4
+    manager._slots = asyncio.Semaphore(4)
+    manager.shutdown_timeout = 5
+
+    async def execute(job):
+        executed.append((consumer, job.id))
+        await asyncio.sleep(0.005)
+        return {"ok": True}
+
+    manager._execute_job = execute
+    return manager
+
+
+class TestRedisJobQueue:
+    """Test ordering and ownership of the shared queue"""
+
+    @pytest.mark.asyncio
+    async def test_priority_order_and_discard(self, server):
+        queue = make_queue(server, "replica-a")
+        await queue.enqueue_many([make_job("low"), make_job("high", priority=2), make_job("mid", priority=1)])
+
+        assert await queue.discard("mid")
+        assert await queue.set_priority("low", 5)
+
+        first = await queue.dequeue()
+        second = await queue.dequeue()
+        assert [first.id, second.id] == ["low", "high"]
+        assert first.priority == 5
+        assert await queue.depth() == 0
+
+        # Owned jobs cannot be discarded or re-scored
+        assert not await queue.discard("low")
+        assert not await queue.set_priority("low", 1)
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_nack_with_delay_redelivers_later(self, server):
+        queue = make_queue(server, "replica-a")
+        await queue.enqueue(make_job("job_1"))
+
+        job = await queue.dequeue()
+        job.retry_count = 1
+        await queue.nack(job, delay=0.1)
+        assert await queue.try_dequeue() is None
+
+        await asyncio.sleep(0.15)
+        redelivered = await queue.try_dequeue()
+        assert redelivered.retry_count == 1
+        assert queue.redelivered == 1
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_unacked_job_is_redelivered_to_other_replica(self, server):
+        replica_a = make_queue(server, "replica-a", visibility_timeout=0.1)
+        replica_b = make_queue(server, "replica-b", visibility_timeout=0.1)
+        await replica_a.enqueue(make_job("job_1"))
+
+        # Replica A claims the job and dies without acking
+        assert (await replica_a.dequeue()).id == "job_1"
+        await replica_a.close()
+        assert await replica_b.try_dequeue() is None
+
+        await asyncio.sleep(0.15)
+        job = await replica_b.try_dequeue()
+        assert job.id == "job_1"
+        await replica_b.ack(job)
+
+        # A late ack from the original owner does not resurrect or drop anything
+        await replica_a.ack(job)
+        await replica_b.close()
+        stats = await replica_b.stats()
+        assert stats["queued"] == 0 and stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_owned_job_is_renewed_past_visibility_timeout(self, server):
+        replica_a = make_queue(server, "replica-a", visibility_timeout=0.1)
+        replica_b = make_queue(server, "replica-b", visibility_timeout=0.1)
+        await replica_a.enqueue(make_job("job_1"))
+
+        # Replica A is alive and keeps the job well past its visibility timeout
+        job = await replica_a.dequeue()
+        await asyncio.sleep(0.35)
+        assert await replica_b.try_dequeue() is None
+
+        await replica_a.ack(job)
+        assert not await replica_a.extend(job)
+        await replica_a.close()
+        stats = await replica_b.stats()
+        assert stats["in_flight"] == 0 and stats["redelivered"] == 0
+
+
+class TestReplicaDelivery:
+    """At-least-once delivery across two simulated orchestrator replicas"""
+
+    @pytest.mark.asyncio
+    async def test_two_replicas_share_work(self, server):
+        executed = []
+        replica_a = make_replica(server, "replica-a", executed)
+        replica_b = make_replica(server, "replica-b", executed)
+        await replica_a.start()
+        await replica_b.start()
+
+        jobs = [await replica_a.create_job(make_task(f"task_{i}"), make_mcp()) for i in range(40)]
+
+        for _ in range(200):
+            if len(executed) >= len(jobs) and not await replica_a.job_queue.depth():
+                break
+            await asyncio.sleep(0.02)
+
+        await replica_a.stop()
+        await replica_b.stop()
+
+        consumers = {consumer for consumer, _ in executed}
+        assert {job_id for _, job_id in executed} == {job.id for job in jobs}
+        assert consumers == {"replica-a", "replica-b"}
+        # Without crashes every job runs exactly once
+        assert len(executed) == len(jobs)
+
+    @pytest.mark.asyncio
+    async def test_job_of_crashed_replica_completes_elsewhere(self, server):
+        executed = []
+        crashed = make_queue(server, "replica-a", visibility_timeout=0.1)
+        replica_b = make_replica(server, "replica-b", executed, visibility_timeout=0.1)
+
+        await crashed.enqueue(make_job("job_1"))
+        await crashed.dequeue()
+        await crashed.close()
+
+        await replica_b.start()
+        for _ in range(100):
+            if executed:
+                break
+            await asyncio.sleep(0.02)
+        await replica_b.stop()
+
+        assert executed == [("replica-b", "job_1")]
+        assert replica_b.finished_jobs.get("task_job_1").status == JobStatus.COMPLETED
+        assert (await replica_b.job_queue.stats())["redelivered"] == 1
+
+    @pytest.mark.asyncio
+    async def test_job_longer_than_visibility_timeout_runs_once(self, server):
+        executed = []
+        replicas = [make_replica(server, name, executed, visibility_timeout=0.3) for name in ("replica-a", "replica-b")]
+        for replica in replicas:
+            async def execute(job, consumer=replica.job_queue.consumer):
+                executed.append((consumer, job.id))
+                await asyncio.sleep(1.0)
+                return {"ok": True}
+            replica._execute_job = execute
+            # One slot each, so only the other replica could claim the job again
+            replica._slots = asyncio.Semaphore(1)
+            await replica.start()
+
+        job = await replicas[0].create_job(make_task("task_long"), make_mcp())
+        for _ in range(100):
+            if job.status == JobStatus.COMPLETED:
+                break
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.4)
+        for replica in replicas:
+            await replica.stop()
+
+        assert len(executed) == 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_job_claimed_by_other_replica(self, server):
+        executed, stopped = [], asyncio.Event()
+        creator = make_replica(server, "replica-a", executed, visibility_timeout=0.3)
+        runner = make_replica(server, "replica-b", executed, visibility_timeout=0.3)
+
+        async def execute(job):
+            executed.append(("replica-b", job.id))
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                stopped.set()
+                raise
+        runner._execute_job = execute
+        await runner.start()
+
+        # Only replica B runs workers, so it claims the job replica A created
+        job = await creator.create_job(make_task("task_remote"), make_mcp())
+        for _ in range(100):
+            if executed:
+                break
+            await asyncio.sleep(0.02)
+
+        assert await creator.cancel_task("task_remote", "test_user_1")
+        await asyncio.wait_for(stopped.wait(), timeout=1)
+        await runner.stop()
+
+        assert runner.finished_jobs.get("task_remote").status == JobStatus.CANCELLED
+        stats = await runner.job_queue.stats()
+        assert stats["queued"] == 0 and stats["in_flight"] == 0
+        assert await runner.job_queue.client.hlen("test:jobs:cancelled") == 0
+        await creator.job_queue.close()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_job_of_crashed_replica_is_not_redelivered(self, server):
+        crashed = make_queue(server, "replica-a", visibility_timeout=0.1)
+        replica_b = make_queue(server, "replica-b", visibility_timeout=0.1)
+        await crashed.enqueue(make_job("job_1"))
+        await crashed.dequeue()
+        await crashed.close()
+
+        assert await replica_b.cancel("job_1")
+        await asyncio.sleep(0.15)
+        assert await replica_b.try_dequeue() is None
+        assert await replica_b.client.hlen("test:jobs:jobs") == 0
+        await replica_b.close()
@@ -0,0 +1,236 @@
+"""
+Test suite for MCPRegistry indexes and user MCP discovery
+"""
+
+import pytest
+import asyncio
+from unittest.mock import Mock, AsyncMock
+from datetime import datetime
+
+import httpx
+
+from models.mcp import MCPInfo, MCPStatus, Capability, RoutingFlags
+from core.registry import MCPRegistry
+
+
+def make_mcp(mcp_id: str, task_types, capabilities=None, user_space: bool = False,
+             status: MCPStatus = MCPStatus.HEALTHY) -> MCPInfo:
+    return MCPInfo(
+        id=mcp_id,
+        name=mcp_id,
+        url=f"https://{mcp_id}.example.com",
+        capabilities=capabilities or [],
+        supported_task_types=task_types,
+        routing_flags=RoutingFlags(can_run_on_user_space=user_space),
+        status=status,
+        last_health_check=datetime.utcnow()
+    )
+
+
+@pytest.fixture
+def registry():
+    """Registry holding only the built-in MCPs"""
+    return MCPRegistry(Mock(), Mock(), Mock())
+
+
+class TestRegistryIndexes:
+    """Test incremental maintenance of the inverted indexes"""
+
+    @pytest.mark.asyncio
+    async def test_register_and_lookup_by_task_type(self, registry):
+        await registry.register_mcp(make_mcp("scan-a", ["security_scan"]))
+        await registry.register_mcp(make_mcp("scan-b", ["security_scan"], status=MCPStatus.WARNING))
+
+        mcps = await registry.get_mcps_for_task("security_scan", user_id="test_user_1")
+        ids = [mcp.id for mcp in mcps]
+
+        assert set(ids) == {"semgrep-mcp", "scan-a", "scan-b"}
+        assert ids[-1] == "scan-b"
+
+    @pytest.mark.asyncio
+    async def test_unregister_removes_from_all_indexes(self, registry):
+        cap = Capability(name="lint", version="2.0.0", parameters={"python"})
+        await registry.register_mcp(make_mcp("linter", ["lint"], [cap], user_space=True))
+        assert "lint" in registry.capability_index
+
+        assert await registry.unregister_mcp("linter")
+        assert not await registry.unregister_mcp("linter")
+
+        assert "lint" not in registry.task_type_index
+        assert "lint" not in registry.capability_index
+        assert "linter" not in registry.get_mcp_ids_by_flag("can_run_on_user_space", True)
+        assert all("linter" not in ids for ids in registry.status_index.values())
+
+    @pytest.mark.asyncio
+    async def test_reregister_after_in_place_update(self, registry):
+        mcp = make_mcp("mutable", ["old_type"])
+        await registry.register_mcp(mcp)
+
+        mcp.supported_task_types = ["new_type"]
+        await registry.register_mcp(mcp)
+
+        assert "old_type" not in registry.task_type_index
+        assert registry.task_type_index["new_type"] == {"mutable"}
+
+    @pytest.mark.asyncio
+    async def test_capability_version_and_parameters(self, registry):
+        await registry.register_mcp(make_mcp("v1", ["lint"], [Capability(name="lint", version="1.0.0", parameters={"python"})]))
+        await registry.register_mcp(make_mcp("v2", ["lint"], [Capability(name="lint", version="2.0.0", parameters={"python", "go"})]))
+
+        required = Capability(name="lint", version="1.5.0", parameters=set())
+        assert registry.get_mcp_ids_by_capability(required) == {"v2"}
+
+        required = Capability(name="lint", version="1.0.0", parameters={"go"})
+        assert registry.get_mcp_ids_by_capability(required) == {"v2"}
+
+    @pytest.mark.asyncio
+    async def test_status_updates_move_buckets(self, registry):
+        assert await registry.update_mcp_status("semgrep-mcp", MCPStatus.UNHEALTHY)
+        assert "semgrep-mcp" in registry.status_index[MCPStatus.UNHEALTHY]
+        assert "semgrep-mcp" not in registry.status_index[MCPStatus.HEALTHY]
+        assert not await registry.update_mcp_status("missing", MCPStatus.HEALTHY)
+
+    @pytest.mark.asyncio
+    async def test_routing_flag_buckets(self, registry):
+        user_space = {mcp.id for mcp in await registry.get_user_space_mcps()}
+        oracle = {mcp.id for mcp in await registry.get_oracle_mcps()}
+
+        assert user_space == {"tree-sitter-mcp", "semgrep-mcp"}
+        assert oracle == {"github-mcp"}
+
+    @pytest.mark.asyncio
+    async def test_keyset_pages_follow_registration_order(self, registry):
+        for i in range(7):
+            await registry.register_mcp(make_mcp(f"extra-{i}", ["lint"], status=MCPStatus.WARNING))
+        await registry.unregister_mcp("extra-3")
+        # Re-registering keeps the original position
+        await registry.register_mcp(make_mcp("extra-0", ["lint"], status=MCPStatus.WARNING))
+
+        seen, after = [], None
+        while True:
+            page = registry.list_mcps_page(4, after=after)
+            seen += [mcp.id for mcp in page]
+            if len(page) < 4:
+                break
+            after = (registry.registered_at[page[-1].id], page[-1].id)
+
+        expected = ["github-mcp", "tree-sitter-mcp", "semgrep-mcp"] + [f"extra-{i}" for i in range(7) if i != 3]
+        assert seen == expected
+
+        warning = registry.list_mcps_page(2, after=(registry.registered_at["extra-1"], "extra-1"), status=MCPStatus.WARNING)
+        assert [mcp.id for mcp in warning] == ["extra-2", "extra-4"]
+
+
+MANIFEST = {
+    "name": "User Linter",
+    "capabilities": [{"name": "lint", "version": "1.0.0", "parameters": ["python"], "task_types": ["lint"]}]
+}
+
+
+class StubClients:
+    """HTTP client registry whose clients answer from an httpx transport"""
+
+    def __init__(self, handler):
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    def get(self, name: str = "default") -> httpx.AsyncClient:
+        return self.client
+
+
+def make_discovery_registry(handler, spaces_per_user: int = 3, users: int = 4) -> MCPRegistry:
+    auth_service = Mock()
+    auth_service.get_all_users = AsyncMock(return_value=[Mock(id=f"user_{u}") for u in range(users)])
+
+    hf_service = Mock()
+    hf_service.get_user_spaces = AsyncMock(side_effect=lambda user_id: [
+        {"owner": user_id, "name": f"space{s}", "url": f"https://{user_id}-space{s}.hf.space"}
+        for s in range(spaces_per_user)
+    ])
+
+    return MCPRegistry(auth_service, Mock(), hf_service, http_clients=StubClients(handler))
+
+
+class TestUserMCPDiscovery:
+    """Test concurrent discovery, manifest revalidation and progress tracking"""
+
+    @pytest.mark.asyncio
+    async def test_discovery_is_concurrent_and_bounded(self):
+        in_flight = {"current": 0, "peak": 0}
+
+        async def handler(request):
+            in_flight["current"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+            await asyncio.sleep(0.01)
+            in_flight["current"] -= 1
+            return httpx.Response(200, json=MANIFEST)
+
+        registry = make_discovery_registry(handler)
+        registry.discovery_concurrency = 5
+        await registry._load_user_mcps()
+
+        progress = registry.discovery_progress
+        assert progress["users_done"] == 4
+        assert progress["spaces_probed"] == 12
+        assert progress["mcps_found"] == 12
+        assert not progress["running"]
+        assert 1 < in_flight["peak"] <= 5
+        assert "user_0-space0" in registry.task_type_index["lint"]
+
+    @pytest.mark.asyncio
+    async def test_not_modified_manifest_is_reused(self):
+        seen_headers = []
+
+        def handler(request):
+            seen_headers.append(request.headers.get("if-none-match"))
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=MANIFEST, headers={"ETag": '"v1"'})
+
+        registry = make_discovery_registry(handler, spaces_per_user=1, users=1)
+        await registry._load_user_mcps()
+        await registry._load_user_mcps()
+
+        assert seen_headers == [None, '"v1"']
+        assert registry.discovery_progress["manifests_not_modified"] == 1
+        assert registry.registry.get("user_0-space0").name == "User Linter"
+
+    @pytest.mark.asyncio
+    async def test_vanished_space_is_unregistered(self):
+        available = {"ok": True}
+
+        def handler(request):
+            if available["ok"]:
+                return httpx.Response(200, json=MANIFEST)
+            return httpx.Response(404)
+
+        registry = make_discovery_registry(handler, spaces_per_user=1, users=1)
+        await registry._load_user_mcps()
+        assert registry.registry.get("user_0-space0") is not None
+
+        available["ok"] = False
+        await registry._load_user_mcps()
+        assert registry.registry.get("user_0-space0") is None
+        assert "lint" not in registry.task_type_index
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", [429, 500, 503])
+    async def test_transient_manifest_failure_keeps_mcp(self, status):
+        responses = iter([httpx.Response(200, json=MANIFEST), httpx.Response(status)])
+        registry = make_discovery_registry(lambda request: next(responses), spaces_per_user=1, users=1)
+        await registry._load_user_mcps()
+
+        await registry._load_user_mcps()
+        assert registry.registry.get("user_0-space0") is not None
+        assert registry.user_mcp_ids["user_0"] == {"user_0-space0"}
+        assert registry.discovery_progress["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_space_listing_keeps_mcps(self):
+        registry = make_discovery_registry(lambda request: httpx.Response(200, json=MANIFEST), users=1)
+        await registry._load_user_mcps()
+
+        registry.hf_service.get_user_spaces.side_effect = httpx.ConnectError("HF API unreachable")
+        await registry._load_user_mcps()
+        assert len(registry.user_mcp_ids["user_0"]) == 3
+        assert len(registry.task_type_index["lint"]) == 3
+        assert registry.discovery_progress["errors"] == 1
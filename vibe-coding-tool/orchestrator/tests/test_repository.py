@@ -0,0 +1,232 @@
+"""
+Test suite for the database repositories, run against SQLite (aiosqlite)
+"""
+
+import pytest
+import pytest_asyncio
+from unittest.mock import Mock, AsyncMock
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from models.task import Task, TaskStatus, TaskType
+from models.job import JobStatus
+from models.mcp import MCPInfo, MCPStatus, RoutingFlags, Capability
+from models.result import ResultCreate, ResultType
+from core.database import Database, to_async_url
+from core.repositories import TaskRepository, JobRepository, ResultRepository
+from core.job_manager import JobManager
+from core.result_manager import ResultManager
+from utils.pagination import encode_cursor, decode_cursor, next_cursor
+
+
+def make_task(task_id: str, created_at: datetime, user_id: str = "test_user_1", **kwargs) -> Task:
+    return Task(
+        id=task_id,
+        user_id=user_id,
+        type=TaskType.SECURITY_SCAN,
+        input={"repo": "test/repo"},
+        created_at=created_at,
+        **kwargs
+    )
+
+
+def make_mcp() -> MCPInfo:
+    return MCPInfo(
+        id="test_mcp_1",
+        name="Test MCP",
+        url="https://test-mcp.example.com",
+        capabilities=[],
+        supported_task_types=["security-scan"],
+        routing_flags=RoutingFlags(),
+        status=MCPStatus.HEALTHY
+    )
+
+
+@pytest_asyncio.fixture
+async def database(tmp_path):
+    database = Database(url=f"sqlite:///{tmp_path / 'orchestrator.db'}", create_tables=True)
+    await database.connect()
+    yield database
+    await database.close()
+
+
+def test_async_url_rewrites_sync_drivers():
+    assert to_async_url("postgresql://u:p@db:5432/vibe") == "postgresql+asyncpg://u:p@db:5432/vibe"
+    assert to_async_url("postgresql+asyncpg://u:p@db/vibe") == "postgresql+asyncpg://u:p@db/vibe"
+    assert to_async_url("sqlite:///local.db") == "sqlite+aiosqlite:///local.db"
+
+
+class TestTaskRepository:
+    """Test persistence and indexed page queries of tasks"""
+
+    @pytest.mark.asyncio
+    async def test_page_query_orders_filters_and_paginates(self, database):
+        repository = TaskRepository(database)
+        start = datetime(2024, 1, 1)
+        lint = Capability(name="lint", version="1.0.0", parameters={"python"})
+        tasks = [
+            make_task(
+                f"task_{i}", start + timedelta(minutes=i),
+                status=TaskStatus.COMPLETED if i % 2 else TaskStatus.PENDING,
+                required_capabilities=[lint] if i == 0 else None
+            )
+            for i in range(10)
+        ]
+        tasks.append(make_task("other_user", start, user_id="test_user_2"))
+        await repository.add_many(tasks)
+
+        page = await repository.list_for_user("test_user_1", limit=3, offset=2)
+        assert [task.id for task in page] == ["task_7", "task_6", "task_5"]
+
+        completed = await repository.list_for_user("test_user_1", status=TaskStatus.COMPLETED)
+        assert [task.id for task in completed] == ["task_9", "task_7", "task_5", "task_3", "task_1"]
+
+        first = await repository.get("task_0", "test_user_1")
+        assert first.required_capabilities == [lint]
+        assert await repository.get("task_0", "test_user_2") is None
+
+    @pytest.mark.asyncio
+    async def test_cursor_walks_every_task_once(self, database):
+        repository = TaskRepository(database)
+        start = datetime(2024, 1, 1)
+        # Ties on created_at are broken by id
+        tasks = [make_task(f"task_{i:02d}", start + timedelta(minutes=i // 3)) for i in range(25)]
+        await repository.add_many(tasks)
+
+        seen, cursor = [], None
+        while True:
+            page = await repository.list_for_user(
+                "test_user_1", limit=7, after=decode_cursor(cursor) if cursor else None
+            )
+            seen += [task.id for task in page]
+            cursor = next_cursor(page, 7)
+            if cursor is None:
+                break
+
+        expected = sorted(tasks, key=lambda task: (task.created_at, task.id), reverse=True)
+        assert seen == [task.id for task in expected]
+
+    def test_cursor_round_trip_and_rejects_garbage(self):
+        created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+        assert decode_cursor(encode_cursor(created_at, "task_1")) == (created_at, "task_1")
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    @pytest.mark.asyncio
+    async def test_status_page_uses_composite_index(self, database):
+        async with database.session() as session:
+            plan = (await session.execute(text(
+                "EXPLAIN QUERY PLAN SELECT * FROM tasks WHERE user_id = 'u' AND status = 'PENDING' "
+                "ORDER BY created_at DESC, id DESC LIMIT 50"
+            ))).all()
+
+        detail = " ".join(row[-1] for row in plan)
+        assert "ix_tasks_user_status_created" in detail
+        assert "TEMP B-TREE" not in detail
+
+    @pytest.mark.asyncio
+    async def test_deep_page_seeks_through_index(self, database):
+        async with database.session() as session:
+            plan = (await session.execute(text(
+                "EXPLAIN QUERY PLAN SELECT * FROM tasks WHERE user_id = 'u' "
+                "AND (created_at, id) < ('2024-01-01 00:00:00', 'task_1') "
+                "ORDER BY created_at DESC, id DESC LIMIT 50"
+            ))).all()
+
+        detail = " ".join(row[-1] for row in plan)
+        # The cursor is part of the index search, not a filter over skipped rows
+        assert "USING INDEX ix_tasks_user_created (user_id=? AND (created_at,id)<(?,?))" in detail
+        assert "TEMP B-TREE" not in detail
+
+
+class TestJobStatePersistence:
+    """Test batched writes of job state transitions"""
+
+    @pytest.mark.asyncio
+    async def test_transitions_are_batched_and_listed_from_database(self, database):
+        job_repository = JobRepository(database, flush_interval=60, batch_size=1000)
+        result_manager = Mock()
+        result_manager.store_result = AsyncMock(return_value="result_1")
+        manager = JobManager(
+            result_manager, Mock(), Mock(), Mock(),
+            task_repository=TaskRepository(database),
+            job_repository=job_repository
+        )
+        manager._execute_job = AsyncMock(return_value={"ok": True})
+
+        now = datetime.utcnow()
+        jobs = await manager.create_jobs([
+            (make_task(f"task_{i}", now + timedelta(seconds=i)), make_mcp()) for i in range(20)
+        ])
+        # Queued, running and completed collapse into one buffered row for the first job
+        await manager.process_job(jobs[0].id)
+        assert job_repository.pending == 20
+        assert job_repository.flushes == 0
+
+        # Listing flushes the buffer, then pages straight from the tasks table
+        tasks = await manager.list_user_tasks("test_user_1", limit=5)
+        assert job_repository.flushes == 1
+        assert job_repository.pending == 0
+        assert [task.id for task in tasks] == [f"task_{i}" for i in range(19, 14, -1)]
+
+        completed = await manager.list_user_tasks("test_user_1", status=TaskStatus.COMPLETED)
+        assert [task.id for task in completed] == ["task_0"]
+
+        row = await job_repository.get(jobs[0].id)
+        assert row["status"].value == JobStatus.COMPLETED.value
+        assert row["result_id"] == "result_1"
+        assert len(await job_repository.list_for_task("task_0")) == 1
+
+    @pytest.mark.asyncio
+    async def test_flush_satisfies_enforced_foreign_keys(self, database):
+        async with database.session() as session:
+            assert (await session.execute(text("PRAGMA foreign_keys"))).scalar() == 1
+
+        # Users are never written to the users table; their tasks still persist
+        job_repository = JobRepository(database, flush_interval=60)
+        manager = JobManager(Mock(), Mock(), Mock(), Mock(), job_repository=job_repository)
+        job = await manager.create_job(make_task("task_1", datetime.utcnow(), user_id="github:42"), make_mcp())
+        assert await job_repository.flush() == 1
+
+        # A job whose task was never recorded is still rejected
+        orphan = job.model_copy(update={"id": "orphan", "task_id": "missing", "task": None})
+        job_repository.record(orphan)
+        with pytest.raises(Exception):
+            await job_repository.flush()
+        assert job_repository.pending == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_remaining_states(self, database):
+        job_repository = JobRepository(database, flush_interval=60)
+        manager = JobManager(Mock(), Mock(), Mock(), Mock(), job_repository=job_repository)
+        job_repository.start()
+
+        task = make_task("task_1", datetime.utcnow())
+        await manager.create_job(task, make_mcp())
+        assert await manager.cancel_task("task_1", "test_user_1")
+        await job_repository.stop()
+
+        stored = await TaskRepository(database).get("task_1", "test_user_1")
+        assert stored.status == TaskStatus.CANCELLED
+
+
+class TestResultRepository:
+    """Test results outliving the in-memory cache"""
+
+    @pytest.mark.asyncio
+    async def test_evicted_result_is_read_from_database(self, database):
+        manager = ResultManager(Mock(), Mock(), ResultRepository(database))
+        result_id = await manager.store_result(ResultCreate(
+            task_id="task_1",
+            user_id="test_user_1",
+            type=ResultType.DIRECT,
+            data={"findings": ["a"]},
+            metadata={"mcp": "test_mcp_1"}
+        ))
+        manager.results_cache.clear()
+
+        result = await manager.get_result(result_id, "test_user_1")
+        assert result.data == {"findings": ["a"]}
+        assert result.metadata == {"mcp": "test_mcp_1"}
+        assert await manager.result_repository.get(result_id, "test_user_2") is None
@@ -0,0 +1,180 @@
+"""
+Test suite for load-aware routing in TaskRouter
+"""
+
+import pytest
+import pytest_asyncio
+import random
+from collections import Counter
+from unittest.mock import Mock
+from datetime import datetime
+
+from models.task import Task, TaskStatus, TaskType
+from models.mcp import MCPInfo, MCPStatus, RoutingFlags, Capability
+from core.registry import MCPRegistry
+from core.job_manager import JobManager
+from core.task_router import TaskRouter
+from utils.metrics import MetricsCollector
+
+
+def make_mcp(mcp_id: str) -> MCPInfo:
+    return MCPInfo(
+        id=mcp_id,
+        name=mcp_id,
+        url=f"https://{mcp_id}.example.com",
+        capabilities=[],
+        supported_task_types=["security-scan"],
+        routing_flags=RoutingFlags(can_run_on_user_space=True),
+        status=MCPStatus.HEALTHY,
+        last_health_check=datetime.utcnow()
+    )
+
+
+def make_task(task_id: str, task_type: TaskType = TaskType.SECURITY_SCAN, **kwargs) -> Task:
+    return Task(
+        id=task_id,
+        user_id="test_user_1",
+        type=task_type,
+        input={},
+        status=TaskStatus.PENDING,
+        created_at=datetime.utcnow(),
+        **kwargs
+    )
+
+
+@pytest_asyncio.fixture
+async def router():
+    """Router over four equivalent MCPs with a live job manager and metrics"""
+    registry = MCPRegistry(Mock(), Mock(), Mock())
+    for mcp_id in list(registry.mcps):
+        await registry.unregister_mcp(mcp_id)
+    for i in range(4):
+        await registry.register_mcp(make_mcp(f"scan-{i}"))
+
+    metrics = MetricsCollector()
+    job_manager = JobManager(Mock(), Mock(), Mock(), Mock(), metrics_collector=metrics)
+    router = TaskRouter(registry, Mock(), job_manager, metrics)
+    router._rng = random.Random(7)
+    return router
+
+
+class TestLoadAwareRouting:
+    """Test power-of-two-choices selection and route cache invalidation"""
+
+    @pytest.mark.asyncio
+    async def test_load_spreads_evenly(self, router):
+        for i in range(400):
+            task = make_task(f"task_{i}")
+            mcp = await router.route_task(task, "test_user_1")
+            await router.job_manager.create_job(task, mcp)
+
+        load = Counter({mcp_id: router.job_manager.get_in_flight(mcp_id) for mcp_id in router.registry.mcps})
+        assert sum(load.values()) == 400
+        assert max(load.values()) - min(load.values()) <= 4
+
+    @pytest.mark.asyncio
+    async def test_slow_mcp_gets_less_traffic(self, router):
+        for _ in range(50):
+            await router.metrics_collector.record_mcp_call("scan-0", "security-scan", 5.0, True)
+
+        chosen = Counter()
+        for i in range(400):
+            task = make_task(f"task_{i}")
+            mcp = await router.route_task(task, "test_user_1")
+            await router.job_manager.create_job(task, mcp)
+            chosen[mcp.id] += 1
+
+        assert chosen["scan-0"] < min(chosen[f"scan-{i}"] for i in range(1, 4))
+
+    @pytest.mark.asyncio
+    async def test_route_cache_keeps_candidates_across_load_changes(self, router):
+        task = make_task("task_1")
+        first = await router.route_task(task, "test_user_1")
+        cache_key = router._route_key(task, "test_user_1")
+        assert cache_key in router.route_cache
+
+        # New load keeps the cached candidates but steers selection away
+        for i in range(5):
+            await router.job_manager.create_job(make_task(f"busy_{i}"), first)
+        chosen = [await router.route_task(task, "test_user_1") for _ in range(20)]
+        assert cache_key in router.route_cache
+        assert all(mcp.id != first.id for mcp in chosen)
+
+    @pytest.mark.asyncio
+    async def test_route_cache_invalidated_by_health(self, router):
+        task = make_task("task_1")
+        await router.route_task(task, "test_user_1")
+
+        for _ in range(3):
+            router.registry.health_monitor.record("scan-0", MCPStatus.UNHEALTHY, 0.1)
+        assert router._get_cached_candidates(router._route_key(task, "test_user_1")) is None
+        chosen = [await router.route_task(task, "test_user_1") for _ in range(20)]
+        assert all(mcp.id != "scan-0" for mcp in chosen)
+
+    @pytest.mark.asyncio
+    async def test_route_cache_separates_capability_parameters(self, router):
+        python_only = make_mcp("lint-python")
+        python_only.capabilities = [Capability(name="lint", version="1.0.0", parameters={"python"})]
+        both = make_mcp("lint-both")
+        both.capabilities = [Capability(name="lint", version="1.0.0", parameters={"python", "js"})]
+        await router.registry.register_mcp(python_only)
+        await router.registry.register_mcp(both)
+
+        def lint_task(task_id, parameters):
+            return make_task(task_id, required_capabilities=[Capability(name="lint", version="1.0.0", parameters=parameters)])
+
+        await router.route_task(lint_task("python", {"python"}), "test_user_1")
+        chosen = [await router.route_task(lint_task(f"js_{i}", {"python", "js"}), "test_user_1") for i in range(20)]
+
+        assert {mcp.id for mcp in chosen} == {"lint-both"}
+
+    @pytest.mark.asyncio
+    async def test_route_cache_is_bounded(self, router):
+        router.route_cache.max_entries = 2
+        for i in range(5):
+            await router.route_task(make_task(f"task_{i}"), f"user_{i}")
+
+        assert len(router.route_cache) == 2
+
+class TestBatchRouting:
+    """Test route_many and bulk job creation"""
+
+    @pytest.mark.asyncio
+    async def test_route_many_spreads_batch_and_reports_errors(self, router):
+        tasks = [make_task(f"task_{i}") for i in range(100)]
+        tasks.append(make_task("unroutable", TaskType.FILE_SEARCH))
+
+        decisions = await router.route_many(tasks, "test_user_1")
+
+        assert len(decisions) == len(tasks)
+        assert decisions[-1]["mcp_info"] is None
+        assert "file-search" in decisions[-1]["error"]
+
+        chosen = Counter(decision["mcp_info"].id for decision in decisions[:-1])
+        assert set(chosen.values()) == {25}
+
+        jobs = await router.job_manager.create_jobs([
+            (task, decision["mcp_info"]) for task, decision in zip(tasks[:-1], decisions[:-1])
+        ])
+        assert len(jobs) == 100
+        assert router.job_manager.job_queue.qsize() == 100
+        assert router.job_manager.get_in_flight("scan-0") == 25
+
+    @pytest.mark.asyncio
+    async def test_route_many_respects_capabilities_and_existing_load(self, router):
+        lint = Capability(name="lint", version="1.0.0", parameters={"python"})
+        capable = make_mcp("scan-lint")
+        capable.capabilities = [lint]
+        await router.registry.register_mcp(capable)
+
+        # Existing load on scan-1 steers plain tasks away from it
+        for i in range(10):
+            await router.job_manager.create_job(make_task(f"busy_{i}"), router.registry.mcps["scan-1"])
+
+        tasks = [make_task("needs_lint", required_capabilities=[lint])]
+        tasks += [make_task(f"plain_{i}") for i in range(8)]
+        decisions = await router.route_many(tasks, "test_user_1")
+
+        assert decisions[0]["mcp_info"].id == "scan-lint"
+        assert all(decision["mcp_info"].id != "scan-1" for decision in decisions[1:])
+
@@ -0,0 +1,191 @@
+"""
+Test suite for the task API routes over the app's services
+"""
+
+import pytest
+import asyncio
+import httpx
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, AsyncMock
+from datetime import datetime
+
+from models.task import Task, TaskStatus, TaskType
+from models.mcp import MCPInfo, MCPStatus, RoutingFlags
+from core.job_manager import JobManager
+from core.auth_service import auth_service, get_current_user
+from api import tasks as tasks_api
+
+
+def make_task(task_id: str) -> Task:
+    return Task(
+        id=task_id,
+        user_id="test_user_1",
+        type=TaskType.SECURITY_SCAN,
+        input={"repo": "test/repo"},
+        status=TaskStatus.PENDING,
+        created_at=datetime.utcnow()
+    )
+
+
+def make_mcp() -> MCPInfo:
+    return MCPInfo(
+        id="test_mcp_1",
+        name="Test MCP",
+        url="https://test-mcp.example.com",
+        capabilities=[],
+        supported_task_types=["security-scan"],
+        routing_flags=RoutingFlags(),
+        status=MCPStatus.HEALTHY
+    )
+
+
+@pytest.fixture
+def job_manager():
+    result_manager = Mock()
+    result_manager.store_result = AsyncMock(return_value="result_1")
+    manager = JobManager(result_manager, Mock(), Mock(), Mock())
+    manager._execute_job = AsyncMock(return_value={"ok": True})
+    return manager
+
+
+@pytest.fixture
+def app(job_manager):
+    """App serving the task routes, with services on app.state as the lifespan sets them"""
+    app = FastAPI()
+    app.include_router(tasks_api.router, prefix="/api")
+    app.state.job_manager = job_manager
+    app.state.task_router = Mock(route_task=AsyncMock(return_value=make_mcp()))
+    app.dependency_overrides[get_current_user] = lambda: "test_user_1"
+    return app
+
+
+class TestTaskEventRoutes:
+    """Test the SSE and WebSocket routes stream from the app's job manager"""
+
+    @pytest.mark.asyncio
+    async def test_sse_streams_task_events(self, app, job_manager):
+        job = await job_manager.create_job(make_task("task_1"), make_mcp())
+        await job_manager.process_job(job.id)
+
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/api/tasks/task_1/events")
+
+        assert response.status_code == 200
+        assert response.text.count("event: status") == 3
+        assert '"job_status":"completed"' in response.text
+
+    def test_websocket_streams_task_events(self, app, job_manager):
+        job = asyncio.run(job_manager.create_job(make_task("task_1"), make_mcp()))
+        asyncio.run(job_manager.process_job(job.id))
+        token = auth_service.create_access_token({"sub": "test_user_1"})
+
+        with TestClient(app).websocket_connect(f"/api/tasks/task_1/ws?token={token}") as websocket:
+            events = [websocket.receive_json() for _ in range(3)]
+
+        assert [event["data"]["job_status"] for event in events] == ["queued", "running", "completed"]
+
+
+class TestEndedTaskStreams:
+    """Test that streams end when no final event can reach this replica"""
+
+    @pytest.mark.asyncio
+    async def test_finished_task_without_topic_gets_its_status(self, app, job_manager):
+        # Loaded from the database after a restart, or finished on another replica
+        finished = make_task("task_1").model_copy(update={"status": TaskStatus.COMPLETED})
+        job_manager.get_task = AsyncMock(return_value=finished)
+
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/api/tasks/task_1/events")
+        token = auth_service.create_access_token({"sub": "test_user_1"})
+        with TestClient(app).websocket_connect(f"/api/tasks/task_1/ws?token={token}") as websocket:
+            event = websocket.receive_json()
+
+        assert response.text.count("event: status") == 1
+        assert '"status":"completed"' in response.text and '"final":true' in response.text
+        assert (event["data"]["status"], event["final"]) == ("completed", True)
+        assert len(job_manager.event_bus.topics) == 0
+
+    @pytest.mark.asyncio
+    async def test_task_finishing_elsewhere_ends_the_stream(self, app, job_manager, monkeypatch):
+        running = make_task("task_1").model_copy(update={"status": TaskStatus.RUNNING})
+        finished = running.model_copy(update={"status": TaskStatus.FAILED})
+        job_manager.get_task = AsyncMock(side_effect=[running, running, finished])
+        monkeypatch.setattr(tasks_api.settings, "event_heartbeat_interval", 0.01)
+
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            response = await asyncio.wait_for(client.get("/api/tasks/task_1/events"), timeout=1)
+
+        assert response.text.count(": keepalive") == 1
+        assert response.text.endswith('"final":true}\n\n')
+        assert '"status":"failed"' in response.text
+
+    @pytest.mark.asyncio
+    async def test_evicted_topic_ends_with_current_status(self, app, job_manager, monkeypatch):
+        await job_manager.create_job(make_task("task_1"), make_mcp())
+        job_manager.event_bus.topics.max_entries = 1
+        monkeypatch.setattr(tasks_api.settings, "event_heartbeat_interval", 5)
+
+        async def evict():
+            while not job_manager.event_bus.subscriber_count("task:task_1"):
+                await asyncio.sleep(0.01)
+            job_manager.event_bus.publish("task:other", "status", {})
+
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            response, _ = await asyncio.wait_for(
+                asyncio.gather(client.get("/api/tasks/task_1/events"), evict()), timeout=1
+            )
+
+        assert response.text.count("event: status") == 2
+        assert '"job_status":"queued"' in response.text
+        assert response.text.endswith('"final":false}\n\n')
+
+
+class TestTaskRoutes:
+    """Test that task routes use the app's job manager and router"""
+
+    @pytest.mark.asyncio
+    async def test_created_task_is_run_by_dispatcher(self, app, job_manager):
+        await job_manager.start()
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post("/api/tasks", json={"type": "security-scan", "input": {"repo": "test/repo"}})
+            assert response.status_code == 200
+            task_id = response.json()["data"]["id"]
+
+            await job_manager.job_queue.join()
+            response = await client.get(f"/api/tasks/{task_id}")
+        await job_manager.stop()
+
+        job_manager._execute_job.assert_awaited_once()
+        assert response.json()["data"]["status"] == TaskStatus.COMPLETED.value
+
+    @pytest.mark.asyncio
+    async def test_routing_errors_keep_their_status(self, app):
+        app.state.task_router.route_task.side_effect = HTTPException(status_code=503, detail="No healthy MCP")
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post("/api/tasks", json={"type": "security-scan", "input": {}})
+
+        assert response.status_code == 503
+        assert response.json()["detail"] == "No healthy MCP"
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_running_task(self, app, job_manager):
+        started = asyncio.Event()
+
+        async def execute(job):
+            started.set()
+            await asyncio.sleep(10)
+
+        job_manager._execute_job = execute
+        await job_manager.start()
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post("/api/tasks", json={"type": "security-scan", "input": {}})
+            task_id = response.json()["data"]["id"]
+            await asyncio.wait_for(started.wait(), timeout=1)
+
+            response = await client.post(f"/api/tasks/{task_id}/cancel")
+            assert response.status_code == 200
+            response = await client.get(f"/api/tasks/{task_id}")
+        await asyncio.wait_for(job_manager.stop(), timeout=1)
+
+        assert response.json()["data"]["status"] == TaskStatus.CANCELLED.value
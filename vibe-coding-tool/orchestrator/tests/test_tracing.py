@@ -0,0 +1,132 @@
+"""
+Test suite for tracing spans and trace propagation into jobs
+"""
+
+import pytest
+import json
+from unittest.mock import Mock, AsyncMock
+from datetime import datetime
+
+from models.task import Task, TaskStatus, TaskType
+from models.mcp import MCPInfo, MCPStatus, RoutingFlags
+from core.job_manager import JobManager
+from utils.tracing import (
+    Tracer, InMemoryExporter, JsonLinesExporter, OTLPJsonExporter,
+    tracer, parse_traceparent, format_traceparent
+)
+
+
+def make_task(task_id: str) -> Task:
+    return Task(
+        id=task_id,
+        user_id="test_user_1",
+        type=TaskType.SECURITY_SCAN,
+        input={"repo": "test/repo"},
+        status=TaskStatus.PENDING,
+        created_at=datetime.utcnow()
+    )
+
+
+def make_mcp() -> MCPInfo:
+    return MCPInfo(
+        id="test_mcp_1",
+        name="Test MCP",
+        url="https://test-mcp.example.com",
+        capabilities=[],
+        supported_task_types=["security-scan"],
+        routing_flags=RoutingFlags(),
+        status=MCPStatus.HEALTHY
+    )
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = InMemoryExporter()
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    yield exporter
+    tracer.flush()
+
+
+class TestTracer:
+    """Test span nesting, propagation formats and exporters"""
+
+    def test_traceparent_round_trip_and_rejects_garbage(self):
+        value = format_traceparent("a" * 32, "b" * 16)
+        assert value == f"00-{'a' * 32}-{'b' * 16}-01"
+        assert parse_traceparent(value) == ("a" * 32, "b" * 16)
+        assert parse_traceparent("00-xyz-abc-01") is None
+        assert parse_traceparent(f"00-{'0' * 32}-{'b' * 16}-01") is None
+        assert parse_traceparent(None) is None
+
+    def test_spans_nest_and_export_in_batches(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        local = Tracer("test-service", JsonLinesExporter(str(path)), batch_size=2)
+
+        remote = ("c" * 32, "d" * 16)
+        with local.start_span("request", parent=remote, kind="server") as request:
+            with local.start_span("child") as child:
+                assert local.current_span() is child
+                carrier = local.inject({})
+            with pytest.raises(ValueError):
+                with local.start_span("failing"):
+                    raise ValueError("boom")
+        assert local.current_span() is None
+        assert local.flush()
+
+        spans = {span["name"]: span for span in map(json.loads, path.read_text().splitlines())}
+        assert set(spans) == {"request", "child", "failing"}
+        assert {span["trace_id"] for span in spans.values()} == {"c" * 32}
+        assert spans["request"]["parent_id"] == "d" * 16
+        assert spans["child"]["parent_id"] == request.span_id
+        assert spans["failing"]["status"] == "error"
+        assert spans["failing"]["status_message"] == "ValueError: boom"
+        assert carrier == {"traceparent": format_traceparent("c" * 32, child.span_id)}
+        assert local.exported == 3
+
+    def test_otlp_encoding(self):
+        local = Tracer("test-service")
+        with local.start_span("op", attributes={"n": 1, "ok": True, "name": "x"}) as span:
+            pass
+
+        encoded = OTLPJsonExporter("http://collector/v1/traces").encode([span])
+        resource = encoded["resourceSpans"][0]
+        assert resource["resource"]["attributes"][0]["value"] == {"stringValue": "test-service"}
+        otlp_span = resource["scopeSpans"][0]["spans"][0]
+        assert otlp_span["traceId"] == span.trace_id and "parentSpanId" not in otlp_span
+        assert otlp_span["status"] == {"code": 1}
+        assert {"key": "n", "value": {"intValue": "1"}} in otlp_span["attributes"]
+        assert {"key": "ok", "value": {"boolValue": True}} in otlp_span["attributes"]
+
+
+class TestJobTracing:
+    """Test that job execution continues the creating request's trace"""
+
+    @pytest.mark.asyncio
+    async def test_job_spans_and_envelope_share_the_request_trace(self, exporter):
+        client = Mock()
+        client.post = AsyncMock(return_value=Mock(status_code=200, raise_for_status=Mock(), json=Mock(return_value={})))
+        http_clients = Mock()
+        http_clients.get.return_value = client
+        result_manager = Mock()
+        result_manager.store_result = AsyncMock(return_value="result_1")
+        manager = JobManager(result_manager, Mock(), Mock(), Mock(), http_clients=http_clients)
+
+        with tracer.start_span("POST /api/tasks", kind="server") as request:
+            job = await manager.create_job(make_task("task_1"), make_mcp())
+        assert parse_traceparent(job.trace_parent) == (request.trace_id, request.span_id)
+
+        await manager.process_job(job.id)
+        assert tracer.flush()
+
+        spans = {span.name: span for span in exporter.spans}
+        assert {span.trace_id for span in spans.values()} == {request.trace_id}
+        assert spans["job.queued"].parent_id == request.span_id
+        assert spans["job.execute"].parent_id == request.span_id
+        assert spans["job.sign_payload"].parent_id == spans["job.execute"].span_id
+        assert spans["mcp.request"].parent_id == spans["job.execute"].span_id
+        assert spans["mcp.request"].attributes["http.status_code"] == 200
+
+        # The signed envelope and the HTTP hop both carry the trace
+        call = client.post.call_args.kwargs
+        assert parse_traceparent(call["json"]["traceparent"]) == (request.trace_id, spans["job.execute"].span_id)
+        assert parse_traceparent(call["headers"]["traceparent"]) == (request.trace_id, spans["mcp.request"].span_id)
@@ -3,10 +3,20 @@ Utility functions for Vibe Coding Tool
 """
 
 from .rate_limiter import RateLimiter
+from .http_client import HTTPClientRegistry, http_clients
+from .cache import BoundedCache, estimate_size
+from .pagination import encode_cursor, decode_cursor, next_cursor
 from .crypto import hash_password, verify_password, generate_salt, generate_api_key, generate_session_id, secure_compare, generate_random_string
 
 __all__ = [
     'RateLimiter',
+    'HTTPClientRegistry',
+    'http_clients',
+    'BoundedCache',
+    'estimate_size',
+    'encode_cursor',
+    'decode_cursor',
+    'next_cursor',
     'hash_password',
     'verify_password',
     'generate_salt',
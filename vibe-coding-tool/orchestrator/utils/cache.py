@@ -0,0 +1,293 @@
+"""
+Bounded in-memory LRU/TTL cache for Vibe Coding Tool
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+def estimate_size(value: Any) -> int:
+    """Approximate size in bytes of a JSON-like value, as serialized"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode())
+    return len(json.dumps(value, default=str, separators=(",", ":")))
+
+class _Entry:
+    __slots__ = ('value', 'size', 'expires_at', 'owner')
+
+    def __init__(self, value: Any, size: int, expires_at: Optional[float], owner: Optional[str]):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.owner = owner
+
+class BoundedCache:
+    """
+    LRU cache with TTL expiry, a memory budget and per-owner quotas.
+
+    Every entry is charged its size in bytes (``estimate_size`` unless the
+    caller passes one). Inserting evicts least recently used entries until the
+    cache fits ``max_bytes``/``max_entries``, and evicts the owner's own least
+    recently used entries until the owner fits ``max_bytes_per_owner``.
+    Expired entries are dropped when read and by a background sweeper that
+    walks an expiry heap, so sweeping costs O(expired log n) rather than a
+    full scan. ``on_evict(key, value)`` is called for every entry evicted or
+    expired, but not for entries that are replaced, popped or cleared.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        default_ttl: Optional[float] = None,
+        max_bytes_per_owner: Optional[int] = None,
+        sizer: Callable[[Any], int] = estimate_size,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None
+    ):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.max_bytes_per_owner = max_bytes_per_owner
+        self.sizer = sizer
+        self.on_evict = on_evict
+
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._owner_keys: Dict[str, "OrderedDict[Hashable, None]"] = {}
+        self._owner_bytes: Dict[str, int] = {}
+        self._expiry_heap: List[Tuple[float, int, Hashable]] = []
+        self._counter = 0
+        self._sweeper: Optional[asyncio.Task] = None
+
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not self._expired(entry, time.monotonic())
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value and mark it most recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        if self._expired(entry, time.monotonic()):
+            self._drop(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        if entry.owner is not None:
+            self._owner_keys[entry.owner].move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Any = _MISSING,
+        owner: Optional[str] = None,
+        size: Optional[int] = None
+    ) -> bool:
+        """
+        Insert or replace a value; returns False if it can never fit.
+
+        ``ttl`` defaults to the cache's ``default_ttl``; pass None to keep the
+        entry until it is evicted.
+        """
+        size = self.sizer(value) if size is None else size
+
+        if (
+            (self.max_bytes is not None and size > self.max_bytes)
+            or (owner is not None and self.max_bytes_per_owner is not None and size > self.max_bytes_per_owner)
+        ):
+            self.rejections += 1
+            self.pop(key)
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+
+        ttl = self.default_ttl if ttl is _MISSING else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        self._entries[key] = _Entry(value, size, expires_at, owner)
+        self.bytes += size
+        if owner is not None:
+            self._owner_keys.setdefault(owner, OrderedDict())[key] = None
+            self._owner_bytes[owner] = self._owner_bytes.get(owner, 0) + size
+
+        if expires_at is not None:
+            self._counter += 1
+            heapq.heappush(self._expiry_heap, (expires_at, self._counter, key))
+            self._compact_expiry_heap()
+
+        self._enforce_limits(owner)
+        return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a value and return it"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._remove(key)
+        return entry.value
+
+    def clear(self):
+        self._entries.clear()
+        self._owner_keys.clear()
+        self._owner_bytes.clear()
+        self._expiry_heap.clear()
+        self.bytes = 0
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Unexpired entries, without touching LRU order or counters"""
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            if not self._expired(entry, now):
+                yield key, entry.value
+
+    def values(self) -> Iterator[Any]:
+        for _, value in self.items():
+            yield value
+
+    def owner_items(self, owner: str) -> Iterator[Tuple[Hashable, Any]]:
+        """Unexpired entries charged to one owner"""
+        now = time.monotonic()
+        for key in list(self._owner_keys.get(owner, ())):
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry, now):
+                yield key, entry.value
+
+    def owner_bytes(self, owner: str) -> int:
+        return self._owner_bytes.get(owner, 0)
+
+    def sweep(self) -> int:
+        """Drop every expired entry, returning how many were removed"""
+        now = time.monotonic()
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            # Heap entries of replaced or removed keys are stale
+            if entry is not None and entry.expires_at == expires_at:
+                self._drop(key)
+                removed += 1
+
+        self._compact_expiry_heap()
+        self.expirations += removed
+        return removed
+
+    def start_sweeper(self, interval: float = 60.0):
+        """Start the background TTL sweeper"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop(interval), name=f"cache-sweeper-{self.name}")
+
+    async def stop_sweeper(self):
+        if self._sweeper is None:
+            return
+
+        self._sweeper.cancel()
+        try:
+            await self._sweeper
+        except asyncio.CancelledError:
+            pass
+        self._sweeper = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and occupancy for metrics export"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'rejections': self.rejections,
+            'owners': len(self._owner_keys)
+        }
+
+    @staticmethod
+    def _expired(entry: _Entry, now: float) -> bool:
+        return entry.expires_at is not None and entry.expires_at <= now
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+        if entry.owner is not None:
+            keys = self._owner_keys[entry.owner]
+            del keys[key]
+            remaining = self._owner_bytes[entry.owner] - entry.size
+            if keys:
+                self._owner_bytes[entry.owner] = remaining
+            else:
+                del self._owner_keys[entry.owner]
+                del self._owner_bytes[entry.owner]
+
+    def _compact_expiry_heap(self):
+        # Replaced and evicted keys leave stale heap items; rebuild when they dominate
+        heap = self._expiry_heap
+        if len(heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [
+                item for item in heap
+                if item[2] in self._entries and self._entries[item[2]].expires_at == item[0]
+            ]
+            heapq.heapify(self._expiry_heap)
+
+    def _drop(self, key: Hashable):
+        """Remove an evicted or expired entry and tell on_evict"""
+        value = self._entries[key].value
+        self._remove(key)
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+
+    def _evict(self, key: Hashable):
+        self._drop(key)
+        self.evictions += 1
+
+    def _enforce_limits(self, owner: Optional[str]):
+        if owner is not None and self.max_bytes_per_owner is not None:
+            while self._owner_bytes.get(owner, 0) > self.max_bytes_per_owner:
+                self._evict(next(iter(self._owner_keys[owner])))
+
+        while (
+            (self.max_bytes is not None and self.bytes > self.max_bytes)
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            self._evict(next(iter(self._entries)))
+
+    async def _sweep_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = self.sweep()
+                if removed:
+                    logger.debug(f"Cache {self.name} swept {removed} expired entries")
+            except Exception as e:
+                logger.error(f"Error sweeping cache {self.name}: {str(e)}")
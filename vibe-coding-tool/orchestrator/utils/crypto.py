@@ -3,6 +3,7 @@ Cryptographic utilities for Vibe Coding Tool
 """
 
 import hashlib
+import hmac
 import secrets
 import os
 from typing import Tuple
@@ -33,6 +34,10 @@ def secure_compare(a: str, b: str) -> bool:
     """Constant-time string comparison for security"""
     return secrets.compare_digest(a, b)
 
+def hmac_sha256_hex(key: str, message: bytes) -> str:
+    """Hex HMAC-SHA256 of a message"""
+    return hmac.new(key.encode(), message, hashlib.sha256).hexdigest()
+
 def generate_random_string(length: int = 16) -> str:
     """Generate a random string"""
     return secrets.token_hex(length)
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Shared outbound HTTP clients for Vibe Coding Tool
+"""
+
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Named upstream pools. Each pool is its own client, so the connection limits
+# of one upstream (e.g. a slow HF Space) cannot exhaust another's.
+DEFAULT_POOLS = ("default", "github", "huggingface", "mcp")
+
+class HTTPClientRegistry:
+    """Process-wide registry of pooled, keep-alive httpx clients"""
+
+    def __init__(self, pool_names=DEFAULT_POOLS):
+        self.pool_names = tuple(pool_names)
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+
+    def open(self):
+        """Create a client for every configured pool"""
+        for name in self.pool_names:
+            self.get(name)
+        logger.info(
+            f"Opened HTTP client pools {', '.join(self.pool_names)} "
+            f"(http2={'on' if self.http2_enabled else 'off'})"
+        )
+
+    @property
+    def http2_enabled(self) -> bool:
+        return settings.http2_enabled and HTTP2_AVAILABLE
+
+    def get(self, name: str = "default") -> httpx.AsyncClient:
+        """Get the shared client for a pool, creating it on first use"""
+        client = self.clients.get(name)
+        if client is None or client.is_closed:
+            client = self._create_client()
+            self.clients[name] = client
+        return client
+
+    async def aclose(self):
+        """Close every pooled client"""
+        for name, client in list(self.clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"Error closing HTTP client pool {name}: {str(e)}")
+        self.clients.clear()
+
+    def _create_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=self.http2_enabled,
+            timeout=httpx.Timeout(
+                settings.http_timeout,
+                connect=settings.http_connect_timeout
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry
+            )
+        )
+
+# Global client registry, opened and closed by the application lifespan
+http_clients = HTTPClientRegistry()
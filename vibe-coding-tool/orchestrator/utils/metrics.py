@@ -2,55 +2,256 @@
 Metrics collection for Vibe Coding Tool
 """
 
+import asyncio
+import logging
 import time
+from bisect import bisect_left
 from datetime import datetime
-from typing import Dict, Any, List
-from collections import defaultdict, deque
+from typing import Dict, Any, List, Optional, Tuple, Iterable, Callable, Awaitable
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Rolling windows reported next to the lifetime totals
+WINDOWS = {'1m': 60, '5m': 300, '1h': 3600}
+WINDOW_SLOT_SECONDS = 10
+WINDOW_SLOTS = max(WINDOWS.values()) // WINDOW_SLOT_SECONDS
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram with lifetime totals and rolling windows.
+
+    Observations also land in a ring of ``WINDOW_SLOT_SECONDS`` slots covering
+    the longest window, so a window is the sum of its recent slots. Recording
+    is a bisect and a few increments; slot storage is allocated once and
+    reused as the ring wraps.
+    """
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count', 'failures', '_ring', '_ring_epochs')
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.failures = 0
+        # Each slot: bucket counts, then sum, count and failures
+        self._ring: List[Optional[list]] = [None] * WINDOW_SLOTS
+        self._ring_epochs = [-1] * WINDOW_SLOTS
+
+    def observe(self, value: float, success: bool = True, now: Optional[float] = None):
+        index = bisect_left(self.bounds, value)
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+        if not success:
+            self.failures += 1
+
+        epoch = int((time.monotonic() if now is None else now) // WINDOW_SLOT_SECONDS)
+        position = epoch % WINDOW_SLOTS
+        slot = self._ring[position]
+        if slot is None:
+            slot = self._ring[position] = [0] * (len(self.counts) + 3)
+        elif self._ring_epochs[position] != epoch:
+            for i in range(len(slot)):
+                slot[i] = 0
+        self._ring_epochs[position] = epoch
+
+        slot[index] += 1
+        slot[-3] += value
+        slot[-2] += 1
+        if not success:
+            slot[-1] += 1
+
+    def window(self, seconds: int, now: Optional[float] = None) -> List[float]:
+        """Bucket counts followed by sum, count and failures over the last ``seconds``"""
+        current = int((time.monotonic() if now is None else now) // WINDOW_SLOT_SECONDS)
+        oldest = current - seconds // WINDOW_SLOT_SECONDS
+        totals = [0] * (len(self.counts) + 3)
+        for slot, epoch in zip(self._ring, self._ring_epochs):
+            if slot is not None and oldest < epoch <= current:
+                for i, value in enumerate(slot):
+                    totals[i] += value
+        return totals
+
+    def lifetime(self) -> List[float]:
+        """Lifetime totals in the layout of ``window()``"""
+        return [*self.counts, self.sum, self.count, self.failures]
+
+def merge_totals(totals: Iterable[List[float]], size: int) -> List[float]:
+    merged = [0] * size
+    for entry in totals:
+        for i, value in enumerate(entry):
+            merged[i] += value
+    return merged
+
+def quantile(counts: List[float], bounds: Tuple[float, ...], q: float) -> Optional[float]:
+    """Estimate a quantile from bucket counts by interpolating within its bucket"""
+    total = sum(counts)
+    if not total:
+        return None
+
+    rank = q * total
+    seen = 0
+    for index, count in enumerate(counts):
+        if count and seen + count >= rank:
+            if index == len(bounds):
+                # Above the largest bound; the best we can say
+                return bounds[-1]
+            lower = bounds[index - 1] if index else 0.0
+            return lower + (bounds[index] - lower) * (rank - seen) / count
+        seen += count
+    return bounds[-1]
+
+def summarize(totals: List[float], bounds: Tuple[float, ...] = LATENCY_BUCKETS) -> Dict[str, Any]:
+    """Count, mean, success rate and percentiles of histogram totals"""
+    counts, total_sum, count, failures = totals[:-3], totals[-3], totals[-2], totals[-1]
+    summary = {
+        "count": count,
+        "average": total_sum / count if count else 0,
+        "success_rate": ((count - failures) / count) * 100 if count else 0
+    }
+    for q in QUANTILES:
+        summary[f"p{int(q * 100)}"] = quantile(counts, bounds, q)
+    return summary
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names: Tuple[str, ...], values: Tuple[Any, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
 
 class MetricsCollector:
-    """Collect and manage application metrics"""
-    
-    def __init__(self, max_metrics: int = 1000):
-        self.max_metrics = max_metrics
-        self.request_metrics = deque(maxlen=max_metrics)
-        self.job_metrics = deque(maxlen=max_metrics)
-        self.mcp_metrics = deque(maxlen=max_metrics)
+    """
+    Collect and manage application metrics.
+
+    Everything is aggregated as it is recorded: counters per label set and a
+    latency histogram per route, job type and MCP. Reading the metrics only
+    walks the aggregates, never individual samples.
+    """
+
+    def __init__(self, latency_window: int = 200, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
         self.start_time = datetime.utcnow()
-    
+        self.buckets = buckets
+
+        # (method, path, status code) -> count; (method, path) -> latency
+        self.request_counts: Dict[Tuple[str, str, int], int] = {}
+        self.request_latency: Dict[Tuple[str, str], Histogram] = {}
+        # (job type, status) -> count; job type -> duration
+        self.job_counts: Dict[Tuple[str, str], int] = {}
+        self.job_durations: Dict[str, Histogram] = {}
+        # (MCP ID, tool, success) -> count; MCP ID -> latency
+        self.mcp_counts: Dict[Tuple[str, str, bool], int] = {}
+        self.mcp_latency: Dict[str, Histogram] = {}
+
+        # Recent call durations per MCP, with lazily recomputed percentiles
+        self.latency_window = latency_window
+        self.mcp_latencies: Dict[str, deque] = {}
+        self._latency_percentiles: Dict[str, Dict[int, float]] = {}
+
+        # Caches whose counters are exported with the metrics
+        self.caches: Dict[str, Any] = {}
+
+        # Gauges snapshotted from services: name -> (help, label names, values)
+        self.gauges: Dict[str, Tuple[str, Tuple[str, ...], Dict[Tuple, float]]] = {}
+        self._gauge_sources: List[Callable[[], Awaitable[None]]] = []
+        self._gauge_refresher: Optional[asyncio.Task] = None
+
+    def register_cache(self, cache) -> None:
+        """Export a BoundedCache's hit/miss/eviction counters"""
+        self.caches[cache.name] = cache
+
+    def register_gauge_source(self, source: Callable[[], Awaitable[None]]) -> None:
+        """Add a coroutine function that publishes gauges with ``set_gauge``"""
+        self._gauge_sources.append(source)
+
+    def set_gauge(self, name: str, help_text: str, label_names: Tuple[str, ...], values: Dict[Tuple, float]):
+        """Replace every series of a gauge at once"""
+        self.gauges[name] = (help_text, label_names, values)
+
+    async def refresh_gauges(self):
+        """Run every gauge source once"""
+        for source in self._gauge_sources:
+            try:
+                await source()
+            except Exception as e:
+                logger.error(f"Error refreshing gauges from {getattr(source, '__name__', source)}: {str(e)}")
+
+    def start_gauge_refresh(self, interval: float = 5.0):
+        """
+        Refresh gauges in the background, so exposition (possibly from
+        another thread) only reads the last snapshot and never waits on
+        queues or the network.
+        """
+        if self._gauge_refresher is None or self._gauge_refresher.done():
+            self._gauge_refresher = asyncio.create_task(self._refresh_loop(interval), name="metrics-gauge-refresh")
+
+    async def stop_gauge_refresh(self):
+        if self._gauge_refresher is None:
+            return
+
+        self._gauge_refresher.cancel()
+        try:
+            await self._gauge_refresher
+        except asyncio.CancelledError:
+            pass
+        self._gauge_refresher = None
+
+    async def _refresh_loop(self, interval: float):
+        while True:
+            await self.refresh_gauges()
+            await asyncio.sleep(interval)
+
+    def _histogram(self, histograms: Dict, key) -> Histogram:
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram(self.buckets)
+        return histogram
+
     async def record_request(self, method: str, path: str, status_code: int, processing_time: float):
-        """Record HTTP request metrics"""
-        metric = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "method": method,
-            "path": path,
-            "status_code": status_code,
-            "processing_time": processing_time
-        }
-        self.request_metrics.append(metric)
-    
+        """Record HTTP request metrics; ``path`` should be the route template"""
+        key = (method, path, status_code)
+        self.request_counts[key] = self.request_counts.get(key, 0) + 1
+        self._histogram(self.request_latency, (method, path)).observe(processing_time, status_code < 400)
+
     async def record_job(self, job_id: str, job_type: str, status: str, duration: float, success: bool):
         """Record job execution metrics"""
-        metric = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "job_id": job_id,
-            "job_type": job_type,
-            "status": status,
-            "duration": duration,
-            "success": success
-        }
-        self.job_metrics.append(metric)
-    
+        key = (job_type, status)
+        self.job_counts[key] = self.job_counts.get(key, 0) + 1
+        self._histogram(self.job_durations, job_type).observe(duration, success)
+
     async def record_mcp_call(self, mcp_id: str, tool_name: str, duration: float, success: bool):
         """Record MCP call metrics"""
-        metric = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "mcp_id": mcp_id,
-            "tool_name": tool_name,
-            "duration": duration,
-            "success": success
-        }
-        self.mcp_metrics.append(metric)
-    
+        key = (mcp_id, tool_name, success)
+        self.mcp_counts[key] = self.mcp_counts.get(key, 0) + 1
+        self._histogram(self.mcp_latency, mcp_id).observe(duration, success)
+
+        latencies = self.mcp_latencies.get(mcp_id)
+        if latencies is None:
+            latencies = self.mcp_latencies[mcp_id] = deque(maxlen=self.latency_window)
+        latencies.append(duration)
+        self._latency_percentiles.pop(mcp_id, None)
+
+    def get_mcp_latency_percentile(self, mcp_id: str, percentile: int = 95) -> Optional[float]:
+        """Latency percentile over an MCP's most recent calls, None without samples"""
+        latencies = self.mcp_latencies.get(mcp_id)
+        if not latencies:
+            return None
+
+        cached = self._latency_percentiles.setdefault(mcp_id, {})
+        if percentile not in cached:
+            ordered = sorted(latencies)
+            cached[percentile] = ordered[min(len(ordered) - 1, len(ordered) * percentile // 100)]
+        return cached[percentile]
+
     async def get_metrics(self) -> Dict[str, Any]:
         """Get aggregated metrics"""
         return {
@@ -58,80 +259,136 @@ class MetricsCollector:
             "uptime": (datetime.utcnow() - self.start_time).total_seconds(),
             "requests": self._get_request_metrics(),
             "jobs": self._get_job_metrics(),
-            "mcps": self._get_mcp_metrics()
+            "mcps": self._get_mcp_metrics(),
+            "caches": {name: cache.stats() for name, cache in self.caches.items()}
+        }
+
+    def _latency_summary(self, histograms: Iterable[Histogram]) -> Dict[str, Any]:
+        """Lifetime and rolling-window summaries of several histograms combined"""
+        histograms = list(histograms)
+        size = len(self.buckets) + 4
+        now = time.monotonic()
+        return {
+            "lifetime": summarize(merge_totals((h.lifetime() for h in histograms), size), self.buckets),
+            **{
+                name: summarize(merge_totals((h.window(seconds, now) for h in histograms), size), self.buckets)
+                for name, seconds in WINDOWS.items()
+            }
         }
-    
+
     def _get_request_metrics(self) -> Dict[str, Any]:
         """Get request metrics summary"""
-        if not self.request_metrics:
-            return {
-                "total_requests": 0,
-                "average_response_time": 0,
-                "success_rate": 0,
-                "status_codes": {}
-            }
-        
-        total_requests = len(self.request_metrics)
-        total_time = sum(m["processing_time"] for m in self.request_metrics)
-        successful_requests = sum(1 for m in self.request_metrics if m["status_code"] < 400)
-        
-        status_codes = defaultdict(int)
-        for m in self.request_metrics:
-            status_codes[m["status_code"]] += 1
-        
+        latency = self._latency_summary(self.request_latency.values())
+        status_codes: Dict[int, int] = {}
+        for (_, _, status_code), count in self.request_counts.items():
+            status_codes[status_code] = status_codes.get(status_code, 0) + count
+
         return {
-            "total_requests": total_requests,
-            "average_response_time": total_time / total_requests,
-            "success_rate": (successful_requests / total_requests) * 100,
-            "status_codes": dict(status_codes)
+            "total_requests": latency["lifetime"]["count"],
+            "average_response_time": latency["lifetime"]["average"],
+            "success_rate": latency["lifetime"]["success_rate"],
+            "status_codes": status_codes,
+            "latency": latency,
+            "routes": {
+                f"{method} {path}": summarize(histogram.lifetime(), self.buckets)
+                for (method, path), histogram in self.request_latency.items()
+            }
         }
-    
+
     def _get_job_metrics(self) -> Dict[str, Any]:
         """Get job metrics summary"""
-        if not self.job_metrics:
-            return {
-                "total_jobs": 0,
-                "average_duration": 0,
-                "success_rate": 0,
-                "status_distribution": {}
-            }
-        
-        total_jobs = len(self.job_metrics)
-        total_duration = sum(m["duration"] for m in self.job_metrics)
-        successful_jobs = sum(1 for m in self.job_metrics if m["success"])
-        
-        status_distribution = defaultdict(int)
-        for m in self.job_metrics:
-            status_distribution[m["status"]] += 1
-        
+        latency = self._latency_summary(self.job_durations.values())
+        status_distribution: Dict[str, int] = {}
+        for (_, status), count in self.job_counts.items():
+            status_distribution[status] = status_distribution.get(status, 0) + count
+
         return {
-            "total_jobs": total_jobs,
-            "average_duration": total_duration / total_jobs,
-            "success_rate": (successful_jobs / total_jobs) * 100,
-            "status_distribution": dict(status_distribution)
+            "total_jobs": latency["lifetime"]["count"],
+            "average_duration": latency["lifetime"]["average"],
+            "success_rate": latency["lifetime"]["success_rate"],
+            "status_distribution": status_distribution,
+            "duration": latency
         }
-    
+
     def _get_mcp_metrics(self) -> Dict[str, Any]:
         """Get MCP metrics summary"""
-        if not self.mcp_metrics:
-            return {
-                "total_calls": 0,
-                "average_duration": 0,
-                "success_rate": 0,
-                "mcp_distribution": {}
-            }
-        
-        total_calls = len(self.mcp_metrics)
-        total_duration = sum(m["duration"] for m in self.mcp_metrics)
-        successful_calls = sum(1 for m in self.mcp_metrics if m["success"])
-        
-        mcp_distribution = defaultdict(int)
-        for m in self.mcp_metrics:
-            mcp_distribution[m["mcp_id"]] += 1
-        
+        latency = self._latency_summary(self.mcp_latency.values())
+
         return {
-            "total_calls": total_calls,
-            "average_duration": total_duration / total_calls,
-            "success_rate": (successful_calls / total_calls) * 100,
-            "mcp_distribution": dict(mcp_distribution)
-        }
\ No newline at end of file
+            "total_calls": latency["lifetime"]["count"],
+            "average_duration": latency["lifetime"]["average"],
+            "success_rate": latency["lifetime"]["success_rate"],
+            "mcp_distribution": {mcp_id: histogram.count for mcp_id, histogram in self.mcp_latency.items()},
+            "latency": latency,
+            "per_mcp": {
+                mcp_id: summarize(histogram.window(WINDOWS['5m']), self.buckets)
+                for mcp_id, histogram in self.mcp_latency.items()
+            }
+        }
+
+    def render_prometheus(self) -> str:
+        """
+        Metrics in the Prometheus text exposition format (version 0.0.4).
+
+        Safe to call from the metrics listener thread: every mapping is
+        copied (atomically, under the GIL) before it is walked.
+        """
+        lines: List[str] = []
+
+        def counter(name: str, help_text: str, label_names: Tuple[str, ...], values: Dict[Tuple, int]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in values.copy().items():
+                lines.append(f"{name}{_labels(label_names, labels)} {value}")
+
+        def histogram(name: str, help_text: str, label_names: Tuple[str, ...], values: Dict[Tuple, Histogram]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, h in values.copy().items():
+                cumulative = 0
+                for bound, count in zip((*h.bounds, "+Inf"), h.counts):
+                    cumulative += count
+                    le = 'le="%s"' % bound
+                    lines.append(f"{name}_bucket{_labels(label_names, labels, le)} {cumulative}")
+                lines.append(f"{name}_sum{_labels(label_names, labels)} {h.sum}")
+                lines.append(f"{name}_count{_labels(label_names, labels)} {h.count}")
+
+        def gauge(name: str, help_text: str, label_names: Tuple[str, ...], values: Dict[Tuple, float]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in values.copy().items():
+                lines.append(f"{name}{_labels(label_names, labels)} {value}")
+
+        gauge("process_uptime_seconds", "Seconds since the orchestrator started", (), {
+            (): (datetime.utcnow() - self.start_time).total_seconds()
+        })
+
+        counter("http_requests_total", "HTTP requests by route and status", ("method", "path", "status"),
+                self.request_counts)
+        histogram("http_request_duration_seconds", "HTTP request latency", ("method", "path"),
+                  self.request_latency)
+
+        counter("jobs_total", "Finished jobs by type and status", ("job_type", "status"), self.job_counts)
+        histogram("job_duration_seconds", "Job duration", ("job_type",),
+                  {(job_type,): h for job_type, h in self.job_durations.copy().items()})
+
+        counter("mcp_calls_total", "MCP calls by tool and outcome", ("mcp_id", "tool", "outcome"), {
+            (mcp_id, tool, "success" if success else "failure"): count
+            for (mcp_id, tool, success), count in self.mcp_counts.copy().items()
+        })
+        histogram("mcp_call_duration_seconds", "MCP call latency", ("mcp_id",),
+                  {(mcp_id,): h for mcp_id, h in self.mcp_latency.copy().items()})
+
+        cache_stats = {name: cache.stats() for name, cache in self.caches.copy().items()}
+        gauge("cache_entries", "Entries held by a cache", ("cache",),
+              {(name,): stats['entries'] for name, stats in cache_stats.items()})
+        gauge("cache_bytes", "Estimated bytes held by a cache", ("cache",),
+              {(name,): stats['bytes'] for name, stats in cache_stats.items()})
+        for field in ('hits', 'misses', 'evictions', 'expirations'):
+            counter(f"cache_{field}_total", f"Cache {field}", ("cache",),
+                    {(name,): stats[field] for name, stats in cache_stats.items()})
+
+        for name, (help_text, label_names, values) in self.gauges.copy().items():
+            gauge(name, help_text, label_names, values)
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,91 @@
+"""
+Prometheus exposition listener for Vibe Coding Tool
+"""
+
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from utils.metrics import MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    server_version = "vibe-metrics"
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/health":
+            self._reply(200, b"ok\n")
+        elif path in ("/", "/metrics"):
+            try:
+                body = self.server.collector.render_prometheus().encode()
+            except Exception as e:
+                logger.error(f"Error rendering metrics: {str(e)}")
+                self._reply(500, b"error rendering metrics\n")
+                return
+            self._reply(200, body)
+        else:
+            self._reply(404, b"not found\n")
+
+    def _reply(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would drown the application log
+        pass
+
+class MetricsServer:
+    """
+    Serves ``/metrics`` on its own port from a background thread.
+
+    Scrapes are rendered in the listener thread from the collector's
+    in-memory aggregates and gauge snapshots, so they never queue behind
+    API requests on the event loop.
+    """
+
+    def __init__(self, collector: MetricsCollector, host: str = "0.0.0.0", port: int = 8090):
+        self.collector = collector
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """Start listening; returns False if the port could not be bound"""
+        if self._server is not None:
+            return True
+
+        try:
+            server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        except OSError as e:
+            # e.g. another worker process of this host already serves metrics
+            logger.warning(f"Metrics listener not started on {self.host}:{self.port}: {str(e)}")
+            return False
+
+        server.daemon_threads = True
+        server.collector = self.collector
+        self._server = server
+        # Port 0 binds an ephemeral port
+        self.port = server.server_address[1]
+        self._thread = threading.Thread(target=server.serve_forever, name="metrics-listener", daemon=True)
+        self._thread.start()
+        logger.info(f"Serving Prometheus metrics on {self.host}:{self.port}")
+        return True
+
+    def stop(self):
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
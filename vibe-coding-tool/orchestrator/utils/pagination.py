@@ -0,0 +1,34 @@
+"""
+Keyset (cursor) pagination helpers for Vibe Coding Tool
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+CursorKey = Tuple[datetime, str]
+
+def encode_cursor(created_at: datetime, item_id: str) -> str:
+    """Opaque cursor pointing just past the item with this (created_at, id)"""
+    payload = json.dumps([created_at.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> CursorKey:
+    """Inverse of ``encode_cursor``; raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), str(item_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def next_cursor(
+    items: List[Any],
+    limit: int,
+    key: Callable[[Any], CursorKey] = lambda item: (item.created_at, item.id)
+) -> Optional[str]:
+    """Cursor for the page after ``items``, or None when this page is the last"""
+    if len(items) < limit or not items:
+        return None
+    return encode_cursor(*key(items[-1]))
@@ -1,37 +1,194 @@
 """
 Rate limiter for Vibe Coding Tool
+
+Limits use the generic cell rate algorithm (GCRA), the token bucket
+expressed as a single "theoretical arrival time" (TAT) per key: a key
+allowing ``max_requests`` per ``window_seconds`` with a burst of ``burst``
+admits a request while ``TAT - now <= window / max_requests * (burst - 1)``.
+One number per key means the check is O(1) and a key whose TAT has passed
+holds no state at all, so idle keys can be dropped.
 """
 
+import math
 import time
 import asyncio
-from typing import Dict, Optional
-from collections import defaultdict, deque
+import logging
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# GCRA update run atomically on the Redis server. Times are integer
+# microseconds from the server clock so replicas agree on "now".
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local burst_offset = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000000 + tonumber(clock[2])
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval * cost
+local diff = now - (new_tat - burst_offset)
+if diff < 0 then
+    return {0, 0, -diff, tat - now}
+end
+
+local ttl = new_tat - now
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(ttl / 1000))
+return {1, math.floor(diff / interval), 0, ttl}
+"""
+
+class RateLimitResult(NamedTuple):
+    """Outcome of one rate limit check; times are in seconds"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+    reset_after: float
+
+class MemoryRateLimitBackend:
+    """
+    Per-process GCRA state in a bounded key table.
+
+    Keys are kept in last-use order. Keys at the head whose TAT has passed
+    are evicted as new requests arrive, and the least recently used key
+    is dropped once ``max_keys`` is reached, so the table never grows with
+    the number of distinct callers.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self.tats: "OrderedDict[str, float]" = OrderedDict()
+        self.evictions = 0
+
+    def acquire(self, key: str, interval: float, burst_offset: float, cost: int = 1) -> RateLimitResult:
+        now = time.monotonic()
+        tats = self.tats
+
+        tat = tats.get(key, now)
+        if tat < now:
+            tat = now
+
+        new_tat = tat + interval * cost
+        diff = now - (new_tat - burst_offset)
+        if diff < 0:
+            return RateLimitResult(False, 0, 0, -diff, tat - now)
+
+        tats[key] = new_tat
+        tats.move_to_end(key)
+        self._evict(now)
+        return RateLimitResult(True, 0, int(diff / interval), 0.0, new_tat - now)
+
+    def _evict(self, now: float):
+        tats = self.tats
+        # Bounded amount of work per request; idle keys are a no-op to forget
+        for _ in range(2):
+            oldest = next(iter(tats))
+            if tats[oldest] > now:
+                break
+            del tats[oldest]
+            self.evictions += 1
+
+        while len(tats) > self.max_keys:
+            tats.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self.tats)
+
+    async def close(self):
+        pass
+
+class RedisRateLimitBackend:
+    """
+    GCRA state shared by all replicas in Redis.
+
+    Each check is one round trip running ``GCRA_SCRIPT``; keys expire on
+    their own once their TAT has passed. If Redis is unavailable requests
+    are allowed rather than turning a cache outage into an API outage.
+    """
+
+    def __init__(self, client, prefix: str = None, owns_client: bool = False):
+        self.client = client
+        self.prefix = prefix or settings.rate_limit_key_prefix
+        self.owns_client = owns_client
+        self._gcra = client.register_script(GCRA_SCRIPT)
+
+    async def acquire(self, key: str, interval: float, burst_offset: float, cost: int = 1) -> RateLimitResult:
+        try:
+            allowed, remaining, retry_after, reset_after = await self._gcra(
+                keys=[f"{self.prefix}:{key}"],
+                args=[max(int(interval * 1e6), 1), int(burst_offset * 1e6), cost]
+            )
+        except Exception as e:
+            logger.warning(f"Rate limit check failed open for {key}: {str(e)}")
+            return RateLimitResult(True, 0, 0, 0.0, 0.0)
+
+        return RateLimitResult(bool(allowed), 0, int(remaining), retry_after / 1e6, reset_after / 1e6)
+
+    async def close(self):
+        if self.owns_client:
+            await self.client.aclose()
 
 class RateLimiter:
-    """Simple rate limiter using sliding window"""
-    
-    def __init__(self, max_requests: int = 100, window_seconds: int = 60):
+    """
+    Token bucket rate limiter allowing ``max_requests`` per ``window_seconds``.
+
+    Up to ``burst`` requests (default: ``max_requests``) may arrive at once;
+    after that requests are admitted at the steady rate. Limiters may share
+    a backend, in which case their keys must not collide.
+    """
+
+    def __init__(self, max_requests: int = 100, window_seconds: float = 60, burst: Optional[int] = None, backend=None):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = defaultdict(deque)
-    
+        self.burst = burst or max_requests
+        self.backend = backend if backend is not None else MemoryRateLimitBackend()
+
+        self.interval = window_seconds / max_requests
+        self.burst_offset = self.interval * self.burst
+        self._is_async = asyncio.iscoroutinefunction(self.backend.acquire)
+
+    async def check(self, key: str, cost: int = 1) -> RateLimitResult:
+        """Consume ``cost`` tokens for ``key`` if available"""
+        if self._is_async:
+            result = await self.backend.acquire(key, self.interval, self.burst_offset, cost)
+        else:
+            result = self.backend.acquire(key, self.interval, self.burst_offset, cost)
+        return result._replace(limit=self.burst)
+
     async def is_allowed(self, key: str) -> bool:
         """Check if request is allowed based on rate limit"""
-        current_time = time.time()
-        
-        # Clean old requests
-        while self.requests[key] and current_time - self.requests[key][0] > self.window_seconds:
-            self.requests[key].popleft()
-        
-        # Check if request is allowed
-        if len(self.requests[key]) < self.max_requests:
-            self.requests[key].append(current_time)
-            return True
-        
-        return False
-    
+        return (await self.check(key)).allowed
+
     async def wait_if_needed(self, key: str) -> None:
-        """Wait if rate limit is exceeded"""
-        if not await self.is_allowed(key):
-            sleep_time = self.window_seconds - (time.time() - self.requests[key][0])
-            await asyncio.sleep(sleep_time)
\ No newline at end of file
+        """Wait until a request is allowed under the rate limit"""
+        while True:
+            result = await self.check(key)
+            if result.allowed:
+                return
+            await asyncio.sleep(max(result.retry_after, 0.001))
+
+def retry_after_header(result: RateLimitResult) -> str:
+    """Whole seconds for ``Retry-After``, rounded up so the retry succeeds"""
+    return str(max(math.ceil(result.retry_after), 1))
+
+def create_rate_limit_backend():
+    """Build the backend selected by ``settings.rate_limit_backend``"""
+    if settings.rate_limit_backend == "redis":
+        import redis.asyncio as redis
+
+        client = redis.Redis.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_max_connections
+        )
+        return RedisRateLimitBackend(client, owns_client=True)
+
+    return MemoryRateLimitBackend(max_keys=settings.rate_limit_max_keys)
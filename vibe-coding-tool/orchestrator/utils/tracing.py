@@ -0,0 +1,380 @@
+"""
+Lightweight distributed tracing for Vibe Coding Tool
+
+Spans follow the OpenTelemetry data model and propagate with the W3C
+``traceparent`` format, so the orchestrator, MCPs and workers can be
+stitched into one trace by any OTLP-compatible backend.
+"""
+
+import json
+import logging
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+from functools import wraps
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+
+# (trace ID, parent span ID) of a remote caller
+SpanContext = Tuple[str, str]
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+def format_traceparent(trace_id: str, span_id: str) -> str:
+    return f"00-{trace_id}-{span_id}-01"
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """(trace ID, span ID) from a ``traceparent`` value, None if absent or malformed"""
+    if not value:
+        return None
+
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16)
+        int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2]
+
+class Span:
+    """One timed operation; use ``Tracer.start_span`` rather than creating spans directly"""
+
+    __slots__ = (
+        'name', 'trace_id', 'span_id', 'parent_id', 'kind', 'start_ns', 'end_ns',
+        'attributes', 'status', 'status_message', '_tracer'
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None
+    ):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes) if attributes else {}
+        self.status = "unset"
+        self.status_message: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return format_traceparent(self.trace_id, self.span_id)
+
+    @property
+    def duration(self) -> Optional[float]:
+        return (self.end_ns - self.start_ns) / 1e9 if self.end_ns is not None else None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = "error"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self, end_ns: Optional[int] = None):
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns if end_ns is not None else time.time_ns()
+        if self.status == "unset":
+            self.status = "ok"
+        self._tracer._finish(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'kind': self.kind,
+            'start_ns': self.start_ns,
+            'end_ns': self.end_ns,
+            'attributes': self.attributes,
+            'status': self.status,
+            'status_message': self.status_message,
+            'service': self._tracer.service_name
+        }
+
+class SpanExporter:
+    """Receives batches of finished spans on the tracer's export thread"""
+
+    def export(self, spans: List[Span]):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+class InMemoryExporter(SpanExporter):
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, spans: List[Span]):
+        self.spans.extend(spans)
+
+class JsonLinesExporter(SpanExporter):
+    """Appends one JSON object per span to a file"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Span]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str, separators=(",", ":")) + "\n")
+
+class OTLPJsonExporter(SpanExporter):
+    """Posts spans to an OTLP/HTTP collector (``/v1/traces``) using the JSON encoding"""
+
+    KINDS = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+    STATUS_CODES = {"unset": 0, "ok": 1, "error": 2}
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    @staticmethod
+    def _value(value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {'boolValue': value}
+        if isinstance(value, int):
+            return {'intValue': str(value)}
+        if isinstance(value, float):
+            return {'doubleValue': value}
+        return {'stringValue': str(value)}
+
+    def encode(self, spans: List[Span]) -> Dict[str, Any]:
+        by_service: Dict[str, List[Span]] = {}
+        for span in spans:
+            by_service.setdefault(span._tracer.service_name, []).append(span)
+
+        return {'resourceSpans': [
+            {
+                'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': service}}]},
+                'scopeSpans': [{
+                    'scope': {'name': 'vibe-coding-tool'},
+                    'spans': [
+                        {
+                            'traceId': span.trace_id,
+                            'spanId': span.span_id,
+                            **({'parentSpanId': span.parent_id} if span.parent_id else {}),
+                            'name': span.name,
+                            'kind': self.KINDS.get(span.kind, 1),
+                            'startTimeUnixNano': str(span.start_ns),
+                            'endTimeUnixNano': str(span.end_ns),
+                            'attributes': [
+                                {'key': key, 'value': self._value(value)} for key, value in span.attributes.items()
+                            ],
+                            'status': {
+                                'code': self.STATUS_CODES[span.status],
+                                **({'message': span.status_message} if span.status_message else {})
+                            }
+                        }
+                        for span in service_spans
+                    ]
+                }]
+            }
+            for service, service_spans in by_service.items()
+        ]}
+
+    def export(self, spans: List[Span]):
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(self.encode(spans), default=str).encode(),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+class Tracer:
+    """
+    Creates spans and exports finished ones in batches.
+
+    The current span lives in a context variable, so spans opened in a
+    request or a job nest across ``await``s without passing them around.
+    Export happens on a background thread; the event loop only appends
+    finished spans to a queue. Without an exporter, spans still carry
+    trace context (for propagation) but are discarded when they end.
+    """
+
+    def __init__(
+        self,
+        service_name: str = "vibe-orchestrator",
+        exporter: Optional[SpanExporter] = None,
+        batch_size: int = 256,
+        flush_interval: float = 2.0
+    ):
+        self.service_name = service_name
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.exported = 0
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=batch_size * 64)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def current_traceparent(self) -> Optional[str]:
+        span = _current_span.get()
+        return span.traceparent if span is not None else None
+
+    def inject(self, carrier: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the current span's ``traceparent`` to headers or a payload"""
+        span = _current_span.get()
+        if span is not None:
+            carrier[TRACEPARENT_HEADER] = span.traceparent
+        return carrier
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[SpanContext] = None,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None
+    ) -> Iterator[Span]:
+        """
+        Open a span as a child of ``parent`` (a remote context) or else of
+        the current span, and make it current until the block exits.
+        Exceptions are recorded on the span and re-raised.
+        """
+        span = self.create_span(name, parent, kind, attributes, start_ns)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def traced(self, name: str, kind: str = "internal"):
+        """Decorator running a coroutine function inside a span"""
+        def decorator(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                with self.start_span(name, kind=kind):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def create_span(
+        self,
+        name: str,
+        parent: Optional[SpanContext] = None,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None
+    ) -> Span:
+        """A span that is not made current; call ``end()`` on it yourself"""
+        if parent is None:
+            current = _current_span.get()
+            parent = (current.trace_id, current.span_id) if current is not None else None
+
+        trace_id, parent_id = parent if parent is not None else (secrets.token_hex(16), None)
+        return Span(self, name, trace_id, parent_id, kind, attributes, start_ns)
+
+    def _finish(self, span: Span):
+        if self.exporter is None:
+            return
+
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+            return
+
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._export_loop, name="span-exporter", daemon=True)
+                    self._thread.start()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until every span finished so far has been exported"""
+        if self._thread is None:
+            return True
+
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def shutdown(self):
+        self.flush()
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+    def _export_loop(self):
+        while True:
+            batch: List[Span] = []
+            markers: List[threading.Event] = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            while True:
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self.exporter.export(batch)
+                    self.exported += len(batch)
+                except Exception as e:
+                    self.dropped += len(batch)
+                    logger.warning(f"Dropped {len(batch)} spans: {str(e)}")
+            for marker in markers:
+                marker.set()
+
+def create_exporter() -> Optional[SpanExporter]:
+    """Exporter selected by the tracing settings"""
+    if not settings.tracing_enabled:
+        return None
+    if settings.tracing_exporter == "otlp":
+        return OTLPJsonExporter(settings.tracing_otlp_endpoint)
+    if settings.tracing_exporter == "file":
+        return JsonLinesExporter(settings.tracing_file)
+    return None
+
+# Process-wide tracer
+tracer = Tracer(settings.tracing_service_name, create_exporter())